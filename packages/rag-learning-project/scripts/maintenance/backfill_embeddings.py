@@ -0,0 +1,72 @@
+"""
+Re-embed documents whose stored embeddings are stale.
+
+Usage:
+    python scripts/maintenance/backfill_embeddings.py
+    python scripts/maintenance/backfill_embeddings.py --collection companies --max-documents 100
+    python scripts/maintenance/backfill_embeddings.py --dry-run
+
+A document is stale when its text, the embedding model or the output
+dimension no longer match the <field>_meta recorded next to its vector
+(documents stored before metadata was recorded are always stale). Progress
+is saved after every bulk write, so re-running after an interruption
+resumes from the last written document.
+"""
+import argparse
+from pathlib import Path
+import sys
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Load environment variables
+load_dotenv(ROOT / ".env")
+
+from job_portal import MongoDBConnection, CompanyStore, JobSeekerStore, JobPortalEmbeddings
+from job_portal.workflows.embedding_backfill import EmbeddingBackfill
+
+
+# Collection -> (store class, backfill factory)
+COLLECTIONS = {
+    "companies": (CompanyStore, EmbeddingBackfill.for_job_postings),
+    "job_seekers": (JobSeekerStore, EmbeddingBackfill.for_candidate_profiles),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--collection", choices=sorted(COLLECTIONS), help="Only backfill one collection")
+    parser.add_argument("--batch-size", type=int, default=64, help="Maximum documents per API request")
+    parser.add_argument("--max-documents", type=int, help="Stop after this many stale documents")
+    parser.add_argument("--checkpoint-dir", default=str(ROOT / ".backfill"), help="Where progress is saved")
+    parser.add_argument("--dry-run", action="store_true", help="Count stale documents without embedding")
+    args = parser.parse_args()
+    
+    names = [args.collection] if args.collection else list(COLLECTIONS)
+    embeddings = JobPortalEmbeddings()
+    
+    print("=" * 60)
+    print(f"Backfilling stale embeddings{' (dry run)' if args.dry_run else ''}")
+    print("=" * 60)
+    
+    with MongoDBConnection(database_name="job_portal") as conn:
+        for name in names:
+            store_class, factory = COLLECTIONS[name]
+            backfill = factory(
+                store_class(conn.get_collection(name)),
+                embeddings,
+                checkpoint_path=str(Path(args.checkpoint_dir) / f"{name}.json"),
+                batch_size=args.batch_size
+            )
+            counts = backfill.run(max_documents=args.max_documents, dry_run=args.dry_run)
+            print(
+                f"✓ {name}: {counts['scanned']} scanned, {counts['stale']} stale, "
+                f"{counts['updated']} updated"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Run the shared embedding sidecar for every process on this host.
+
+Usage:
+    python scripts/maintenance/embedding_sidecar.py
+    python scripts/maintenance/embedding_sidecar.py --port 8765 --coalesce-ms 5
+    python scripts/maintenance/embedding_sidecar.py --socket /tmp/job_portal_embeddings.sock
+
+Then point clients at it:
+    EMBEDDING_PROVIDER=sidecar EMBEDDING_SIDECAR_URL=http://127.0.0.1:8765
+    EMBEDDING_PROVIDER=sidecar EMBEDDING_SIDECAR_URL=unix:///tmp/job_portal_embeddings.sock
+
+The sidecar owns the embedding cache (EMBEDDING_CACHE_* settings), the
+Voyage rate limiter (VOYAGE_RPM / VOYAGE_TPM) and request coalescing, so
+CLI sessions, agent workers and scripts share one cache and one quota.
+"""
+import argparse
+from pathlib import Path
+import sys
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Load environment variables
+load_dotenv(ROOT / ".env")
+
+from job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+from job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
+from job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+from job_portal.infrastructure.voyage.sidecar import EmbeddingSidecar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--coalesce-ms", type=float, default=5.0, help="Window for merging concurrent requests")
+    parser.add_argument("--local", action="store_true", help="Serve the offline hashing provider instead of Voyage AI")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+    
+    service = VoyageEmbeddingService(
+        cache=EmbeddingCache.from_env(),
+        coalesce_window=args.coalesce_ms / 1000 if args.coalesce_ms > 0 else None,
+        provider=HashingEmbeddingProvider() if args.local else None
+    )
+    sidecar = EmbeddingSidecar(
+        service,
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+        verbose=args.verbose
+    )
+    
+    print(f"Embedding sidecar serving {service.model} ({service.output_dimension}d) at {sidecar.url}")
+    try:
+        sidecar.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        sidecar.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Import a partner feed of job postings or candidate profiles.
+
+Usage:
+    python scripts/maintenance/import_feed.py --collection companies --file postings.jsonl
+    python scripts/maintenance/import_feed.py --collection job_seekers --file profiles.jsonl --chunk-size 1000
+    python scripts/maintenance/import_feed.py --collection companies --file postings.jsonl --chunks
+
+The feed is a JSON Lines file with one record per line, using the fields of
+store_job_posting / store_profile (without the embedding). Records are
+upserted by company_id + job_title (postings) or user_id (profiles), so
+re-running the same feed is safe: records whose embedded text didn't change
+keep their stored vector and are not sent to the embedding API.
+
+With --chunks, the chunks of new and changed records are synced into
+job_chunks / profile_chunks for chunk search (VECTOR_SEARCH_CHUNKS).
+"""
+import argparse
+import json
+from pathlib import Path
+import sys
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Load environment variables
+load_dotenv(ROOT / ".env")
+
+from job_portal import MongoDBConnection, CompanyStore, JobSeekerStore, JobPortalEmbeddings
+from job_portal.repositories.chunk_repository import ChunkStore
+from job_portal.workflows.bulk_upsert import bulk_upsert_job_postings, bulk_upsert_profiles
+
+
+# Collection -> (store class, import function)
+COLLECTIONS = {
+    "companies": (CompanyStore, bulk_upsert_job_postings),
+    "job_seekers": (JobSeekerStore, bulk_upsert_profiles),
+}
+
+
+def read_records(path):
+    """Yield the records of a JSON Lines file, skipping blank lines."""
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--collection", choices=sorted(COLLECTIONS), required=True, help="Collection to import into")
+    parser.add_argument("--file", required=True, help="JSON Lines feed")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Records per lookup, embedding call and bulk write")
+    parser.add_argument("--max-retries", type=int, default=3, help="Retries of failed writes per chunk")
+    parser.add_argument("--chunks", action="store_true", help="Also sync the records' chunks for chunk search")
+    args = parser.parse_args()
+    
+    store_class, import_fn = COLLECTIONS[args.collection]
+    
+    print("=" * 60)
+    print(f"Importing {args.file} into {args.collection}")
+    print("=" * 60)
+    
+    with MongoDBConnection(database_name="job_portal") as conn:
+        store = store_class(conn.get_collection(args.collection))
+        counts = import_fn(
+            store,
+            read_records(args.file),
+            JobPortalEmbeddings(generation=store.generation),
+            chunk_size=args.chunk_size,
+            max_retries=args.max_retries,
+            chunk_store=ChunkStore.for_store(store) if args.chunks else None
+        )
+    
+    print(
+        f"✓ {counts['received']} received, {counts['inserted']} inserted, {counts['updated']} updated, "
+        f"{counts['unchanged']} unchanged"
+    )
+    print(f"✓ {counts['embedded']} embedded, {counts['skipped']} skipped, {counts['failed']} failed")
+    if args.chunks:
+        print(f"✓ {counts['chunks_embedded']} chunks embedded")
+
+
+if __name__ == "__main__":
+    main()
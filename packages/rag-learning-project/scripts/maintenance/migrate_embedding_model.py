@@ -0,0 +1,123 @@
+"""
+Migrate stored embeddings to a new model or dimension without search downtime.
+
+Usage:
+    python scripts/maintenance/migrate_embedding_model.py --name v2 --model voyage-3.5 --dimension 512
+    python scripts/maintenance/migrate_embedding_model.py --name v2 --model voyage-3.5 --dimension 512 --status
+    python scripts/maintenance/migrate_embedding_model.py --name v2 --model voyage-3.5 --dimension 512 --switch
+
+The new vectors are written to shadow fields (e.g. requirements_embedding_v2)
+next to the live ones, and a matching search index is created (or printed,
+on deployments without search index management). Searches keep reading the
+live fields meanwhile. Re-run until both collections are at 100%, then pass
+--switch: it re-checks coverage and index readiness and atomically replaces
+the generation file (EMBEDDING_GENERATION_FILE), so stores and query
+embeddings created afterwards use the new fields and model together.
+Long-running processes pick the switch up through reload_generation() (the
+agent tools call it before every search).
+"""
+import argparse
+import json
+from pathlib import Path
+import sys
+from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Load environment variables
+load_dotenv(ROOT / ".env")
+
+from job_portal import MongoDBConnection, RateLimiter
+from job_portal.domain.embedding_generation import EmbeddingGeneration, load_generation, register_generation
+from job_portal.infrastructure.voyage.rate_limiter import set_rate_limiter
+from job_portal.workflows.embedding_migration import EmbeddingMigration, check_target, switch_generation
+
+
+# Collection -> migration factory
+COLLECTIONS = {
+    "companies": EmbeddingMigration.for_job_postings,
+    "job_seekers": EmbeddingMigration.for_candidate_profiles,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--name", required=True, help="Target generation name (suffix of the shadow fields)")
+    parser.add_argument("--model", required=True, help="Target Voyage model")
+    parser.add_argument("--dimension", type=int, required=True, help="Target output dimension")
+    parser.add_argument("--batch-size", type=int, default=64, help="Maximum documents per API request")
+    parser.add_argument("--max-documents", type=int, help="Stop after this many documents per collection")
+    parser.add_argument("--budget-share", type=float, default=0.5,
+                        help="Share of VOYAGE_RPM/VOYAGE_TPM this process may use (the rest is left for searches)")
+    parser.add_argument("--checkpoint-dir", default=str(ROOT / ".backfill"), help="Where progress is saved")
+    parser.add_argument("--status", action="store_true", help="Only report coverage and index state")
+    parser.add_argument("--switch", action="store_true", help="Switch reads to the target once fully migrated")
+    args = parser.parse_args()
+    
+    target = EmbeddingGeneration(args.name, model=args.model, output_dimension=args.dimension)
+    active = load_generation()
+    if not (args.switch and active == target):
+        check_target(target)
+        # Stores leave the shadow fields out of their results from now on
+        register_generation(target)
+    
+    # Searches run in other processes with their own limiter; leave them headroom
+    limiter = RateLimiter.from_env()
+    set_rate_limiter(RateLimiter(
+        rpm=limiter.rpm * args.budget_share if limiter.rpm else None,
+        tpm=limiter.tpm * args.budget_share if limiter.tpm else None
+    ))
+    
+    print("=" * 60)
+    print(f"Embedding migration: {active!r} -> {target!r}")
+    print("=" * 60)
+    
+    with MongoDBConnection(database_name="job_portal") as conn:
+        migrations = [
+            factory(
+                conn.get_collection(name),
+                target,
+                checkpoint_path=str(Path(args.checkpoint_dir) / f"{name}.{args.name}.json"),
+                batch_size=args.batch_size
+            )
+            for name, factory in COLLECTIONS.items()
+        ]
+        
+        if args.switch:
+            try:
+                generation = switch_generation(migrations)
+            except RuntimeError as error:
+                print(f"✗ Not switching: {error}")
+                sys.exit(1)
+            print(f"✓ Reads switched to {generation!r}; restart long-running processes to pick it up")
+            return
+        
+        for migration in migrations:
+            name = migration.collection_name
+            if not args.status:
+                try:
+                    if migration.ensure_index():
+                        print(f"✓ {name}: created search index {migration.store.vector_index_name}")
+                except OperationFailure as error:
+                    print(f"⚠ {name}: could not create the search index ({error}); create it in Atlas:")
+                    print(json.dumps(migration.index_definition(), indent=2))
+                counts = migration.run(max_documents=args.max_documents)
+                print(f"✓ {name}: {counts['scanned']} scanned, {counts['stale']} embedded, {counts['updated']} updated")
+            
+            coverage = migration.coverage()
+            try:
+                index = "queryable" if migration.index_ready() else "not ready"
+            except OperationFailure:
+                index = "unknown"
+            print(
+                f"  {name}: {coverage['migrated']}/{coverage['total']} migrated "
+                f"({coverage['ratio']:.1%}), index {migration.store.vector_index_name} {index}"
+            )
+
+
+if __name__ == "__main__":
+    main()
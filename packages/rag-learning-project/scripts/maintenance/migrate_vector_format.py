@@ -0,0 +1,74 @@
+"""
+Convert stored embeddings between BSON double arrays and packed BinData vectors.
+
+Usage:
+    python scripts/maintenance/migrate_vector_format.py --format float32
+    python scripts/maintenance/migrate_vector_format.py --format int8 --collection companies --dry-run
+
+The Atlas vector indexes in index_definitions.json index BinData float32 and
+int8 vectors with the same definition, so no index change is needed; Atlas
+re-indexes the converted documents automatically. Set VECTOR_STORAGE_FORMAT
+to the same format afterwards so new documents and query vectors match.
+
+Converting int8 back to float32 or array keeps each vector's direction (what
+cosine similarity uses) but not its original scale.
+
+With --coarse-dimensions (or VECTOR_COARSE_DIMENSIONS) set, missing
+<field>_coarse vectors for two-stage search are filled in as well.
+"""
+import argparse
+from pathlib import Path
+import sys
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Load environment variables
+load_dotenv(ROOT / ".env")
+
+from job_portal import MongoDBConnection, CompanyStore, JobSeekerStore
+from job_portal.infrastructure.mongodb.vector_codec import VECTOR_FORMATS
+
+
+# Collection -> (store class, vector field)
+COLLECTIONS = {
+    "companies": (CompanyStore, "requirements_embedding"),
+    "job_seekers": (JobSeekerStore, "profile_embedding"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--format", required=True, choices=VECTOR_FORMATS, help="Target vector format")
+    parser.add_argument("--collection", choices=sorted(COLLECTIONS), help="Only migrate one collection")
+    parser.add_argument("--batch-size", type=int, default=500, help="Documents per bulk write")
+    parser.add_argument("--coarse-dimensions", type=int, help="Also fill coarse vectors of this size")
+    parser.add_argument("--dry-run", action="store_true", help="Count documents without writing")
+    args = parser.parse_args()
+    
+    names = [args.collection] if args.collection else list(COLLECTIONS)
+    
+    print("=" * 60)
+    print(f"Migrating vectors to '{args.format}'{' (dry run)' if args.dry_run else ''}")
+    print("=" * 60)
+    
+    with MongoDBConnection(database_name="job_portal") as conn:
+        for name in names:
+            store_class, field = COLLECTIONS[name]
+            store = store_class(
+                conn.get_collection(name),
+                vector_format=args.format,
+                coarse_dimensions=args.coarse_dimensions
+            )
+            counts = store.convert_vector_field(field, batch_size=args.batch_size, dry_run=args.dry_run)
+            print(f"✓ {name}.{field}: {counts['converted']} converted, {counts['skipped']} up to date")
+    
+    print()
+    print(f"Set VECTOR_STORAGE_FORMAT={args.format} so new documents and queries use the same format.")
+
+
+if __name__ == "__main__":
+    main()
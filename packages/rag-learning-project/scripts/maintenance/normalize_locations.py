@@ -0,0 +1,86 @@
+"""
+Fill normalized location tokens and points, and create their indexes.
+
+Usage:
+    python scripts/maintenance/normalize_locations.py
+    python scripts/maintenance/normalize_locations.py --collection companies --all
+    python scripts/maintenance/normalize_locations.py --dry-run
+
+Documents stored before locations were normalized have no
+<field>_tokens / <field>_point, so exact-token and radius filters don't
+match them. This derives both from the location text (only for documents
+missing the tokens, unless --all re-derives every document, e.g. after the
+gazetteer grew) and creates the multikey and 2dsphere indexes the filters
+run on.
+"""
+import argparse
+from pathlib import Path
+import sys
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Load environment variables
+load_dotenv(ROOT / ".env")
+
+from job_portal import MongoDBConnection, CompanyStore, JobSeekerStore
+from job_portal.domain.location import location_fields
+
+
+COLLECTIONS = {
+    "companies": CompanyStore,
+    "job_seekers": JobSeekerStore,
+}
+
+
+def normalize_collection(store, everything=False, batch_size=500, dry_run=False):
+    """Derive location fields for a store's documents; returns (scanned, updated)."""
+    field = store.location_field
+    query = {} if everything else {f"{field}_tokens": {"$exists": False}}
+    scanned = updated = 0
+    operations = []
+    for document in store.collection.find(query, {field: 1, f"{field}_point": 1}):
+        scanned += 1
+        fields = location_fields(field, document.get(field))
+        if f"{field}_point" not in fields and document.get(f"{field}_point"):
+            # Keep coordinates given at write time for places the gazetteer doesn't know
+            fields[f"{field}_point"] = document[f"{field}_point"]
+        operations.append(UpdateOne({"_id": document["_id"]}, {"$set": fields}))
+        if len(operations) >= batch_size:
+            if not dry_run:
+                updated += store.collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations and not dry_run:
+        updated += store.collection.bulk_write(operations, ordered=False).modified_count
+    return scanned, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--collection", choices=sorted(COLLECTIONS), help="Only normalize one collection")
+    parser.add_argument("--all", action="store_true", help="Re-derive documents that already have tokens")
+    parser.add_argument("--batch-size", type=int, default=500, help="Updates per bulk write")
+    parser.add_argument("--dry-run", action="store_true", help="Count documents without writing")
+    args = parser.parse_args()
+    
+    names = [args.collection] if args.collection else list(COLLECTIONS)
+    
+    print("=" * 60)
+    print(f"Normalizing locations{' (dry run)' if args.dry_run else ''}")
+    print("=" * 60)
+    
+    with MongoDBConnection(database_name="job_portal") as conn:
+        for name in names:
+            store = COLLECTIONS[name](conn.get_collection(name))
+            scanned, updated = normalize_collection(store, args.all, args.batch_size, args.dry_run)
+            print(f"✓ {name}: {scanned} scanned, {updated} updated")
+            if not args.dry_run:
+                print(f"✓ {name}: indexes {', '.join(store.ensure_location_indexes())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 """Seed sample data with real embeddings and rich descriptions."""
 from pathlib import Path
 import sys
-import time
 import os
 from dotenv import load_dotenv
 
@@ -146,14 +145,12 @@ def seed_companies(embeddings_service: JobPortalEmbeddings):
                 experience_level=company_data["experience_level"]
             )
             company_data["job_requirements_embedding"] = embedding
+            company_data["embedding_meta"] = embeddings_service.embedding_metadata(
+                JobPortalEmbeddings.job_posting_document_text(company_data)
+            )
             
             job_id = company_store.store_job_posting(**company_data)
             print(f"    ✓ Created with real embedding")
-            
-            # Rate limit: wait 25 seconds between requests (3 RPM = 20s, add buffer)
-            if i < len(companies_data) - 1:
-                print(f"    ⏳ Waiting 25s for rate limit...")
-                time.sleep(25)
         
         print(f"✓ Seeded {len(companies_data)} job postings with real embeddings")
 
@@ -302,14 +299,12 @@ def seed_job_seekers(embeddings_service: JobPortalEmbeddings):
                 education=seeker_data["education_level"]
             )
             seeker_data["profile_embedding"] = embedding
+            seeker_data["embedding_meta"] = embeddings_service.embedding_metadata(
+                JobPortalEmbeddings.candidate_profile_document_text(seeker_data)
+            )
             
             profile_id = jobseeker_store.store_profile(**seeker_data)
             print(f"    ✓ Created with real embedding")
-            
-            # Rate limit: wait 25 seconds between requests (3 RPM = 20s, add buffer)
-            if i < len(seekers_data) - 1:
-                print(f"    ⏳ Waiting 25s for rate limit...")
-                time.sleep(25)
         
         print(f"✓ Seeded {len(seekers_data)} job seeker profiles with real embeddings")
 
@@ -355,10 +350,6 @@ if __name__ == "__main__":
     
     seed_companies(embeddings_service)
     
-    # Wait before processing job seekers to avoid rate limit
-    print("\n⏳ Waiting 30 seconds before processing job seekers...")
-    time.sleep(30)
-    
     seed_job_seekers(embeddings_service)
     verify_data()
     
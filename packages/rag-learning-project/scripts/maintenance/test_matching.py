@@ -28,7 +28,15 @@ def test_job_seeker_finds_companies():
         # Get all job seekers
         seekers = list(conn.get_collection("job_seekers").find({}))
         
-        for seeker in seekers:
+        # Search for matching jobs for every seeker's profile embedding at once
+        all_matches = company_store.search_many(
+            [seeker['profile_embedding'] for seeker in seekers],
+            limit=3,
+            num_candidates=30,
+            vector_field=company_store.vector_field
+        )
+        
+        for seeker, matches in zip(seekers, all_matches):
             print(f"\n{'─' * 80}")
             print(f"👤 {seeker['name']} - {seeker['current_title']}")
             print(f"   Experience: {seeker['years_of_experience']} years")
@@ -38,13 +46,9 @@ def test_job_seeker_finds_companies():
             print(f"\n   Profile snippet: {seeker['profile_summary'][:150]}...")
             print(f"\n   🔍 Searching for matching jobs...")
             
-            # Search for matching jobs using the seeker's profile embedding
-            matches = company_store.search_matching_candidates(
-                candidate_profile_embedding=seeker['profile_embedding'],
-                limit=3
-            )
-            
-            if matches:
+            if isinstance(matches, Exception):
+                print(f"   ❌ Search failed: {matches}")
+            elif matches:
                 print(f"\n   ✓ Found {len(matches)} matching jobs:\n")
                 for i, match in enumerate(matches, 1):
                     score = match.get('score', 0)
@@ -78,7 +82,15 @@ def test_company_finds_candidates():
         # Get all companies
         companies = list(conn.get_collection("companies").find({}))
         
-        for company in companies:
+        # Search for matching candidates for every job's requirements embedding at once
+        all_matches = jobseeker_store.search_many(
+            [company['requirements_embedding'] for company in companies],
+            limit=3,
+            num_candidates=30,
+            vector_field=jobseeker_store.vector_field
+        )
+        
+        for company, matches in zip(companies, all_matches):
             print(f"\n{'─' * 80}")
             print(f"🏢 {company['company_name']} - {company['job_title']}")
             print(f"   Location: {company['location']}")
@@ -88,13 +100,9 @@ def test_company_finds_candidates():
             print(f"\n   Job snippet: {company['job_description'][:150]}...")
             print(f"\n   🔍 Searching for matching candidates...")
             
-            # Search for matching candidates using the job's requirements embedding
-            matches = jobseeker_store.search_matching_jobs(
-                job_requirements_embedding=company['requirements_embedding'],
-                limit=3
-            )
-            
-            if matches:
+            if isinstance(matches, Exception):
+                print(f"   ❌ Search failed: {matches}")
+            elif matches:
                 print(f"\n   ✓ Found {len(matches)} matching candidates:\n")
                 for i, match in enumerate(matches, 1):
                     score = match.get('score', 0)
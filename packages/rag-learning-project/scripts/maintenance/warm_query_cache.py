@@ -0,0 +1,70 @@
+"""
+Pre-embed the most frequent logged search queries into the embedding cache.
+
+Usage:
+    python scripts/maintenance/warm_query_cache.py
+    python scripts/maintenance/warm_query_cache.py --top 500 --max-tokens 50000
+    python scripts/maintenance/warm_query_cache.py --dry-run
+
+Queries come from the log the search tools write (QUERY_LOG_PATH). They are
+ranked by frequency, with older occurrences decaying by half every
+--half-life-days. Queries that are already cached cost nothing; the rest
+are embedded in rank order until the token budget is spent. Run it at
+startup or from cron against the same EMBEDDING_CACHE_PATH (or sidecar)
+the search processes use.
+"""
+import argparse
+from pathlib import Path
+import sys
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Load environment variables
+load_dotenv(ROOT / ".env")
+
+from job_portal import JobPortalEmbeddings
+from job_portal.services.embeddings.query_log import QueryLog
+from job_portal.workflows.cache_warmer import DAY, CacheWarmer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=200, help="Number of top-ranked queries considered")
+    parser.add_argument("--half-life-days", type=float, default=7.0, help="Days after which a query counts half")
+    parser.add_argument("--max-tokens", type=int, default=20_000, help="Token budget for this run")
+    parser.add_argument("--kind", action="append", choices=["jobs", "candidates"], help="Only warm these searches")
+    parser.add_argument("--dry-run", action="store_true", help="Plan the run without embedding")
+    args = parser.parse_args()
+    
+    log = QueryLog.from_env()
+    if log is None:
+        print("Query log is disabled (QUERY_LOG_PATH=off); nothing to warm")
+        return
+    
+    warmer = CacheWarmer(
+        JobPortalEmbeddings(),
+        log,
+        top_n=args.top,
+        half_life=args.half_life_days * DAY,
+        max_tokens=args.max_tokens,
+        kinds=args.kind
+    )
+    
+    print("=" * 60)
+    print(f"Warming query embeddings{' (dry run)' if args.dry_run else ''}")
+    print("=" * 60)
+    
+    report = warmer.run(dry_run=args.dry_run)
+    print(
+        f"✓ {report['ranked']} ranked, {report['cached']} already cached, "
+        f"{report['warmed']} {'planned' if args.dry_run else 'warmed'} ({report['tokens']} tokens), "
+        f"{report['over_budget']} over budget, {report['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
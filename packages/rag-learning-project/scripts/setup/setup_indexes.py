@@ -60,6 +60,60 @@ def print_setup_instructions():
     print(json.dumps(definitions['company_vector_index']['definition'], indent=2))
     print()
     
+    print("-" * 80)
+    print("OPTIONAL: Coarse indexes for two-stage search")
+    print("-" * 80)
+    print("Only needed when VECTOR_COARSE_DIMENSIONS is set (numDimensions must match it).")
+    print("Run scripts/maintenance/migrate_vector_format.py to fill the coarse fields.")
+    print()
+    for key, collection in (("jobseeker_vector_index_coarse", "job_seekers"),
+                            ("company_vector_index_coarse", "companies")):
+        print(f"Collection: {collection}")
+        print(f"Index Name: {definitions[key]['name']}")
+        print()
+        print("JSON Definition:")
+        print(json.dumps(definitions[key]['definition'], indent=2))
+        print()
+    
+    print("-" * 80)
+    print("OPTIONAL: Chunk indexes for chunk-level search")
+    print("-" * 80)
+    print("Only needed when storing long postings/profiles in a ChunkStore.")
+    print()
+    for key, collection in (("job_chunk_vector_index", "job_chunks"),
+                            ("profile_chunk_vector_index", "profile_chunks")):
+        print(f"Collection: {collection}")
+        print(f"Index Name: {definitions[key]['name']}")
+        print()
+        print("JSON Definition:")
+        print(json.dumps(definitions[key]['definition'], indent=2))
+        print()
+    
+    print("-" * 80)
+    print("Location indexes (regular MongoDB indexes)")
+    print("-" * 80)
+    print("Location filters match normalized tokens and GeoJSON points instead of a")
+    print("$regex on the location text. Create their indexes and fill the derived")
+    print("fields of existing documents with:")
+    print()
+    print("  python scripts/maintenance/normalize_locations.py")
+    print()
+    print("Collection: companies   -> location_tokens (multikey), location_point (2dsphere)")
+    print("Collection: job_seekers -> desired_location_tokens (multikey), desired_location_point (2dsphere)")
+    print()
+    
+    print("-" * 80)
+    print("Upsert key indexes (regular MongoDB unique indexes)")
+    print("-" * 80)
+    print("Feed imports upsert postings by company_id + job_title and profiles by user_id.")
+    print("The unique indexes keep those lookups off a collection scan and stop two")
+    print("concurrent imports from inserting the same record twice. import_feed.py")
+    print("creates them (VectorStore.ensure_upsert_index); remove duplicates first.")
+    print()
+    print("Collection: companies   -> { company_id: 1, job_title: 1 }, unique")
+    print("Collection: job_seekers -> { user_id: 1 }, unique")
+    print()
+    
     print("=" * 80)
     print("After creating indexes, you can use the vector search functionality!")
     print("=" * 80)
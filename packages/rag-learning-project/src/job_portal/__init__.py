@@ -4,7 +4,14 @@ from .infrastructure.mongodb.connection import MongoDBConnection
 from .repositories.base_vector_store import VectorStore
 from .repositories.company_repository import CompanyStore
 from .repositories.jobseeker_repository import JobSeekerStore
+from .repositories.chunk_repository import ChunkStore
 from .infrastructure.voyage.embedding_service import VoyageEmbeddingService
+from .infrastructure.voyage.async_embedding_service import AsyncVoyageEmbeddingService
+from .infrastructure.voyage.embedding_cache import EmbeddingCache
+from .infrastructure.voyage.rate_limiter import RateLimiter
+from .infrastructure.observability.metrics import MetricsRegistry, get_registry
+from .infrastructure.providers.base import EmbeddingProvider
+from .infrastructure.providers.hashing import HashingEmbeddingProvider
 from .services.embeddings.job_portal_embeddings import JobPortalEmbeddings
 
 __all__ = [
@@ -12,6 +19,14 @@ __all__ = [
     "VectorStore",
     "CompanyStore",
     "JobSeekerStore",
+    "ChunkStore",
     "VoyageEmbeddingService",
+    "AsyncVoyageEmbeddingService",
+    "EmbeddingCache",
+    "RateLimiter",
+    "MetricsRegistry",
+    "get_registry",
+    "EmbeddingProvider",
+    "HashingEmbeddingProvider",
     "JobPortalEmbeddings",
 ]
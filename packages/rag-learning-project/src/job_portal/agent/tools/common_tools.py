@@ -1,7 +1,48 @@
 """Common utility tools shared across job seekers and companies."""
+import os
 from typing import List, Dict, Any
+import voyageai.error as voyage_error
 from langchain_core.tools import tool
 
+try:
+    from ...infrastructure.voyage.rate_limiter import RateLimitTimeout
+    from ...infrastructure.voyage.resilience import CircuitOpenError, EmbeddingTimeout
+    from ...infrastructure.voyage.sidecar import SidecarError
+    from ...services.embeddings.query_canonicalizer import normalize_text
+    from ...services.embeddings.query_log import get_query_log
+except ImportError:
+    from job_portal.infrastructure.voyage.rate_limiter import RateLimitTimeout
+    from job_portal.infrastructure.voyage.resilience import CircuitOpenError, EmbeddingTimeout
+    from job_portal.infrastructure.voyage.sidecar import SidecarError
+    from job_portal.services.embeddings.query_canonicalizer import normalize_text
+    from job_portal.services.embeddings.query_log import get_query_log
+
+
+# Seconds a search may wait for embedding rate-limit budget before it is
+# answered from document metadata instead
+SEARCH_MAX_WAIT = float(os.getenv("SEARCH_EMBEDDING_MAX_WAIT", "0"))
+
+# Search chunks (job_chunks / profile_chunks, synced with import_feed.py
+# --chunks) so long documents match on their best passage, not their opening
+SEARCH_CHUNKS = os.getenv("VECTOR_SEARCH_CHUNKS", "").lower() in ("1", "true", "yes")
+
+# Errors meaning embeddings are unavailable right now (quota exhausted,
+# breaker open, deadline missed, provider or sidecar failing); searches fall
+# back to metadata on these and let anything else surface
+EMBEDDING_UNAVAILABLE_ERRORS = (
+    RateLimitTimeout,
+    CircuitOpenError,
+    EmbeddingTimeout,
+    SidecarError,
+    voyage_error.APIError,
+    voyage_error.APIConnectionError,
+    voyage_error.RateLimitError,
+    voyage_error.ServerError,
+    voyage_error.ServiceUnavailableError,
+    voyage_error.Timeout,
+    voyage_error.TryAgain,
+)
+
 
 @tool
 def format_search_results(results: str, result_type: str = "job") -> str:
@@ -27,6 +68,28 @@ def _format_score(score: float) -> str:
     return f"{score * 100:.1f}%"
 
 
+def _log_search_query(text: str, kind: str) -> str:
+    """Canonicalize a search query and record it in the query log for cache warming."""
+    query = normalize_text(text)
+    query_log = get_query_log()
+    if query_log is not None:
+        query_log.append(query, kind)
+    return query
+
+
+def _keyword_match_header(count: int, noun: str, filters: Dict[str, Any], reason: Exception) -> str:
+    """Header marking results as keyword-matched, with the filters that were used."""
+    used = "; ".join(
+        f"{name.replace('_', ' ')}: {', '.join(value) if isinstance(value, list) else value}"
+        for name, value in filters.items()
+    ) or "none"
+    return (
+        f"🔤 Keyword-matched {count} {noun}(s) - semantic search is unavailable right now "
+        f"({type(reason).__name__}), so results are ranked by metadata only.\n"
+        f"   Filters: {used}\n\n"
+    )
+
+
 def _truncate_text(text: str, max_length: int = 100) -> str:
     """Truncate text to max length with ellipsis."""
     if len(text) <= max_length:
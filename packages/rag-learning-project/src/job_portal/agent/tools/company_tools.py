@@ -1,22 +1,27 @@
 """LangChain tools for companies."""
-import time
 from langchain_core.tools import tool
 
 try:
     from ...infrastructure.mongodb.connection import MongoDBConnection
+    from ...repositories.chunk_repository import ChunkStore
     from ...repositories.jobseeker_repository import JobSeekerStore
     from ...services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from ...services.matching.keyword_filters import EXPERIENCE_YEARS, extract_filters, rank_by_skills
 except ImportError:
     from job_portal.infrastructure.mongodb.connection import MongoDBConnection
+    from job_portal.repositories.chunk_repository import ChunkStore
     from job_portal.repositories.jobseeker_repository import JobSeekerStore
     from job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from job_portal.services.matching.keyword_filters import EXPERIENCE_YEARS, extract_filters, rank_by_skills
+from .common_tools import (
+    EMBEDDING_UNAVAILABLE_ERRORS, SEARCH_CHUNKS, SEARCH_MAX_WAIT, _keyword_match_header, _log_search_query
+)
 
 
 # Initialize services (lazy loading)
 _db_connection = None
 _jobseeker_store = None
 _embeddings = None
-_last_api_call = 0  # Track last API call for rate limiting
 
 
 def _get_jobseeker_store() -> JobSeekerStore:
@@ -26,6 +31,9 @@ def _get_jobseeker_store() -> JobSeekerStore:
         _db_connection = MongoDBConnection()
         collection = _db_connection.get_collection("job_seekers")
         _jobseeker_store = JobSeekerStore(collection)
+    else:
+        # Pick up a generation switched while this process was running
+        _jobseeker_store.reload_generation()
     return _jobseeker_store
 
 
@@ -34,23 +42,11 @@ def _get_embeddings() -> JobPortalEmbeddings:
     global _embeddings
     if _embeddings is None:
         _embeddings = JobPortalEmbeddings()
+    else:
+        _embeddings.reload_generation()
     return _embeddings
 
 
-def _handle_rate_limit():
-    """Handle Voyage AI rate limiting (3 RPM)."""
-    global _last_api_call
-    current_time = time.time()
-    time_since_last_call = current_time - _last_api_call
-    
-    # If less than 20 seconds since last call, wait
-    if time_since_last_call < 20 and _last_api_call > 0:
-        wait_time = 20 - time_since_last_call
-        time.sleep(wait_time)
-    
-    _last_api_call = time.time()
-
-
 def _format_salary(salary_min):
     """Format minimum salary for display."""
     if not salary_min:
@@ -65,13 +61,67 @@ def _truncate_summary(text, max_length=200):
     return text[:max_length].rsplit(' ', 1)[0] + "..."
 
 
+def _format_candidate(i, candidate, match):
+    """Format one candidate search result."""
+    output = f"{i}. 👤 {candidate.get('name', 'Unknown')}\n"
+    output += f"   💼 Title: {candidate.get('current_title', 'N/A')}\n"
+    output += f"   📊 Experience: {candidate.get('years_of_experience', 0)} years\n"
+    output += f"   📍 Location: {candidate.get('desired_location', 'N/A')} | {candidate.get('desired_remote_policy', 'N/A')}\n"
+    output += f"   💰 Desired Salary: {_format_salary(candidate.get('desired_salary_min'))}\n"
+    output += f"   🎓 Education: {candidate.get('education_level', 'N/A')}\n"
+    output += f"   🎯 Match: {match}\n"
+    
+    skills = candidate.get('skills', [])
+    if skills:
+        output += f"   🛠️  Skills: {', '.join(skills[:5])}\n"
+    
+    output += f"   🆔 ID: {candidate.get('_id')}\n\n"
+    return output
+
+
+def _keyword_search_candidates(jobseeker_store, job_requirements, limit, reason):
+    """Answer a candidate search from profile metadata when embeddings are unavailable."""
+    filters = extract_filters(job_requirements)
+    skills = filters.get("skills", [])
+    # Profiles store years of experience rather than a level
+    min_experience, max_experience = EXPERIENCE_YEARS.get(filters.get("experience_level"), (None, None))
+    results = jobseeker_store.filter_by_metadata(
+        min_experience=min_experience,
+        max_experience=max_experience,
+        skills=skills,
+        location=filters.get("location"),
+        remote_policy=filters.get("remote_policy"),
+        limit=limit * 10
+    )
+    if not results and skills and len(filters) > 1:
+        # Too narrow: keep the skills, drop location, policy and level
+        results = jobseeker_store.filter_by_metadata(skills=skills, limit=limit * 10)
+    results = rank_by_skills(results, skills, "skills", limit)
+    
+    if not results:
+        return (
+            "No matching candidates found by keyword search (semantic search is unavailable right now). "
+            "Try naming specific skills, a location or a remote policy."
+        )
+    
+    output = _keyword_match_header(len(results), "candidate", filters, reason)
+    for i, candidate in enumerate(results, 1):
+        match = f"{candidate['matched_skills']}/{len(skills)} skills (keyword)" if skills else "keyword"
+        output += _format_candidate(i, candidate, match)
+    
+    output += "💡 Use get_candidate_details with an ID to see full profile.\n"
+    return output
+
+
 @tool
 def search_candidates(job_requirements: str, limit: int = 5) -> str:
     """
     Search for candidates that match the given job requirements.
     
     Use this tool when a company wants to find matching candidates for a job opening.
-    The tool performs vector similarity search to find the best matches.
+    The tool performs vector similarity search to find the best matches. When embeddings
+    are throttled or unavailable it answers immediately from profile metadata instead, and
+    marks the results as keyword-matched.
     
     Args:
         job_requirements: Job requirements as natural language text (e.g., "Senior Python developer with ML experience")
@@ -85,21 +135,35 @@ def search_candidates(job_requirements: str, limit: int = 5) -> str:
         # Validate limit
         limit = min(max(1, limit), 10)
         
-        # Handle rate limiting for Voyage AI
-        _handle_rate_limit()
+        jobseeker_store = _get_jobseeker_store()
+        
+        # Canonical text is both embedded and logged, so warming hits the same cache keys
+        query_text = _log_search_query(job_requirements, "candidates")
         
         # Generate embedding for requirements
         embeddings = _get_embeddings()
-        requirements_embedding = embeddings.embed_search_query(job_requirements)
+        try:
+            requirements_embedding = embeddings.embed_search_query(query_text, max_wait=SEARCH_MAX_WAIT)
+        except EMBEDDING_UNAVAILABLE_ERRORS as e:
+            # Quota exhausted, breaker open or provider failing: don't make the user wait
+            return _keyword_search_candidates(jobseeker_store, job_requirements, limit, e)
         
         # Search for matching candidates
-        jobseeker_store = _get_jobseeker_store()
-        results = jobseeker_store.vector_search(
-            query_vector=requirements_embedding,
-            limit=limit,
-            num_candidates=limit * 10,
-            vector_field="profile_embedding"
-        )
+        if SEARCH_CHUNKS:
+            results = ChunkStore.for_store(jobseeker_store).search_parents(
+                query_vector=requirements_embedding,
+                limit=limit,
+                num_candidates=limit * 10,
+                as_hits=True
+            )
+        else:
+            results = jobseeker_store.vector_search(
+                query_vector=requirements_embedding,
+                limit=limit,
+                num_candidates=limit * 10,
+                vector_field=jobseeker_store.vector_field,
+                as_hits=True
+            )
         
         if not results:
             return "No matching candidates found. Try different requirements or broader search terms."
@@ -108,21 +172,7 @@ def search_candidates(job_requirements: str, limit: int = 5) -> str:
         output = f"🔍 Found {len(results)} matching candidate(s):\n\n"
         for i, candidate in enumerate(results, 1):
             score = candidate.get('score', 0)
-            match_pct = score * 100
-            
-            output += f"{i}. 👤 {candidate.get('name', 'Unknown')}\n"
-            output += f"   💼 Title: {candidate.get('current_title', 'N/A')}\n"
-            output += f"   📊 Experience: {candidate.get('years_of_experience', 0)} years\n"
-            output += f"   📍 Location: {candidate.get('desired_location', 'N/A')} | {candidate.get('desired_remote_policy', 'N/A')}\n"
-            output += f"   💰 Desired Salary: {_format_salary(candidate.get('desired_salary_min'))}\n"
-            output += f"   🎓 Education: {candidate.get('education_level', 'N/A')}\n"
-            output += f"   🎯 Match: {match_pct:.1f}%\n"
-            
-            skills = candidate.get('skills', [])
-            if skills:
-                output += f"   🛠️  Skills: {', '.join(skills[:5])}\n"
-            
-            output += f"   🆔 ID: {candidate.get('_id')}\n\n"
+            output += _format_candidate(i, candidate, f"{score * 100:.1f}%")
         
         output += "💡 Use get_candidate_details with an ID to see full profile.\n"
         output += "💡 Use compare_candidates with multiple IDs to compare candidates.\n"
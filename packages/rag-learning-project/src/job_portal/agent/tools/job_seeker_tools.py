@@ -1,22 +1,27 @@
 """LangChain tools for job seekers."""
-import time
 from langchain_core.tools import tool
 
 try:
     from ...infrastructure.mongodb.connection import MongoDBConnection
+    from ...repositories.chunk_repository import ChunkStore
     from ...repositories.company_repository import CompanyStore
     from ...services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from ...services.matching.keyword_filters import extract_filters, rank_by_skills
 except ImportError:
     from job_portal.infrastructure.mongodb.connection import MongoDBConnection
+    from job_portal.repositories.chunk_repository import ChunkStore
     from job_portal.repositories.company_repository import CompanyStore
     from job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from job_portal.services.matching.keyword_filters import extract_filters, rank_by_skills
+from .common_tools import (
+    EMBEDDING_UNAVAILABLE_ERRORS, SEARCH_CHUNKS, SEARCH_MAX_WAIT, _keyword_match_header, _log_search_query
+)
 
 
 # Initialize services (lazy loading)
 _db_connection = None
 _company_store = None
 _embeddings = None
-_last_api_call = 0  # Track last API call for rate limiting
 
 
 def _get_company_store() -> CompanyStore:
@@ -26,6 +31,9 @@ def _get_company_store() -> CompanyStore:
         _db_connection = MongoDBConnection()
         collection = _db_connection.get_collection("companies")
         _company_store = CompanyStore(collection)
+    else:
+        # Pick up a generation switched while this process was running
+        _company_store.reload_generation()
     return _company_store
 
 
@@ -34,23 +42,11 @@ def _get_embeddings() -> JobPortalEmbeddings:
     global _embeddings
     if _embeddings is None:
         _embeddings = JobPortalEmbeddings()
+    else:
+        _embeddings.reload_generation()
     return _embeddings
 
 
-def _handle_rate_limit():
-    """Handle Voyage AI rate limiting (3 RPM)."""
-    global _last_api_call
-    current_time = time.time()
-    time_since_last_call = current_time - _last_api_call
-    
-    # If less than 20 seconds since last call, wait
-    if time_since_last_call < 20 and _last_api_call > 0:
-        wait_time = 20 - time_since_last_call
-        time.sleep(wait_time)
-    
-    _last_api_call = time.time()
-
-
 def _format_salary(salary_range):
     """Format salary range for display."""
     if not salary_range:
@@ -67,13 +63,63 @@ def _truncate_description(text, max_length=200):
     return text[:max_length].rsplit(' ', 1)[0] + "..."
 
 
+def _format_job(i, job, match):
+    """Format one job search result."""
+    output = f"{i}. 🏢 {job.get('company_name', 'Unknown Company')}\n"
+    output += f"   💼 Job: {job.get('job_title', 'N/A')}\n"
+    output += f"   📍 Location: {job.get('location', 'N/A')} | {job.get('remote_policy', 'N/A')}\n"
+    output += f"   💰 Salary: {_format_salary(job.get('salary_range'))}\n"
+    output += f"   📊 Experience: {job.get('experience_level', 'N/A')}\n"
+    output += f"   🎯 Match: {match}\n"
+    
+    skills = job.get('required_skills', [])
+    if skills:
+        output += f"   🛠️  Skills: {', '.join(skills[:5])}\n"
+    
+    output += f"   🆔 ID: {job.get('_id')}\n\n"
+    return output
+
+
+def _keyword_search_jobs(company_store, requirements, limit, reason):
+    """Answer a job search from posting metadata when embeddings are unavailable."""
+    filters = extract_filters(requirements)
+    skills = filters.get("skills", [])
+    results = company_store.filter_by_metadata(
+        location=filters.get("location"),
+        remote_policy=filters.get("remote_policy"),
+        skills=skills,
+        experience_level=filters.get("experience_level"),
+        limit=limit * 10
+    )
+    if not results and skills and len(filters) > 1:
+        # Too narrow: keep the skills, drop location, policy and level
+        results = company_store.filter_by_metadata(skills=skills, limit=limit * 10)
+    results = rank_by_skills(results, skills, "required_skills", limit)
+    
+    if not results:
+        return (
+            "No matching job postings found by keyword search (semantic search is unavailable right now). "
+            "Try naming specific skills, a location or a remote policy."
+        )
+    
+    output = _keyword_match_header(len(results), "job posting", filters, reason)
+    for i, job in enumerate(results, 1):
+        match = f"{job['matched_skills']}/{len(skills)} skills (keyword)" if skills else "keyword"
+        output += _format_job(i, job, match)
+    
+    output += "💡 Use get_company_details with an ID to see full job description.\n"
+    return output
+
+
 @tool
 def search_jobs(requirements: str, limit: int = 5) -> str:
     """
     Search for job postings that match the given requirements.
     
     Use this tool when a job seeker wants to find matching companies and job opportunities.
-    The tool performs vector similarity search to find the best matches.
+    The tool performs vector similarity search to find the best matches. When embeddings
+    are throttled or unavailable it answers immediately from job metadata instead, and
+    marks the results as keyword-matched.
     
     Args:
         requirements: Job requirements as natural language text (e.g., "Python developer with 5 years experience")
@@ -87,21 +133,35 @@ def search_jobs(requirements: str, limit: int = 5) -> str:
         # Validate limit
         limit = min(max(1, limit), 10)
         
-        # Handle rate limiting for Voyage AI
-        _handle_rate_limit()
+        company_store = _get_company_store()
+        
+        # Canonical text is both embedded and logged, so warming hits the same cache keys
+        query_text = _log_search_query(requirements, "jobs")
         
         # Generate embedding for requirements
         embeddings = _get_embeddings()
-        requirements_embedding = embeddings.embed_search_query(requirements)
+        try:
+            requirements_embedding = embeddings.embed_search_query(query_text, max_wait=SEARCH_MAX_WAIT)
+        except EMBEDDING_UNAVAILABLE_ERRORS as e:
+            # Quota exhausted, breaker open or provider failing: don't make the user wait
+            return _keyword_search_jobs(company_store, requirements, limit, e)
         
         # Search for matching companies
-        company_store = _get_company_store()
-        results = company_store.vector_search(
-            query_vector=requirements_embedding,
-            limit=limit,
-            num_candidates=limit * 10,
-            vector_field="requirements_embedding"
-        )
+        if SEARCH_CHUNKS:
+            results = ChunkStore.for_store(company_store).search_parents(
+                query_vector=requirements_embedding,
+                limit=limit,
+                num_candidates=limit * 10,
+                as_hits=True
+            )
+        else:
+            results = company_store.vector_search(
+                query_vector=requirements_embedding,
+                limit=limit,
+                num_candidates=limit * 10,
+                vector_field=company_store.vector_field,
+                as_hits=True
+            )
         
         if not results:
             return "No matching job postings found. Try different requirements or broader search terms."
@@ -110,20 +170,7 @@ def search_jobs(requirements: str, limit: int = 5) -> str:
         output = f"🔍 Found {len(results)} matching job posting(s):\n\n"
         for i, job in enumerate(results, 1):
             score = job.get('score', 0)
-            match_pct = score * 100
-            
-            output += f"{i}. 🏢 {job.get('company_name', 'Unknown Company')}\n"
-            output += f"   💼 Job: {job.get('job_title', 'N/A')}\n"
-            output += f"   📍 Location: {job.get('location', 'N/A')} | {job.get('remote_policy', 'N/A')}\n"
-            output += f"   💰 Salary: {_format_salary(job.get('salary_range'))}\n"
-            output += f"   📊 Experience: {job.get('experience_level', 'N/A')}\n"
-            output += f"   🎯 Match: {match_pct:.1f}%\n"
-            
-            skills = job.get('required_skills', [])
-            if skills:
-                output += f"   🛠️  Skills: {', '.join(skills[:5])}\n"
-            
-            output += f"   🆔 ID: {job.get('_id')}\n\n"
+            output += _format_job(i, job, f"{score * 100:.1f}%")
         
         output += "💡 Use get_company_details with an ID to see full job description.\n"
         output += "💡 Use compare_companies with multiple IDs to compare opportunities.\n"
@@ -0,0 +1,168 @@
+"""Embedding generations: which model's vectors, in which fields, searches read.
+
+A generation names an embedding model and output dimension, and the vector
+fields and search indexes holding its vectors. The unnamed default
+generation uses the original field and index names (``requirements_embedding``,
+``company_vector_index``); a generation named ``v2`` uses
+``requirements_embedding_v2`` and ``company_vector_index_v2``. Migrating to
+a new model fills the new generation's fields next to the live ones, then
+switches the active generation, so stores and query embeddings move over
+together.
+
+The active generation is read from a small JSON file
+(``EMBEDDING_GENERATION_FILE``, default ``.embedding_generation.json``) that
+is replaced atomically; without the file the default generation is active.
+The file also lists the other generations whose fields the collections
+hold (a migration's target, generations switched away from), so stores
+leave those vectors out of read results as well.
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_MODEL = "voyage-context-3"
+DEFAULT_DIMENSION = 1024
+DEFAULT_PATH = ".embedding_generation.json"
+
+
+class EmbeddingGeneration:
+    """Model, output dimension and field suffix of one set of stored vectors."""
+    
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        model: str = DEFAULT_MODEL,
+        output_dimension: int = DEFAULT_DIMENSION
+    ):
+        """
+        Initialize embedding generation.
+        
+        Args:
+            name: Suffix for field and index names (None uses the base names)
+            model: Embedding model name
+            output_dimension: Embedding dimension
+        """
+        if name is not None and not name.isidentifier():
+            raise ValueError(f"Generation name must be a valid identifier, got {name!r}")
+        self.name = name or None
+        self.model = model
+        self.output_dimension = int(output_dimension)
+    
+    def field(self, base: str) -> str:
+        """Vector field holding this generation's vectors for a base field name."""
+        return f"{base}_{self.name}" if self.name else base
+    
+    def index(self, base: str) -> str:
+        """Search index over this generation's vectors for a base index name."""
+        return f"{base}_{self.name}" if self.name else base
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the generation file."""
+        return {"name": self.name, "model": self.model, "output_dimension": self.output_dimension}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EmbeddingGeneration":
+        """Deserialize from the generation file."""
+        return cls(
+            name=data.get("name"),
+            model=data.get("model", DEFAULT_MODEL),
+            output_dimension=data.get("output_dimension", DEFAULT_DIMENSION)
+        )
+    
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, EmbeddingGeneration) and self.to_dict() == other.to_dict()
+    
+    def __repr__(self) -> str:
+        return f"EmbeddingGeneration({self.name!r}, {self.model!r}, {self.output_dimension})"
+
+
+def generation_path() -> str:
+    """Path of the active generation file from ``EMBEDDING_GENERATION_FILE``."""
+    return os.getenv("EMBEDDING_GENERATION_FILE", DEFAULT_PATH)
+
+
+def load_generation(path: Optional[str] = None) -> EmbeddingGeneration:
+    """
+    Read the active generation.
+    
+    Args:
+        path: Generation file (defaults to ``generation_path()``)
+    
+    Returns:
+        The active generation, or the default one if the file doesn't exist
+    """
+    return EmbeddingGeneration.from_dict(_read_file(path))
+
+
+def other_generation_fields(base: str, path: Optional[str] = None) -> List[str]:
+    """
+    Vector fields of the inactive generations listed in the generation file.
+    
+    Args:
+        base: Base field name (e.g. "requirements_embedding")
+        path: Generation file (defaults to ``generation_path()``)
+    
+    Returns:
+        Suffixed field names, e.g. a running migration's shadow field
+    """
+    names = _read_file(path).get("other_generations", [])
+    return [EmbeddingGeneration(name).field(base) for name in names]
+
+
+def save_generation(generation: EmbeddingGeneration, path: Optional[str] = None) -> None:
+    """
+    Make a generation active by atomically replacing the generation file.
+    
+    The previously active generation is kept in the file's other
+    generations, since its fields stay in place for rolling back.
+    
+    Args:
+        generation: Generation to activate
+        path: Generation file (defaults to ``generation_path()``)
+    """
+    data = _read_file(path)
+    others = set(data.get("other_generations", []))
+    if data.get("name"):
+        others.add(data["name"])
+    others.discard(generation.name)
+    _write_file({**generation.to_dict(), "other_generations": sorted(others)}, path)
+
+
+def register_generation(generation: EmbeddingGeneration, path: Optional[str] = None) -> None:
+    """
+    List a generation whose fields are being filled without activating it.
+    
+    Migrations call this before writing shadow fields, so stores reading
+    the active generation leave the shadow vectors out of their results.
+    
+    Args:
+        generation: Target generation of a migration
+        path: Generation file (defaults to ``generation_path()``)
+    """
+    data = _read_file(path) or EmbeddingGeneration().to_dict()
+    others = set(data.get("other_generations", []))
+    if generation.name and generation.name != data.get("name"):
+        others.add(generation.name)
+    _write_file({**data, "other_generations": sorted(others)}, path)
+
+
+def _read_file(path: Optional[str]) -> Dict[str, Any]:
+    """Read the generation file, or nothing if it doesn't exist."""
+    path = path or generation_path()
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _write_file(data: Dict[str, Any], path: Optional[str]) -> None:
+    """Atomically replace the generation file."""
+    path = path or generation_path()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2)
+    os.replace(tmp_path, path)
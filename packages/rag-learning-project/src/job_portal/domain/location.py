@@ -0,0 +1,288 @@
+"""Location normalization into exact-match tokens and GeoJSON points.
+
+Free-text locations ("San Francisco, CA", "Berlin", "Remote") are stored
+with two derived fields next to the original text:
+
+- ``<field>_tokens``: the lower-cased city, region and country names,
+  with abbreviations and aliases expanded ("SF", "CA", "USA" become
+  "san francisco", "california", "united states"). Exact-token filters
+  use an ordinary multikey index and are valid Atlas vector pre-filters,
+  unlike the case-insensitive ``$regex`` they replace.
+- ``<field>_point``: a GeoJSON point for places in the built-in gazetteer
+  (or coordinates given by the caller), queried with ``$geoWithin``
+  through a 2dsphere index.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+EARTH_RADIUS_KM = 6378.1
+
+REMOTE = "remote"
+
+COUNTRY_ALIASES = {
+    "us": "united states",
+    "usa": "united states",
+    "u.s.": "united states",
+    "u.s.a.": "united states",
+    "united states of america": "united states",
+    "america": "united states",
+    "uk": "united kingdom",
+    "u.k.": "united kingdom",
+    "great britain": "united kingdom",
+    "england": "united kingdom",
+    "deutschland": "germany",
+    "the netherlands": "netherlands",
+    "holland": "netherlands",
+}
+
+# Region name -> country, with abbreviations
+REGIONS = {
+    "california": "united states",
+    "new york": "united states",
+    "texas": "united states",
+    "washington": "united states",
+    "massachusetts": "united states",
+    "illinois": "united states",
+    "colorado": "united states",
+    "georgia": "united states",
+    "oregon": "united states",
+    "florida": "united states",
+    "ontario": "canada",
+    "british columbia": "canada",
+    "quebec": "canada",
+}
+
+REGION_ALIASES = {
+    "ca": "california",
+    "ny": "new york",
+    "tx": "texas",
+    "wa": "washington",
+    "ma": "massachusetts",
+    "il": "illinois",
+    "co": "colorado",
+    "ga": "georgia",
+    "or": "oregon",
+    "fl": "florida",
+    "on": "ontario",
+    "bc": "british columbia",
+    "qc": "quebec",
+}
+
+# City -> (region, country, longitude, latitude)
+CITIES: Dict[str, Tuple[Optional[str], str, float, float]] = {
+    "san francisco": ("california", "united states", -122.4194, 37.7749),
+    "los angeles": ("california", "united states", -118.2437, 34.0522),
+    "san jose": ("california", "united states", -121.8863, 37.3382),
+    "oakland": ("california", "united states", -122.2712, 37.8044),
+    "new york": ("new york", "united states", -74.0060, 40.7128),
+    "austin": ("texas", "united states", -97.7431, 30.2672),
+    "dallas": ("texas", "united states", -96.7970, 32.7767),
+    "seattle": ("washington", "united states", -122.3321, 47.6062),
+    "boston": ("massachusetts", "united states", -71.0589, 42.3601),
+    "chicago": ("illinois", "united states", -87.6298, 41.8781),
+    "denver": ("colorado", "united states", -104.9903, 39.7392),
+    "atlanta": ("georgia", "united states", -84.3880, 33.7490),
+    "portland": ("oregon", "united states", -122.6765, 45.5152),
+    "miami": ("florida", "united states", -80.1918, 25.7617),
+    "toronto": ("ontario", "canada", -79.3832, 43.6532),
+    "vancouver": ("british columbia", "canada", -123.1207, 49.2827),
+    "montreal": ("quebec", "canada", -73.5673, 45.5017),
+    "london": (None, "united kingdom", -0.1276, 51.5072),
+    "berlin": (None, "germany", 13.4050, 52.5200),
+    "munich": (None, "germany", 11.5820, 48.1351),
+    "amsterdam": (None, "netherlands", 4.9041, 52.3676),
+    "paris": (None, "france", 2.3522, 48.8566),
+    "dublin": (None, "ireland", -6.2603, 53.3498),
+    "lisbon": (None, "portugal", -9.1393, 38.7223),
+    "madrid": (None, "spain", -3.7038, 40.4168),
+    "barcelona": (None, "spain", 2.1734, 41.3851),
+    "stockholm": (None, "sweden", 18.0686, 59.3293),
+    "zurich": (None, "switzerland", 8.5417, 47.3769),
+    "bangalore": (None, "india", 77.5946, 12.9716),
+    "singapore": (None, "singapore", 103.8198, 1.3521),
+    "sydney": (None, "australia", 151.2093, -33.8688),
+    "tokyo": (None, "japan", 139.6503, 35.6762),
+}
+
+CITY_ALIASES = {
+    "sf": "san francisco",
+    "san fran": "san francisco",
+    "bay area": "san francisco",
+    "nyc": "new york",
+    "new york city": "new york",
+    "la": "los angeles",
+    "bengaluru": "bangalore",
+    "münchen": "munich",
+}
+
+COUNTRIES = set(COUNTRY_ALIASES.values()) | set(REGIONS.values()) | {
+    country for _, country, _, _ in CITIES.values()
+}
+
+Coordinates = Tuple[float, float]
+
+
+def _clean(part: str) -> str:
+    return re.sub(r"\s+", " ", part.strip(" .").casefold())
+
+
+def _country(part: str) -> Optional[str]:
+    part = COUNTRY_ALIASES.get(part, part)
+    return part if part in COUNTRIES else None
+
+
+def _region(part: str) -> Optional[str]:
+    part = REGION_ALIASES.get(part, part)
+    return part if part in REGIONS else None
+
+
+def geo_point(longitude: float, latitude: float) -> Dict[str, Any]:
+    """GeoJSON point (MongoDB stores longitude first)."""
+    return {"type": "Point", "coordinates": [float(longitude), float(latitude)]}
+
+
+def normalize_location(
+    text: Optional[str],
+    coordinates: Optional[Coordinates] = None
+) -> Dict[str, Any]:
+    """
+    Parse a free-text location into city, region and country.
+    
+    Parts are read right to left: a known country, then a known region,
+    and whatever remains first is the city. Known cities fill in their
+    region, country and coordinates.
+    
+    Args:
+        text: Location as entered (e.g. "Austin, TX", "Berlin, Germany", "Remote")
+        coordinates: (longitude, latitude) overriding the gazetteer's
+    
+    Returns:
+        Dict with 'city', 'region', 'country', 'tokens' (distinct non-empty
+        names, most specific first) and 'point' (GeoJSON or None)
+    """
+    parts = [_clean(part) for part in re.split(r"[,;/|]", text or "")]
+    parts = [part for part in parts if part]
+    city = region = country = None
+    point = None
+    
+    # "Remote", "Remote, US": the rest of the text narrows where remote work is allowed
+    remote = bool(parts) and parts[0].startswith(REMOTE)
+    if remote:
+        parts = parts[1:]
+    
+    if len(parts) > 1 and _country(parts[-1]):
+        country = _country(parts.pop())
+    if len(parts) > 1 and _region(parts[-1]):
+        region = _region(parts.pop())
+    # Unrecognized qualifiers ("Portland, ME") mean a place the gazetteer doesn't know
+    qualified = len(parts) > 1
+    if qualified and region is None:
+        region = parts[-1]
+    if parts:
+        first = CITY_ALIASES.get(parts[0], parts[0])
+        if first in CITIES or qualified or region or country:
+            city = first
+        elif _region(first):
+            region = _region(first)
+        elif _country(first):
+            country = _country(first)
+        else:
+            city = first
+    
+    if city in CITIES and not qualified:
+        known_region, known_country, longitude, latitude = CITIES[city]
+        # Keep the gazetteer's coordinates only if the rest of the text agrees
+        if (region or known_region) == known_region and (country or known_country) == known_country:
+            region = known_region
+            country = known_country
+            point = geo_point(longitude, latitude)
+    if region in REGIONS and not country:
+        country = REGIONS[region]
+    if coordinates is not None:
+        point = geo_point(*coordinates)
+    
+    tokens: List[str] = [REMOTE] if remote else []
+    for name in (city, region, country):
+        if name and name not in tokens:
+            tokens.append(name)
+    return {"city": city, "region": region, "country": country, "tokens": tokens, "point": point}
+
+
+def location_fields(
+    field: str,
+    text: Optional[str],
+    coordinates: Optional[Coordinates] = None
+) -> Dict[str, Any]:
+    """
+    Build the stored ``<field>_tokens`` and ``<field>_point`` fields for a location.
+    
+    Args:
+        field: Location field name (e.g. "location", "desired_location")
+        text: Location as entered
+        coordinates: (longitude, latitude) overriding the gazetteer's
+    
+    Returns:
+        Fields to store next to the location text (no point for unknown places)
+    """
+    location = normalize_location(text, coordinates)
+    fields: Dict[str, Any] = {f"{field}_tokens": location["tokens"]}
+    if location["point"] is not None:
+        fields[f"{field}_point"] = location["point"]
+    return fields
+
+
+def location_filter(
+    field: str,
+    location: Optional[str] = None,
+    near: Union[None, str, Coordinates] = None,
+    radius_km: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Build filter criteria on a location's derived fields.
+    
+    ``location`` matches documents having every token of the normalized
+    query ("Austin" matches "Austin, TX"; "TX" matches every Texas city).
+    ``near`` with ``radius_km`` matches documents whose point lies within
+    the radius.
+    
+    Args:
+        field: Location field name (e.g. "location", "desired_location")
+        location: Place to match exactly
+        near: Place name from the gazetteer, or (longitude, latitude)
+        radius_km: Search radius around ``near``
+    
+    Returns:
+        Filter criteria (empty if no location was given)
+    
+    Raises:
+        ValueError: If ``near`` is an unknown place or given without ``radius_km``
+    """
+    criteria: Dict[str, Any] = {}
+    if location:
+        tokens = normalize_location(location)["tokens"]
+        if len(tokens) == 1:
+            criteria[f"{field}_tokens"] = tokens[0]
+        elif tokens:
+            criteria["$and"] = [{f"{field}_tokens": token} for token in tokens]
+    if near is not None:
+        if not radius_km:
+            raise ValueError("A radius_km is required with near")
+        if isinstance(near, str):
+            point = normalize_location(near)["point"]
+            if point is None:
+                raise ValueError(f"Unknown place {near!r}; pass (longitude, latitude) instead")
+            near = tuple(point["coordinates"])
+        criteria[f"{field}_point"] = {
+            "$geoWithin": {"$centerSphere": [list(near), radius_km / EARTH_RADIUS_KM]}
+        }
+    return criteria
+
+
+def geo_fields(criteria: Optional[Dict[str, Any]]) -> List[str]:
+    """Top-level fields of filter criteria that use ``$geoWithin``."""
+    return [
+        key for key, spec in (criteria or {}).items()
+        if isinstance(spec, dict) and "$geoWithin" in spec
+    ]
+
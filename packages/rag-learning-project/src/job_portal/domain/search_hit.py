@@ -0,0 +1,66 @@
+"""Compact search result type."""
+from typing import Any, Dict, Iterator
+
+
+class SearchHit:
+    """
+    One search result: the document's _id, its score and the returned fields.
+    
+    Uses ``__slots__``, so a hit costs three references on top of its
+    fields. It reads like the result document (``hit["job_title"]``,
+    ``hit.get("score")``, ``hit.get("_id")``), so formatting code works with
+    hits and plain documents alike.
+    """
+    
+    __slots__ = ("id", "score", "fields")
+    
+    def __init__(self, id: Any, score: float, fields: Dict[str, Any]):
+        """
+        Initialize search hit.
+        
+        Args:
+            id: Document _id
+            score: Similarity score
+            fields: Remaining returned fields
+        """
+        self.id = id
+        self.score = score
+        self.fields = fields
+    
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "SearchHit":
+        """Create a hit from a result document with "_id" and "score" fields."""
+        fields = dict(document)
+        return cls(fields.pop("_id", None), fields.pop("score", 0.0), fields)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == "_id":
+            return self.id
+        if key == "score":
+            return self.score
+        return self.fields[key]
+    
+    def __contains__(self, key: object) -> bool:
+        return key in ("_id", "score") or key in self.fields
+    
+    def __iter__(self) -> Iterator[str]:
+        yield "_id"
+        yield "score"
+        yield from self.fields
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field like ``dict.get``."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to a result document."""
+        return {"_id": self.id, **self.fields, "score": self.score}
+    
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SearchHit) and self.to_dict() == other.to_dict()
+    
+    def __repr__(self) -> str:
+        return f"SearchHit({self.id!r}, {self.score:.4f}, {self.fields!r})"
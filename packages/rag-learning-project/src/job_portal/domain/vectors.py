@@ -0,0 +1,62 @@
+"""Embedding vector types shared by the embedding services and repositories.
+
+Embeddings travel through the package as float32 NumPy arrays: a ``Vector``
+is one embedding and a ``Matrix`` holds one embedding per row (e.g. the
+chunks of a document). A 1024-dimension ``Vector`` takes 4 KB, against
+about 32 KB for the same values as a list of Python floats. Values only
+become lists at the BSON and JSON boundaries.
+"""
+from typing import Any, List, Sequence, Union
+
+import numpy as np
+
+
+DTYPE = np.float32
+
+# One embedding: 1-D float32 array
+Vector = np.ndarray
+# One embedding per row: 2-D float32 array
+Matrix = np.ndarray
+# Anything that can be turned into a Vector
+VectorLike = Union[np.ndarray, Sequence[float]]
+
+
+def as_vector(values: Any) -> Vector:
+    """
+    Convert values to a 1-D float32 vector, without copying float32 input.
+    
+    Args:
+        values: List of floats or NumPy array
+    
+    Returns:
+        1-D float32 array
+    """
+    return np.asarray(values, dtype=DTYPE).reshape(-1)
+
+
+def as_matrix(values: Any) -> Matrix:
+    """
+    Convert values to a 2-D float32 matrix, without copying float32 input.
+    
+    Args:
+        values: Vector, list of vectors or NumPy array
+    
+    Returns:
+        2-D float32 array with one vector per row
+    """
+    return np.atleast_2d(np.asarray(values, dtype=DTYPE))
+
+
+def to_list(vector: VectorLike) -> List[float]:
+    """
+    Convert a vector to a list of Python floats for BSON or JSON.
+    
+    Args:
+        vector: Vector or list of floats
+    
+    Returns:
+        List of floats
+    """
+    if isinstance(vector, np.ndarray):
+        return vector.tolist()
+    return [float(x) for x in vector]
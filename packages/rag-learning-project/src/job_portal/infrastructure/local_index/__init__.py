@@ -0,0 +1 @@
+"""Local in-process vector indexes mirroring MongoDB collections."""
@@ -0,0 +1,576 @@
+"""In-process vector index mirroring one vector field of a MongoDB collection."""
+import hashlib
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import bson
+import numpy as np
+from bson import json_util
+from bson.binary import Binary, VECTOR_SUBTYPE
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+from ...domain.vectors import DTYPE, Matrix, Vector, VectorLike
+from ..mongodb.vector_codec import decode_vector
+from .columns import ColumnarMetadata
+
+
+def _is_vector(value: Any) -> bool:
+    """Whether a field value looks like a stored embedding."""
+    if isinstance(value, Binary):
+        return value.subtype == VECTOR_SUBTYPE
+    return isinstance(value, list) and len(value) >= 16 and all(isinstance(item, float) for item in value[:16])
+
+
+def _normalize(vector: Vector) -> Vector:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def top_k(similarities: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest similarities in each row, best first."""
+    if k < similarities.shape[-1]:
+        top = np.argpartition(-similarities, k - 1, axis=-1)[..., :k]
+    else:
+        top = np.broadcast_to(np.arange(similarities.shape[-1]), similarities.shape).copy()
+    order = np.argsort(-np.take_along_axis(similarities, top, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(top, order, axis=-1)
+
+
+class LocalVectorIndex(ABC):
+    """
+    Vector index kept in process memory and in sync with a MongoDB collection.
+    
+    The index is built from a bulk scan of every document with a vector in
+    ``vector_field`` and then kept current from a change stream, or by
+    polling the collection when change streams are unavailable (standalone
+    servers, mongomock). Documents are kept without their vectors, so
+    searches return the same documents ``$vectorSearch`` would without a
+    network round trip, with scores on Atlas's cosine scale.
+    
+    Each document occupies a slot; vectors are stored L2-normalized in slot
+    order, so inner product is cosine similarity. Updates and deletes leave
+    a tombstone that searches skip, and the index is compacted once a
+    quarter of its slots are dead. ``filter_criteria`` are compiled into a
+    mask over columns of the kept documents' fields and turned into an
+    allow-list of slots, cached until the next change; small allow-lists are
+    scored exactly.
+    
+    Subclasses provide the search structure over the slot vectors.
+    """
+    
+    name: str = "local"
+    
+    def __init__(
+        self,
+        collection: Collection,
+        vector_field: str,
+        path: Optional[str] = None,
+        poll_interval: float = 30.0,
+        save_interval: float = 300.0,
+        exact_threshold: int = 2048,
+        filter_cache_size: int = 256
+    ):
+        """
+        Initialize local vector index.
+        
+        Args:
+            collection: Collection to mirror
+            vector_field: Name of the field containing vector embeddings
+            path: Directory to persist the index to (None keeps it in memory only)
+            poll_interval: Seconds between scans when change streams are unavailable
+            save_interval: Seconds between saves while syncing
+            exact_threshold: Allow-lists up to this size are scored exactly
+            filter_cache_size: Number of filter allow-lists kept
+        """
+        self.collection = collection
+        self.vector_field = vector_field
+        self.path = Path(path) if path else None
+        self.poll_interval = poll_interval
+        self.save_interval = save_interval
+        self.exact_threshold = exact_threshold
+        self.filter_cache_size = filter_cache_size
+        self.mode: Optional[str] = None
+        
+        self._lock = threading.RLock()
+        self._dimension: Optional[int] = None
+        self._vectors = np.zeros((0, 0), dtype=DTYPE)
+        self._count = 0
+        self._ids: List[Any] = []
+        self._documents: List[Optional[Dict[str, Any]]] = []
+        self._slots: Dict[Any, int] = {}
+        self._fingerprints: Dict[Any, str] = {}
+        self._deleted: List[int] = []
+        self._columns = ColumnarMetadata()
+        self._allowed_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._resume_token: Any = None
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    # -- search structure -------------------------------------------------
+    
+    @abstractmethod
+    def _index_rebuild(self) -> None:
+        """Rebuild the search structure over slots ``0 .. _count - 1``."""
+    
+    @abstractmethod
+    def _index_add(self, start: int, vectors: np.ndarray) -> None:
+        """Add vectors for the slots starting at ``start``."""
+    
+    @abstractmethod
+    def _index_search(
+        self,
+        queries: Matrix,
+        k: int,
+        allowed: Optional[np.ndarray],
+        excluded: np.ndarray,
+        num_candidates: Optional[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest slots for each query.
+        
+        Args:
+            queries: Normalized query vectors, one per row
+            k: Number of results per query
+            allowed: Slots to search (None for every slot but ``excluded``)
+            excluded: Dead slots
+            num_candidates: Caller's ANN candidate count, as a search-effort hint
+        
+        Returns:
+            (similarities, slots) with one row per query, best first; missing
+            results have slot -1
+        """
+    
+    def _save_index(self, prefix: Path) -> None:
+        """Persist the search structure next to the slot data (optional)."""
+    
+    def _load_index(self, prefix: Path) -> bool:
+        """Load a persisted search structure; False makes the caller rebuild it."""
+        return False
+    
+    # -- contents ---------------------------------------------------------
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._dimension
+    
+    def _fingerprint(self, document: Dict[str, Any]) -> str:
+        return hashlib.blake2b(bson.encode(document), digest_size=16).hexdigest()
+    
+    def _strip(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop vector fields from a document before keeping it."""
+        return {key: value for key, value in document.items() if not _is_vector(value)}
+    
+    def _changed(self) -> None:
+        self._allowed_cache.clear()
+        self._dirty = True
+    
+    def _append(self, rows: List[Tuple[Any, Dict[str, Any], Vector]]) -> None:
+        """Append documents with their normalized vectors to new slots."""
+        if not rows:
+            return
+        vectors = np.stack([vector for _, _, vector in rows]).astype(DTYPE, copy=False)
+        start = self._count
+        needed = start + len(rows)
+        if needed > self._vectors.shape[0] or self._vectors.shape[1] != vectors.shape[1]:
+            grown = np.zeros((max(needed, 2 * self._vectors.shape[0], 64), vectors.shape[1]), dtype=DTYPE)
+            grown[:start] = self._vectors[:start]
+            self._vectors = grown
+        self._vectors[start:needed] = vectors
+        for offset, (doc_id, document, _) in enumerate(rows):
+            self._ids.append(doc_id)
+            self._documents.append(document)
+            self._slots[doc_id] = start + offset
+        self._columns.append([document for _, document, _ in rows])
+        self._count = needed
+        self._index_add(start, vectors)
+    
+    def _vector_of(self, document: Dict[str, Any]) -> Optional[Vector]:
+        value = document.get(self.vector_field)
+        if value is None:
+            return None
+        vector = decode_vector(value)
+        if self._dimension is None:
+            self._dimension = vector.shape[0]
+        elif vector.shape[0] != self._dimension:
+            # Left out rather than failing the whole index (e.g. mid-migration documents)
+            return None
+        return _normalize(vector)
+    
+    def _drop(self, doc_id: Any) -> None:
+        slot = self._slots.pop(doc_id, None)
+        self._fingerprints.pop(doc_id, None)
+        if slot is None:
+            return
+        self._ids[slot] = None
+        self._documents[slot] = None
+        self._deleted.append(slot)
+    
+    def upsert(self, document: Dict[str, Any]) -> None:
+        """
+        Add or replace one document.
+        
+        Args:
+            document: Full document as stored in MongoDB (documents without a
+                vector are removed from the index)
+        """
+        with self._lock:
+            self._drop(document["_id"])
+            vector = self._vector_of(document)
+            if vector is not None:
+                self._append([(document["_id"], self._strip(document), vector)])
+                self._fingerprints[document["_id"]] = self._fingerprint(document)
+            self._changed()
+            self._maybe_compact()
+    
+    def remove(self, doc_id: Any) -> None:
+        """Remove one document by _id."""
+        with self._lock:
+            self._drop(doc_id)
+            self._changed()
+            self._maybe_compact()
+    
+    def _maybe_compact(self) -> None:
+        if len(self._deleted) > max(64, self._count // 4):
+            self._compact()
+    
+    def _compact(self) -> None:
+        """Move live slots together and rebuild the search structure."""
+        live = [slot for slot in range(self._count) if self._ids[slot] is not None]
+        self._vectors = self._vectors[live].copy() if live else np.zeros((0, self._dimension or 0), dtype=DTYPE)
+        self._ids = [self._ids[slot] for slot in live]
+        self._documents = [self._documents[slot] for slot in live]
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+        self._count = len(live)
+        self._deleted = []
+        self._columns.clear()
+        self._index_rebuild()
+        self._changed()
+    
+    def _scan(self):
+        return self.collection.find({self.vector_field: {"$exists": True, "$ne": None}})
+    
+    def build(self) -> int:
+        """
+        Rebuild the index from a bulk scan of the collection.
+        
+        Returns:
+            Number of indexed documents
+        """
+        rows = []
+        fingerprints = {}
+        with self._lock:
+            self._dimension = None
+            for document in self._scan():
+                vector = self._vector_of(document)
+                if vector is not None:
+                    rows.append((document["_id"], self._strip(document), vector))
+                    fingerprints[document["_id"]] = self._fingerprint(document)
+            
+            dimension = self._dimension or 0
+            self._vectors = np.stack([vector for _, _, vector in rows]).astype(DTYPE) if rows \
+                else np.zeros((0, dimension), dtype=DTYPE)
+            self._ids = [doc_id for doc_id, _, _ in rows]
+            self._documents = [document for _, document, _ in rows]
+            self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+            self._fingerprints = fingerprints
+            self._count = len(rows)
+            self._deleted = []
+            self._columns.clear()
+            self._index_rebuild()
+            self._changed()
+            return len(self._slots)
+    
+    def poll(self) -> Dict[str, int]:
+        """
+        Bring the index up to date by scanning the collection.
+        
+        Only documents whose content changed are re-indexed.
+        
+        Returns:
+            Dict with 'upserted' and 'removed' counts
+        """
+        counts = {"upserted": 0, "removed": 0}
+        seen = set()
+        for document in self._scan():
+            seen.add(document["_id"])
+            if self._fingerprints.get(document["_id"]) != self._fingerprint(document):
+                self.upsert(document)
+                counts["upserted"] += 1
+        with self._lock:
+            for doc_id in [doc_id for doc_id in self._slots if doc_id not in seen]:
+                self._drop(doc_id)
+                counts["removed"] += 1
+            if counts["removed"]:
+                self._changed()
+                self._maybe_compact()
+        return counts
+    
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        """
+        Apply one change stream event.
+        
+        Args:
+            change: Event from ``collection.watch(full_document="updateLookup")``
+        """
+        operation = change.get("operationType")
+        if operation in ("insert", "replace", "update"):
+            document = change.get("fullDocument")
+            if document is None:
+                # Deleted again before the lookup
+                self.remove(change["documentKey"]["_id"])
+            else:
+                self.upsert(document)
+        elif operation == "delete":
+            self.remove(change["documentKey"]["_id"])
+        elif operation in ("drop", "rename", "invalidate", "dropDatabase"):
+            self.build()
+    
+    # -- search -----------------------------------------------------------
+    
+    def _allowed(self, filter_criteria: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Slots of live documents matching a filter (None without a filter)."""
+        if not filter_criteria:
+            return None
+        key = json_util.dumps(filter_criteria, sort_keys=True)
+        allowed = self._allowed_cache.get(key)
+        if allowed is None:
+            mask = self._columns.mask(filter_criteria, self._documents)
+            mask[self._deleted] = False
+            allowed = np.flatnonzero(mask)
+            self._allowed_cache[key] = allowed
+            while len(self._allowed_cache) > self.filter_cache_size:
+                self._allowed_cache.popitem(last=False)
+        else:
+            self._allowed_cache.move_to_end(key)
+        return allowed
+    
+    def search(
+        self,
+        query_vector: VectorLike,
+        limit: int = 10,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        num_candidates: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the documents nearest to a query vector.
+        
+        Args:
+            query_vector: Query vector embedding
+            limit: Number of results to return
+            filter_criteria: Optional MongoDB filter on the kept document fields
+            num_candidates: ANN search effort hint (as for ``$vectorSearch``)
+        
+        Returns:
+            Matching documents (without vectors) with a "score", best first
+        """
+        return self.search_many([query_vector], limit, filter_criteria, num_candidates)[0]
+    
+    def search_many(
+        self,
+        query_vectors: Sequence[VectorLike],
+        limit: int = 10,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        num_candidates: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Find the nearest documents for several query vectors sharing one filter.
+        
+        The filter is compiled once and all queries are scored together
+        (one matrix product, or one batched FAISS search).
+        
+        Args:
+            query_vectors: Query vector embeddings
+            limit: Number of results per query
+            filter_criteria: Optional MongoDB filter on the kept document fields
+            num_candidates: ANN search effort hint (as for ``$vectorSearch``)
+        
+        Returns:
+            Matching documents per query, in query order
+        """
+        queries = [_normalize(decode_vector(query_vector)) for query_vector in query_vectors]
+        with self._lock:
+            if not self._slots or not queries:
+                return [[] for _ in queries]
+            # The first query of the wrong dimension, if any
+            query = max(queries, key=lambda query: query.shape[0] != self._dimension)
+            if self._dimension is not None and query.shape[0] != self._dimension:
+                raise ValueError(f"Query has {query.shape[0]} dimensions, index has {self._dimension}")
+            queries = np.stack(queries).astype(DTYPE, copy=False)
+            allowed = self._allowed(filter_criteria)
+            k = min(limit, len(self._slots) if allowed is None else len(allowed))
+            if k <= 0:
+                return [[] for _ in queries]
+            if allowed is not None and len(allowed) <= self.exact_threshold:
+                similarities = queries @ self._vectors[allowed].T
+                top = top_k(similarities, k)
+                similarities, slots = np.take_along_axis(similarities, top, axis=1), allowed[top]
+            else:
+                similarities, slots = self._index_search(
+                    queries, k, allowed, np.asarray(self._deleted, dtype=np.int64), num_candidates
+                )
+            
+            results = [[] for _ in queries]
+            rows = np.repeat(np.arange(len(queries)), slots.shape[1])
+            for row, similarity, slot in zip(rows, similarities.ravel(), slots.ravel()):
+                if slot < 0 or self._documents[slot] is None:
+                    continue
+                document = dict(self._documents[slot])
+                # Same scale as Atlas's cosine vectorSearchScore
+                document["score"] = float((1 + similarity) / 2)
+                results[row].append(document)
+            return results
+    
+    # -- persistence ------------------------------------------------------
+    
+    def _prefix(self) -> Path:
+        return self.path / f"{self.collection.name}.{self.vector_field}.{self.name}"
+    
+    def save(self) -> None:
+        """Persist the index, the kept documents and the sync position."""
+        if self.path is None:
+            return
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            prefix = self._prefix()
+            np.save(f"{prefix}.vectors.tmp.npy", self._vectors[:self._count])
+            state = {
+                "vector_field": self.vector_field,
+                "dimension": self._dimension,
+                "ids": self._ids,
+                "documents": self._documents,
+                "fingerprints": list(self._fingerprints.items()),
+                "deleted": self._deleted,
+                "resume_token": self._resume_token,
+            }
+            with open(f"{prefix}.state.tmp", "w", encoding="utf-8") as handle:
+                handle.write(json_util.dumps(state))
+            self._save_index(prefix)
+            os.replace(f"{prefix}.vectors.tmp.npy", f"{prefix}.vectors.npy")
+            os.replace(f"{prefix}.state.tmp", f"{prefix}.state.json")
+            self._dirty = False
+    
+    def load(self) -> bool:
+        """
+        Load a persisted index.
+        
+        Returns:
+            True if one was found
+        """
+        if self.path is None:
+            return False
+        prefix = self._prefix()
+        if not (Path(f"{prefix}.state.json").exists() and Path(f"{prefix}.vectors.npy").exists()):
+            return False
+        with self._lock:
+            with open(f"{prefix}.state.json", "r", encoding="utf-8") as handle:
+                state = json_util.loads(handle.read())
+            self._vectors = np.load(f"{prefix}.vectors.npy").astype(DTYPE, copy=False)
+            self._dimension = state["dimension"]
+            self._ids = state["ids"]
+            self._documents = state["documents"]
+            self._count = len(self._ids)
+            self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids) if doc_id is not None}
+            self._fingerprints = dict(state["fingerprints"])
+            self._deleted = state["deleted"]
+            self._resume_token = state["resume_token"]
+            self._columns.clear()
+            if not self._load_index(prefix):
+                self._index_rebuild()
+            self._allowed_cache.clear()
+            self._dirty = False
+        return True
+    
+    # -- synchronization --------------------------------------------------
+    
+    def _open_stream(self, resume_token: Any = None):
+        return self.collection.watch(
+            full_document="updateLookup", resume_after=resume_token, max_await_time_ms=500
+        )
+    
+    def start(self) -> "LocalVectorIndex":
+        """
+        Load or build the index, then keep it in sync on a background thread.
+        
+        The change stream is opened before any catch-up scan, so no change
+        falls between the two; events replayed on top of the scan are
+        idempotent.
+        """
+        loaded = self.load()
+        stream = None
+        try:
+            try:
+                stream = self._open_stream(self._resume_token if loaded else None)
+                resumed = loaded and self._resume_token is not None
+            except PyMongoError:
+                if not loaded or self._resume_token is None:
+                    raise
+                # Resume point no longer in the oplog: start over and reconcile
+                stream = self._open_stream()
+                resumed = False
+            self.mode = "change_stream"
+            if not loaded:
+                self.build()
+            elif not resumed:
+                self.poll()
+        except PyMongoError:
+            self.mode = "polling"
+            if loaded:
+                self.poll()
+            else:
+                self.build()
+        self.save()
+        
+        self._stop.clear()
+        target = self._follow_stream if stream is not None else self._follow_polling
+        self._thread = threading.Thread(
+            target=target, args=(stream,) if stream is not None else (), name=f"local-index-{self.collection.name}",
+            daemon=True
+        )
+        self._thread.start()
+        return self
+    
+    def _follow_stream(self, stream) -> None:
+        last_save = time.monotonic()
+        try:
+            with stream:
+                while not self._stop.is_set():
+                    change = stream.try_next()
+                    if change is not None:
+                        self.apply_change(change)
+                    self._resume_token = stream.resume_token
+                    if self._dirty and time.monotonic() - last_save >= self.save_interval:
+                        self.save()
+                        last_save = time.monotonic()
+        except PyMongoError:
+            # Lost the stream (e.g. failover to a node without it): keep up by polling
+            self.mode = "polling"
+            self._follow_polling()
+    
+    def _follow_polling(self) -> None:
+        last_save = time.monotonic()
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except PyMongoError:
+                continue
+            if self._dirty and time.monotonic() - last_save >= self.save_interval:
+                self.save()
+                last_save = time.monotonic()
+    
+    def close(self) -> None:
+        """Stop syncing and save the index."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.save()
@@ -0,0 +1,171 @@
+"""Columnar document metadata that compiles MongoDB filters into slot masks."""
+import operator
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from bson import json_util
+
+from .filters import MISSING, get_path, match_value
+
+
+_COMPARISONS: Dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "$eq": operator.eq,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _value_key(value: Any) -> Any:
+    """Hashable key telling distinct field values apart."""
+    if value is MISSING:
+        return MISSING
+    if value is None or isinstance(value, (str, int, float, bool)):
+        # The type keeps True, 1 and 1.0 apart
+        return type(value), value
+    return json_util.dumps(value, sort_keys=True)
+
+
+class Column:
+    """
+    Dictionary-encoded values of one field path across slots.
+    
+    Each slot holds a code into the column's distinct values, so a filter
+    on the field is evaluated once per distinct value and then broadcast to
+    every slot with one gather.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.values: List[Any] = []
+        self._codes_by_key: Dict[Any, int] = {}
+        self._codes = np.zeros(0, dtype=np.int32)
+        self._size = 0
+        self._numbers: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _code(self, value: Any) -> int:
+        key = _value_key(value)
+        code = self._codes_by_key.get(key)
+        if code is None:
+            code = len(self.values)
+            self._codes_by_key[key] = code
+            self.values.append(value)
+            self._numbers = None
+        return code
+    
+    def append(self, documents: List[Optional[Dict[str, Any]]]) -> None:
+        """Encode the field of documents for the next slots (None for dead slots)."""
+        needed = self._size + len(documents)
+        if needed > len(self._codes):
+            grown = np.zeros(max(needed, 2 * len(self._codes), 64), dtype=np.int32)
+            grown[:self._size] = self._codes[:self._size]
+            self._codes = grown
+        for offset, document in enumerate(documents):
+            value = MISSING if document is None else get_path(document, self.path)
+            self._codes[self._size + offset] = self._code(value)
+        self._size = needed
+    
+    def _distinct_numbers(self) -> np.ndarray:
+        """Distinct values as floats (NaN for anything but a plain number)."""
+        if self._numbers is None:
+            self._numbers = np.array(
+                [value if _is_number(value) else np.nan for value in self.values], dtype=np.float64
+            )
+        return self._numbers
+    
+    def mask(self, spec: Any) -> np.ndarray:
+        """
+        Evaluate a filter spec on the field.
+        
+        Args:
+            spec: Literal, operator document or compiled regex for the field
+        
+        Returns:
+            Boolean mask over slots
+        """
+        if (
+            isinstance(spec, dict) and spec
+            and all(op in _COMPARISONS and _is_number(operand) for op, operand in spec.items())
+        ):
+            # Numeric ranges: compare the distinct numbers in one pass and
+            # only evaluate the rest (arrays, other types) value by value
+            numbers = self._distinct_numbers()
+            distinct = np.ones(len(self.values), dtype=bool)
+            for op, operand in spec.items():
+                distinct &= _COMPARISONS[op](numbers, operand)
+            for code in np.flatnonzero(np.isnan(numbers)):
+                distinct[code] = match_value(self.values[code], spec)
+        else:
+            distinct = np.fromiter(
+                (match_value(value, spec) for value in self.values), dtype=bool, count=len(self.values)
+            )
+        return distinct[self._codes[:self._size]]
+
+
+class ColumnarMetadata:
+    """
+    Per-field columns over the kept documents, built on first use.
+    
+    Filters compile into boolean masks over slots: each field condition is
+    a column mask, and ``$and``/``$or``/``$nor`` combine masks. Results are
+    the same as evaluating ``filters.matches`` document by document.
+    """
+    
+    def __init__(self):
+        self._columns: Dict[str, Column] = {}
+    
+    def clear(self) -> None:
+        """Forget every column (after slots were renumbered)."""
+        self._columns.clear()
+    
+    def append(self, documents: List[Optional[Dict[str, Any]]]) -> None:
+        """Encode documents added to the next slots in every built column."""
+        for column in self._columns.values():
+            column.append(documents)
+    
+    def column(self, path: str, documents: List[Optional[Dict[str, Any]]]) -> Column:
+        """Get the column for a field path, building it from the slot documents if needed."""
+        column = self._columns.get(path)
+        if column is None:
+            column = Column(path)
+            column.append(documents)
+            self._columns[path] = column
+        return column
+    
+    def mask(self, criteria: Dict[str, Any], documents: List[Optional[Dict[str, Any]]]) -> np.ndarray:
+        """
+        Compile a MongoDB filter into a mask over slots.
+        
+        Args:
+            criteria: MongoDB filter document
+            documents: Kept document of every slot (None for dead slots)
+        
+        Returns:
+            Boolean mask, True for slots whose document matches
+        
+        Raises:
+            ValueError: If the filter uses an unsupported operator
+        """
+        mask = np.ones(len(documents), dtype=bool)
+        for key, spec in criteria.items():
+            if key == "$and":
+                for clause in spec:
+                    mask &= self.mask(clause, documents)
+            elif key in ("$or", "$nor"):
+                either = np.zeros(len(documents), dtype=bool)
+                for clause in spec:
+                    either |= self.mask(clause, documents)
+                mask &= either if key == "$or" else ~either
+            elif key.startswith("$"):
+                raise ValueError(f"Unsupported filter operator {key!r}")
+            else:
+                mask &= self.column(key, documents).mask(spec)
+        return mask
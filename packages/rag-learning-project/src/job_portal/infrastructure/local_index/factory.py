@@ -0,0 +1,104 @@
+"""Opening local vector indexes from configuration."""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from pymongo.collection import Collection
+
+from .base import LocalVectorIndex
+from .faiss_index import FaissVectorIndex
+from .numpy_index import NumpyVectorIndex
+
+
+DEFAULT_DIR = ".vector_index"
+
+# VECTOR_SEARCH_BACKEND -> index class ("atlas" searches with $vectorSearch)
+BACKENDS = {
+    "faiss": FaissVectorIndex,
+    "numpy": NumpyVectorIndex,
+}
+
+_open_indexes: Dict[Tuple[str, str, str], LocalVectorIndex] = {}
+_open_lock = threading.Lock()
+
+
+def open_local_index(
+    collection: Collection,
+    vector_field: str,
+    backend: Optional[str] = None
+) -> Optional[LocalVectorIndex]:
+    """
+    Get the synced local index for a collection's vector field, if configured.
+    
+    ``VECTOR_SEARCH_BACKEND`` picks the backend: ``atlas`` (the default)
+    means no local index, ``faiss`` an approximate FAISS index and ``numpy``
+    exact search. ``LOCAL_INDEX_DIR`` sets where indexes persist
+    (``off`` keeps them in memory), ``LOCAL_INDEX_POLL_SECONDS`` the polling
+    interval without change streams and ``FAISS_INDEX_TYPE`` the FAISS
+    structure. Indexes are shared per process, so every store on the same
+    collection and field searches one mirror.
+    
+    Args:
+        collection: Collection to mirror
+        vector_field: Name of the field containing vector embeddings
+        backend: Backend name (defaults to VECTOR_SEARCH_BACKEND)
+    
+    Returns:
+        Started local index, or None to search with Atlas
+    
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    # An empty setting (VECTOR_SEARCH_BACKEND= in .env) means the default too
+    backend = (backend or os.getenv("VECTOR_SEARCH_BACKEND") or "atlas").lower()
+    if backend == "atlas":
+        return None
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown vector search backend '{backend}'. Expected one of: atlas, {', '.join(BACKENDS)}"
+        )
+    
+    key = (collection.full_name, vector_field, backend)
+    with _open_lock:
+        index = _open_indexes.get(key)
+        if index is None:
+            path = os.getenv("LOCAL_INDEX_DIR", DEFAULT_DIR)
+            kwargs = {
+                "path": None if path.lower() in ("", "none", "off") else path,
+                "poll_interval": float(os.getenv("LOCAL_INDEX_POLL_SECONDS", "30")),
+            }
+            if backend == "faiss":
+                kwargs["index_type"] = os.getenv("FAISS_INDEX_TYPE", "hnsw")
+            index = BACKENDS[backend](collection, vector_field, **kwargs).start()
+            _open_indexes[key] = index
+        return index
+
+
+def close_local_index(index: LocalVectorIndex) -> bool:
+    """
+    Stop syncing and save one index opened by ``open_local_index``.
+    
+    Stores call this when they stop searching its field (e.g. after a
+    generation switch), so the old field's mirror doesn't keep syncing.
+    
+    Args:
+        index: Index returned by ``open_local_index``
+    
+    Returns:
+        True if the index was open; indexes created elsewhere are left alone
+    """
+    with _open_lock:
+        keys = [key for key, opened in _open_indexes.items() if opened is index]
+        for key in keys:
+            del _open_indexes[key]
+    if keys:
+        index.close()
+    return bool(keys)
+
+
+def close_local_indexes() -> None:
+    """Stop syncing and save every index opened by ``open_local_index``."""
+    with _open_lock:
+        for index in _open_indexes.values():
+            index.close()
+        _open_indexes.clear()
@@ -0,0 +1,142 @@
+"""FAISS-backed local vector index (HNSW, IVF or flat)."""
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from ...domain.vectors import Matrix
+from .base import LocalVectorIndex
+
+try:
+    import faiss
+except ImportError:  # optional: only needed for VECTOR_SEARCH_BACKEND=faiss
+    faiss = None
+
+
+INDEX_TYPES = ("hnsw", "ivf", "flat")
+
+
+class FaissVectorIndex(LocalVectorIndex):
+    """
+    Local vector index searched with FAISS.
+    
+    ``hnsw`` (the default) gives sub-millisecond top-k on tens of thousands
+    of vectors and takes additions without retraining; ``ivf`` uses less
+    memory per vector but is retrained (with ``nlist`` ~ sqrt(n) lists) on
+    every rebuild; ``flat`` is exact. Dead slots and filter allow-lists are
+    passed to FAISS as ID selectors, so filtering happens inside the search
+    instead of by over-fetching.
+    """
+    
+    name = "faiss"
+    
+    def __init__(
+        self,
+        collection: Any,
+        vector_field: str,
+        index_type: str = "hnsw",
+        hnsw_m: int = 32,
+        ef_construction: int = 80,
+        ef_search: int = 64,
+        nprobe: int = 8,
+        **kwargs
+    ):
+        """
+        Initialize FAISS index.
+        
+        Args:
+            collection: Collection to mirror
+            vector_field: Name of the field containing vector embeddings
+            index_type: "hnsw", "ivf" or "flat"
+            hnsw_m: HNSW graph degree
+            ef_construction: HNSW build-time search depth
+            ef_search: Minimum HNSW query-time search depth (raised to
+                the caller's num_candidates)
+            nprobe: IVF lists visited per query
+            **kwargs: Passed to ``LocalVectorIndex``
+        """
+        if faiss is None:
+            raise ImportError("faiss is not installed; install faiss-cpu to use the FAISS index")
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}'. Expected one of: {', '.join(INDEX_TYPES)}")
+        super().__init__(collection, vector_field, **kwargs)
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+        self._index: Any = None
+    
+    def _new_index(self, dimension: int, count: int) -> Any:
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.ef_construction
+            return index
+        if self.index_type == "ivf":
+            quantizer = faiss.IndexFlatIP(dimension)
+            nlist = max(1, int(np.sqrt(count)))
+            return faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexFlatIP(dimension)
+    
+    def _index_rebuild(self) -> None:
+        if not self._dimension:
+            self._index = None
+            return
+        vectors = np.ascontiguousarray(self._vectors[:self._count])
+        self._index = self._new_index(self._dimension, self._count)
+        if self._count:
+            if not self._index.is_trained:
+                self._index.train(vectors)
+            self._index.add(vectors)
+    
+    def _index_add(self, start: int, vectors: np.ndarray) -> None:
+        if self._index is None or not self._index.is_trained or self._index.ntotal != start:
+            self._index_rebuild()
+            return
+        self._index.add(np.ascontiguousarray(vectors))
+    
+    def _index_search(
+        self,
+        queries: Matrix,
+        k: int,
+        allowed: Optional[np.ndarray],
+        excluded: np.ndarray,
+        num_candidates: Optional[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # A bitmap over slots is cheaper to build per query than a hash set
+        selector = None
+        if allowed is not None or len(excluded):
+            mask = np.zeros(self._count, dtype=bool)
+            if allowed is not None:
+                mask[allowed] = True
+            else:
+                mask[:] = True
+                mask[excluded] = False
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(self._count, faiss.swig_ptr(bitmap))
+        
+        if self.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW(efSearch=max(self.ef_search, k, num_candidates or 0))
+        elif self.index_type == "ivf":
+            params = faiss.SearchParametersIVF(nprobe=min(self.nprobe, self._index.nlist))
+        else:
+            params = faiss.SearchParameters()
+        if selector is not None:
+            params.sel = selector
+        
+        return self._index.search(np.ascontiguousarray(queries), k, params=params)
+    
+    def _save_index(self, prefix: Path) -> None:
+        if self._index is not None:
+            faiss.write_index(self._index, f"{prefix}.faiss.tmp")
+            Path(f"{prefix}.faiss.tmp").replace(f"{prefix}.faiss")
+    
+    def _load_index(self, prefix: Path) -> bool:
+        path = Path(f"{prefix}.faiss")
+        if not path.exists():
+            return False
+        index = faiss.read_index(str(path))
+        if index.ntotal != self._count or index.d != self._dimension:
+            return False
+        self._index = index
+        return True
@@ -0,0 +1,177 @@
+"""Evaluation of MongoDB filter documents against in-memory documents.
+
+Local indexes answer ``filter_criteria`` the way MongoDB would, for the
+subset of the query language the stores build: equality (matching array
+elements too), ``$eq``/``$ne``, ``$in``/``$nin``, ``$gt``/``$gte``/``$lt``/``$lte``,
+``$regex`` with ``$options``, ``$exists``, ``$not``, ``$geoWithin`` with
+``$centerSphere`` on GeoJSON points and the ``$and``/``$or``/``$nor``
+combinators, on dotted paths.
+"""
+import math
+import re
+from typing import Any, Dict, List
+
+MISSING = object()
+
+
+def get_path(document: Dict[str, Any], path: str) -> Any:
+    """
+    Resolve a dotted path, collecting values across arrays of subdocuments.
+    
+    Args:
+        document: Document to read
+        path: Dotted field path (e.g. "salary_range.max")
+    
+    Returns:
+        The value, a list of values if the path crosses an array, or
+        ``MISSING`` if it is missing
+    """
+    values: List[Any] = [document]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict) and part in value:
+                found.append(value[part])
+            elif isinstance(value, list):
+                found.extend(item[part] for item in value if isinstance(item, dict) and part in item)
+        if not found:
+            return MISSING
+        values = found
+    return values[0] if len(values) == 1 else values
+
+
+def _candidates(value: Any) -> List[Any]:
+    """The value itself plus, for arrays, each element (MongoDB's array matching)."""
+    if isinstance(value, list):
+        return [value, *value]
+    return [value]
+
+
+def _compare(left: Any, right: Any, op: str) -> bool:
+    try:
+        if op == "$gt":
+            return left > right
+        if op == "$gte":
+            return left >= right
+        if op == "$lt":
+            return left < right
+        return left <= right
+    except TypeError:
+        # MongoDB only compares values of the same type bracket
+        return False
+
+
+def _regex(spec: Dict[str, Any]) -> "re.Pattern":
+    flags = 0
+    for option in spec.get("$options", ""):
+        flags |= {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}.get(option, 0)
+    pattern = spec["$regex"]
+    return re.compile(pattern.pattern if isinstance(pattern, re.Pattern) else pattern, flags)
+
+
+def _within(value: Any, spec: Dict[str, Any]) -> bool:
+    """Whether a GeoJSON point lies within a ``$centerSphere`` (great-circle distance)."""
+    if set(spec) != {"$centerSphere"}:
+        raise ValueError(f"Unsupported $geoWithin shape {sorted(spec)}")
+    if not isinstance(value, dict) or value.get("type") != "Point":
+        return False
+    (center_lng, center_lat), radius = spec["$centerSphere"]
+    lng, lat = value["coordinates"]
+    lat1, lat2 = math.radians(center_lat), math.radians(lat)
+    haversine = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin(math.radians(lng - center_lng) / 2) ** 2
+    )
+    return 2 * math.asin(min(1.0, math.sqrt(haversine))) <= radius
+
+
+def _match_operators(value: Any, spec: Dict[str, Any]) -> bool:
+    present = value is not MISSING
+    candidates = _candidates(value) if present else [None]
+    for op, operand in spec.items():
+        if op == "$options":
+            continue
+        if op == "$eq":
+            if not any(candidate == operand for candidate in candidates):
+                return False
+        elif op == "$ne":
+            if any(candidate == operand for candidate in candidates):
+                return False
+        elif op == "$in":
+            if not any(candidate == item for candidate in candidates for item in operand):
+                return False
+        elif op == "$nin":
+            if any(candidate == item for candidate in candidates for item in operand):
+                return False
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            if not present or not any(_compare(candidate, operand, op) for candidate in candidates):
+                return False
+        elif op == "$regex":
+            pattern = _regex(spec)
+            if not present or not any(
+                isinstance(candidate, str) and pattern.search(candidate) for candidate in candidates
+            ):
+                return False
+        elif op == "$exists":
+            if present != bool(operand):
+                return False
+        elif op == "$geoWithin":
+            if not present or not any(_within(candidate, operand) for candidate in candidates):
+                return False
+        elif op == "$not":
+            if match_value(value, operand):
+                return False
+        else:
+            raise ValueError(f"Unsupported filter operator {op!r}")
+    return True
+
+
+def match_value(value: Any, spec: Any) -> bool:
+    """
+    Check whether a field value (as returned by ``get_path``) satisfies a filter spec.
+    
+    Args:
+        value: Field value, or the missing-field sentinel
+        spec: Literal to compare with, operator document or compiled regex
+    
+    Returns:
+        True if the value matches
+    """
+    if isinstance(spec, dict) and spec and all(key.startswith("$") for key in spec):
+        return _match_operators(value, spec)
+    if isinstance(spec, re.Pattern):
+        return _match_operators(value, {"$regex": spec})
+    if value is MISSING:
+        return spec is None
+    return any(candidate == spec for candidate in _candidates(value))
+
+
+def matches(document: Dict[str, Any], criteria: Dict[str, Any]) -> bool:
+    """
+    Check whether a document satisfies a MongoDB filter.
+    
+    Args:
+        document: Document to test
+        criteria: MongoDB filter document
+    
+    Returns:
+        True if the document matches
+    
+    Raises:
+        ValueError: If the filter uses an unsupported operator
+    """
+    for key, spec in criteria.items():
+        if key == "$and":
+            if not all(matches(document, clause) for clause in spec):
+                return False
+        elif key == "$or":
+            if not any(matches(document, clause) for clause in spec):
+                return False
+        elif key == "$nor":
+            if any(matches(document, clause) for clause in spec):
+                return False
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported filter operator {key!r}")
+        elif not match_value(get_path(document, key), spec):
+            return False
+    return True
@@ -0,0 +1,85 @@
+"""Exact local vector index searched with NumPy."""
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from ...domain.vectors import Matrix
+from .base import LocalVectorIndex, top_k
+
+
+class NumpyVectorIndex(LocalVectorIndex):
+    """
+    Local vector index with exact, brute-force search.
+    
+    Needs neither Atlas Search nor an ANN library, so it suits small and
+    medium collections and tests. The slot vectors are already one
+    contiguous, L2-normalized float32 matrix; a search scores it in blocks
+    of ``block_size`` rows (one matrix product per block for all queries),
+    keeping a running top-k with ``argpartition``. Results are exact, so
+    scores match Atlas's exact (ENN) search.
+    """
+    
+    name = "numpy"
+    
+    def __init__(
+        self,
+        collection: Any,
+        vector_field: str,
+        block_size: int = 16384,
+        **kwargs
+    ):
+        """
+        Initialize NumPy index.
+        
+        Args:
+            collection: Collection to mirror
+            vector_field: Name of the field containing vector embeddings
+            block_size: Rows scored per matrix product (bounds temporary memory)
+            **kwargs: Passed to ``LocalVectorIndex``
+        """
+        super().__init__(collection, vector_field, **kwargs)
+        self.block_size = block_size
+    
+    def _index_rebuild(self) -> None:
+        # The slot matrix is the index
+        pass
+    
+    def _index_add(self, start: int, vectors: np.ndarray) -> None:
+        pass
+    
+    def _index_search(
+        self,
+        queries: Matrix,
+        k: int,
+        allowed: Optional[np.ndarray],
+        excluded: np.ndarray,
+        num_candidates: Optional[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        total = self._count if allowed is None else len(allowed)
+        dead = None
+        if allowed is None and len(excluded):
+            dead = np.zeros(self._count, dtype=bool)
+            dead[excluded] = True
+        
+        best_similarities = np.empty((len(queries), 0), dtype=np.float32)
+        best_slots = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, total, self.block_size):
+            end = min(start + self.block_size, total)
+            if allowed is None:
+                slots = np.arange(start, end)
+                similarities = queries @ self._vectors[start:end].T
+                if dead is not None:
+                    similarities[:, dead[start:end]] = -np.inf
+            else:
+                slots = allowed[start:end]
+                similarities = queries @ self._vectors[slots].T
+            
+            similarities = np.concatenate([best_similarities, similarities], axis=1)
+            slots = np.concatenate([best_slots, np.broadcast_to(slots, (len(queries), len(slots)))], axis=1)
+            top = top_k(similarities, k)
+            best_similarities = np.take_along_axis(similarities, top, axis=1)
+            best_slots = np.take_along_axis(slots, top, axis=1)
+        
+        # Dead slots only surface when fewer than k live ones exist
+        best_slots = np.where(np.isfinite(best_similarities), best_slots, -1)
+        return best_similarities, best_slots
@@ -0,0 +1,147 @@
+"""Encoding of embedding vectors for storage and querying in MongoDB."""
+from typing import Any, List, Sequence, Union
+
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype, VECTOR_SUBTYPE
+
+from ...domain.vectors import Vector, as_vector, to_list
+
+
+# Storage formats for vector fields
+ARRAY = "array"      # BSON array of doubles (~9 KB per 1024-dim vector)
+FLOAT32 = "float32"  # Packed BinData float32 vector (~4 KB)
+INT8 = "int8"        # Packed BinData int8 vector, scalar-quantized (~1 KB)
+
+VECTOR_FORMATS = (ARRAY, FLOAT32, INT8)
+
+_DTYPES = {FLOAT32: BinaryVectorDtype.FLOAT32, INT8: BinaryVectorDtype.INT8}
+
+StoredVector = Union[List[float], Binary]
+
+
+def validate_format(vector_format: str) -> str:
+    """
+    Check that a vector storage format is supported.
+    
+    Args:
+        vector_format: One of VECTOR_FORMATS
+    
+    Returns:
+        The format, unchanged
+    
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if vector_format not in VECTOR_FORMATS:
+        raise ValueError(
+            f"Unknown vector format '{vector_format}'. Expected one of: {', '.join(VECTOR_FORMATS)}"
+        )
+    return vector_format
+
+
+def encode_vector(vector: Any, vector_format: str = ARRAY) -> StoredVector:
+    """
+    Encode a vector for storage or as a $vectorSearch queryVector.
+    
+    int8 vectors are quantized per vector (largest component maps to 127).
+    This keeps each vector's direction, so cosine similarity is preserved
+    up to rounding; the scale itself is not stored.
+    
+    Args:
+        vector: Vector as a list, NumPy array or an already encoded BinData vector
+        vector_format: Target format (array, float32 or int8)
+    
+    Returns:
+        List of floats for "array", otherwise a BinData vector
+    """
+    validate_format(vector_format)
+    if isinstance(vector, Binary) and vector.subtype == VECTOR_SUBTYPE:
+        if vector.as_vector().dtype == _DTYPES.get(vector_format):
+            return vector
+        vector = decode_vector(vector)
+    if vector_format == ARRAY:
+        return to_list(vector)
+    
+    values = as_vector(vector)
+    if vector_format == FLOAT32:
+        return Binary.from_vector(values, BinaryVectorDtype.FLOAT32)
+    return Binary.from_vector(quantize_int8(values).tolist(), BinaryVectorDtype.INT8)
+
+
+def decode_vector(value: Any) -> Vector:
+    """
+    Decode a stored vector to a float32 vector.
+    
+    int8 vectors come back as their quantized components, which differ from
+    the original by a per-vector scale only.
+    
+    Args:
+        value: Stored value (array, BinData vector or NumPy array)
+    
+    Returns:
+        1-D float32 array
+    """
+    if isinstance(value, Binary) and value.subtype == VECTOR_SUBTYPE:
+        payload = bytes(value)
+        if payload[:1] == BinaryVectorDtype.FLOAT32.value:
+            # Read float32 payloads directly, past the dtype and padding bytes
+            return np.frombuffer(payload, dtype="<f4", offset=2).astype(np.float32)
+        return as_vector(value.as_vector().data)
+    return as_vector(value)
+
+
+def quantize_int8(vector: Sequence[float]) -> np.ndarray:
+    """
+    Scale a vector so its largest component is +/-127 and round to int8.
+    
+    Args:
+        vector: Float vector
+    
+    Returns:
+        int8 NumPy array
+    """
+    values = np.asarray(vector, dtype=np.float32)
+    peak = float(np.max(np.abs(values))) if values.size else 0.0
+    if peak == 0.0:
+        return np.zeros(values.shape, dtype=np.int8)
+    return np.clip(np.rint(values * (127.0 / peak)), -127, 127).astype(np.int8)
+
+
+def truncate_vector(vector: Any, dimensions: int) -> np.ndarray:
+    """
+    Shorten a vector to its first ``dimensions`` components and re-normalize.
+    
+    Voyage embeddings are trained so that a prefix is itself a usable
+    lower-dimension embedding, so this stands in for requesting a smaller
+    output_dimension without another API call.
+    
+    Args:
+        vector: Full vector (list, NumPy array or BinData vector)
+        dimensions: Number of leading components to keep
+        
+    Returns:
+        Unit-length float32 NumPy array
+    """
+    prefix = decode_vector(vector)[:dimensions]
+    norm = float(np.linalg.norm(prefix))
+    return prefix / norm if norm else prefix
+
+
+def detect_format(value: Any) -> str:
+    """
+    Get the storage format of a stored vector.
+    
+    Args:
+        value: Stored value
+    
+    Returns:
+        "array", "float32" or "int8"
+    """
+    if isinstance(value, Binary) and value.subtype == VECTOR_SUBTYPE:
+        dtype = value.as_vector().dtype
+        for name, candidate in _DTYPES.items():
+            if candidate == dtype:
+                return name
+        raise ValueError(f"Unsupported BinData vector dtype: {dtype}")
+    return ARRAY
+
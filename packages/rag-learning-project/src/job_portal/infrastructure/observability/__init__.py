@@ -0,0 +1 @@
+"""Metrics and other runtime instrumentation."""
@@ -0,0 +1,341 @@
+"""In-process metrics registry with Prometheus text exposition."""
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Seconds; covers cache-speed calls up to multi-second API calls and waits
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """A named metric with optional labels; one child series per label combination."""
+    
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[LabelValues, Any] = {}
+    
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def _child(self, labels: Dict[str, Any]) -> Any:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = self._new_series()
+            return series
+    
+    def _new_series(self) -> Any:
+        raise NotImplementedError
+    
+    def _items(self) -> List[Tuple[LabelValues, Any]]:
+        with self._lock:
+            return list(self._series.items())
+    
+    def render(self) -> List[str]:
+        """Render this metric in Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+        for values, series in self._items():
+            lines.extend(self._render_series(values, series))
+        return lines
+
+
+class _Value:
+    """Mutable float guarded by its metric's lock."""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0.0
+
+
+class _ScalarMetric(_Metric):
+    """Metric holding one number per series."""
+    
+    def _new_series(self) -> _Value:
+        return _Value()
+    
+    def _render_series(self, values: LabelValues, series: _Value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.value)}"]
+    
+    def snapshot(self) -> Dict[LabelValues, float]:
+        return {values: series.value for values, series in self._items()}
+
+
+class Counter(_ScalarMetric):
+    """Monotonically increasing count."""
+    
+    kind = "counter"
+    
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """
+        Increase the counter.
+        
+        Args:
+            amount: Non-negative increment
+            **labels: Value for every label name
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        series = self._child(labels)
+        with self._lock:
+            series.value += amount
+    
+    def value(self, **labels: Any) -> float:
+        """Get the current count of one series (0 if never incremented)."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series.value if series else 0.0
+
+
+class Gauge(_ScalarMetric):
+    """Value that can go up and down, or is read from a callback at collection time."""
+    
+    kind = "gauge"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+    
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge."""
+        series = self._child(labels)
+        with self._lock:
+            series.value = value
+    
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add to the gauge (negative amounts decrease it)."""
+        series = self._child(labels)
+        with self._lock:
+            series.value += amount
+    
+    def _items(self) -> List[Tuple[LabelValues, Any]]:
+        if self.callback is None:
+            return super()._items()
+        items = []
+        for values, value in self.callback().items():
+            series = _Value()
+            series.value = value
+            items.append((values, series))
+        return items
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+    
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        bounds = sorted(float(bound) for bound in buckets)
+        if not bounds or bounds[-1] != math.inf:
+            bounds.append(math.inf)
+        self.buckets = tuple(bounds)
+    
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(len(self.buckets))
+    
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Record one observation.
+        
+        Args:
+            value: Observed value (e.g. seconds or tokens)
+            **labels: Value for every label name
+        """
+        series = self._child(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+    
+    def _render_series(self, values: LabelValues, series: _HistogramSeries) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, series.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+        lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+    
+    def snapshot(self) -> Dict[LabelValues, Dict[str, float]]:
+        return {
+            values: {"count": series.count, "sum": series.sum}
+            for values, series in self._items()
+        }
+
+
+class MetricsRegistry:
+    """
+    Collection of named metrics.
+    
+    Metrics are created on first request and shared afterwards, so every
+    component asking for the same name records into the same series.
+    """
+    
+    def __init__(self, namespace: str = "job_portal"):
+        """
+        Initialize metrics registry.
+        
+        Args:
+            namespace: Prefix added to every metric name
+        """
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> Any:
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {full_name} is already registered as a {metric.kind}")
+            return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+    
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None
+    ) -> Gauge:
+        """
+        Get or create a gauge.
+        
+        Args:
+            name: Metric name (without namespace)
+            documentation: Help text
+            labelnames: Label names
+            callback: Optional function returning {label values: value},
+                called at collection time instead of storing values
+        """
+        gauge = self._get_or_create(Gauge, name, documentation, labelnames)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read every metric in process.
+        
+        Returns:
+            {metric name: {label string: value}}; histogram values are
+            dicts with 'count' and 'sum'
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                ",".join(f"{name}={value}" for name, value in zip(metric.labelnames, values)): value
+                for values, value in metric.snapshot().items()
+            }
+            for metric in metrics
+        }
+    
+    def render_prometheus(self) -> str:
+        """
+        Export every metric in the Prometheus text exposition format.
+        
+        Returns:
+            Text suitable for a /metrics endpoint
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_default_registry: Optional[MetricsRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = MetricsRegistry()
+        return _default_registry
+
+
+def set_registry(registry: Optional[MetricsRegistry]) -> None:
+    """Replace the process-wide registry (None creates a fresh one on next use)."""
+    global _default_registry
+    with _default_lock:
+        _default_registry = registry
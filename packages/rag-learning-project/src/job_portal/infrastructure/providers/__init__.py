@@ -0,0 +1 @@
+"""Embedding providers (Voyage AI and local backends)."""
@@ -0,0 +1,64 @@
+"""Embedding provider interface shared by the embedding services."""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List
+
+from ...domain.vectors import Matrix
+
+
+class EmbeddingProvider(ABC):
+    """
+    Backend that turns contextualized inputs into embedding vectors.
+    
+    Providers only compute vectors; caching, batching, coalescing and rate
+    limiting stay in the embedding services, so every backend gets them for
+    free. Remote providers are paced by the shared rate limiter, local ones
+    are not.
+    """
+    
+    name: str = "provider"
+    model: str = ""
+    output_dimension: int = 1024
+    remote: bool = True
+    
+    @abstractmethod
+    def embed(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """
+        Embed contextualized inputs.
+        
+        Args:
+            inputs: Contextualized inputs, each a list of chunks
+            input_type: "query" or "document"
+        
+        Returns:
+            One float32 matrix of chunk embeddings per input, in input order
+            (nested lists are accepted too and converted by the services)
+        """
+    
+    async def aembed(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """Async version of ``embed`` (runs ``embed`` in a worker thread by default)."""
+        return await asyncio.to_thread(self.embed, inputs, input_type)
+    
+    def check_wait(
+        self,
+        inputs: List[List[str]],
+        input_type: str,
+        max_wait: float
+    ) -> None:
+        """
+        Check that a request wouldn't wait longer than max_wait for budget.
+        
+        Only providers whose requests are paced elsewhere (such as the
+        embedding sidecar) need to override this; the default never waits.
+        
+        Raises:
+            RateLimitTimeout: If the request would wait longer than max_wait
+        """
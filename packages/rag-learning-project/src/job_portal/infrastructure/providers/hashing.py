@@ -0,0 +1,194 @@
+"""CPU-only embedding provider based on hashed n-grams and sparse random projection."""
+import hashlib
+import re
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ...domain.vectors import Matrix
+from .base import EmbeddingProvider
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Odd 64-bit constant used to combine token hashes into bigram hashes
+_BIGRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _hash64(text: str) -> int:
+    """Stable 64-bit hash (Python's ``hash`` is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic local embedder for offline ingestion, benchmarks and
+    degraded-mode search.
+    
+    Each text is reduced to word unigrams, word bigrams and character
+    n-grams. Every feature is hashed and scattered into ``output_dimension``
+    buckets with random signs (a sparse random projection), then the vector
+    is L2-normalized, so cosine similarity tracks n-gram overlap. Chunks of
+    one input are mixed with the input's mean vector as a cheap stand-in for
+    contextualized embeddings. Vectors are not comparable with Voyage
+    vectors; the model name keeps their cache entries apart.
+    """
+    
+    name = "local"
+    remote = False
+    
+    def __init__(
+        self,
+        output_dimension: int = 1024,
+        char_ngram: int = 3,
+        char_weight: float = 0.5,
+        projections: int = 4,
+        context_weight: float = 0.25,
+        seed: int = 0,
+        max_cached_tokens: int = 100000
+    ):
+        """
+        Initialize hashing embedding provider.
+        
+        Args:
+            output_dimension: Embedding dimension (default: 1024)
+            char_ngram: Character n-gram length (0 disables character features)
+            char_weight: Weight of character n-grams relative to word features
+            projections: Buckets each feature is scattered into
+            context_weight: Weight of the input's mean vector mixed into each chunk
+            seed: Seed for the projection hashes (changing it changes every vector)
+            max_cached_tokens: Size of the per-token feature hash cache
+        """
+        self.output_dimension = output_dimension
+        self.char_ngram = char_ngram
+        self.char_weight = char_weight
+        self.context_weight = context_weight
+        self.max_cached_tokens = max_cached_tokens
+        self.model = f"local-hashing-v1-s{seed}"
+        
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 2 ** 63, size=projections, dtype=np.uint64) | np.uint64(1)
+        self._token_features: Dict[str, Tuple[int, np.ndarray]] = {}
+        self._lock = threading.Lock()
+    
+    def embed(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """
+        Embed contextualized inputs in one vectorized pass.
+        
+        Args:
+            inputs: Contextualized inputs, each a list of chunks
+            input_type: "query" or "document" (the embedding is symmetric)
+        
+        Returns:
+            One float32 matrix of chunk embeddings per input, in input order
+        """
+        texts = [chunk for chunks in inputs for chunk in chunks]
+        matrix = self.embed_texts(texts)
+        
+        results = []
+        start = 0
+        for chunks in inputs:
+            block = matrix[start:start + len(chunks)]
+            start += len(chunks)
+            if len(chunks) > 1 and self.context_weight:
+                block = self._normalize(block + self.context_weight * block.mean(axis=0))
+            results.append(block)
+        return results
+    
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed independent texts.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            float32 matrix of shape (len(texts), output_dimension) with unit rows
+            (all-zero rows for texts without any word characters)
+        """
+        rows, hashes, weights = [], [], []
+        for row, text in enumerate(texts):
+            features, feature_weights = self._features(text)
+            rows.append(np.full(len(features), row, dtype=np.int64))
+            hashes.append(features)
+            weights.append(feature_weights)
+        
+        dim = self.output_dimension
+        if not texts:
+            return np.zeros((0, dim), dtype=np.float32)
+        
+        rows = np.concatenate(rows)
+        hashes = np.concatenate(hashes)
+        weights = np.concatenate(weights)
+        
+        # Sparse random projection: each feature lands in a few buckets with a random sign
+        flat_index, values = [], []
+        for multiplier in self._multipliers:
+            mixed = hashes * multiplier
+            buckets = ((mixed >> np.uint64(32)) % np.uint64(dim)).astype(np.int64)
+            signs = np.where((mixed >> np.uint64(31)) & np.uint64(1), 1.0, -1.0)
+            flat_index.append(rows * dim + buckets)
+            values.append(signs * weights)
+        
+        matrix = np.bincount(
+            np.concatenate(flat_index),
+            weights=np.concatenate(values),
+            minlength=len(texts) * dim
+        ).reshape(len(texts), dim)
+        return self._normalize(matrix.astype(np.float32))
+    
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Hash a text's word unigrams, word bigrams and character n-grams."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        if not tokens:
+            return np.zeros(0, dtype=np.uint64), np.zeros(0)
+        
+        token_hashes = []
+        char_hashes = []
+        for token in tokens:
+            token_hash, token_chars = self._token(token)
+            token_hashes.append(token_hash)
+            char_hashes.append(token_chars)
+        
+        unigrams = np.array(token_hashes, dtype=np.uint64)
+        bigrams = (unigrams[:-1] * _BIGRAM_MULTIPLIER) ^ unigrams[1:]
+        chars = np.concatenate(char_hashes)
+        
+        features = np.concatenate([unigrams, bigrams, chars])
+        weights = np.concatenate([
+            np.ones(len(unigrams) + len(bigrams)),
+            np.full(len(chars), self.char_weight)
+        ])
+        return features, weights
+    
+    def _token(self, token: str) -> Tuple[int, np.ndarray]:
+        """Get a token's hash and character n-gram hashes, memoized per token."""
+        cached = self._token_features.get(token)
+        if cached is not None:
+            return cached
+        
+        n = self.char_ngram
+        if n:
+            padded = f"<{token}>"
+            grams = [padded[i:i + n] for i in range(max(1, len(padded) - n + 1))]
+            chars = np.array([_hash64("#" + gram) for gram in grams], dtype=np.uint64)
+        else:
+            chars = np.zeros(0, dtype=np.uint64)
+        entry = (_hash64(token), chars)
+        
+        with self._lock:
+            if len(self._token_features) >= self.max_cached_tokens:
+                self._token_features.clear()
+            self._token_features[token] = entry
+        return entry
+    
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """Scale rows to unit length, leaving all-zero rows untouched."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
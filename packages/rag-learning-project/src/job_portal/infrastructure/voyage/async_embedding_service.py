@@ -0,0 +1,353 @@
+"""Asyncio variant of the Voyage AI contextualized embedding service."""
+import asyncio
+import os
+import time
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import aiohttp
+import voyageai
+
+from ...domain.vectors import Matrix, Vector, as_matrix
+from ..providers.base import EmbeddingProvider
+
+from .batching import BatchPlanner, MAX_TOKENS_PER_REQUEST
+from .embedding_cache import EmbeddingCache, make_cache_key
+from .instrumentation import EmbeddingMetrics
+from .rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, get_rate_limiter
+from .resilience import ResiliencePolicy
+from .tokenization import TokenCounter, chunk_tokens_from_env, get_token_counter, make_text_splitter
+
+
+class AsyncVoyageEmbeddingService:
+    """
+    Non-blocking counterpart of ``VoyageEmbeddingService``.
+    
+    All requests share one pooled aiohttp session, and a semaphore caps how
+    many requests are in flight at once, so many searches can overlap on a
+    single event loop. Cancelling an awaiting task aborts its HTTP request
+    and frees its concurrency slot.
+    
+    Cache misses are deduplicated and packed into requests within the API
+    limits, and each request runs under the same ``ResiliencePolicy`` as
+    the sync service. Cache reads and writes run in a worker thread, so
+    the SQLite cache never blocks the event loop.
+    
+    A non-Voyage ``EmbeddingProvider`` can be passed in, in which case it is
+    used instead of the Voyage API.
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "voyage-context-3",
+        output_dimension: int = 1024,
+        cache: Optional[EmbeddingCache] = None,
+        max_concurrency: int = 4,
+        timeout: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        provider: Optional[EmbeddingProvider] = None,
+        metrics: Optional[EmbeddingMetrics] = None,
+        token_counter: Optional[TokenCounter] = None,
+        chunk_tokens: Optional[int] = None,
+        resilience: Optional[ResiliencePolicy] = None
+    ):
+        """
+        Initialize async Voyage AI embedding service.
+        
+        Args:
+            api_key: Voyage AI API key (defaults to VOYAGE_API_KEY env var)
+            model: Model name (default: voyage-context-3)
+            output_dimension: Embedding dimension (default: 1024)
+            cache: Optional embedding cache consulted before every API call
+            max_concurrency: Maximum number of concurrent API requests
+            timeout: Per-request timeout in seconds
+            rate_limiter: Limiter every API request waits on (defaults to the
+                process-wide limiter shared with the sync service)
+            provider: Embedding backend to use instead of Voyage AI (model and
+                output_dimension are then taken from the provider)
+            metrics: Metrics to record calls into (defaults to ones on the
+                process-wide registry, shared with the sync service)
+            token_counter: Counts tokens for chunking and rate limiting
+                (defaults to the process-wide counter)
+            chunk_tokens: Token budget per chunk when documents are split
+                (defaults to EMBEDDING_CHUNK_TOKENS, or 512)
+            resilience: Deadline, retry, hedging and circuit-breaker policy
+                for remote requests (defaults to one configured from env)
+        """
+        self.api_key = api_key or os.getenv("VOYAGE_API_KEY")
+        self.provider = provider
+        if provider is None and not self.api_key:
+            raise ValueError(
+                "Voyage API key not found. Set VOYAGE_API_KEY environment variable "
+                "or pass api_key parameter."
+            )
+        if provider is not None:
+            model = provider.model
+            output_dimension = provider.output_dimension
+        self.client = voyageai.AsyncClient(api_key=self.api_key, timeout=timeout) if provider is None else None
+        self.model = model
+        self.output_dimension = output_dimension
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.metrics = metrics or EmbeddingMetrics()
+        self.remote = provider is None or provider.remote
+        self.resilience = resilience or (ResiliencePolicy.from_env() if self.remote else None)
+        
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Same chunking as the synchronous service so cache keys line up
+        self.token_counter = token_counter or get_token_counter()
+        self.chunk_tokens = chunk_tokens or chunk_tokens_from_env()
+        self.text_splitter = make_text_splitter(self.token_counter, self.chunk_tokens)
+        
+        # Same request packing as the sync service
+        token_budget = self.rate_limiter.tpm if self.remote else None
+        self.batch_planner = BatchPlanner(
+            max_tokens=int(min(MAX_TOKENS_PER_REQUEST, token_budget or MAX_TOKENS_PER_REQUEST)),
+            count_tokens=self.token_counter
+        )
+    
+    async def embed_query(self, query: str) -> Vector:
+        """
+        Generate embedding for a search query.
+        
+        Args:
+            query: Search query text
+        
+        Returns:
+            Query embedding vector
+        """
+        return (await self.embed_inputs([[query]], input_type="query"))[0][0]
+    
+    async def embed_document(
+        self,
+        document: str,
+        auto_chunk: bool = True
+    ) -> Union[Vector, Dict[str, Any]]:
+        """
+        Generate contextualized embedding for a document.
+        
+        Args:
+            document: Document text (job posting or candidate profile)
+            auto_chunk: If True, automatically chunk long documents
+        
+        Returns:
+            If the document fits in one chunk: Single embedding vector
+            Otherwise: Dict with 'embeddings', 'chunks' and 'num_chunks' keys
+        """
+        if auto_chunk:
+            chunks = self.text_splitter.split_text(document)
+            if len(chunks) > 1:
+                embeddings = (await self.embed_inputs([chunks], input_type="document"))[0]
+                return {
+                    "embeddings": embeddings,
+                    "chunks": chunks,
+                    "num_chunks": len(chunks)
+                }
+        return (await self.embed_inputs([[document]], input_type="document"))[0][0]
+    
+    async def embed_documents_batch(
+        self,
+        documents: List[str],
+        auto_chunk: bool = False
+    ) -> List[Vector]:
+        """
+        Generate embeddings for multiple documents in batch.
+        
+        Args:
+            documents: List of document texts
+            auto_chunk: If True, chunk each document and average its chunk embeddings
+        
+        Returns:
+            List of embedding vectors (one per document)
+        """
+        if auto_chunk:
+            chunked_docs = [self.text_splitter.split_text(doc) for doc in documents]
+        else:
+            chunked_docs = [[doc] for doc in documents]
+        
+        doc_embeddings = await self.embed_inputs(chunked_docs, input_type="document")
+        
+        return [
+            chunk_embeddings[0] if len(chunk_embeddings) == 1
+            else chunk_embeddings.mean(axis=0, dtype=chunk_embeddings.dtype)
+            for chunk_embeddings in doc_embeddings
+        ]
+    
+    async def embed_inputs(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """
+        Generate contextualized embeddings, serving repeated inputs from the cache.
+        
+        Args:
+            inputs: Contextualized inputs, each a list of chunks
+            input_type: "query" or "document"
+        
+        Returns:
+            One float32 matrix of chunk embeddings per input, in input order
+        """
+        keys, results = await asyncio.to_thread(self._cache_lookup, inputs, input_type)
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        if self.cache is not None:
+            self.metrics.observe_cache(input_type, hits=len(inputs) - len(missing), misses=len(missing))
+        
+        if missing:
+            # Identical inputs in one call are sent once
+            unique: Dict[Tuple[str, ...], int] = {}
+            to_fetch = []
+            for i in missing:
+                if tuple(inputs[i]) not in unique:
+                    unique[tuple(inputs[i])] = len(to_fetch)
+                    to_fetch.append(inputs[i])
+            
+            fetched = await self._fetch_planned(to_fetch, input_type)
+            
+            stored = {}
+            for i in missing:
+                position = unique[tuple(inputs[i])]
+                results[i] = fetched[position]
+                stored.setdefault(position, keys[i])
+            if self.cache is not None:
+                await asyncio.to_thread(
+                    self._cache_store, [(key, fetched[position]) for position, key in stored.items()]
+                )
+        
+        return results
+    
+    def _cache_lookup(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> Tuple[List[Optional[str]], List[Optional[Matrix]]]:
+        """Read cached embeddings (runs in a worker thread)."""
+        if self.cache is None:
+            return [None] * len(inputs), [None] * len(inputs)
+        keys = [make_cache_key(self.model, self.output_dimension, input_type, chunks) for chunks in inputs]
+        return keys, [self.cache.get(key) for key in keys]
+    
+    def _cache_store(self, entries: List[Tuple[str, Matrix]]) -> None:
+        """Write fetched embeddings to the cache (runs in a worker thread)."""
+        for key, embeddings in entries:
+            self.cache.put(key, embeddings)
+    
+    async def _fetch_planned(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """Split inputs into limit-sized requests and send them concurrently."""
+        batches = self.batch_planner.plan(inputs)
+        if len(batches) <= 1:
+            return await self._request(inputs, input_type)
+        
+        # The semaphore bounds how many of these are in flight
+        fetched = await asyncio.gather(
+            *(self._request([inputs[i] for i in batch], input_type) for batch in batches)
+        )
+        results: List[Optional[Matrix]] = [None] * len(inputs)
+        for batch, batch_embeddings in zip(batches, fetched):
+            for i, embeddings in zip(batch, batch_embeddings):
+                results[i] = embeddings
+        return results
+    
+    async def _request(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """Send one request, admitted by the rate limiter and run under the resilience policy."""
+        tokens = sum(self.token_counter.count(chunk) for chunks in inputs for chunk in chunks)
+        if not self.remote:
+            return await self._attempt(inputs, input_type, tokens)
+        
+        # Wait for budget before taking a concurrency slot
+        priority = INTERACTIVE if input_type == "query" else BACKGROUND
+        
+        async def admit(timeout: Optional[float] = None) -> None:
+            waited = await self.rate_limiter.acquire_async(tokens=tokens, priority=priority, timeout=timeout)
+            self.metrics.observe_rate_limit_wait(priority, waited)
+        
+        if self.resilience is None:
+            await admit()
+            return await self._attempt(inputs, input_type, tokens)
+        # Every attempt, retry and hedge is admitted by the rate limiter
+        return await self.resilience.call_async(
+            lambda: self._attempt(inputs, input_type, tokens),
+            admit,
+            input_type,
+            on_retry=lambda error: self.metrics.observe_retry(self._provider_name, input_type),
+            on_hedge=lambda: self.metrics.observe_hedge(self._provider_name, input_type)
+        )
+    
+    @property
+    def _provider_name(self) -> str:
+        return self.provider.name if self.provider is not None else "voyage"
+    
+    async def _attempt(
+        self,
+        inputs: List[List[str]],
+        input_type: str,
+        tokens: int
+    ) -> List[Matrix]:
+        """Make one call and record it."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            embeddings = await self._send(inputs, input_type)
+            ok = True
+            return embeddings
+        finally:
+            self.metrics.observe_request(
+                self._provider_name, input_type, time.perf_counter() - start,
+                inputs=len(inputs), tokens=tokens, ok=ok
+            )
+    
+    async def _send(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """Call the provider, or Voyage AI over the pooled session, in a concurrency slot."""
+        if self.provider is not None:
+            async with self._semaphore:
+                return [as_matrix(embeddings) for embeddings in await self.provider.aembed(inputs, input_type)]
+        
+        async with self._semaphore:
+            token = voyageai.aiosession.set(self._get_session())
+            try:
+                result = await self.client.contextualized_embed(
+                    inputs=inputs,
+                    model=self.model,
+                    input_type=input_type,
+                    output_dimension=self.output_dimension
+                )
+            finally:
+                voyageai.aiosession.reset(token)
+        return [as_matrix(doc_result.embeddings) for doc_result in result.results]
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get or create the pooled HTTP session (must run inside the event loop)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def aclose(self):
+        """Close the pooled HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.aclose()
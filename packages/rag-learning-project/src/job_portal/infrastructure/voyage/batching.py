@@ -0,0 +1,102 @@
+"""Request planning that keeps contextualized_embed calls within API limits."""
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+
+
+# Per-request limits of the Voyage contextualized embeddings endpoint
+MAX_INPUTS_PER_REQUEST = 1000
+MAX_CHUNKS_PER_REQUEST = 16000
+MAX_TOKENS_PER_REQUEST = 120000
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text.
+    
+    Args:
+        text: Input text
+    
+    Returns:
+        Estimated number of tokens (about 4 characters per token)
+    """
+    return max(1, len(text) // 4)
+
+
+class BatchPlanner:
+    """
+    Packs contextualized inputs into as few requests as the API limits allow.
+    
+    Inputs are packed greedily in order, so a request is closed only when the
+    next input would push it past the input, chunk or token limit. An input
+    that exceeds a limit on its own is sent alone and left for the API to
+    reject.
+    """
+    
+    def __init__(
+        self,
+        max_inputs: int = MAX_INPUTS_PER_REQUEST,
+        max_chunks: int = MAX_CHUNKS_PER_REQUEST,
+        max_tokens: int = MAX_TOKENS_PER_REQUEST,
+        count_tokens: Callable[[str], int] = estimate_tokens
+    ):
+        """
+        Initialize batch planner.
+        
+        Args:
+            max_inputs: Maximum inputs (documents) per request
+            max_chunks: Maximum chunks across all inputs of a request
+            max_tokens: Maximum tokens across all inputs of a request
+            count_tokens: Function returning the token count of a chunk
+        """
+        self.max_inputs = max_inputs
+        self.max_chunks = max_chunks
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+    
+    def plan(self, inputs: Sequence[List[str]]) -> List[List[int]]:
+        """
+        Split inputs into request-sized batches.
+        
+        Args:
+            inputs: Contextualized inputs, each a list of chunks
+        
+        Returns:
+            Batches of input positions, in input order
+        """
+        return [
+            [position for position, _ in batch]
+            for batch in self.pack(enumerate(inputs))
+        ]
+    
+    def pack(self, items: Iterable[Tuple[Any, List[str]]]) -> Iterator[List[Tuple[Any, List[str]]]]:
+        """
+        Lazily group (item, chunks) pairs into request-sized batches.
+        
+        Only the batch being filled is held in memory, so this works on
+        unbounded iterables.
+        
+        Args:
+            items: Pairs of an arbitrary item and its chunks
+        
+        Yields:
+            Lists of (item, chunks) pairs that fit in one request
+        """
+        batch: List[Tuple[Any, List[str]]] = []
+        chunk_count = 0
+        token_count = 0
+        
+        for item, chunks in items:
+            tokens = sum(self.count_tokens(chunk) for chunk in chunks)
+            if batch and (
+                len(batch) + 1 > self.max_inputs
+                or chunk_count + len(chunks) > self.max_chunks
+                or token_count + tokens > self.max_tokens
+            ):
+                yield batch
+                batch, chunk_count, token_count = [], 0, 0
+            
+            batch.append((item, chunks))
+            chunk_count += len(chunks)
+            token_count += tokens
+        
+        if batch:
+            yield batch
@@ -0,0 +1,160 @@
+"""Micro-batching coalescer for concurrent embedding requests."""
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ...domain.vectors import Matrix
+
+
+EmbedFn = Callable[[List[List[str]], str], List[Matrix]]
+
+
+class _Batch:
+    """Requests of one input type collected during a coalescing window."""
+
+    __slots__ = ("input_type", "futures")
+
+    def __init__(self, input_type: str):
+        self.input_type = input_type
+        self.futures: Dict[Tuple[str, Tuple[str, ...]], Future] = {}
+
+
+class RequestCoalescer:
+    """
+    Merges embedding requests arriving within a short window into one API call.
+
+    The first caller for an input type opens a batch and waits ``window``
+    seconds while other threads add their inputs to it, then sends a single
+    multi-input request and routes each result back to its caller. Requests
+    for an input that is already queued or in flight share the pending
+    result instead of being sent again.
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        window: float = 0.025,
+        max_batch_size: int = 128
+    ):
+        """
+        Initialize request coalescer.
+
+        Args:
+            embed_fn: Function sending contextualized inputs of one input type
+                to the API and returning their chunk embeddings in order
+            window: Seconds to wait for more requests before sending a batch
+            max_batch_size: Send a batch as soon as it holds this many inputs
+        """
+        self.embed_fn = embed_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self._lock = threading.Lock()
+        self._open: Dict[str, _Batch] = {}
+        self._inflight: Dict[Tuple[str, Tuple[str, ...]], Future] = {}
+
+        self.requests = 0
+        self.deduplicated = 0
+        self.batches_sent = 0
+        self.inputs_sent = 0
+
+    def embed(self, inputs: List[List[str]], input_type: str) -> List[Matrix]:
+        """
+        Embed inputs, sharing API calls with concurrent callers.
+
+        Args:
+            inputs: Contextualized inputs, each a list of chunks
+            input_type: "query" or "document"
+
+        Returns:
+            One float32 matrix of chunk embeddings per input, in input order
+        """
+        futures = []
+        led = None
+        for chunks in inputs:
+            future, batch, full = self._enqueue(chunks, input_type)
+            futures.append(future)
+            if full:
+                self._send(batch)
+            elif batch is not None:
+                led = batch
+
+        if led is not None:
+            time.sleep(self.window)
+            with self._lock:
+                ready = self._open.get(input_type) is led
+                if ready:
+                    del self._open[input_type]
+            if ready:
+                self._send(led)
+
+        return [future.result() for future in futures]
+
+    def _enqueue(
+        self,
+        chunks: List[str],
+        input_type: str
+    ) -> Tuple[Future, Optional[_Batch], bool]:
+        """
+        Queue one input.
+
+        Returns:
+            The input's future, the batch if this call opened or filled it
+            (None otherwise), and whether that batch is full and must be sent now
+        """
+        key = (input_type, tuple(chunks))
+        with self._lock:
+            self.requests += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future, None, False
+
+            future = Future()
+            self._inflight[key] = future
+            batch = self._open.get(input_type)
+            leader = batch is None
+            if leader:
+                batch = self._open[input_type] = _Batch(input_type)
+            batch.futures[key] = future
+            if len(batch.futures) >= self.max_batch_size:
+                del self._open[input_type]
+                return future, batch, True
+            return future, (batch if leader else None), False
+
+    def _send(self, batch: _Batch) -> None:
+        """Send a closed batch and resolve its futures."""
+        keys = list(batch.futures)
+        try:
+            results = self.embed_fn([list(key[1]) for key in keys], batch.input_type)
+        except Exception as exc:
+            for key in keys:
+                batch.futures[key].set_exception(exc)
+        else:
+            for key, embeddings in zip(keys, results):
+                batch.futures[key].set_result(embeddings)
+        finally:
+            with self._lock:
+                self.batches_sent += 1
+                self.inputs_sent += len(keys)
+                for key in keys:
+                    self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dict with request, deduplication and batch counts
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "deduplicated": self.deduplicated,
+                "batches_sent": self.batches_sent,
+                "inputs_sent": self.inputs_sent,
+                "avg_batch_size": (
+                    self.inputs_sent / self.batches_sent if self.batches_sent else 0.0
+                ),
+            }
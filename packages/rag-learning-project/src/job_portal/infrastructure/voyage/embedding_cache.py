@@ -0,0 +1,269 @@
+"""Content-addressed embedding cache with an in-memory LRU over SQLite."""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_CACHE_PATH = Path(".cache") / "embeddings.sqlite3"
+
+
+def make_cache_key(
+    model: str,
+    output_dimension: int,
+    input_type: str,
+    texts: Sequence[str]
+) -> str:
+    """
+    Build a stable cache key for one contextualized input.
+
+    Args:
+        model: Embedding model name
+        output_dimension: Requested embedding dimension
+        input_type: Voyage input type ("query" or "document")
+        texts: Chunks making up the contextualized input (a single text for
+            queries and unchunked documents)
+
+    Returns:
+        Hex SHA-256 digest identifying the input
+    """
+    digest = hashlib.sha256()
+    for part in (model, str(output_dimension), input_type or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for embedding vectors.
+
+    Entries are float32 matrices (one row per chunk) keyed by
+    ``make_cache_key``. Lookups hit an in-memory LRU first and fall back to
+    an SQLite file, so repeated texts survive process restarts without
+    another Voyage API call. Both tiers evict by size.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            path: SQLite file for the disk tier (None keeps the cache in memory only)
+            max_memory_bytes: Size budget for the in-memory LRU tier
+            max_disk_bytes: Size budget for the SQLite tier
+        """
+        self.path = str(path) if path else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self._lock = threading.RLock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingCache":
+        """
+        Create a cache configured from environment variables.
+
+        ``EMBEDDING_CACHE_PATH`` sets the SQLite file (``none`` disables the
+        disk tier) and ``EMBEDDING_CACHE_MAX_MB`` sets the disk budget.
+        """
+        path = os.getenv("EMBEDDING_CACHE_PATH", str(DEFAULT_CACHE_PATH))
+        if path.lower() in ("", "none", "off"):
+            path = None
+        max_mb = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))
+        return cls(path=path, max_disk_bytes=int(max_mb * 1024 * 1024))
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier on first use."""
+        if self.path is None:
+            return None
+        if self._disk is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._disk = sqlite3.connect(self.path, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, rows INTEGER, dim INTEGER, "
+                "data BLOB, size INTEGER, last_access REAL)"
+            )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access "
+                "ON embeddings(last_access)"
+            )
+            self._disk.commit()
+            row = self._disk.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()
+            self._disk_bytes = row[0]
+        return self._disk
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Look up cached vectors.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            float32 matrix of shape (num_chunks, dimension), or None on a miss
+        """
+        with self._lock:
+            vectors = self._memory.get(key)
+            if vectors is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vectors
+
+            disk = self._connect()
+            if disk is not None:
+                row = disk.execute(
+                    "SELECT rows, dim, data FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    rows, dim, data = row
+                    vectors = np.frombuffer(data, dtype=np.float32).reshape(rows, dim)
+                    disk.execute(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        (time.time(), key)
+                    )
+                    disk.commit()
+                    self._remember(key, vectors)
+                    self.disk_hits += 1
+                    return vectors
+
+            self.misses += 1
+            return None
+
+    def contains(self, key: str) -> bool:
+        """
+        Check whether a key is cached, without counting a hit or miss.
+        
+        Args:
+            key: Cache key from ``make_cache_key``
+        
+        Returns:
+            True if either tier holds the key
+        """
+        with self._lock:
+            if key in self._memory:
+                return True
+            disk = self._connect()
+            if disk is None:
+                return False
+            return disk.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone() is not None
+    
+    def put(self, key: str, vectors: Any) -> None:
+        """
+        Store vectors under a key in both tiers.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+            vectors: One vector or a list of vectors (one per chunk)
+        """
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        matrix.setflags(write=False)
+        with self._lock:
+            self._remember(key, matrix)
+
+            disk = self._connect()
+            if disk is None:
+                return
+            previous = disk.execute(
+                "SELECT size FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            disk.execute(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)",
+                (key, matrix.shape[0], matrix.shape[1], matrix.tobytes(),
+                 matrix.nbytes, time.time())
+            )
+            self._disk_bytes += matrix.nbytes - (previous[0] if previous else 0)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk(disk)
+            disk.commit()
+
+    def _remember(self, key: str, matrix: np.ndarray) -> None:
+        """Insert into the memory tier, evicting least recently used entries."""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        self._memory[key] = matrix
+        self._memory_bytes += matrix.nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def _evict_disk(self, disk: sqlite3.Connection) -> None:
+        """Drop least recently used rows until the disk tier is at 90% of budget."""
+        target = int(self.max_disk_bytes * 0.9)
+        rows = disk.execute(
+            "SELECT key, size FROM embeddings ORDER BY last_access ASC"
+        )
+        stale = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            stale.append((key,))
+            self._disk_bytes -= size
+        disk.executemany("DELETE FROM embeddings WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache hit/miss counters and tier sizes.
+
+        Returns:
+            Dict with hit, miss, eviction counts, hit ratio and byte sizes
+        """
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            disk = self._connect()
+            if disk is not None:
+                disk.execute("DELETE FROM embeddings")
+                disk.commit()
+                self._disk_bytes = 0
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
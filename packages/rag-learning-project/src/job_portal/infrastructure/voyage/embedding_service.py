@@ -1,8 +1,21 @@
 """Voyage AI Contextualized Embedding Service for Job Portal."""
 import os
-from typing import List, Dict, Any, Optional, Union
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 import voyageai
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from ...domain.vectors import Matrix, Vector, as_matrix
+from ..providers.base import EmbeddingProvider
+
+from .batching import BatchPlanner, MAX_TOKENS_PER_REQUEST
+from .coalescer import RequestCoalescer
+from .embedding_cache import EmbeddingCache, make_cache_key
+from .instrumentation import EmbeddingMetrics
+from .provider import VoyageProvider
+from .rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, RateLimitTimeout, get_rate_limiter
+from .resilience import ResiliencePolicy
+from .tokenization import TokenCounter, chunk_tokens_from_env, get_token_counter, make_text_splitter
 
 
 class VoyageEmbeddingService:
@@ -12,13 +25,29 @@ class VoyageEmbeddingService:
     Uses voyage-context-3 model which provides context-aware embeddings
     that maintain document-level context across chunks, improving retrieval
     accuracy for job postings and candidate profiles.
+    
+    Vectors come from an ``EmbeddingProvider``: Voyage AI by default, or
+    any other backend (such as the local hashing provider) passed in.
+    
+    Embeddings are returned as float32 NumPy arrays (see
+    ``job_portal.domain.vectors``). Arrays served from the cache are shared
+    and read-only; copy one before modifying it in place.
     """
     
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: str = "voyage-context-3",
-        output_dimension: int = 1024
+        output_dimension: int = 1024,
+        cache: Optional[EmbeddingCache] = None,
+        coalesce_window: Optional[float] = None,
+        max_parallel_requests: int = 2,
+        rate_limiter: Optional[RateLimiter] = None,
+        provider: Optional[EmbeddingProvider] = None,
+        metrics: Optional[EmbeddingMetrics] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+        token_counter: Optional[TokenCounter] = None,
+        chunk_tokens: Optional[int] = None
     ):
         """
         Initialize Voyage AI embedding service.
@@ -27,48 +56,117 @@ class VoyageEmbeddingService:
             api_key: Voyage AI API key (defaults to VOYAGE_API_KEY env var)
             model: Model name (default: voyage-context-3)
             output_dimension: Embedding dimension (default: 1024)
+            cache: Optional embedding cache consulted before every API call
+            coalesce_window: If set, concurrent requests arriving within this
+                many seconds are merged into one API call
+            max_parallel_requests: Maximum requests in flight when a call is
+                split into several batches
+            rate_limiter: Limiter every API request waits on (defaults to the
+                process-wide limiter)
+            provider: Embedding backend to use instead of Voyage AI (model and
+                output_dimension are then taken from the provider)
+            metrics: Metrics to record calls into (defaults to ones on the
+                process-wide registry)
+            resilience: Deadline, retry, hedging and circuit-breaker policy
+                for remote providers (defaults to one configured from the
+                environment; local providers are called directly)
+            token_counter: Counts tokens for chunking, request packing and
+                rate limiting (defaults to the process-wide counter)
+            chunk_tokens: Token budget per chunk when documents are split
+                (defaults to EMBEDDING_CHUNK_TOKENS, or 512)
         """
         self.api_key = api_key or os.getenv("VOYAGE_API_KEY")
-        if not self.api_key:
+        if provider is None and not self.api_key:
             raise ValueError(
                 "Voyage API key not found. Set VOYAGE_API_KEY environment variable "
                 "or pass api_key parameter."
             )
+        if provider is None:
+            self.client = voyageai.Client(api_key=self.api_key)
+            provider = VoyageProvider(self.client, model=model, output_dimension=output_dimension)
+        else:
+            self.client = getattr(provider, "client", None)
         
-        self.client = voyageai.Client(api_key=self.api_key)
-        self.model = model
-        self.output_dimension = output_dimension
-        
-        # Text splitter for chunking long documents
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            separators=["\n\n", "\n", ". ", " "],
-            chunk_size=1000,
-            chunk_overlap=0  # Voyage recommends no overlap for contextualized embeddings
+        self.provider = provider
+        self.model = provider.model
+        self.output_dimension = provider.output_dimension
+        self.cache = cache
+        self.max_parallel_requests = max_parallel_requests
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.metrics = metrics or EmbeddingMetrics()
+        self.resilience = resilience or (ResiliencePolicy.from_env() if provider.remote else None)
+        self.token_counter = token_counter or get_token_counter()
+        # A single request can never use more tokens than one minute's budget
+        token_budget = self.rate_limiter.tpm if provider.remote else None
+        self.batch_planner = BatchPlanner(
+            max_tokens=int(min(MAX_TOKENS_PER_REQUEST, token_budget or MAX_TOKENS_PER_REQUEST)),
+            count_tokens=self.token_counter
         )
+        self.coalescer = (
+            RequestCoalescer(self._fetch_planned, window=coalesce_window)
+            if coalesce_window is not None else None
+        )
+        
+        # Text splitter packing long documents into token-budget chunks
+        self.chunk_tokens = chunk_tokens or chunk_tokens_from_env()
+        self.text_splitter = make_text_splitter(self.token_counter, self.chunk_tokens)
     
-    def embed_query(self, query: str) -> List[float]:
+    def embed_query(self, query: str, max_wait: Optional[float] = None) -> Vector:
         """
         Generate embedding for a search query.
         
         Args:
             query: Search query text
+            max_wait: If set, fail instead of waiting longer than this many
+                seconds for rate-limit budget (cached queries never wait)
             
         Returns:
             Query embedding vector
+        
+        Raises:
+            RateLimitTimeout: If the query would wait longer than max_wait
         """
-        result = self.client.contextualized_embed(
-            inputs=[[query]],
-            model=self.model,
-            input_type="query",
-            output_dimension=self.output_dimension
-        )
-        return result.results[0].embeddings[0]
+        if max_wait is not None:
+            self._check_wait([[query]], "query", max_wait)
+        return self.embed_inputs([[query]], input_type="query")[0][0]
+    
+    def _check_wait(self, inputs: List[List[str]], input_type: str, max_wait: float) -> None:
+        """Raise RateLimitTimeout if uncached inputs would wait longer than max_wait."""
+        if not self.provider.remote:
+            # Providers paced elsewhere (the sidecar) check with their own limiter
+            self.provider.check_wait(inputs, input_type, max_wait)
+            return
+        priority = INTERACTIVE if input_type == "query" else BACKGROUND
+        wait = self.rate_limiter.estimate_wait(self._count_tokens(inputs), priority)
+        if wait <= max_wait:
+            return
+        if all(self.cached(inputs, input_type)):
+            return
+        raise RateLimitTimeout(f"Embedding request would wait {wait:.1f}s for rate-limit budget")
+    
+    def cached(self, inputs: List[List[str]], input_type: str) -> List[bool]:
+        """
+        Check which inputs are already in the cache.
+        
+        Args:
+            inputs: Contextualized inputs, each a list of chunks
+            input_type: "query" or "document"
+        
+        Returns:
+            One flag per input (all False without a cache)
+        """
+        if self.cache is None:
+            return [False] * len(inputs)
+        return [
+            self.cache.contains(make_cache_key(self.model, self.output_dimension, input_type, chunks))
+            for chunks in inputs
+        ]
     
     def embed_document(
         self,
         document: str,
         auto_chunk: bool = True
-    ) -> Union[List[float], Dict[str, Any]]:
+    ) -> Union[Vector, Dict[str, Any]]:
         """
         Generate contextualized embedding for a document.
         
@@ -78,48 +176,32 @@ class VoyageEmbeddingService:
             
         Returns:
             If auto_chunk=False: Single embedding vector
-            If auto_chunk=True: Dict with 'embeddings' and 'chunks' keys
+            If auto_chunk=True: Dict with 'embeddings' (one row per chunk)
+            and 'chunks' keys
         """
         if auto_chunk:
             chunks = self.text_splitter.split_text(document)
             
             # If document is short enough, don't chunk
             if len(chunks) == 1:
-                result = self.client.contextualized_embed(
-                    inputs=[[document]],
-                    model=self.model,
-                    input_type="document",
-                    output_dimension=self.output_dimension
-                )
-                return result.results[0].embeddings[0]
+                return self.embed_inputs([[document]], input_type="document")[0][0]
             
             # Generate contextualized embeddings for chunks
-            result = self.client.contextualized_embed(
-                inputs=[chunks],
-                model=self.model,
-                input_type="document",
-                output_dimension=self.output_dimension
-            )
+            embeddings = self.embed_inputs([chunks], input_type="document")[0]
             
             return {
-                "embeddings": result.results[0].embeddings,
+                "embeddings": embeddings,
                 "chunks": chunks,
                 "num_chunks": len(chunks)
             }
         else:
-            result = self.client.contextualized_embed(
-                inputs=[[document]],
-                model=self.model,
-                input_type="document",
-                output_dimension=self.output_dimension
-            )
-            return result.results[0].embeddings[0]
+            return self.embed_inputs([[document]], input_type="document")[0][0]
     
     def embed_documents_batch(
         self,
         documents: List[str],
         auto_chunk: bool = False
-    ) -> List[List[float]]:
+    ) -> List[Vector]:
         """
         Generate embeddings for multiple documents in batch.
         
@@ -142,23 +224,206 @@ class VoyageEmbeddingService:
             # Treat each document as a single chunk
             chunked_docs = [[doc] for doc in documents]
         
-        # Generate contextualized embeddings
-        result = self.client.contextualized_embed(
-            inputs=chunked_docs,
-            model=self.model,
-            input_type="document",
-            output_dimension=self.output_dimension
-        )
+        # Generate contextualized embeddings (planned into limit-sized requests)
+        doc_embeddings = self.embed_inputs(chunked_docs, input_type="document")
         
         # Return first embedding from each document (or average if multiple chunks)
-        embeddings = []
-        for doc_result in result.results:
-            if len(doc_result.embeddings) == 1:
-                embeddings.append(doc_result.embeddings[0])
+        return [self._document_vector(chunk_embeddings) for chunk_embeddings in doc_embeddings]
+    
+    def embed_stream(
+        self,
+        documents: Iterable[Any],
+        text_fn: Optional[Callable[[Any], str]] = None,
+        auto_chunk: bool = False,
+        max_parallel: Optional[int] = None
+    ) -> Iterator[Tuple[Any, Vector]]:
+        """
+        Embed an arbitrarily long stream of documents in constant memory.
+        
+        Documents are read lazily, packed into requests that fit the API
+        limits, and embedded with at most ``max_parallel`` requests in
+        flight. Pairs are yielded as each request finishes, so output order
+        follows completion order rather than input order.
+        
+        Args:
+            documents: Iterable of documents (strings, or any object with text_fn)
+            text_fn: Function extracting the text to embed from a document
+            auto_chunk: If True, chunk each document and average its chunk embeddings
+            max_parallel: Maximum requests in flight (defaults to max_parallel_requests)
+            
+        Yields:
+            (document, embedding) pairs
+        """
+        text_fn = text_fn or (lambda doc: doc)
+        max_parallel = max_parallel or self.max_parallel_requests
+        
+        def chunked(docs):
+            for doc in docs:
+                text = text_fn(doc)
+                yield doc, (self.text_splitter.split_text(text) if auto_chunk else [text])
+        
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+            pending = set()
+            for batch in self.batch_planner.pack(chunked(documents)):
+                if len(pending) >= max_parallel:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+                pending.add(executor.submit(self._embed_stream_batch, batch))
+            
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+    
+    def _embed_stream_batch(
+        self,
+        batch: List[Tuple[Any, List[str]]]
+    ) -> List[Tuple[Any, Vector]]:
+        """Embed one planned batch of (document, chunks) pairs."""
+        doc_embeddings = self.embed_inputs([chunks for _, chunks in batch], input_type="document")
+        return [
+            (doc, self._document_vector(chunk_embeddings))
+            for (doc, _), chunk_embeddings in zip(batch, doc_embeddings)
+        ]
+    
+    @staticmethod
+    def _document_vector(chunk_embeddings: Matrix) -> Vector:
+        """Collapse a document's chunk embeddings into one vector."""
+        if len(chunk_embeddings) == 1:
+            return chunk_embeddings[0]
+        # Average embeddings if document has multiple chunks
+        return chunk_embeddings.mean(axis=0, dtype=chunk_embeddings.dtype)
+    
+    def embed_inputs(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """
+        Generate contextualized embeddings, serving repeated inputs from the cache.
+        
+        Every public embedding method funnels through here, so this is the
+        single place that talks to the embedding provider.
+        
+        Args:
+            inputs: Contextualized inputs, each a list of chunks
+            input_type: "query" or "document"
+            
+        Returns:
+            One float32 matrix of chunk embeddings per input, in input order
+        """
+        results: List[Optional[Matrix]] = [None] * len(inputs)
+        keys: List[Optional[str]] = [None] * len(inputs)
+        missing = []
+        
+        for i, chunks in enumerate(inputs):
+            if self.cache is not None:
+                keys[i] = make_cache_key(self.model, self.output_dimension, input_type, chunks)
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            missing.append(i)
+        
+        if self.cache is not None:
+            self.metrics.observe_cache(input_type, hits=len(inputs) - len(missing), misses=len(missing))
+        
+        if missing:
+            # Identical inputs in one call are sent once
+            unique: Dict[Tuple[str, ...], int] = {}
+            to_fetch = []
+            for i in missing:
+                if tuple(inputs[i]) not in unique:
+                    unique[tuple(inputs[i])] = len(to_fetch)
+                    to_fetch.append(inputs[i])
+            
+            if self.coalescer is not None:
+                fetched = self.coalescer.embed(to_fetch, input_type)
             else:
-                # Average embeddings if document has multiple chunks
-                import numpy as np
-                avg_embedding = np.mean(doc_result.embeddings, axis=0).tolist()
-                embeddings.append(avg_embedding)
+                fetched = self._fetch_planned(to_fetch, input_type)
+            
+            stored = set()
+            for i in missing:
+                position = unique[tuple(inputs[i])]
+                results[i] = fetched[position]
+                if self.cache is not None and position not in stored:
+                    self.cache.put(keys[i], fetched[position])
+                    stored.add(position)
+        
+        return results
+    
+    def _fetch_planned(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """Split inputs into limit-sized requests and send them with bounded parallelism."""
+        batches = self.batch_planner.plan(inputs)
+        if len(batches) <= 1:
+            return self._request(inputs, input_type)
+        
+        results: List[Optional[Matrix]] = [None] * len(inputs)
+        workers = min(len(batches), self.max_parallel_requests)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fetched = executor.map(
+                lambda batch: self._request([inputs[i] for i in batch], input_type),
+                batches
+            )
+            for batch, batch_embeddings in zip(batches, fetched):
+                for i, embeddings in zip(batch, batch_embeddings):
+                    results[i] = embeddings
+        return results
+    
+    def _request(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """Send one request to the embedding provider."""
+        tokens = self._count_tokens(inputs)
+        if not self.provider.remote:
+            return self._send(inputs, input_type, tokens)
         
-        return embeddings
+        # Queries come from interactive searches; documents from ingestion
+        priority = INTERACTIVE if input_type == "query" else BACKGROUND
+        
+        def admit(timeout: Optional[float] = None) -> None:
+            waited = self.rate_limiter.acquire(tokens=tokens, priority=priority, timeout=timeout)
+            self.metrics.observe_rate_limit_wait(priority, waited)
+        
+        if self.resilience is None:
+            admit()
+            return self._send(inputs, input_type, tokens)
+        # Every attempt, retry and hedge is admitted by the rate limiter
+        return self.resilience.call(
+            lambda: self._send(inputs, input_type, tokens),
+            admit,
+            input_type,
+            on_retry=lambda error: self.metrics.observe_retry(self.provider.name, input_type),
+            on_hedge=lambda: self.metrics.observe_hedge(self.provider.name, input_type)
+        )
+    
+    def _send(
+        self,
+        inputs: List[List[str]],
+        input_type: str,
+        tokens: int
+    ) -> List[Matrix]:
+        """Make one provider call and record it."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            embeddings = [as_matrix(matrix) for matrix in self.provider.embed(inputs, input_type)]
+            ok = True
+            return embeddings
+        finally:
+            self.metrics.observe_request(
+                self.provider.name, input_type, time.perf_counter() - start,
+                inputs=len(inputs), tokens=tokens, ok=ok
+            )
+    
+    def _count_tokens(self, inputs: List[List[str]]) -> int:
+        """Estimate the tokens a request will consume."""
+        count = self.batch_planner.count_tokens
+        return sum(count(chunk) for chunks in inputs for chunk in chunks)
@@ -0,0 +1,126 @@
+"""Metrics recorded by the embedding services."""
+from typing import Optional
+
+from ..observability.metrics import MetricsRegistry, get_registry
+from .rate_limiter import PRIORITY_NAMES
+
+
+# Per-request sizes
+INPUT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+TOKEN_BUCKETS = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 120000)
+
+
+class EmbeddingMetrics:
+    """
+    Latency, size, retry, rate-limit and cache metrics for embedding calls.
+    
+    All embedding services on the same registry record into the same
+    series, labelled by provider and input type, so the registry's
+    Prometheus export shows where time and quota go.
+    """
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize embedding metrics.
+        
+        Args:
+            registry: Registry to record into (defaults to the process-wide one)
+        """
+        self.registry = registry or get_registry()
+        labels = ("provider", "input_type")
+        self.request_seconds = self.registry.histogram(
+            "embedding_request_seconds", "Embedding provider call latency.", labels
+        )
+        self.requests = self.registry.counter(
+            "embedding_requests_total", "Embedding provider calls by outcome.", labels + ("outcome",)
+        )
+        self.request_inputs = self.registry.histogram(
+            "embedding_request_inputs", "Inputs per embedding request.", labels, buckets=INPUT_BUCKETS
+        )
+        self.request_tokens = self.registry.histogram(
+            "embedding_request_tokens", "Estimated tokens per embedding request.", labels, buckets=TOKEN_BUCKETS
+        )
+        self.retries = self.registry.counter(
+            "embedding_retries_total", "Embedding requests retried after a failure.", labels
+        )
+        self.hedges = self.registry.counter(
+            "embedding_hedges_total", "Duplicate requests sent for slow query embeddings.", labels
+        )
+        self.rate_limit_wait_seconds = self.registry.histogram(
+            "embedding_rate_limit_wait_seconds", "Time spent waiting on the rate limiter.", ("priority",)
+        )
+        self.cache_lookups = self.registry.counter(
+            "embedding_cache_lookups_total", "Embedding cache lookups by result.", ("input_type", "result")
+        )
+        self.registry.gauge(
+            "embedding_cache_hit_ratio", "Fraction of embedding cache lookups served from the cache.",
+            ("input_type",), callback=self._cache_hit_ratios
+        )
+    
+    def observe_request(
+        self,
+        provider: str,
+        input_type: str,
+        seconds: float,
+        inputs: int,
+        tokens: int,
+        ok: bool = True
+    ) -> None:
+        """
+        Record one provider call.
+        
+        Args:
+            provider: Provider name (e.g. "voyage", "local")
+            input_type: "query" or "document"
+            seconds: Call latency
+            inputs: Contextualized inputs in the request
+            tokens: Estimated tokens in the request
+            ok: Whether the call succeeded
+        """
+        self.request_seconds.observe(seconds, provider=provider, input_type=input_type)
+        self.requests.inc(provider=provider, input_type=input_type, outcome="ok" if ok else "error")
+        self.request_inputs.observe(inputs, provider=provider, input_type=input_type)
+        self.request_tokens.observe(tokens, provider=provider, input_type=input_type)
+    
+    def observe_retry(self, provider: str, input_type: str) -> None:
+        """Record a retried request."""
+        self.retries.inc(provider=provider, input_type=input_type)
+    
+    def observe_hedge(self, provider: str, input_type: str) -> None:
+        """Record a hedged duplicate request."""
+        self.hedges.inc(provider=provider, input_type=input_type)
+    
+    def observe_rate_limit_wait(self, priority: int, seconds: float) -> None:
+        """Record time a request spent waiting for rate-limit budget."""
+        self.rate_limit_wait_seconds.observe(seconds, priority=PRIORITY_NAMES.get(priority, str(priority)))
+    
+    def observe_cache(self, input_type: str, hits: int, misses: int) -> None:
+        """Record cache lookups of one embed call."""
+        if hits:
+            self.cache_lookups.inc(hits, input_type=input_type, result="hit")
+        if misses:
+            self.cache_lookups.inc(misses, input_type=input_type, result="miss")
+    
+    def _cache_hit_ratios(self):
+        kinds = {kind for kind, _ in self.cache_lookups.snapshot()}
+        return {(kind,): self.cache_hit_ratio(kind) for kind in sorted(kinds)}
+    
+    def cache_hit_ratio(self, input_type: Optional[str] = None) -> float:
+        """
+        Get the fraction of cache lookups that were hits.
+        
+        Args:
+            input_type: Only count this input type (None counts all)
+        
+        Returns:
+            Hit ratio between 0 and 1 (0 before any lookup)
+        """
+        hits = misses = 0.0
+        for (kind, result), value in self.cache_lookups.snapshot().items():
+            if input_type is None or kind == input_type:
+                if result == "hit":
+                    hits += value
+                else:
+                    misses += value
+        total = hits + misses
+        return hits / total if total else 0.0
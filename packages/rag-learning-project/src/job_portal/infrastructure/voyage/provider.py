@@ -0,0 +1,39 @@
+"""Voyage AI backend for the embedding provider interface."""
+from typing import Any, List
+
+from ...domain.vectors import Matrix, as_matrix
+from ..providers.base import EmbeddingProvider
+
+
+class VoyageProvider(EmbeddingProvider):
+    """Embeds inputs with Voyage AI's contextualized_embed endpoint."""
+    
+    name = "voyage"
+    remote = True
+    
+    def __init__(self, client: Any, model: str = "voyage-context-3", output_dimension: int = 1024):
+        """
+        Initialize Voyage provider.
+        
+        Args:
+            client: ``voyageai.Client`` used for requests
+            model: Model name (default: voyage-context-3)
+            output_dimension: Embedding dimension (default: 1024)
+        """
+        self.client = client
+        self.model = model
+        self.output_dimension = output_dimension
+    
+    def embed(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """Send one contextualized_embed request."""
+        result = self.client.contextualized_embed(
+            inputs=inputs,
+            model=self.model,
+            input_type=input_type,
+            output_dimension=self.output_dimension
+        )
+        return [as_matrix(doc_result.embeddings) for doc_result in result.results]
@@ -0,0 +1,292 @@
+"""Process-wide token-bucket rate limiter for Voyage AI requests."""
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Priority classes (lower value is served first)
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a request cannot be admitted within its timeout."""
+
+
+class _Bucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second."""
+    
+    __slots__ = ("capacity", "rate", "level", "updated")
+    
+    def __init__(self, per_minute: float, capacity: float):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.level = capacity
+        self.updated = time.monotonic()
+    
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_for(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (amounts above capacity wait for a full bucket)."""
+        deficit = min(amount, self.capacity) - self.level
+        return max(0.0, deficit / self.rate)
+
+
+class RateLimiter:
+    """
+    Thread-safe, asyncio-aware limiter for requests-per-minute and
+    tokens-per-minute budgets.
+    
+    Callers wait in one priority queue: a request is admitted only when it is
+    at the head of the queue and both buckets can cover it, so interactive
+    searches overtake queued background ingestion. A budget of None disables
+    that bucket.
+    """
+    
+    def __init__(
+        self,
+        rpm: Optional[float] = 3,
+        tpm: Optional[float] = 10000,
+        request_burst: float = 1
+    ):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            rpm: Requests per minute (None for unlimited)
+            tpm: Tokens per minute (None for unlimited)
+            request_burst: Requests that may be sent back to back after idling
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = _Bucket(rpm, request_burst) if rpm else None
+        self._tokens = _Bucket(tpm, tpm) if tpm else None
+        
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int, int]] = []
+        self._seq = itertools.count()
+        
+        self._admitted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self._timeouts = 0
+        self._tokens_admitted = 0
+        self._wait_seconds = 0.0
+        self._max_wait = 0.0
+    
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """
+        Create a limiter from ``VOYAGE_RPM`` and ``VOYAGE_TPM`` (0 means unlimited).
+        """
+        rpm = float(os.getenv("VOYAGE_RPM", "3"))
+        tpm = float(os.getenv("VOYAGE_TPM", "10000"))
+        return cls(rpm=rpm or None, tpm=tpm or None)
+    
+    def acquire(
+        self,
+        tokens: int = 0,
+        priority: int = INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> float:
+        """
+        Block until a request is admitted.
+        
+        Args:
+            tokens: Estimated tokens the request will consume
+            priority: INTERACTIVE or BACKGROUND
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            Seconds spent waiting
+        
+        Raises:
+            RateLimitTimeout: If the request was not admitted within timeout
+        """
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(tokens, priority)
+            try:
+                while True:
+                    wait = self._try_admit(ticket, start)
+                    if wait is None:
+                        return time.monotonic() - start
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise RateLimitTimeout(
+                                f"Rate limit wait exceeded {timeout:.1f}s"
+                            )
+                        wait = min(wait, remaining) if wait else remaining
+                    self._cond.wait(wait or None)
+            finally:
+                self._dequeue(ticket)
+    
+    async def acquire_async(
+        self,
+        tokens: int = 0,
+        priority: int = INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> float:
+        """
+        Asyncio version of ``acquire`` that sleeps without blocking the event loop.
+        
+        Args:
+            tokens: Estimated tokens the request will consume
+            priority: INTERACTIVE or BACKGROUND
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            Seconds spent waiting
+        
+        Raises:
+            RateLimitTimeout: If the request was not admitted within timeout
+        """
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(tokens, priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_admit(ticket, start)
+                if wait is None:
+                    return time.monotonic() - start
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        with self._cond:
+                            self._timeouts += 1
+                        raise RateLimitTimeout(f"Rate limit wait exceeded {timeout:.1f}s")
+                    wait = min(wait or 0.05, remaining)
+                # Non-head waiters poll; the head sleeps exactly until its budget refills
+                await asyncio.sleep(wait or 0.05)
+        finally:
+            with self._cond:
+                self._dequeue(ticket)
+    
+    def estimate_wait(self, tokens: int = 0, priority: int = INTERACTIVE) -> float:
+        """
+        Estimate how long a new request would wait if submitted now.
+        
+        Args:
+            tokens: Estimated tokens the request will consume
+            priority: INTERACTIVE or BACKGROUND
+        
+        Returns:
+            Estimated seconds until admission
+        """
+        with self._cond:
+            now = time.monotonic()
+            ahead = [w for w in self._waiters if w[0] <= priority]
+            wait = 0.0
+            if self._requests is not None:
+                # Queued requests ahead are admitted one by one as the bucket refills
+                self._requests.refill(now)
+                needed = len(ahead) + 1
+                wait = max(wait, max(0.0, needed - self._requests.level) / self._requests.rate)
+            if self._tokens is not None:
+                self._tokens.refill(now)
+                needed = sum(w[2] for w in ahead) + tokens
+                wait = max(wait, max(0.0, needed - self._tokens.level) / self._tokens.rate)
+            return wait
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get limiter metrics.
+        
+        Returns:
+            Dict with admitted counts per priority, timeouts, queue depth,
+            wait times and current bucket levels
+        """
+        with self._cond:
+            now = time.monotonic()
+            admitted = sum(self._admitted.values())
+            stats = {
+                "admitted": dict(self._admitted),
+                "timeouts": self._timeouts,
+                "queued": len(self._waiters),
+                "tokens_admitted": self._tokens_admitted,
+                "total_wait_seconds": self._wait_seconds,
+                "avg_wait_seconds": self._wait_seconds / admitted if admitted else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
+            if self._requests is not None:
+                self._requests.refill(now)
+                stats["requests_available"] = self._requests.level
+            if self._tokens is not None:
+                self._tokens.refill(now)
+                stats["tokens_available"] = self._tokens.level
+            return stats
+    
+    def _enqueue(self, tokens: int, priority: int) -> Tuple[int, int, int]:
+        ticket = (priority, next(self._seq), tokens)
+        heapq.heappush(self._waiters, ticket)
+        return ticket
+    
+    def _dequeue(self, ticket: Tuple[int, int, int]) -> None:
+        if ticket in self._waiters:
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+        self._cond.notify_all()
+    
+    def _try_admit(self, ticket: Tuple[int, int, int], start: float) -> Optional[float]:
+        """
+        Admit the ticket if it is at the head of the queue and budget allows.
+        
+        Returns:
+            None if admitted, otherwise seconds to wait before retrying
+            (0 when waiting on another request ahead in the queue)
+        """
+        if self._waiters[0] != ticket:
+            return 0.0
+        
+        now = time.monotonic()
+        priority, _, tokens = ticket
+        wait = 0.0
+        if self._requests is not None:
+            self._requests.refill(now)
+            wait = max(wait, self._requests.wait_for(1))
+        if self._tokens is not None:
+            self._tokens.refill(now)
+            wait = max(wait, self._tokens.wait_for(tokens))
+        if wait > 0:
+            return wait
+        
+        if self._requests is not None:
+            self._requests.level -= 1
+        if self._tokens is not None:
+            self._tokens.level -= min(tokens, self._tokens.capacity)
+        waited = now - start
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        self._admitted[name] = self._admitted.get(name, 0) + 1
+        self._tokens_admitted += tokens
+        self._wait_seconds += waited
+        self._max_wait = max(self._max_wait, waited)
+        return None
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide limiter shared by every Voyage call site."""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter.from_env()
+        return _default_limiter
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """Replace the process-wide limiter (None recreates it from env on next use)."""
+    global _default_limiter
+    with _default_lock:
+        _default_limiter = limiter
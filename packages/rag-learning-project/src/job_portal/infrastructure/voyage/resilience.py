@@ -0,0 +1,527 @@
+"""Deadlines, retries, hedging and circuit breaking for embedding requests."""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+import voyageai.error as voyage_error
+
+from .rate_limiter import RateLimitTimeout
+
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_RETRYABLE_ERRORS = (
+    voyage_error.RateLimitError,
+    voyage_error.ServerError,
+    voyage_error.ServiceUnavailableError,
+    voyage_error.APIConnectionError,
+    voyage_error.Timeout,
+    voyage_error.TryAgain,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit breaker is open."""
+
+
+class EmbeddingTimeout(Exception):
+    """Raised when an embedding request misses its deadline."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Check whether a failed request is worth retrying.
+    
+    Throttling (429), server errors (5xx), connection errors and timeouts
+    are transient; invalid requests and authentication errors are not.
+    
+    Args:
+        error: Exception raised by the provider
+    
+    Returns:
+        True if the request may succeed when sent again
+    """
+    if isinstance(error, (_RETRYABLE_ERRORS, EmbeddingTimeout)):
+        return True
+    status = getattr(error, "http_status", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def _retry_after(error: BaseException) -> float:
+    """Seconds the server asked us to wait (Retry-After header), or 0."""
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after") or headers.get("Retry-After") or 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing provider for a while.
+    
+    After ``failure_threshold`` consecutive transient failures the breaker
+    opens and every call fails fast with ``CircuitOpenError``. Once
+    ``reset_timeout`` seconds have passed a single trial call is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial call
+            clock: Time source (monotonic seconds)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+    
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+    
+    def before_call(self) -> None:
+        """
+        Admit a call or fail fast.
+        
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with its
+                trial call already in flight
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._clock() - self._opened_at >= self.reset_timeout and not self._trial_in_flight:
+                self._state = HALF_OPEN
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+            raise CircuitOpenError(
+                f"Embedding provider unavailable after {self._failures} consecutive failures; "
+                f"retrying in {retry_in:.0f}s"
+            )
+    
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+    
+    def release(self) -> None:
+        """Give back a half-open trial slot for a call that was never sent."""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the breaker at the threshold."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+
+class LatencyTracker:
+    """Rolling window of recent request latencies."""
+    
+    def __init__(self, window: int = 200):
+        """
+        Initialize latency tracker.
+        
+        Args:
+            window: Number of recent samples kept
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float) -> None:
+        """Add a latency sample."""
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, fraction: float, min_samples: int = 20) -> Optional[float]:
+        """
+        Get a latency percentile.
+        
+        Args:
+            fraction: Percentile as a fraction (0.95 for p95)
+            min_samples: Samples needed before a value is reported
+        
+        Returns:
+            Latency in seconds, or None with too few samples
+        """
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ResiliencePolicy:
+    """
+    Runs embedding requests with a deadline, jittered retries, optional
+    hedging and a circuit breaker.
+    
+    Every attempt, including retries and hedges, is admitted through the
+    caller's ``admit`` function (the rate limiter), so the extra requests
+    stay inside the RPM/TPM budget. A hedge is only sent when admission
+    does not require waiting.
+    
+    The deadline starts once the first attempt is admitted: queueing for
+    rate-limit budget is the limiter's concern (callers bound it with
+    ``max_wait``), so a query that waited for the next refill still gets
+    its full deadline. Retries have to be admitted within what is left.
+    
+    Attempts run on the process-wide request executor (see
+    ``get_request_executor``), shared by every policy.
+    """
+    
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        query_deadline: float = 10.0,
+        document_deadline: float = 120.0,
+        hedge_percentile: Optional[float] = 0.95,
+        hedge_min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize resilience policy.
+        
+        Args:
+            max_attempts: Attempts per request, including the first
+            base_delay: Backoff base in seconds (doubles per retry, full jitter)
+            max_delay: Backoff ceiling in seconds
+            query_deadline: Seconds a query request may take in total
+            document_deadline: Seconds a document request may take in total
+            hedge_percentile: Query latency percentile after which a
+                duplicate request is sent (None disables hedging)
+            hedge_min_samples: Query latencies needed before hedging starts
+            breaker: Circuit breaker (defaults to the process-wide one)
+            executor: Executor running attempts (defaults to the
+                process-wide one)
+            sleep: Sleep function used for backoff
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.query_deadline = query_deadline
+        self.document_deadline = document_deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or get_circuit_breaker()
+        self.latencies = LatencyTracker()
+        self._executor = executor or get_request_executor()
+        self._sleep = sleep
+    
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        """
+        Create a policy configured from environment variables.
+        
+        ``EMBEDDING_MAX_ATTEMPTS``, ``EMBEDDING_QUERY_DEADLINE`` and
+        ``EMBEDDING_DOCUMENT_DEADLINE`` (seconds) override the defaults;
+        ``EMBEDDING_HEDGE_PERCENTILE`` sets the hedging threshold (``off``
+        disables hedging).
+        """
+        hedge = os.getenv("EMBEDDING_HEDGE_PERCENTILE", "0.95")
+        return cls(
+            max_attempts=int(os.getenv("EMBEDDING_MAX_ATTEMPTS", "3")),
+            query_deadline=float(os.getenv("EMBEDDING_QUERY_DEADLINE", "10")),
+            document_deadline=float(os.getenv("EMBEDDING_DOCUMENT_DEADLINE", "120")),
+            hedge_percentile=None if hedge.lower() in ("", "off", "none") else float(hedge)
+        )
+    
+    def call(
+        self,
+        send: Callable[[], T],
+        admit: Callable[[Optional[float]], None],
+        input_type: str,
+        on_retry: Optional[Callable[[BaseException], None]] = None,
+        on_hedge: Optional[Callable[[], None]] = None
+    ) -> T:
+        """
+        Send a request under this policy.
+        
+        Args:
+            send: Function performing one attempt
+            admit: Function waiting for rate-limit budget for one attempt;
+                called with the seconds it may wait (None for the first
+                attempt, 0 means don't wait) and raising ``RateLimitTimeout``
+                when budget isn't available in time
+            input_type: "query" or "document" (queries get the shorter
+                deadline and may be hedged)
+            on_retry: Called with the error before each retry
+            on_hedge: Called when a hedged duplicate is sent
+        
+        Returns:
+            Result of the first successful attempt
+        
+        Raises:
+            CircuitOpenError: If the breaker is open
+            EmbeddingTimeout: If the deadline passes
+            RateLimitTimeout: If budget for a retry isn't available before the deadline
+            Exception: The provider's error when it is not retryable or
+                attempts run out
+        """
+        is_query = input_type == "query"
+        budget = self.query_deadline if is_query else self.document_deadline
+        deadline: Optional[float] = None
+        hedge_after = None
+        if is_query and self.hedge_percentile is not None:
+            hedge_after = self.latencies.percentile(self.hedge_percentile, self.hedge_min_samples)
+        
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.before_call()
+            try:
+                admit(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except RateLimitTimeout:
+                self.breaker.release()
+                raise
+            if deadline is None:
+                deadline = time.monotonic() + budget
+            try:
+                result = self._attempt(send, admit, deadline, hedge_after, on_hedge)
+            except Exception as error:
+                self._sleep(self._retry_delay(error, attempt, deadline, on_retry))
+                continue
+            self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+    
+    async def call_async(
+        self,
+        send: Callable[[], Awaitable[T]],
+        admit: Callable[[Optional[float]], Awaitable[None]],
+        input_type: str,
+        on_retry: Optional[Callable[[BaseException], None]] = None,
+        on_hedge: Optional[Callable[[], None]] = None
+    ) -> T:
+        """
+        Asyncio version of ``call``: ``send`` and ``admit`` are coroutine functions.
+        
+        Attempts run as tasks on the event loop instead of the request
+        executor; a hedge's losing attempt is cancelled.
+        
+        Returns:
+            Result of the first successful attempt
+        
+        Raises:
+            The same errors as ``call``
+        """
+        is_query = input_type == "query"
+        budget = self.query_deadline if is_query else self.document_deadline
+        deadline: Optional[float] = None
+        hedge_after = None
+        if is_query and self.hedge_percentile is not None:
+            hedge_after = self.latencies.percentile(self.hedge_percentile, self.hedge_min_samples)
+        
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.before_call()
+            try:
+                await admit(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except BaseException:
+                # Includes cancellation while queued for budget
+                self.breaker.release()
+                raise
+            if deadline is None:
+                deadline = time.monotonic() + budget
+            try:
+                result = await self._attempt_async(send, admit, deadline, hedge_after, on_hedge)
+            except Exception as error:
+                await asyncio.sleep(self._retry_delay(error, attempt, deadline, on_retry))
+                continue
+            self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+    
+    def _retry_delay(
+        self,
+        error: Exception,
+        attempt: int,
+        deadline: float,
+        on_retry: Optional[Callable[[BaseException], None]]
+    ) -> float:
+        """Record a failed attempt and return the backoff before retrying, or re-raise."""
+        if not is_retryable(error):
+            # The provider answered; the request itself was bad
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        delay = max(
+            _retry_after(error),
+            random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        )
+        if attempt == self.max_attempts or time.monotonic() + delay >= deadline:
+            raise error
+        if on_retry is not None:
+            on_retry(error)
+        return delay
+    
+    def _attempt(
+        self,
+        send: Callable[[], T],
+        admit: Callable[[Optional[float]], None],
+        deadline: float,
+        hedge_after: Optional[float],
+        on_hedge: Optional[Callable[[], None]]
+    ) -> T:
+        """Run one attempt (plus an optional hedge) against the deadline."""
+        start = time.monotonic()
+        pending = {self._executor.submit(send)}
+        
+        if hedge_after is not None:
+            done, _ = wait(pending, timeout=min(hedge_after, max(0.0, deadline - start)))
+            if not done and time.monotonic() < deadline and self._try_admit(admit):
+                pending.add(self._executor.submit(send))
+                if on_hedge is not None:
+                    on_hedge()
+        
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.latencies.record(time.monotonic() - start)
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        raise EmbeddingTimeout(f"Embedding request exceeded its deadline after {time.monotonic() - start:.1f}s")
+    
+    async def _attempt_async(
+        self,
+        send: Callable[[], Awaitable[T]],
+        admit: Callable[[Optional[float]], Awaitable[None]],
+        deadline: float,
+        hedge_after: Optional[float],
+        on_hedge: Optional[Callable[[], None]]
+    ) -> T:
+        """Run one attempt (plus an optional hedge) as tasks against the deadline."""
+        start = time.monotonic()
+        pending = {asyncio.ensure_future(send())}
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(pending, timeout=min(hedge_after, max(0.0, deadline - start)))
+                if not done and time.monotonic() < deadline and await self._try_admit_async(admit):
+                    pending.add(asyncio.ensure_future(send()))
+                    if on_hedge is not None:
+                        on_hedge()
+            
+            error: Optional[BaseException] = None
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.latencies.record(time.monotonic() - start)
+                        return task.result()
+                    error = task.exception()
+            if error is not None and not pending:
+                raise error
+            raise EmbeddingTimeout(f"Embedding request exceeded its deadline after {time.monotonic() - start:.1f}s")
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    @staticmethod
+    async def _try_admit_async(admit: Callable[[Optional[float]], Awaitable[None]]) -> bool:
+        """Admit a hedge only if no rate-limit wait is needed."""
+        try:
+            await admit(0.0)
+            return True
+        except RateLimitTimeout:
+            return False
+    
+    @staticmethod
+    def _try_admit(admit: Callable[[Optional[float]], None]) -> bool:
+        """Admit a hedge only if no rate-limit wait is needed."""
+        try:
+            admit(0.0)
+            return True
+        except RateLimitTimeout:
+            return False
+
+
+_default_breaker: Optional[CircuitBreaker] = None
+_default_executor: Optional[ThreadPoolExecutor] = None
+_default_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get the process-wide circuit breaker shared by every embedding service."""
+    global _default_breaker
+    with _default_lock:
+        if _default_breaker is None:
+            _default_breaker = CircuitBreaker(
+                failure_threshold=int(os.getenv("EMBEDDING_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("EMBEDDING_BREAKER_RESET_SECONDS", "30"))
+            )
+        return _default_breaker
+
+
+def set_circuit_breaker(breaker: Optional[CircuitBreaker]) -> None:
+    """Replace the process-wide breaker (None recreates it from env on next use)."""
+    global _default_breaker
+    with _default_lock:
+        _default_breaker = breaker
+
+
+def get_request_executor() -> ThreadPoolExecutor:
+    """Get the process-wide executor running embedding attempts for every policy."""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("EMBEDDING_REQUEST_THREADS", "8")),
+                thread_name_prefix="embedding"
+            )
+        return _default_executor
+
+
+def set_request_executor(executor: Optional[ThreadPoolExecutor]) -> None:
+    """Replace the process-wide executor, shutting down the old one (None recreates it on next use)."""
+    global _default_executor
+    with _default_lock:
+        previous, _default_executor = _default_executor, executor
+    if previous is not None and previous is not executor:
+        previous.shutdown(wait=False)
@@ -0,0 +1,330 @@
+"""Local embedding sidecar: one process owning the cache, rate limiter and coalescing.
+
+Every CLI, agent worker and script on a host can send its embedding requests
+to one sidecar instead of calling Voyage AI itself. The sidecar wraps a
+single ``VoyageEmbeddingService``, so all processes share its cache, stay
+inside one view of the RPM/TPM budget and have their concurrent requests
+coalesced. Clients use ``SidecarProvider``, usually by setting
+``EMBEDDING_PROVIDER=sidecar``.
+
+The protocol is JSON over HTTP/1.1, on TCP or a Unix socket. Vectors travel
+as base64-encoded little-endian float32 bytes:
+    
+    POST /embed   {"inputs": [[chunk, ...], ...], "input_type": "query"}
+                  -> {"embeddings": [{"shape": [rows, dim], "data": "..."}]}
+    POST /check   {"inputs": ..., "input_type": ..., "max_wait": seconds}
+                  -> 200, or 429 if the request would wait longer
+    GET  /health  -> {"status": "ok", "model": ..., "output_dimension": ...}
+    GET  /metrics -> Prometheus text from the sidecar's metrics registry
+"""
+import base64
+import http.client
+import json
+import os
+import socket
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from ...domain.vectors import DTYPE, Matrix
+from ..providers.base import EmbeddingProvider
+from .embedding_service import VoyageEmbeddingService
+from .rate_limiter import RateLimitTimeout
+from .resilience import CircuitOpenError, EmbeddingTimeout
+
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+# Sidecar status codes for errors the client re-raises as the same exception
+_ERROR_STATUS = (
+    (RateLimitTimeout, 429),
+    (CircuitOpenError, 503),
+    (EmbeddingTimeout, 504),
+)
+
+
+class SidecarError(Exception):
+    """Raised when the sidecar can't be reached or fails a request."""
+
+
+def encode_matrix(matrix: Matrix) -> Dict[str, Any]:
+    """Encode a float32 matrix for the wire."""
+    matrix = np.ascontiguousarray(matrix, dtype="<f4")
+    return {"shape": list(matrix.shape), "data": base64.b64encode(matrix.tobytes()).decode("ascii")}
+
+
+def decode_matrix(payload: Dict[str, Any]) -> Matrix:
+    """Decode a matrix encoded by ``encode_matrix``."""
+    data = base64.b64decode(payload["data"])
+    return np.frombuffer(data, dtype="<f4").astype(DTYPE, copy=False).reshape(payload["shape"])
+
+
+def _parse_inputs(body: Dict[str, Any]) -> Tuple[List[List[str]], str]:
+    inputs = body["inputs"]
+    input_type = body.get("input_type", "document")
+    if input_type not in ("query", "document"):
+        raise ValueError(f"input_type must be 'query' or 'document', got {input_type!r}")
+    if not isinstance(inputs, list) or not all(
+        isinstance(chunks, list) and all(isinstance(chunk, str) for chunk in chunks)
+        for chunks in inputs
+    ):
+        raise ValueError("inputs must be a list of lists of strings")
+    return inputs, input_type
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "EmbeddingSidecar/1.0"
+    
+    @property
+    def service(self) -> VoyageEmbeddingService:
+        return self.server.service
+    
+    def address_string(self) -> str:
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+    
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+    
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"))
+    
+    def _send_error(self, error: Exception) -> None:
+        status = next((code for kind, code in _ERROR_STATUS if isinstance(error, kind)), 502)
+        if isinstance(error, (ValueError, KeyError, TypeError)):
+            status = 400
+        self._send_json(status, {"error": type(error).__name__, "message": str(error)})
+    
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {
+                "status": "ok",
+                "provider": self.service.provider.name,
+                "model": self.service.model,
+                "output_dimension": self.service.output_dimension,
+            })
+        elif self.path == "/metrics":
+            text = self.service.metrics.registry.render_prometheus()
+            self._send(200, text.encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": "NotFound", "message": self.path})
+    
+    def do_POST(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            inputs, input_type = _parse_inputs(body)
+            if self.path == "/embed":
+                matrices = self.service.embed_inputs(inputs, input_type)
+                self._send_json(200, {"embeddings": [encode_matrix(matrix) for matrix in matrices]})
+            elif self.path == "/check":
+                self.service._check_wait(inputs, input_type, float(body.get("max_wait", 0)))
+                self._send_json(200, {"status": "ok"})
+            else:
+                self._send_json(404, {"error": "NotFound", "message": self.path})
+        except Exception as error:
+            self._send_error(error)
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class EmbeddingSidecar:
+    """
+    HTTP server exposing one ``VoyageEmbeddingService`` to local processes.
+    """
+    
+    def __init__(
+        self,
+        service: VoyageEmbeddingService,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: Optional[str] = None,
+        verbose: bool = False
+    ):
+        """
+        Initialize embedding sidecar and bind its socket.
+        
+        Args:
+            service: Embedding service shared by all clients
+            host: TCP host to listen on (ignored with socket_path)
+            port: TCP port to listen on (0 picks a free port)
+            socket_path: Listen on this Unix socket instead of TCP
+            verbose: Log every request to stderr
+        """
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.server = _UnixServer(socket_path, _Handler)
+            self.url = f"unix://{socket_path}"
+        else:
+            self.server = _TCPServer((host, port), _Handler)
+            self.url = f"http://{host}:{self.server.server_address[1]}"
+        self.server.service = service
+        self.server.verbose = verbose
+        self.service = service
+        self.socket_path = socket_path
+        self._thread: Optional[threading.Thread] = None
+    
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """Serve requests until ``shutdown`` is called."""
+        self.server.serve_forever(poll_interval)
+    
+    def start(self) -> "EmbeddingSidecar":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, args=(0.05,), name="embedding-sidecar", daemon=True
+        )
+        self._thread.start()
+        return self
+    
+    def shutdown(self) -> None:
+        """Stop a sidecar started with ``start`` and release its socket."""
+        self.server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+        self.close()
+    
+    def close(self) -> None:
+        """Release the listening socket."""
+        self.server.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+    
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class SidecarProvider(EmbeddingProvider):
+    """
+    Embeds inputs by asking a local embedding sidecar.
+    
+    The sidecar already caches, rate limits and retries, so this provider
+    is not ``remote``: the client-side service doesn't pace it again. Each
+    thread keeps one persistent connection to the sidecar.
+    """
+    
+    name = "sidecar"
+    remote = False
+    
+    def __init__(
+        self,
+        url: str = DEFAULT_URL,
+        model: Optional[str] = None,
+        output_dimension: Optional[int] = None,
+        timeout: float = 180.0
+    ):
+        """
+        Initialize sidecar provider.
+        
+        Args:
+            url: Sidecar address, ``http://host:port`` or ``unix:///path/to.sock``
+            model: Model served by the sidecar (asked from the sidecar if None)
+            output_dimension: Embedding dimension (asked from the sidecar if None)
+            timeout: Seconds to wait for a response
+        
+        Raises:
+            SidecarError: If model details are needed and the sidecar is unreachable
+        """
+        self.url = url
+        self.timeout = timeout
+        self._local = threading.local()
+        if model is None or output_dimension is None:
+            health = self.health()
+            model = model or health["model"]
+            output_dimension = output_dimension or health["output_dimension"]
+        self.model = model
+        self.output_dimension = output_dimension
+    
+    @classmethod
+    def from_env(cls) -> "SidecarProvider":
+        """Create a provider for the sidecar at ``EMBEDDING_SIDECAR_URL``."""
+        return cls(url=os.getenv("EMBEDDING_SIDECAR_URL", DEFAULT_URL))
+    
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            parsed = urlparse(self.url)
+            if parsed.scheme == "unix":
+                connection = _UnixHTTPConnection(parsed.path, timeout=self.timeout)
+            else:
+                connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+    
+    def _call(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = json.loads(response.read() or b"{}")
+                break
+            except TimeoutError as error:
+                connection.close()
+                self._local.connection = None
+                raise SidecarError(f"Embedding sidecar at {self.url} timed out after {self.timeout}s") from error
+            except (ConnectionError, http.client.HTTPException, OSError) as error:
+                # The sidecar may have closed an idle keep-alive connection; reconnect once
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise SidecarError(f"Embedding sidecar at {self.url} is unreachable: {error}") from error
+        
+        if response.status == 200:
+            return data
+        message = data.get("message", "")
+        for kind, status in _ERROR_STATUS:
+            if response.status == status:
+                raise kind(message)
+        raise SidecarError(f"{data.get('error', response.status)}: {message}")
+    
+    def health(self) -> Dict[str, Any]:
+        """Get the sidecar's status, model and output dimension."""
+        return self._call("GET", "/health")
+    
+    def embed(
+        self,
+        inputs: List[List[str]],
+        input_type: str
+    ) -> List[Matrix]:
+        """Embed inputs through the sidecar."""
+        data = self._call("POST", "/embed", {"inputs": inputs, "input_type": input_type})
+        return [decode_matrix(payload) for payload in data["embeddings"]]
+    
+    def check_wait(
+        self,
+        inputs: List[List[str]],
+        input_type: str,
+        max_wait: float
+    ) -> None:
+        """Ask the sidecar whether the request would wait longer than max_wait."""
+        self._call("POST", "/check", {"inputs": inputs, "input_type": input_type, "max_wait": max_wait})
@@ -0,0 +1,181 @@
+"""Token counting and token-budget chunking for embedding inputs."""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from .batching import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:  # optional: counts fall back to the character estimate
+    tiktoken = None
+
+
+DEFAULT_ENCODING = "cl100k_base"
+DEFAULT_CHUNK_TOKENS = 512
+CHUNK_SEPARATORS = ["\n\n", "\n", ". ", " "]
+
+
+class TokenCounter:
+    """
+    Counts tokens with a tiktoken encoding, caching counts by text hash.
+    
+    Voyage's tokenizer isn't available offline, so ``cl100k_base`` is used
+    as a close stand-in; it tracks real token counts far better than the
+    4-characters-per-token estimate, which is used when tiktoken or its
+    encoding file can't be loaded. Chunking and request packing count the
+    same texts many times, so counts are remembered in a bounded LRU.
+    """
+    
+    def __init__(
+        self,
+        encoding_name: Optional[str] = DEFAULT_ENCODING,
+        max_entries: int = 65536
+    ):
+        """
+        Initialize token counter.
+        
+        Args:
+            encoding_name: tiktoken encoding (None always uses the estimate)
+            max_entries: Maximum number of cached counts
+        """
+        self.encoding_name = encoding_name
+        self.max_entries = max_entries
+        self._encoding: Any = None
+        self._loaded = encoding_name is None or tiktoken is None
+        self._counts: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_env(cls) -> "TokenCounter":
+        """
+        Create a counter configured from environment variables.
+        
+        ``EMBEDDING_TOKENIZER`` names the tiktoken encoding; ``estimate``
+        uses the character estimate instead.
+        """
+        name = os.getenv("EMBEDDING_TOKENIZER", DEFAULT_ENCODING)
+        return cls(encoding_name=None if name.lower() == "estimate" else name)
+    
+    @property
+    def backend(self) -> str:
+        """Name of the tokenizer in use ("estimate" if none could be loaded)."""
+        return self.encoding_name if self._load() is not None else "estimate"
+    
+    def _load(self) -> Any:
+        # Loading may download the encoding file; try once, lazily
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                    except Exception:
+                        self._encoding = None
+                    self._loaded = True
+        return self._encoding
+    
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+        
+        Args:
+            text: Input text
+        
+        Returns:
+            Token count (at least 1)
+        """
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        
+        encoding = self._load()
+        tokens = max(1, len(encoding.encode_ordinary(text))) if encoding is not None else estimate_tokens(text)
+        
+        with self._lock:
+            self._counts[key] = tokens
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return tokens
+    
+    __call__ = count
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict with backend, hits, misses, hit ratio and cached entries
+        """
+        backend = self.backend
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": backend,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._counts),
+            }
+
+
+def make_text_splitter(
+    counter: TokenCounter,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS
+) -> RecursiveCharacterTextSplitter:
+    """
+    Create a splitter that packs chunks up to a token budget.
+    
+    Text is split on paragraphs, lines, sentences and words (in that order
+    of preference) and the pieces are merged back together until the next
+    one would push a chunk past ``chunk_tokens``.
+    
+    Args:
+        counter: Token counter used to measure pieces
+        chunk_tokens: Maximum tokens per chunk
+    
+    Returns:
+        Text splitter with a ``split_text`` method
+    """
+    return RecursiveCharacterTextSplitter(
+        separators=CHUNK_SEPARATORS,
+        chunk_size=chunk_tokens,
+        chunk_overlap=0,  # Voyage recommends no overlap for contextualized embeddings
+        length_function=counter
+    )
+
+
+def chunk_tokens_from_env() -> int:
+    """Token budget per chunk from ``EMBEDDING_CHUNK_TOKENS``."""
+    return int(os.getenv("EMBEDDING_CHUNK_TOKENS", str(DEFAULT_CHUNK_TOKENS)))
+
+
+_default_counter: Optional[TokenCounter] = None
+_default_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """Get the process-wide token counter shared by every embedding service."""
+    global _default_counter
+    with _default_lock:
+        if _default_counter is None:
+            _default_counter = TokenCounter.from_env()
+        return _default_counter
+
+
+def set_token_counter(counter: Optional[TokenCounter]) -> None:
+    """Replace the process-wide counter (None recreates it from env on next use)."""
+    global _default_counter
+    with _default_lock:
+        _default_counter = counter
+
@@ -1,21 +1,261 @@
 """Base vector store interface for MongoDB Atlas Vector Search."""
-from typing import List, Dict, Any, Optional
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from bson import json_util
+from pymongo import ASCENDING, GEOSPHERE, UpdateOne
 from pymongo.collection import Collection
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+try:
+    from ..domain.location import Coordinates, geo_fields, location_filter
+    from ..domain.search_hit import SearchHit
+    from ..domain.vectors import VectorLike
+    from ..infrastructure.local_index.base import LocalVectorIndex
+    from ..infrastructure.mongodb.vector_codec import (
+        StoredVector, decode_vector, detect_format, encode_vector, truncate_vector, validate_format
+    )
+except ImportError:
+    from job_portal.domain.location import Coordinates, geo_fields, location_filter
+    from job_portal.domain.search_hit import SearchHit
+    from job_portal.domain.vectors import VectorLike
+    from job_portal.infrastructure.local_index.base import LocalVectorIndex
+    from job_portal.infrastructure.mongodb.vector_codec import (
+        StoredVector, decode_vector, detect_format, encode_vector, truncate_vector, validate_format
+    )
+
+
+# Write error codes worth retrying: duplicate keys from concurrent upserts of
+# the same key, write conflicts, time limits and primary step-downs
+RETRYABLE_WRITE_CODES = frozenset({11000, 112, 50, 262, 91, 189, 10107, 11600, 11602, 13435, 13436})
+
+# Most documents a radius filter passes to $vectorSearch as an _id list; wider
+# areas are matched after the search, over-fetching this many times the limit
+GEO_PREFILTER_LIMIT = int(os.getenv("VECTOR_GEO_PREFILTER_LIMIT", "1000"))
+GEO_OVERFETCH_FACTOR = 10
+
+# Upper bound Atlas accepts for numCandidates
+MAX_NUM_CANDIDATES = 10000
+
+
+def _copy_path(source: Dict[str, Any], target: Dict[str, Any], parts: List[str]) -> None:
+    if parts[0] not in source:
+        return
+    if len(parts) == 1:
+        target[parts[0]] = source[parts[0]]
+    elif isinstance(source[parts[0]], dict):
+        _copy_path(source[parts[0]], target.setdefault(parts[0], {}), parts[1:])
+
+
+def _drop_path(document: Dict[str, Any], parts: List[str]) -> Dict[str, Any]:
+    if parts[0] not in document:
+        return document
+    document = dict(document)
+    if len(parts) == 1:
+        del document[parts[0]]
+    elif isinstance(document[parts[0]], dict):
+        document[parts[0]] = _drop_path(document[parts[0]], parts[1:])
+    return document
+
+
+def apply_projection(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply a find-style inclusion or exclusion projection to a document in memory.
+    
+    Used for results that don't come straight from MongoDB (rescored and
+    local index results), so every search path honours the same projection.
+    A "score" field is always kept.
+    
+    Args:
+        document: Result document
+        projection: Projection, or None for the whole document
+    
+    Returns:
+        Projected copy of the document (the document itself without a projection)
+    """
+    if not projection:
+        return document
+    paths = {path: value for path, value in projection.items() if path not in ("_id", "score")}
+    if any(paths.values()):
+        result = {"_id": document["_id"]} if projection.get("_id", 1) and "_id" in document else {}
+        for path in paths:
+            _copy_path(document, result, path.split("."))
+    else:
+        result = document
+        for path in paths:
+            result = _drop_path(result, path.split("."))
+        if not projection.get("_id", 1):
+            result = _drop_path(result, ["_id"])
+    if "score" in document:
+        result = {**result, "score": document["score"]}
+    return result
 
 
 class VectorStore:
-    """Base class for vector storage and retrieval operations."""
+    """
+    Base class for vector storage and retrieval operations.
+    
+    Vectors are accepted as float32 NumPy arrays or lists and stored in
+    ``vector_format``: plain BSON double arrays ("array", the default),
+    packed BinData float32 vectors ("float32") or scalar-quantized BinData
+    int8 vectors ("int8"). Query vectors are encoded the same way, so Atlas
+    compares like with like.
+    
+    With ``coarse_dimensions`` set, every vector field also gets a
+    ``<field>_coarse`` copy holding its re-normalized prefix, indexed by a
+    smaller ``<index>_coarse`` Atlas index. Searches then over-fetch on the
+    coarse index and rescore the candidates against the full vectors.
+    
+    With a ``local_index`` mirroring a vector field, searches on that field
+    are answered in process instead of by ``$vectorSearch``.
     
-    def __init__(self, collection: Collection, vector_index_name: str = "vector_index"):
+    Reads (searches, ``get_by_id`` and metadata filters) leave the stored
+    vectors out of returned documents unless callers pass
+    ``include_vectors=True``: a 1024-dimension vector is about 10 KB per
+    document that nothing displays. A ``projection`` selects fields
+    explicitly, and searches return compact ``SearchHit`` objects with
+    ``as_hits=True``.
+    
+    Stores with a ``location_field`` keep normalized ``<field>_tokens``
+    and a GeoJSON ``<field>_point`` next to it (see ``domain.location``).
+    Atlas can't evaluate ``$geoWithin`` inside ``$vectorSearch``, so radius
+    filters are first answered by the 2dsphere index and passed to the
+    vector search as an ``_id`` pre-filter.
+    """
+    
+    # Fields identifying a document across imports, backed by a unique index
+    # (see ensure_upsert_index; empty: no natural key)
+    upsert_key: Tuple[str, ...] = ()
+    
+    # Free-text location field with derived tokens and point (None: no location)
+    location_field: Optional[str] = None
+    
+    # Collection and index of this store's chunks (None: not chunked) and the
+    # fields copied onto chunks for pre-filtering (see ChunkStore.for_store)
+    chunk_collection: Optional[str] = None
+    chunk_index_name: Optional[str] = None
+    chunk_metadata_fields: Tuple[str, ...] = ()
+    
+    # Fields a re-import only sets on insert, so lifecycle changes made since
+    # (a closed posting, a hired candidate) survive it
+    insert_only_fields: Tuple[str, ...] = ("created_at", "status")
+    
+    def __init__(
+        self,
+        collection: Collection,
+        vector_index_name: str = "vector_index",
+        vector_format: Optional[str] = None,
+        coarse_dimensions: Optional[int] = None,
+        rescore_factor: int = 4,
+        local_index: Optional[LocalVectorIndex] = None,
+        vector_fields: Optional[Sequence[str]] = None
+    ):
         """
         Initialize vector store.
         
         Args:
             collection: MongoDB collection instance
             vector_index_name: Name of the vector search index
+            vector_format: Vector storage format (defaults to the
+                VECTOR_STORAGE_FORMAT env var, or "array")
+            coarse_dimensions: Dimensions of the coarse search vectors
+                (defaults to the VECTOR_COARSE_DIMENSIONS env var; unset
+                disables two-stage search)
+            rescore_factor: Candidates fetched from the coarse index per
+                requested result
+            local_index: Synced in-process index answering searches on its
+                vector field
+            vector_fields: Fields holding this store's vectors, left out of
+                returned documents by default (defaults to ["embedding"])
         """
         self.collection = collection
         self.vector_index_name = vector_index_name
+        self.vector_format = validate_format(
+            vector_format or os.getenv("VECTOR_STORAGE_FORMAT", "array")
+        )
+        if coarse_dimensions is None and os.getenv("VECTOR_COARSE_DIMENSIONS"):
+            coarse_dimensions = int(os.getenv("VECTOR_COARSE_DIMENSIONS"))
+        self.coarse_dimensions = coarse_dimensions or None
+        self.coarse_index_name = f"{vector_index_name}_coarse"
+        self.rescore_factor = rescore_factor
+        self.local_index = local_index
+        self.vector_field_names = list(dict.fromkeys(vector_fields or ["embedding"]))
+    
+    def read_projection(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        include_vectors: bool = False,
+        vector_field: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build the projection for documents read by this store.
+        
+        Args:
+            projection: Explicit projection, used as is
+            include_vectors: If True, return whole documents
+            vector_field: Vector field read by the caller, excluded along
+                with the store's own vector fields
+        
+        Returns:
+            Projection excluding every vector field and its coarse copy,
+            the explicit projection, or None for whole documents
+        """
+        if projection is not None:
+            return projection
+        if include_vectors:
+            return None
+        fields = list(self.vector_field_names)
+        if vector_field and vector_field not in fields:
+            fields.append(vector_field)
+        excluded = {}
+        for field in fields:
+            excluded[field] = 0
+            excluded[f"{field}_coarse"] = 0
+        return excluded
+    
+    def encode_vector(self, vector: Any) -> StoredVector:
+        """
+        Encode a vector in this store's storage format.
+        
+        Args:
+            vector: Vector as a list, NumPy array or BinData vector
+            
+        Returns:
+            Value to store in a vector field or pass as queryVector
+        """
+        return encode_vector(vector, self.vector_format)
+    
+    def vector_fields(
+        self,
+        vector_field: str,
+        vector: Any,
+        embedding_meta: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the stored fields for one embedding.
+        
+        Args:
+            vector_field: Name of the field containing vector embeddings
+            vector: Full embedding
+            embedding_meta: Optional source-text hash, model and dimension of
+                the embedding, stored as ``<field>_meta`` for staleness checks
+            
+        Returns:
+            The encoded vector, plus its coarse copy when two-stage search is
+            enabled and its metadata when given
+        """
+        fields = {vector_field: self.encode_vector(vector)}
+        if embedding_meta is not None:
+            fields[f"{vector_field}_meta"] = embedding_meta
+        if self.coarse_dimensions:
+            fields[f"{vector_field}_coarse"] = self.encode_vector(
+                truncate_vector(vector, self.coarse_dimensions)
+            )
+        return fields
     
     def insert_document(self, document: Dict[str, Any]) -> str:
         """
@@ -43,14 +283,203 @@ class VectorStore:
         result = self.collection.insert_many(documents)
         return [str(id) for id in result.inserted_ids]
     
+    def bulk_upsert(
+        self,
+        documents: Sequence[Dict[str, Any]],
+        key_fields: Sequence[str],
+        chunk_size: int = 500,
+        max_retries: int = 3,
+        retry_delay: float = 0.5
+    ) -> Dict[str, int]:
+        """
+        Insert or update documents by a natural key, so re-running an import is idempotent.
+        
+        Each document becomes an upsert that ``$set``s its fields on the
+        document with the same key fields; ``insert_only_fields``
+        (``created_at``, ``status``) are only set when the document is
+        inserted. Upserts are sent with unordered
+        ``bulk_write`` in chunks of ``chunk_size``. Operations that fail
+        with a transient error (see ``RETRYABLE_WRITE_CODES``) are retried
+        with exponential backoff, and a chunk that loses its connection is
+        resent whole; other failures are counted and the import continues.
+        
+        Args:
+            documents: Documents to write (fields not in a document are left alone)
+            key_fields: Fields identifying a document (e.g. ("user_id",))
+            chunk_size: Upserts per bulk write
+            max_retries: Retries per chunk after the first attempt
+            retry_delay: Backoff base in seconds (doubles per retry)
+        
+        Returns:
+            Dict with 'inserted', 'updated', 'unchanged' and 'failed' counts
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        for start in range(0, len(documents), chunk_size):
+            operations = [
+                self._upsert_operation(document, key_fields)
+                for document in documents[start:start + chunk_size]
+            ]
+            self._write_chunk(operations, counts, max_retries, retry_delay)
+        return counts
+    
+    def _upsert_operation(self, document: Dict[str, Any], key_fields: Sequence[str]) -> UpdateOne:
+        fields = {
+            key: value for key, value in document.items()
+            if key != "_id" and key not in self.insert_only_fields
+        }
+        on_insert = {
+            key: document[key] for key in self.insert_only_fields
+            if document.get(key) is not None
+        }
+        on_insert["created_at"] = datetime.now(timezone.utc)
+        update = {"$set": fields, "$setOnInsert": on_insert}
+        if self.location_field:
+            point = f"{self.location_field}_point"
+            # A location moved to an unknown place has no point; drop the old one
+            if f"{self.location_field}_tokens" in fields and point not in fields:
+                update["$unset"] = {point: ""}
+        return UpdateOne({field: document[field] for field in key_fields}, update, upsert=True)
+    
+    def _write_chunk(
+        self,
+        operations: List[UpdateOne],
+        counts: Dict[str, int],
+        max_retries: int,
+        retry_delay: float
+    ) -> None:
+        """Bulk-write one chunk, retrying its transient failures."""
+        for attempt in range(max_retries + 1):
+            try:
+                details = self.collection.bulk_write(operations, ordered=False).bulk_api_result
+                retry = []
+            except BulkWriteError as e:
+                details = e.details
+                errors = details.get("writeErrors", [])
+                retry = [operations[error["index"]] for error in errors if error.get("code") in RETRYABLE_WRITE_CODES]
+                counts["failed"] += len(errors) - len(retry)
+            except AutoReconnect:
+                # Unknown how much was applied; upserts are idempotent, so resend it all
+                details = {}
+                retry = operations
+            
+            counts["inserted"] += details.get("nUpserted", 0)
+            counts["updated"] += details.get("nModified", 0)
+            counts["unchanged"] += details.get("nMatched", 0) - details.get("nModified", 0)
+            if not retry:
+                return
+            if attempt == max_retries:
+                counts["failed"] += len(retry)
+                return
+            time.sleep(retry_delay * 2 ** attempt)
+            operations = retry
+    
+    def location_criteria(
+        self,
+        location: Optional[str] = None,
+        near: Union[None, str, Coordinates] = None,
+        radius_km: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Build indexed filter criteria on this store's location field.
+        
+        Args:
+            location: Place to match exactly by its normalized tokens
+            near: Place name or (longitude, latitude) to search around
+            radius_km: Search radius around ``near``
+        
+        Returns:
+            Filter criteria on ``<field>_tokens`` / ``<field>_point``
+        """
+        return location_filter(self.location_field, location, near, radius_km)
+    
+    def ensure_location_indexes(self) -> List[str]:
+        """
+        Create the indexes behind location filters unless they exist.
+        
+        Returns:
+            Names of the token (multikey) and 2dsphere indexes
+        """
+        if not self.location_field:
+            return []
+        return [
+            self.collection.create_index([(f"{self.location_field}_tokens", ASCENDING)]),
+            self.collection.create_index([(f"{self.location_field}_point", GEOSPHERE)]),
+        ]
+    
+    def ensure_upsert_index(self) -> Optional[str]:
+        """
+        Create the unique index on ``upsert_key`` unless it exists.
+        
+        Upserts look documents up by their key, so without it every upsert
+        scans the collection, and two imports inserting the same new key at
+        once could both insert it. Fails if the collection already holds
+        duplicate keys; remove them first.
+        
+        Returns:
+            Name of the unique index, or None for stores without a key
+        """
+        if not self.upsert_key:
+            return None
+        return self.collection.create_index(
+            [(field, ASCENDING) for field in self.upsert_key],
+            unique=True
+        )
+    
+    def _atlas_filter(
+        self,
+        filter_criteria: Optional[Dict[str, Any]]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Split filter criteria into a $vectorSearch pre-filter and a $match after it.
+        
+        $vectorSearch can't pre-filter on ``$geoWithin``. Radius criteria
+        matching up to ``GEO_PREFILTER_LIMIT`` documents are replaced by an
+        _id list; wider areas are returned as the $match instead, so the
+        pre-filter never grows unbounded.
+        
+        Args:
+            filter_criteria: Filter criteria, possibly with ``$geoWithin``
+        
+        Returns:
+            (pre_filter, post_match); post_match is None unless the radius
+            covers more documents than the limit
+        """
+        fields = geo_fields(filter_criteria)
+        if not fields:
+            return filter_criteria, None
+        criteria = {key: spec for key, spec in filter_criteria.items() if key not in fields}
+        geo_criteria = {key: filter_criteria[key] for key in fields}
+        # Answered by the 2dsphere index
+        ids = [
+            doc["_id"]
+            for doc in self.collection.find(geo_criteria, {"_id": 1}, limit=GEO_PREFILTER_LIMIT + 1)
+        ]
+        if len(ids) > GEO_PREFILTER_LIMIT:
+            return criteria or None, geo_criteria
+        id_filter = {"_id": {"$in": ids}}
+        if "_id" in criteria:
+            criteria["$and"] = [*criteria.get("$and", []), id_filter]
+        else:
+            criteria.update(id_filter)
+        return criteria, None
+    
+    @staticmethod
+    def _overfetch(stage: Dict[str, Any]) -> None:
+        """Widen a $vectorSearch stage so enough results survive a later $match."""
+        stage["limit"] = min(MAX_NUM_CANDIDATES, stage["limit"] * GEO_OVERFETCH_FACTOR)
+        stage["numCandidates"] = min(MAX_NUM_CANDIDATES, max(stage["numCandidates"], stage["limit"]))
+    
     def vector_search(
         self,
-        query_vector: List[float],
+        query_vector: VectorLike,
         limit: int = 10,
         num_candidates: int = 100,
         filter_criteria: Optional[Dict[str, Any]] = None,
-        vector_field: str = "embedding"
-    ) -> List[Dict[str, Any]]:
+        vector_field: str = "embedding",
+        projection: Optional[Dict[str, Any]] = None,
+        include_vectors: bool = False,
+        as_hits: bool = False
+    ) -> List[Union[Dict[str, Any], SearchHit]]:
         """
         Perform vector similarity search using MongoDB Atlas Vector Search.
         
@@ -60,16 +489,47 @@ class VectorStore:
             num_candidates: Number of candidates for ANN search (should be >= limit)
             filter_criteria: Optional pre-filter criteria for hybrid search
             vector_field: Name of the field containing vector embeddings
+            projection: Fields to return (defaults to everything but vectors)
+            include_vectors: If True, also return the vector fields
+            as_hits: If True, return ``SearchHit`` objects instead of dicts
             
         Returns:
             List of matching documents with similarity scores
         """
+        projection = self.read_projection(projection, include_vectors, vector_field)
+        
+        if self.local_index is not None and vector_field == self.local_index.vector_field and not include_vectors:
+            # The local index keeps documents without their vectors
+            results = [
+                apply_projection(document, projection)
+                for document in self.local_index.search(query_vector, limit, filter_criteria, num_candidates)
+            ]
+        elif self.coarse_dimensions:
+            results = self._two_stage_search(
+                query_vector, limit, num_candidates, filter_criteria, vector_field, projection
+            )
+        else:
+            results = self._atlas_search(
+                query_vector, limit, num_candidates, filter_criteria, vector_field, projection
+            )
+        return [SearchHit.from_document(document) for document in results] if as_hits else results
+    
+    def _atlas_search(
+        self,
+        query_vector: VectorLike,
+        limit: int,
+        num_candidates: int,
+        filter_criteria: Optional[Dict[str, Any]],
+        vector_field: str,
+        projection: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Search with a single $vectorSearch stage."""
         pipeline = [
             {
                 "$vectorSearch": {
                     "index": self.vector_index_name,
                     "path": vector_field,
-                    "queryVector": query_vector,
+                    "queryVector": self.encode_vector(query_vector),
                     "numCandidates": num_candidates,
                     "limit": limit
                 }
@@ -82,20 +542,81 @@ class VectorStore:
         ]
         
         # Add filter if provided
-        if filter_criteria:
-            pipeline[0]["$vectorSearch"]["filter"] = filter_criteria
+        pre_filter, post_match = self._atlas_filter(filter_criteria)
+        if pre_filter:
+            pipeline[0]["$vectorSearch"]["filter"] = pre_filter
+        if post_match:
+            self._overfetch(pipeline[0]["$vectorSearch"])
+            pipeline[1:1] = [{"$match": post_match}, {"$limit": limit}]
+        
+        # Leave vectors on the server instead of shipping them with every hit
+        if projection:
+            pipeline.append({"$project": projection})
         
         results = list(self.collection.aggregate(pipeline))
         return results
     
+    def _two_stage_search(
+        self,
+        query_vector: VectorLike,
+        limit: int,
+        num_candidates: int,
+        filter_criteria: Optional[Dict[str, Any]],
+        vector_field: str,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Over-fetch on the coarse index, then rescore candidates on full vectors."""
+        coarse_field = f"{vector_field}_coarse"
+        fetch = limit * self.rescore_factor
+        
+        stage = {
+            "index": self.coarse_index_name,
+            "path": coarse_field,
+            "queryVector": self.encode_vector(truncate_vector(query_vector, self.coarse_dimensions)),
+            "numCandidates": min(MAX_NUM_CANDIDATES, max(num_candidates, fetch)),
+            "limit": fetch
+        }
+        pre_filter, post_match = self._atlas_filter(filter_criteria)
+        if pre_filter:
+            stage["filter"] = pre_filter
+        pipeline = [
+            {"$vectorSearch": stage},
+            {"$addFields": {"coarse_score": {"$meta": "vectorSearchScore"}}},
+            {"$project": {coarse_field: 0}}
+        ]
+        if post_match:
+            self._overfetch(stage)
+            pipeline.insert(1, {"$match": post_match})
+        candidates = [doc for doc in self.collection.aggregate(pipeline) if doc.get(vector_field) is not None]
+        if not candidates:
+            return []
+        
+        query = decode_vector(query_vector)
+        matrix = np.stack([decode_vector(doc[vector_field]) for doc in candidates])
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        cosine = matrix @ query / np.where(norms == 0, 1, norms)
+        
+        # Same scale as Atlas's cosine vectorSearchScore
+        scores = (1 + cosine) / 2
+        order = np.argsort(-scores, kind="stable")[:limit]
+        results = []
+        for i in order:
+            candidates[i]["score"] = float(scores[i])
+            # Full vectors were needed for rescoring; drop them now
+            results.append(apply_projection(candidates[i], projection))
+        return results
+    
     def hybrid_search(
         self,
-        query_vector: List[float],
+        query_vector: VectorLike,
         filter_criteria: Dict[str, Any],
         limit: int = 10,
         num_candidates: int = 100,
-        vector_field: str = "embedding"
-    ) -> List[Dict[str, Any]]:
+        vector_field: str = "embedding",
+        projection: Optional[Dict[str, Any]] = None,
+        include_vectors: bool = False,
+        as_hits: bool = False
+    ) -> List[Union[Dict[str, Any], SearchHit]]:
         """
         Perform hybrid search combining vector similarity and metadata filtering.
         
@@ -105,6 +626,9 @@ class VectorStore:
             limit: Number of results to return
             num_candidates: Number of candidates for ANN search
             vector_field: Name of the field containing vector embeddings
+            projection: Fields to return (defaults to everything but vectors)
+            include_vectors: If True, also return the vector fields
+            as_hits: If True, return ``SearchHit`` objects instead of dicts
             
         Returns:
             List of matching documents with similarity scores
@@ -114,21 +638,145 @@ class VectorStore:
             limit=limit,
             num_candidates=num_candidates,
             filter_criteria=filter_criteria,
-            vector_field=vector_field
+            vector_field=vector_field,
+            projection=projection,
+            include_vectors=include_vectors,
+            as_hits=as_hits
         )
     
-    def get_by_id(self, document_id: str) -> Optional[Dict[str, Any]]:
+    def search_many(
+        self,
+        query_vectors: Sequence[VectorLike],
+        limit: int = 10,
+        num_candidates: int = 100,
+        filter_criteria: Union[None, Dict[str, Any], Sequence[Optional[Dict[str, Any]]]] = None,
+        vector_field: str = "embedding",
+        projection: Optional[Dict[str, Any]] = None,
+        include_vectors: bool = False,
+        as_hits: bool = False,
+        max_workers: Optional[int] = None
+    ) -> List[Union[List[Union[Dict[str, Any], SearchHit]], Exception]]:
+        """
+        Run many vector searches, with results in query order.
+        
+        Atlas searches run concurrently on a bounded thread pool, so
+        matching thousands of entities is limited by throughput rather than
+        by one round trip after another. Searches answered by the local
+        index are grouped by filter, and each group is scored in one batch
+        against a single compiled allow-list. A failing query doesn't fail
+        the batch: its slot holds the exception instead of results.
+        
+        Args:
+            query_vectors: Query vector embeddings
+            limit: Number of results per query
+            num_candidates: Number of candidates for ANN search
+            filter_criteria: One filter shared by every query, or one per query
+            vector_field: Name of the field containing vector embeddings
+            projection: Fields to return (defaults to everything but vectors)
+            include_vectors: If True, also return the vector fields
+            as_hits: If True, return ``SearchHit`` objects instead of dicts
+            max_workers: Concurrent Atlas searches (defaults to the
+                VECTOR_SEARCH_CONCURRENCY env var, or 8)
+        
+        Returns:
+            Per query, its results or the exception it raised
+        
+        Raises:
+            ValueError: If per-query filters don't match the number of queries
+        """
+        queries = list(query_vectors)
+        if filter_criteria is None or isinstance(filter_criteria, dict):
+            filters = [filter_criteria] * len(queries)
+        else:
+            filters = list(filter_criteria)
+            if len(filters) != len(queries):
+                raise ValueError(f"Got {len(filters)} filters for {len(queries)} queries")
+        results: List[Any] = [None] * len(queries)
+        
+        if self.local_index is not None and vector_field == self.local_index.vector_field and not include_vectors:
+            projection = self.read_projection(projection, include_vectors, vector_field)
+            groups: Dict[str, List[int]] = {}
+            for i, criteria in enumerate(filters):
+                groups.setdefault(json_util.dumps(criteria, sort_keys=True), []).append(i)
+            for positions in groups.values():
+                try:
+                    batch = self.local_index.search_many(
+                        [queries[i] for i in positions], limit, filters[positions[0]], num_candidates
+                    )
+                except Exception:
+                    # Isolate the failing query (e.g. a wrong dimension) by running them one by one
+                    for i in positions:
+                        results[i] = self._search_one(
+                            queries[i], limit, num_candidates, filters[i], vector_field,
+                            projection, include_vectors, as_hits
+                        )
+                    continue
+                for i, documents in zip(positions, batch):
+                    documents = [apply_projection(document, projection) for document in documents]
+                    results[i] = [SearchHit.from_document(document) for document in documents] if as_hits \
+                        else documents
+            return results
+        
+        if not queries:
+            return results
+        workers = max_workers or int(os.getenv("VECTOR_SEARCH_CONCURRENCY", "8"))
+        with ThreadPoolExecutor(max_workers=min(workers, len(queries)), thread_name_prefix="vector-search") as executor:
+            futures = [
+                executor.submit(
+                    self._search_one, query, limit, num_candidates, criteria, vector_field,
+                    projection, include_vectors, as_hits
+                )
+                for query, criteria in zip(queries, filters)
+            ]
+            return [future.result() for future in futures]
+    
+    def _search_one(
+        self,
+        query_vector: VectorLike,
+        limit: int,
+        num_candidates: int,
+        filter_criteria: Optional[Dict[str, Any]],
+        vector_field: str,
+        projection: Optional[Dict[str, Any]],
+        include_vectors: bool,
+        as_hits: bool
+    ) -> Union[List[Union[Dict[str, Any], SearchHit]], Exception]:
+        """One search of a batch, returning its exception instead of raising it."""
+        try:
+            return self.vector_search(
+                query_vector=query_vector,
+                limit=limit,
+                num_candidates=num_candidates,
+                filter_criteria=filter_criteria,
+                vector_field=vector_field,
+                projection=projection,
+                include_vectors=include_vectors,
+                as_hits=as_hits
+            )
+        except Exception as e:
+            return e
+    
+    def get_by_id(
+        self,
+        document_id: str,
+        projection: Optional[Dict[str, Any]] = None,
+        include_vectors: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Retrieve a document by its ID.
         
         Args:
             document_id: Document ID
+            projection: Fields to return (defaults to everything but vectors)
+            include_vectors: If True, also return the vector fields
             
         Returns:
             Document if found, None otherwise
         """
         from bson import ObjectId
-        return self.collection.find_one({"_id": ObjectId(document_id)})
+        return self.collection.find_one(
+            {"_id": ObjectId(document_id)}, self.read_projection(projection, include_vectors)
+        )
     
     def update_document(self, document_id: str, update_data: Dict[str, Any]) -> bool:
         """
@@ -162,6 +810,60 @@ class VectorStore:
         result = self.collection.delete_one({"_id": ObjectId(document_id)})
         return result.deleted_count > 0
     
+    def convert_vector_field(
+        self,
+        vector_field: str,
+        batch_size: int = 500,
+        dry_run: bool = False
+    ) -> Dict[str, int]:
+        """
+        Re-encode every stored vector in a field to this store's vector_format.
+        
+        Missing coarse vectors are filled in when two-stage search is
+        enabled. Documents already up to date are left alone, so the
+        conversion can be re-run after an interruption.
+        
+        Args:
+            vector_field: Name of the field containing vector embeddings
+            batch_size: Documents per bulk write
+            dry_run: If True, count documents without writing
+            
+        Returns:
+            Dict with 'converted' and 'skipped' counts
+        """
+        coarse_field = f"{vector_field}_coarse"
+        counts = {"converted": 0, "skipped": 0}
+        operations = []
+        cursor = self.collection.find(
+            {vector_field: {"$exists": True, "$ne": None}},
+            {vector_field: 1, coarse_field: 1}
+        ).batch_size(batch_size)
+        
+        for document in cursor:
+            value = document[vector_field]
+            coarse = document.get(coarse_field)
+            up_to_date = detect_format(value) == self.vector_format and (
+                not self.coarse_dimensions
+                or (coarse is not None and detect_format(coarse) == self.vector_format)
+            )
+            if up_to_date:
+                counts["skipped"] += 1
+                continue
+            counts["converted"] += 1
+            if dry_run:
+                continue
+            operations.append(UpdateOne(
+                {"_id": document["_id"]},
+                {"$set": self.vector_fields(vector_field, value)}
+            ))
+            if len(operations) >= batch_size:
+                self.collection.bulk_write(operations, ordered=False)
+                operations = []
+        
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return counts
+    
     def count_documents(self, filter_criteria: Optional[Dict[str, Any]] = None) -> int:
         """
         Count documents matching filter criteria.
@@ -0,0 +1,282 @@
+"""Chunk-level vector store for long job postings and candidate profiles."""
+import hashlib
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from bson import ObjectId
+from pymongo import DeleteMany, InsertOne, UpdateOne
+
+from ..domain.search_hit import SearchHit
+from ..domain.vectors import Matrix, VectorLike
+from .base_vector_store import VectorStore
+
+
+class ChunkStore(VectorStore):
+    """
+    Stores one document per chunk of a parent posting or profile.
+    
+    Each chunk keeps its text hash, so re-syncing an edited parent only
+    embeds chunks whose text changed; unchanged chunks keep their vectors
+    even if they moved. Searches match chunks and collapse the hits to one
+    result per parent scored by its best chunk (max-sim).
+    
+    ``ChunkStore.for_store`` opens the chunk store of a ``CompanyStore``
+    (``job_chunks``, ``job_chunk_vector_index``) or ``JobSeekerStore``
+    (``profile_chunks``, ``profile_chunk_vector_index``).
+    """
+    
+    def __init__(
+        self,
+        collection,
+        vector_index_name: str,
+        parent_collection: Optional[str] = None,
+        vector_format: Optional[str] = None,
+        parent_vector_fields: Sequence[str] = (),
+        metadata_fields: Sequence[str] = ()
+    ):
+        """
+        Initialize chunk store.
+        
+        Args:
+            collection: MongoDB collection for chunks
+            vector_index_name: Name of the vector search index (see
+                ``index_definitions.json``)
+            parent_collection: Name of the parents' collection; when set,
+                search results are the parent documents themselves
+            vector_format: Vector storage format ("array", "float32" or "int8")
+            parent_vector_fields: Parents' vector fields, left out of joined
+                parent documents along with their coarse copies
+            metadata_fields: Parent fields copied onto every chunk for
+                pre-filtering (the chunk index's filter fields)
+        """
+        super().__init__(collection, vector_index_name, vector_format, coarse_dimensions=0)
+        self.parent_collection = parent_collection
+        self.parent_vector_fields = list(parent_vector_fields)
+        self.metadata_fields = tuple(metadata_fields)
+    
+    @classmethod
+    def for_store(cls, store: VectorStore, vector_format: Optional[str] = None) -> "ChunkStore":
+        """
+        Open the chunk store of a parent store, in the same database.
+        
+        Args:
+            store: Parent store with ``chunk_collection``, ``chunk_index_name``
+                and ``chunk_metadata_fields`` set
+            vector_format: Vector storage format of the chunks
+        
+        Returns:
+            Chunk store whose search results are the parent documents
+        
+        Raises:
+            ValueError: If the store has no chunk collection
+        """
+        if not store.chunk_collection:
+            raise ValueError(f"{type(store).__name__} has no chunk collection")
+        return cls(
+            store.collection.database[store.chunk_collection],
+            store.chunk_index_name,
+            parent_collection=store.collection.name,
+            vector_format=vector_format,
+            parent_vector_fields=store.vector_field_names,
+            metadata_fields=store.chunk_metadata_fields
+        )
+    
+    def chunk_metadata(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Pick the fields of a parent document copied onto its chunks.
+        
+        Args:
+            document: Parent document
+        
+        Returns:
+            The document's ``metadata_fields`` that are set
+        """
+        return {field: document[field] for field in self.metadata_fields if field in document}
+    
+    @staticmethod
+    def chunk_hash(text: str) -> str:
+        """
+        Hash a chunk's text.
+        
+        Args:
+            text: Chunk text
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _parent_key(parent_id: Any) -> Any:
+        """Store parent ids as ObjectIds when possible so they join with the parents' _id."""
+        if isinstance(parent_id, str) and ObjectId.is_valid(parent_id):
+            return ObjectId(parent_id)
+        return parent_id
+    
+    def sync_chunks(
+        self,
+        parent_id: Any,
+        chunks: List[str],
+        embed_fn: Callable[[List[str]], Matrix],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """
+        Bring a parent's stored chunks in line with its current text.
+        
+        Args:
+            parent_id: ID of the parent posting or profile
+            chunks: Current chunks of the parent's text, in order
+            embed_fn: Function embedding a list of chunk texts (only called
+                with chunks that are new or changed)
+            metadata: Filterable fields copied onto every chunk (e.g. status,
+                location) so searches can pre-filter
+        
+        Returns:
+            Dict with 'embedded', 'reused' and 'deleted' chunk counts
+        """
+        parent_key = self._parent_key(parent_id)
+        metadata = metadata or {}
+        
+        existing = defaultdict(list)
+        for doc in self.collection.find(
+            {"parent_id": parent_key},
+            {"text_hash": 1, "chunk_index": 1}
+        ).sort("chunk_index", 1):
+            existing[doc["text_hash"]].append(doc)
+        
+        operations = []
+        reused = 0
+        to_embed = []
+        for index, text in enumerate(chunks):
+            text_hash = self.chunk_hash(text)
+            if existing[text_hash]:
+                doc = existing[text_hash].pop(0)
+                reused += 1
+                if doc.get("chunk_index") != index or metadata:
+                    operations.append(UpdateOne(
+                        {"_id": doc["_id"]},
+                        {"$set": {"chunk_index": index, **metadata}}
+                    ))
+            else:
+                to_embed.append((index, text, text_hash))
+        
+        stale = [doc["_id"] for docs in existing.values() for doc in docs]
+        if stale:
+            operations.append(DeleteMany({"_id": {"$in": stale}}))
+        
+        if to_embed:
+            vectors = embed_fn([text for _, text, _ in to_embed])
+            for (index, text, text_hash), vector in zip(to_embed, vectors):
+                operations.append(InsertOne({
+                    "parent_id": parent_key,
+                    "chunk_index": index,
+                    "text_hash": text_hash,
+                    "text": text,
+                    **self.vector_fields("embedding", vector),
+                    **metadata
+                }))
+        
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        return {"embedded": len(to_embed), "reused": reused, "deleted": len(stale)}
+    
+    def delete_chunks(self, parent_id: Any) -> int:
+        """
+        Delete all chunks of a parent.
+        
+        Args:
+            parent_id: ID of the parent posting or profile
+        
+        Returns:
+            Number of chunks deleted
+        """
+        result = self.collection.delete_many({"parent_id": self._parent_key(parent_id)})
+        return result.deleted_count
+    
+    def search_parents(
+        self,
+        query_vector: VectorLike,
+        limit: int = 10,
+        num_candidates: int = 100,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        chunks_per_parent: int = 3,
+        as_hits: bool = False
+    ) -> List[Union[Dict[str, Any], SearchHit]]:
+        """
+        Search chunks and return the best-matching parents.
+        
+        Args:
+            query_vector: Query vector embedding
+            limit: Number of parents to return
+            num_candidates: Number of candidates for ANN search
+            filter_criteria: Optional pre-filter on chunk metadata
+            chunks_per_parent: Chunk hits fetched per requested parent, so
+                parents with several matching chunks don't crowd out others
+            as_hits: If True, return ``SearchHit`` objects instead of dicts
+        
+        Returns:
+            One result per parent with its max chunk 'score', the best
+            'matched_chunk' text and 'chunk_hits'; with parent_collection set,
+            these fields are merged into the parent document (without its
+            vectors)
+        """
+        fetch = limit * chunks_per_parent
+        stage = {
+            "index": self.vector_index_name,
+            "path": "embedding",
+            "queryVector": self.encode_vector(query_vector),
+            "numCandidates": min(10000, max(num_candidates, fetch)),
+            "limit": fetch
+        }
+        if filter_criteria:
+            stage["filter"] = filter_criteria
+        
+        pipeline = [
+            {"$vectorSearch": stage},
+            {"$project": {
+                "parent_id": 1,
+                "chunk_index": 1,
+                "text": 1,
+                "score": {"$meta": "vectorSearchScore"}
+            }},
+            {"$sort": {"score": -1}},
+            {"$group": {
+                "_id": "$parent_id",
+                "score": {"$max": "$score"},
+                "matched_chunk": {"$first": "$text"},
+                "matched_chunk_index": {"$first": "$chunk_index"},
+                "chunk_hits": {"$sum": 1}
+            }},
+            {"$sort": {"score": -1}},
+            {"$limit": limit}
+        ]
+        
+        if self.parent_collection:
+            pipeline += [
+                {"$lookup": {
+                    "from": self.parent_collection,
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "as": "parent"
+                }},
+                {"$unwind": "$parent"},
+                {"$replaceRoot": {"newRoot": {"$mergeObjects": [
+                    "$parent",
+                    {
+                        "score": "$score",
+                        "matched_chunk": "$matched_chunk",
+                        "matched_chunk_index": "$matched_chunk_index",
+                        "chunk_hits": "$chunk_hits"
+                    }
+                ]}}}
+            ]
+            # Leave the parents' vectors on the server, as VectorStore reads do
+            excluded = {}
+            for field in self.parent_vector_fields:
+                excluded[field] = 0
+                excluded[f"{field}_coarse"] = 0
+            if excluded:
+                pipeline.append({"$project": excluded})
+        
+        results = list(self.collection.aggregate(pipeline))
+        return [SearchHit.from_document(document) for document in results] if as_hits else results
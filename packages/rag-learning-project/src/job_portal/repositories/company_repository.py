@@ -1,21 +1,100 @@
 """Company-specific vector store operations."""
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 
+from ..domain.embedding_generation import EmbeddingGeneration, load_generation, other_generation_fields
+from ..domain.location import Coordinates, location_fields
+from ..domain.vectors import VectorLike
+from ..infrastructure.local_index.base import LocalVectorIndex
+from ..infrastructure.local_index.factory import close_local_index, open_local_index
 from .base_vector_store import VectorStore
 
 
 class CompanyStore(VectorStore):
     """Manages company job postings with vector embeddings and filterable metadata."""
     
-    def __init__(self, collection, vector_index_name: str = "company_vector_index"):
+    # Fields identifying a posting across imports
+    upsert_key = ("company_id", "job_title")
+    location_field = "location"
+    chunk_collection = "job_chunks"
+    chunk_index_name = "job_chunk_vector_index"
+    chunk_metadata_fields = (
+        "company_size", "location_tokens", "industry", "remote_policy",
+        "experience_level", "required_skills", "status"
+    )
+    
+    def __init__(
+        self,
+        collection,
+        vector_index_name: str = "company_vector_index",
+        vector_format: Optional[str] = None,
+        coarse_dimensions: Optional[int] = None,
+        generation: Optional[EmbeddingGeneration] = None,
+        local_index: Optional[LocalVectorIndex] = None
+    ):
         """
         Initialize company store.
         
         Args:
             collection: MongoDB collection for companies
             vector_index_name: Name of the vector search index
+            vector_format: Vector storage format ("array", "float32" or "int8")
+            coarse_dimensions: Dimensions of the coarse vectors for two-stage search
+            generation: Embedding generation to read and write (defaults to the
+                active one); it picks the vector field and suffixes the index name
+            local_index: In-process index for the vector field (defaults to the
+                one VECTOR_SEARCH_BACKEND selects, if any)
         """
-        super().__init__(collection, vector_index_name)
+        self.generation = generation or load_generation()
+        self.vector_field = self.generation.field("requirements_embedding")
+        self._base_index_name = vector_index_name
+        self._injected_local_index = local_index
+        super().__init__(
+            collection,
+            self.generation.index(vector_index_name),
+            vector_format,
+            coarse_dimensions,
+            local_index=local_index if local_index is not None else open_local_index(collection, self.vector_field),
+            vector_fields=self._stored_vector_fields()
+        )
+    
+    def _stored_vector_fields(self) -> List[str]:
+        """
+        Vector fields left out of reads.
+        
+        Returns:
+            The active generation's field, the original one and those of the
+            other generations in the generation file (e.g. a migration's
+            shadow field)
+        """
+        return [self.vector_field, "requirements_embedding", *other_generation_fields("requirements_embedding")]
+    
+    def reload_generation(self) -> bool:
+        """
+        Follow the active generation if it changed since this store was created.
+        
+        Long-lived stores (the agent tools keep one per process) call this
+        before searching, so they read the new field and index as soon as
+        ``switch_generation`` replaces the generation file. A local index
+        passed to the constructor is kept; one opened from
+        ``VECTOR_SEARCH_BACKEND`` is closed and the new field's opened.
+        
+        Returns:
+            True if the store moved to another generation
+        """
+        generation = load_generation()
+        if generation == self.generation:
+            # A migration may have started since; keep its shadow field out of reads
+            self.vector_field_names = list(dict.fromkeys(self._stored_vector_fields()))
+            return False
+        previous = self.local_index
+        self.__init__(
+            self.collection, self._base_index_name, self.vector_format, self.coarse_dimensions, generation,
+            local_index=self._injected_local_index
+        )
+        if previous is not None and previous is not self.local_index:
+            # Nothing searches the old field any more; stop mirroring it
+            close_local_index(previous)
+        return True
     
     def store_job_posting(
         self,
@@ -23,7 +102,7 @@ class CompanyStore(VectorStore):
         company_name: str,
         job_title: str,
         job_description: str,
-        job_requirements_embedding: List[float],
+        job_requirements_embedding: VectorLike,
         company_size: str,
         location: str,
         industry: str,
@@ -31,7 +110,9 @@ class CompanyStore(VectorStore):
         remote_policy: str = "onsite",
         required_skills: Optional[List[str]] = None,
         experience_level: Optional[str] = None,
-        additional_metadata: Optional[Dict[str, Any]] = None
+        additional_metadata: Optional[Dict[str, Any]] = None,
+        embedding_meta: Optional[Dict[str, Any]] = None,
+        location_coordinates: Optional[Coordinates] = None
     ) -> str:
         """
         Store a job posting with vector embedding and filterable metadata.
@@ -50,18 +131,65 @@ class CompanyStore(VectorStore):
             required_skills: List of required skills
             experience_level: Experience level ("entry", "mid", "senior", "lead")
             additional_metadata: Any additional metadata
+            embedding_meta: Source-text hash, model and dimension of the
+                embedding (see JobPortalEmbeddings.embedding_metadata)
+            location_coordinates: (longitude, latitude) of the location, for
+                places the built-in gazetteer doesn't know
             
         Returns:
             Inserted document ID
         """
-        document = {
+        document = self.job_posting_document(
+            company_id=company_id,
+            company_name=company_name,
+            job_title=job_title,
+            job_description=job_description,
+            company_size=company_size,
+            location=location,
+            industry=industry,
+            salary_range=salary_range,
+            remote_policy=remote_policy,
+            required_skills=required_skills,
+            experience_level=experience_level,
+            additional_metadata=additional_metadata,
+            location_coordinates=location_coordinates
+        )
+        document.update(self.vector_fields(self.vector_field, job_requirements_embedding, embedding_meta))
+        return self.insert_document(document)
+    
+    @staticmethod
+    def job_posting_document(
+        company_id: str,
+        company_name: str,
+        job_title: str,
+        job_description: str,
+        company_size: str,
+        location: str,
+        industry: str,
+        salary_range: Optional[Dict[str, float]] = None,
+        remote_policy: str = "onsite",
+        required_skills: Optional[List[str]] = None,
+        experience_level: Optional[str] = None,
+        additional_metadata: Optional[Dict[str, Any]] = None,
+        location_coordinates: Optional[Coordinates] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a job posting document without its vector fields.
+        
+        Takes the same fields as ``store_job_posting``, so imported records
+        are stored in the same shape.
+        
+        Returns:
+            Job posting document
+        """
+        return {
             "company_id": company_id,
             "company_name": company_name,
             "job_title": job_title,
             "job_description": job_description,
-            "requirements_embedding": job_requirements_embedding,
             "company_size": company_size,
             "location": location,
+            **location_fields("location", location, location_coordinates),
             "industry": industry,
             "remote_policy": remote_policy,
             "required_skills": required_skills or [],
@@ -71,18 +199,18 @@ class CompanyStore(VectorStore):
             "created_at": None,  # Set by MongoDB timestamp
             **(additional_metadata or {})
         }
-        
-        return self.insert_document(document)
     
     def search_matching_candidates(
         self,
-        candidate_profile_embedding: List[float],
+        candidate_profile_embedding: VectorLike,
         company_size: Optional[str] = None,
         location: Optional[str] = None,
         industry: Optional[str] = None,
         remote_policy: Optional[str] = None,
         experience_level: Optional[str] = None,
-        limit: int = 10
+        limit: int = 10,
+        near: Union[None, str, Coordinates] = None,
+        radius_km: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for job postings matching a candidate's profile.
@@ -90,11 +218,13 @@ class CompanyStore(VectorStore):
         Args:
             candidate_profile_embedding: Vector embedding of candidate's profile
             company_size: Filter by company size
-            location: Filter by location
+            location: Filter by location (matched on its normalized tokens)
             industry: Filter by industry
             remote_policy: Filter by remote policy
             experience_level: Filter by experience level
             limit: Number of results to return
+            near: Place name or (longitude, latitude) to search around
+            radius_km: Only return postings within this distance of ``near``
             
         Returns:
             List of matching job postings with similarity scores
@@ -103,8 +233,7 @@ class CompanyStore(VectorStore):
         
         if company_size:
             filter_criteria["company_size"] = company_size
-        if location:
-            filter_criteria["location"] = {"$regex": location, "$options": "i"}
+        filter_criteria.update(self.location_criteria(location, near, radius_km))
         if industry:
             filter_criteria["industry"] = industry
         if remote_policy:
@@ -117,7 +246,7 @@ class CompanyStore(VectorStore):
             limit=limit,
             num_candidates=limit * 10,
             filter_criteria=filter_criteria if len(filter_criteria) > 1 else None,
-            vector_field="requirements_embedding"
+            vector_field=self.vector_field
         )
     
     def get_jobs_by_company(self, company_id: str) -> List[Dict[str, Any]]:
@@ -152,18 +281,30 @@ class CompanyStore(VectorStore):
         industry: Optional[str] = None,
         remote_policy: Optional[str] = None,
         salary_min: Optional[float] = None,
-        limit: int = 50
+        skills: Optional[List[str]] = None,
+        experience_level: Optional[str] = None,
+        limit: int = 50,
+        projection: Optional[Dict[str, Any]] = None,
+        include_vectors: bool = False,
+        near: Union[None, str, Coordinates] = None,
+        radius_km: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Filter job postings by metadata only (no vector search).
         
         Args:
             company_size: Filter by company size
-            location: Filter by location
+            location: Filter by location (matched on its normalized tokens)
             industry: Filter by industry
             remote_policy: Filter by remote policy
             salary_min: Minimum salary requirement
+            skills: Required skills (any match)
+            experience_level: Filter by experience level
             limit: Maximum number of results
+            projection: Fields to return (defaults to everything but vectors)
+            include_vectors: If True, also return the vector fields
+            near: Place name or (longitude, latitude) to search around
+            radius_km: Only return postings within this distance of ``near``
             
         Returns:
             List of matching job postings
@@ -172,13 +313,18 @@ class CompanyStore(VectorStore):
         
         if company_size:
             filter_criteria["company_size"] = company_size
-        if location:
-            filter_criteria["location"] = {"$regex": location, "$options": "i"}
+        filter_criteria.update(self.location_criteria(location, near, radius_km))
         if industry:
             filter_criteria["industry"] = industry
         if remote_policy:
             filter_criteria["remote_policy"] = remote_policy
         if salary_min:
             filter_criteria["salary_range.max"] = {"$gte": salary_min}
+        if skills:
+            filter_criteria["required_skills"] = {"$in": skills}
+        if experience_level:
+            filter_criteria["experience_level"] = experience_level
         
-        return list(self.collection.find(filter_criteria).limit(limit))
+        return list(
+            self.collection.find(filter_criteria, self.read_projection(projection, include_vectors)).limit(limit)
+        )
@@ -1,28 +1,107 @@
 """Job seeker-specific vector store operations."""
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 
+from ..domain.embedding_generation import EmbeddingGeneration, load_generation, other_generation_fields
+from ..domain.location import Coordinates, location_fields
+from ..domain.vectors import VectorLike
+from ..infrastructure.local_index.base import LocalVectorIndex
+from ..infrastructure.local_index.factory import close_local_index, open_local_index
 from .base_vector_store import VectorStore
 
 
 class JobSeekerStore(VectorStore):
     """Manages job seeker profiles with vector embeddings and filterable metadata."""
     
-    def __init__(self, collection, vector_index_name: str = "jobseeker_vector_index"):
+    # Field identifying a profile across imports
+    upsert_key = ("user_id",)
+    location_field = "desired_location"
+    chunk_collection = "profile_chunks"
+    chunk_index_name = "profile_chunk_vector_index"
+    chunk_metadata_fields = (
+        "years_of_experience", "skills", "desired_location_tokens", "desired_remote_policy",
+        "education_level", "industries_of_interest", "status"
+    )
+    
+    def __init__(
+        self,
+        collection,
+        vector_index_name: str = "jobseeker_vector_index",
+        vector_format: Optional[str] = None,
+        coarse_dimensions: Optional[int] = None,
+        generation: Optional[EmbeddingGeneration] = None,
+        local_index: Optional[LocalVectorIndex] = None
+    ):
         """
         Initialize job seeker store.
         
         Args:
             collection: MongoDB collection for job seekers
             vector_index_name: Name of the vector search index
+            vector_format: Vector storage format ("array", "float32" or "int8")
+            coarse_dimensions: Dimensions of the coarse vectors for two-stage search
+            generation: Embedding generation to read and write (defaults to the
+                active one); it picks the vector field and suffixes the index name
+            local_index: In-process index for the vector field (defaults to the
+                one VECTOR_SEARCH_BACKEND selects, if any)
+        """
+        self.generation = generation or load_generation()
+        self.vector_field = self.generation.field("profile_embedding")
+        self._base_index_name = vector_index_name
+        self._injected_local_index = local_index
+        super().__init__(
+            collection,
+            self.generation.index(vector_index_name),
+            vector_format,
+            coarse_dimensions,
+            local_index=local_index if local_index is not None else open_local_index(collection, self.vector_field),
+            vector_fields=self._stored_vector_fields()
+        )
+    
+    def _stored_vector_fields(self) -> List[str]:
+        """
+        Vector fields left out of reads.
+        
+        Returns:
+            The active generation's field, the original one and those of the
+            other generations in the generation file (e.g. a migration's
+            shadow field)
+        """
+        return [self.vector_field, "profile_embedding", *other_generation_fields("profile_embedding")]
+    
+    def reload_generation(self) -> bool:
         """
-        super().__init__(collection, vector_index_name)
+        Follow the active generation if it changed since this store was created.
+        
+        Long-lived stores (the agent tools keep one per process) call this
+        before searching, so they read the new field and index as soon as
+        ``switch_generation`` replaces the generation file. A local index
+        passed to the constructor is kept; one opened from
+        ``VECTOR_SEARCH_BACKEND`` is closed and the new field's opened.
+        
+        Returns:
+            True if the store moved to another generation
+        """
+        generation = load_generation()
+        if generation == self.generation:
+            # A migration may have started since; keep its shadow field out of reads
+            self.vector_field_names = list(dict.fromkeys(self._stored_vector_fields()))
+            return False
+        previous = self.local_index
+        self.__init__(
+            self.collection, self._base_index_name, self.vector_format, self.coarse_dimensions, generation,
+            local_index=self._injected_local_index
+        )
+        if previous is not None and previous is not self.local_index:
+            # Nothing searches the old field any more; stop mirroring it
+            close_local_index(previous)
+        return True
     
     def store_profile(
         self,
         user_id: str,
         name: str,
         profile_summary: str,
-        profile_embedding: List[float],
+        profile_embedding: VectorLike,
         years_of_experience: float,
         skills: List[str],
         desired_location: str,
@@ -32,7 +111,9 @@ class JobSeekerStore(VectorStore):
         current_title: Optional[str] = None,
         industries_of_interest: Optional[List[str]] = None,
         availability: str = "immediately",
-        additional_metadata: Optional[Dict[str, Any]] = None
+        additional_metadata: Optional[Dict[str, Any]] = None,
+        embedding_meta: Optional[Dict[str, Any]] = None,
+        location_coordinates: Optional[Coordinates] = None
     ) -> str:
         """
         Store a job seeker profile with vector embedding and filterable metadata.
@@ -52,18 +133,67 @@ class JobSeekerStore(VectorStore):
             industries_of_interest: List of industries of interest
             availability: Availability status ("immediately", "2_weeks", "1_month", "3_months")
             additional_metadata: Any additional metadata
+            embedding_meta: Source-text hash, model and dimension of the
+                embedding (see JobPortalEmbeddings.embedding_metadata)
+            location_coordinates: (longitude, latitude) of the desired
+                location, for places the built-in gazetteer doesn't know
             
         Returns:
             Inserted document ID
         """
-        document = {
+        document = self.profile_document(
+            user_id=user_id,
+            name=name,
+            profile_summary=profile_summary,
+            years_of_experience=years_of_experience,
+            skills=skills,
+            desired_location=desired_location,
+            desired_remote_policy=desired_remote_policy,
+            desired_salary_min=desired_salary_min,
+            education_level=education_level,
+            current_title=current_title,
+            industries_of_interest=industries_of_interest,
+            availability=availability,
+            additional_metadata=additional_metadata,
+            location_coordinates=location_coordinates
+        )
+        document.update(self.vector_fields(self.vector_field, profile_embedding, embedding_meta))
+        return self.insert_document(document)
+    
+    @staticmethod
+    def profile_document(
+        user_id: str,
+        name: str,
+        profile_summary: str,
+        years_of_experience: float,
+        skills: List[str],
+        desired_location: str,
+        desired_remote_policy: str = "any",
+        desired_salary_min: Optional[float] = None,
+        education_level: Optional[str] = None,
+        current_title: Optional[str] = None,
+        industries_of_interest: Optional[List[str]] = None,
+        availability: str = "immediately",
+        additional_metadata: Optional[Dict[str, Any]] = None,
+        location_coordinates: Optional[Coordinates] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a profile document without its vector fields.
+        
+        Takes the same fields as ``store_profile``, so imported records are
+        stored in the same shape.
+        
+        Returns:
+            Profile document
+        """
+        return {
             "user_id": user_id,
             "name": name,
             "profile_summary": profile_summary,
-            "profile_embedding": profile_embedding,
             "years_of_experience": years_of_experience,
             "skills": skills,
             "desired_location": desired_location,
+            **location_fields("desired_location", desired_location, location_coordinates),
             "desired_remote_policy": desired_remote_policy,
             "desired_salary_min": desired_salary_min,
             "education_level": education_level,
@@ -74,19 +204,19 @@ class JobSeekerStore(VectorStore):
             "created_at": None,  # Set by MongoDB timestamp
             **(additional_metadata or {})
         }
-        
-        return self.insert_document(document)
     
     def search_matching_jobs(
         self,
-        job_requirements_embedding: List[float],
+        job_requirements_embedding: VectorLike,
         min_experience: Optional[float] = None,
         max_experience: Optional[float] = None,
         required_skills: Optional[List[str]] = None,
         location: Optional[str] = None,
         remote_policy: Optional[str] = None,
         industry: Optional[str] = None,
-        limit: int = 10
+        limit: int = 10,
+        near: Union[None, str, Coordinates] = None,
+        radius_km: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for candidates matching job requirements.
@@ -96,10 +226,13 @@ class JobSeekerStore(VectorStore):
             min_experience: Minimum years of experience
             max_experience: Maximum years of experience
             required_skills: List of required skills
-            location: Filter by desired location
+            location: Filter by desired location (matched on its normalized tokens)
             remote_policy: Filter by remote policy preference
             industry: Filter by industry of interest
             limit: Number of results to return
+            near: Place name or (longitude, latitude) to search around
+            radius_km: Only return candidates wanting to work within this
+                distance of ``near``
             
         Returns:
             List of matching candidate profiles with similarity scores
@@ -117,8 +250,7 @@ class JobSeekerStore(VectorStore):
         if required_skills:
             filter_criteria["skills"] = {"$in": required_skills}
         
-        if location:
-            filter_criteria["desired_location"] = {"$regex": location, "$options": "i"}
+        filter_criteria.update(self.location_criteria(location, near, radius_km))
         
         if remote_policy and remote_policy != "any":
             filter_criteria["$or"] = [
@@ -134,7 +266,7 @@ class JobSeekerStore(VectorStore):
             limit=limit,
             num_candidates=limit * 10,
             filter_criteria=filter_criteria if len(filter_criteria) > 1 else None,
-            vector_field="profile_embedding"
+            vector_field=self.vector_field
         )
     
     def get_profile_by_user(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -170,7 +302,12 @@ class JobSeekerStore(VectorStore):
         location: Optional[str] = None,
         education_level: Optional[str] = None,
         availability: Optional[str] = None,
-        limit: int = 50
+        remote_policy: Optional[str] = None,
+        limit: int = 50,
+        projection: Optional[Dict[str, Any]] = None,
+        include_vectors: bool = False,
+        near: Union[None, str, Coordinates] = None,
+        radius_km: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Filter candidates by metadata only (no vector search).
@@ -179,10 +316,16 @@ class JobSeekerStore(VectorStore):
             min_experience: Minimum years of experience
             max_experience: Maximum years of experience
             skills: Required skills (any match)
-            location: Filter by desired location
+            location: Filter by desired location (matched on its normalized tokens)
             education_level: Filter by education level
             availability: Filter by availability
+            remote_policy: Filter by desired remote policy
             limit: Maximum number of results
+            projection: Fields to return (defaults to everything but vectors)
+            include_vectors: If True, also return the vector fields
+            near: Place name or (longitude, latitude) to search around
+            radius_km: Only return candidates wanting to work within this
+                distance of ``near``
             
         Returns:
             List of matching profiles
@@ -200,8 +343,7 @@ class JobSeekerStore(VectorStore):
         if skills:
             filter_criteria["skills"] = {"$in": skills}
         
-        if location:
-            filter_criteria["desired_location"] = {"$regex": location, "$options": "i"}
+        filter_criteria.update(self.location_criteria(location, near, radius_km))
         
         if education_level:
             filter_criteria["education_level"] = education_level
@@ -209,4 +351,9 @@ class JobSeekerStore(VectorStore):
         if availability:
             filter_criteria["availability"] = availability
         
-        return list(self.collection.find(filter_criteria).limit(limit))
+        if remote_policy:
+            filter_criteria["desired_remote_policy"] = remote_policy
+        
+        return list(
+            self.collection.find(filter_criteria, self.read_projection(projection, include_vectors)).limit(limit)
+        )
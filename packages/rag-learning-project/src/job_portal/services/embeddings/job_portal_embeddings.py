@@ -1,26 +1,339 @@
 """High-level embedding functions for job portal use cases."""
-from typing import Dict, List, Any
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Union
+
+import numpy as np
 
 try:
     from ...infrastructure.voyage.embedding_service import VoyageEmbeddingService
+    from ...infrastructure.voyage.async_embedding_service import AsyncVoyageEmbeddingService
+    from ...infrastructure.voyage.embedding_cache import EmbeddingCache
+    from ...infrastructure.voyage.sidecar import SidecarProvider
+    from ...infrastructure.providers.base import EmbeddingProvider
+    from ...infrastructure.providers.hashing import HashingEmbeddingProvider
+    from ...domain.embedding_generation import EmbeddingGeneration, load_generation
+    from ...domain.vectors import Matrix, Vector
+    from .query_canonicalizer import canonical_experience_level, canonical_skills, normalize_text
+    from .query_memo import QueryMemo
 except ImportError:
     from job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+    from job_portal.infrastructure.voyage.async_embedding_service import AsyncVoyageEmbeddingService
+    from job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
+    from job_portal.infrastructure.voyage.sidecar import SidecarProvider
+    from job_portal.infrastructure.providers.base import EmbeddingProvider
+    from job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+    from job_portal.domain.embedding_generation import EmbeddingGeneration, load_generation
+    from job_portal.domain.vectors import Matrix, Vector
+    from job_portal.services.embeddings.query_canonicalizer import (
+        canonical_experience_level,
+        canonical_skills,
+        normalize_text,
+    )
+    from job_portal.services.embeddings.query_memo import QueryMemo
 
 
 class JobPortalEmbeddings:
     """
     High-level interface for generating embeddings for job portal entities.
     Handles job postings, candidate profiles, and search queries.
+    
+    Every ``embed_*`` method has an ``aembed_*`` coroutine counterpart that
+    runs on a shared ``AsyncVoyageEmbeddingService``.
+    
+    Set ``EMBEDDING_PROVIDER=local`` (or pass a provider) to embed offline
+    with the CPU-only hashing provider instead of Voyage AI, or
+    ``EMBEDDING_PROVIDER=sidecar`` to send requests to the shared embedding
+    sidecar at ``EMBEDDING_SIDECAR_URL``.
+    
+    Structured search queries are canonicalized (case, whitespace, skill
+    order, experience-level vocabulary) before embedding and memoized on the
+    canonical text; ``query_memo.stats()`` shows how many calls were saved.
     """
     
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        cache: Optional[EmbeddingCache] = None,
+        use_cache: bool = True,
+        coalesce_window: Optional[float] = None,
+        max_concurrency: int = 4,
+        provider: Optional[EmbeddingProvider] = None,
+        query_memo: Optional[QueryMemo] = None,
+        generation: Optional[EmbeddingGeneration] = None
+    ):
         """
         Initialize job portal embeddings.
         
         Args:
             api_key: Voyage AI API key (optional, uses env var if not provided)
+            cache: Embedding cache to use (defaults to one configured from env vars)
+            use_cache: Set to False to call the Voyage API for every request
+            coalesce_window: Seconds to collect concurrent requests into one
+                API call (defaults to EMBEDDING_COALESCE_WINDOW_MS, off if unset)
+            max_concurrency: Maximum concurrent requests for the async methods
+            provider: Embedding backend (defaults to Voyage AI, the local
+                hashing provider when EMBEDDING_PROVIDER=local, or the
+                embedding sidecar when EMBEDDING_PROVIDER=sidecar)
+            query_memo: Memo for structured search query embeddings
+                (defaults to one configured from env vars)
+            generation: Embedding generation whose Voyage model and dimension
+                are used (defaults to the active one, so query vectors match
+                the fields the stores read)
+        """
+        self.generation = generation or load_generation()
+        self._configured_provider = provider
+        provider = self._select_provider(provider, self.generation)
+        # The sidecar already caches and coalesces for every process
+        shared = isinstance(provider, SidecarProvider)
+        if cache is None and use_cache and not shared:
+            cache = EmbeddingCache.from_env()
+        if coalesce_window is None and not shared and os.getenv("EMBEDDING_COALESCE_WINDOW_MS"):
+            coalesce_window = float(os.getenv("EMBEDDING_COALESCE_WINDOW_MS")) / 1000
+        self._api_key = api_key
+        self._provider = provider
+        self._cache = cache
+        self._coalesce_window = coalesce_window
+        self._max_concurrency = max_concurrency
+        self.embedding_service = self._create_embedding_service()
+        self._async_service: Optional[AsyncVoyageEmbeddingService] = None
+        self._retired_async_services: List[AsyncVoyageEmbeddingService] = []
+        self.query_memo = query_memo if query_memo is not None else QueryMemo.from_env()
+    
+    @staticmethod
+    def _select_provider(
+        provider: Optional[EmbeddingProvider],
+        generation: EmbeddingGeneration
+    ) -> Optional[EmbeddingProvider]:
+        """The caller's provider, or the one EMBEDDING_PROVIDER selects (None for Voyage AI)."""
+        provider_name = os.getenv("EMBEDDING_PROVIDER", "voyage").lower()
+        if provider is None and provider_name == "local":
+            provider = HashingEmbeddingProvider(output_dimension=generation.output_dimension)
+        elif provider is None and provider_name == "sidecar":
+            provider = SidecarProvider.from_env()
+        return provider
+    
+    def _create_embedding_service(self) -> VoyageEmbeddingService:
+        """Create the sync embedding service for the current generation."""
+        return VoyageEmbeddingService(
+            api_key=self._api_key,
+            model=self.generation.model,
+            output_dimension=self.generation.output_dimension,
+            cache=self._cache,
+            coalesce_window=self._coalesce_window,
+            provider=self._provider
+        )
+    
+    def reload_generation(self) -> bool:
+        """
+        Follow the active generation if it changed since this instance was created.
+        
+        Long-lived instances (the agent tools keep one per process) call this
+        before embedding queries, so query vectors move to the new model as
+        soon as ``switch_generation`` replaces the generation file. Memoized
+        query vectors belong to the old model and are dropped.
+        
+        Returns:
+            True if the embeddings moved to another generation
+        """
+        generation = load_generation()
+        if generation == self.generation:
+            return False
+        self.generation = generation
+        self._provider = self._select_provider(self._configured_provider, generation)
+        self.embedding_service = self._create_embedding_service()
+        # Created again on next use; aclose releases the old one's connections
+        if self._async_service is not None:
+            self._retired_async_services.append(self._async_service)
+        self._async_service = None
+        self.query_memo.clear()
+        return True
+    
+    @property
+    def async_embedding_service(self) -> AsyncVoyageEmbeddingService:
+        """Get or create the async embedding service (shares the sync service's cache)."""
+        if self._async_service is None:
+            self._async_service = AsyncVoyageEmbeddingService(
+                api_key=self._api_key,
+                model=self.generation.model,
+                output_dimension=self.generation.output_dimension,
+                cache=self._cache,
+                max_concurrency=self._max_concurrency,
+                provider=self._provider
+            )
+        return self._async_service
+    
+    @staticmethod
+    def _job_posting_text(
+        job_title: str,
+        job_description: str,
+        required_skills: List[str],
+        experience_level: str = None,
+        additional_context: str = None
+    ) -> str:
+        """Construct comprehensive job requirements text."""
+        requirements_text = f"Job Title: {job_title}\n\n"
+        
+        if experience_level:
+            requirements_text += f"Experience Level: {experience_level}\n\n"
+        
+        requirements_text += f"Description:\n{job_description}\n\n"
+        
+        if required_skills:
+            requirements_text += f"Required Skills: {', '.join(required_skills)}\n\n"
+        
+        if additional_context:
+            requirements_text += f"Additional Requirements:\n{additional_context}"
+        
+        return requirements_text
+    
+    @staticmethod
+    def _candidate_profile_text(
+        name: str,
+        current_title: str,
+        profile_summary: str,
+        skills: List[str],
+        years_of_experience: float,
+        education: str = None,
+        work_history: str = None
+    ) -> str:
+        """Construct comprehensive profile text."""
+        profile_text = f"Candidate: {name}\n"
+        profile_text += f"Current Title: {current_title}\n"
+        profile_text += f"Experience: {years_of_experience} years\n\n"
+        
+        if education:
+            profile_text += f"Education: {education}\n\n"
+        
+        profile_text += f"Professional Summary:\n{profile_summary}\n\n"
+        profile_text += f"Skills: {', '.join(skills)}\n\n"
+        
+        if work_history:
+            profile_text += f"Work History:\n{work_history}"
+        
+        return profile_text
+    
+    @staticmethod
+    def _job_search_query_text(
+        desired_role: str = None,
+        desired_skills: List[str] = None,
+        experience_level: str = None,
+        additional_preferences: str = None
+    ) -> str:
+        """Construct a canonical job search query from candidate preferences."""
+        desired_role = normalize_text(desired_role)
+        desired_skills = canonical_skills(desired_skills)
+        experience_level = canonical_experience_level(experience_level)
+        additional_preferences = normalize_text(additional_preferences)
+        query_text = ""
+        
+        if desired_role:
+            query_text += f"Looking for: {desired_role}\n"
+        
+        if experience_level:
+            query_text += f"Experience level: {experience_level}\n"
+        
+        if desired_skills:
+            query_text += f"Skills: {', '.join(desired_skills)}\n"
+        
+        if additional_preferences:
+            query_text += f"\n{additional_preferences}"
+        
+        return query_text.strip()
+    
+    @staticmethod
+    def _candidate_search_query_text(
+        job_title: str,
+        required_skills: List[str] = None,
+        experience_level: str = None,
+        additional_requirements: str = None
+    ) -> str:
+        """Construct a canonical candidate search query from job requirements."""
+        job_title = normalize_text(job_title)
+        required_skills = canonical_skills(required_skills)
+        experience_level = canonical_experience_level(experience_level)
+        additional_requirements = normalize_text(additional_requirements)
+        query_text = f"Searching for candidates for: {job_title}\n"
+        
+        if experience_level:
+            query_text += f"Experience level: {experience_level}\n"
+        
+        if required_skills:
+            query_text += f"Required skills: {', '.join(required_skills)}\n"
+        
+        if additional_requirements:
+            query_text += f"\n{additional_requirements}"
+        
+        return query_text.strip()
+    
+    @staticmethod
+    def job_posting_document_text(document: Dict[str, Any]) -> str:
+        """
+        Rebuild the embedded text of a stored job posting.
+        
+        Args:
+            document: Job posting document as stored by CompanyStore
+        
+        Returns:
+            The text ``embed_job_posting`` embeds for these fields
         """
-        self.embedding_service = VoyageEmbeddingService(api_key=api_key)
+        return JobPortalEmbeddings._job_posting_text(
+            document.get("job_title", ""),
+            document.get("job_description", ""),
+            document.get("required_skills") or [],
+            document.get("experience_level"),
+            document.get("additional_context")
+        )
+    
+    @staticmethod
+    def candidate_profile_document_text(document: Dict[str, Any]) -> str:
+        """
+        Rebuild the embedded text of a stored candidate profile.
+        
+        Args:
+            document: Profile document as stored by JobSeekerStore
+        
+        Returns:
+            The text ``embed_candidate_profile`` embeds for these fields
+        """
+        return JobPortalEmbeddings._candidate_profile_text(
+            document.get("name", ""),
+            document.get("current_title", ""),
+            document.get("profile_summary", ""),
+            document.get("skills") or [],
+            document.get("years_of_experience"),
+            document.get("education") or document.get("education_level"),
+            document.get("work_history")
+        )
+    
+    def embedding_metadata(self, text: str) -> Dict[str, Any]:
+        """
+        Describe what an embedding of ``text`` was computed from.
+        
+        Stored next to a vector, this tells later jobs whether the vector is
+        out of date with its text, model or dimension.
+        
+        Args:
+            text: Embedded text
+        
+        Returns:
+            Dict with 'text_hash', 'model', 'dimension' and 'updated_at'
+        """
+        return {
+            "text_hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            "model": self.embedding_service.model,
+            "dimension": self.embedding_service.output_dimension,
+            "updated_at": datetime.now(timezone.utc)
+        }
+    
+    @staticmethod
+    def _primary_embedding(embedding_result: Union[Vector, Dict[str, Any]]) -> Vector:
+        """Pick the embedding that represents a whole (possibly chunked) document."""
+        # If chunked, use the first chunk (usually contains title + key info)
+        if isinstance(embedding_result, dict):
+            return embedding_result["embeddings"][0]
+        return embedding_result
     
     def embed_job_posting(
         self,
@@ -29,7 +342,7 @@ class JobPortalEmbeddings:
         required_skills: List[str],
         experience_level: str = None,
         additional_context: str = None
-    ) -> List[float]:
+    ) -> Vector:
         """
         Generate embedding for a job posting.
         
@@ -43,33 +356,16 @@ class JobPortalEmbeddings:
         Returns:
             Embedding vector for the job requirements
         """
-        # Construct comprehensive job requirements text
-        requirements_text = f"Job Title: {job_title}\n\n"
-        
-        if experience_level:
-            requirements_text += f"Experience Level: {experience_level}\n\n"
-        
-        requirements_text += f"Description:\n{job_description}\n\n"
-        
-        if required_skills:
-            requirements_text += f"Required Skills: {', '.join(required_skills)}\n\n"
-        
-        if additional_context:
-            requirements_text += f"Additional Requirements:\n{additional_context}"
+        requirements_text = self._job_posting_text(
+            job_title, job_description, required_skills, experience_level, additional_context
+        )
         
         # Generate embedding (auto-chunk if needed)
         embedding_result = self.embedding_service.embed_document(
             requirements_text,
             auto_chunk=True
         )
-        
-        # If chunked, return the first chunk's embedding (most important context)
-        # or average all chunks
-        if isinstance(embedding_result, dict):
-            # For job postings, use first chunk (usually contains title + key info)
-            return embedding_result["embeddings"][0]
-        else:
-            return embedding_result
+        return self._primary_embedding(embedding_result)
     
     def embed_candidate_profile(
         self,
@@ -80,7 +376,7 @@ class JobPortalEmbeddings:
         years_of_experience: float,
         education: str = None,
         work_history: str = None
-    ) -> List[float]:
+    ) -> Vector:
         """
         Generate embedding for a candidate profile.
         
@@ -96,51 +392,71 @@ class JobPortalEmbeddings:
         Returns:
             Embedding vector for the candidate profile
         """
-        # Construct comprehensive profile text
-        profile_text = f"Candidate: {name}\n"
-        profile_text += f"Current Title: {current_title}\n"
-        profile_text += f"Experience: {years_of_experience} years\n\n"
-        
-        if education:
-            profile_text += f"Education: {education}\n\n"
-        
-        profile_text += f"Professional Summary:\n{profile_summary}\n\n"
-        profile_text += f"Skills: {', '.join(skills)}\n\n"
-        
-        if work_history:
-            profile_text += f"Work History:\n{work_history}"
+        profile_text = self._candidate_profile_text(
+            name, current_title, profile_summary, skills,
+            years_of_experience, education, work_history
+        )
         
         # Generate embedding (auto-chunk if needed)
         embedding_result = self.embedding_service.embed_document(
             profile_text,
             auto_chunk=True
         )
+        return self._primary_embedding(embedding_result)
+    
+    def embed_document_texts(self, texts: List[str]) -> List[Vector]:
+        """
+        Embed already-built document texts in one call.
         
-        # If chunked, return the first chunk's embedding
-        if isinstance(embedding_result, dict):
-            return embedding_result["embeddings"][0]
-        else:
-            return embedding_result
+        Each text is chunked and reduced to its primary embedding exactly
+        as ``embed_job_posting`` / ``embed_candidate_profile`` do, so the
+        vectors (and cache entries) are the same as embedding them one by one.
+        
+        Args:
+            texts: Texts from ``job_posting_document_text`` or
+                ``candidate_profile_document_text``
+        
+        Returns:
+            One embedding vector per text, in order
+        """
+        splitter = self.embedding_service.text_splitter
+        inputs = []
+        for text in texts:
+            chunks = splitter.split_text(text)
+            inputs.append(chunks if len(chunks) > 1 else [text])
+        return [matrix[0] for matrix in self.embedding_service.embed_inputs(inputs, input_type="document")]
     
-    def embed_search_query(self, query: str) -> List[float]:
+    def embed_search_query(self, query: str, max_wait: Optional[float] = None) -> Vector:
         """
         Generate embedding for a search query.
         
         Args:
             query: Search query text
+            max_wait: If set, fail with ``RateLimitTimeout`` instead of
+                waiting longer than this many seconds for rate-limit budget
             
         Returns:
             Query embedding vector
         """
+        if max_wait is not None:
+            return self.embedding_service.embed_query(query, max_wait=max_wait)
         return self.embedding_service.embed_query(query)
     
+    def _embed_canonical_query(self, query_text: str) -> Vector:
+        """Embed a canonical query, serving repeats from the query memo."""
+        vector = self.query_memo.get(query_text)
+        if vector is None:
+            vector = self.embed_search_query(query_text)
+            self.query_memo.put(query_text, vector)
+        return vector
+    
     def embed_job_search_query(
         self,
         desired_role: str = None,
         desired_skills: List[str] = None,
         experience_level: str = None,
         additional_preferences: str = None
-    ) -> List[float]:
+    ) -> Vector:
         """
         Generate embedding for a job search query from candidate preferences.
         
@@ -153,21 +469,9 @@ class JobPortalEmbeddings:
         Returns:
             Query embedding vector
         """
-        query_text = ""
-        
-        if desired_role:
-            query_text += f"Looking for: {desired_role}\n"
-        
-        if experience_level:
-            query_text += f"Experience level: {experience_level}\n"
-        
-        if desired_skills:
-            query_text += f"Skills: {', '.join(desired_skills)}\n"
-        
-        if additional_preferences:
-            query_text += f"\n{additional_preferences}"
-        
-        return self.embed_search_query(query_text.strip())
+        return self._embed_canonical_query(self._job_search_query_text(
+            desired_role, desired_skills, experience_level, additional_preferences
+        ))
     
     def embed_candidate_search_query(
         self,
@@ -175,7 +479,7 @@ class JobPortalEmbeddings:
         required_skills: List[str] = None,
         experience_level: str = None,
         additional_requirements: str = None
-    ) -> List[float]:
+    ) -> Vector:
         """
         Generate embedding for a candidate search query from job requirements.
         
@@ -188,15 +492,163 @@ class JobPortalEmbeddings:
         Returns:
             Query embedding vector
         """
-        query_text = f"Searching for candidates for: {job_title}\n"
+        return self._embed_canonical_query(self._candidate_search_query_text(
+            job_title, required_skills, experience_level, additional_requirements
+        ))
         
-        if experience_level:
-            query_text += f"Experience level: {experience_level}\n"
+    def job_posting_chunks(
+        self,
+        job_title: str,
+        job_description: str,
+        required_skills: List[str],
+        experience_level: str = None,
+        additional_context: str = None
+    ) -> List[str]:
+        """
+        Split a job posting into the chunks stored in a ChunkStore.
         
-        if required_skills:
-            query_text += f"Required skills: {', '.join(required_skills)}\n"
+        Args:
+            job_title: Job title
+            job_description: Full job description
+            required_skills: List of required skills
+            experience_level: Experience level (entry, mid, senior, lead)
+            additional_context: Any additional context
         
-        if additional_requirements:
-            query_text += f"\n{additional_requirements}"
+        Returns:
+            Chunk texts, in order
+        """
+        return self.embedding_service.text_splitter.split_text(self._job_posting_text(
+            job_title, job_description, required_skills, experience_level, additional_context
+        ))
+    
+    def candidate_profile_chunks(
+        self,
+        name: str,
+        current_title: str,
+        profile_summary: str,
+        skills: List[str],
+        years_of_experience: float,
+        education: str = None,
+        work_history: str = None
+    ) -> List[str]:
+        """
+        Split a candidate profile into the chunks stored in a ChunkStore.
         
-        return self.embed_search_query(query_text.strip())
+        Args:
+            name: Candidate name
+            current_title: Current or most recent job title
+            profile_summary: Professional summary
+            skills: List of skills
+            years_of_experience: Years of experience
+            education: Education background
+            work_history: Work history details
+        
+        Returns:
+            Chunk texts, in order
+        """
+        return self.embedding_service.text_splitter.split_text(self._candidate_profile_text(
+            name, current_title, profile_summary, skills,
+            years_of_experience, education, work_history
+        ))
+    
+    def embed_chunks(self, chunks: List[str]) -> Matrix:
+        """
+        Embed chunks of one document, one vector per chunk.
+        
+        Pass this as ``embed_fn`` to ``ChunkStore.sync_chunks``. The chunks
+        are embedded together as one contextualized input, so when only some
+        chunks of a document changed they share context with each other
+        rather than with the whole document.
+        
+        Args:
+            chunks: Chunk texts
+        
+        Returns:
+            Chunk embedding vectors, in order
+        """
+        if not chunks:
+            return np.zeros((0, self.embedding_service.output_dimension), dtype=np.float32)
+        return self.embedding_service.embed_inputs([chunks], input_type="document")[0]
+    
+    async def aembed_job_posting(
+        self,
+        job_title: str,
+        job_description: str,
+        required_skills: List[str],
+        experience_level: str = None,
+        additional_context: str = None
+    ) -> Vector:
+        """Async version of ``embed_job_posting``."""
+        requirements_text = self._job_posting_text(
+            job_title, job_description, required_skills, experience_level, additional_context
+        )
+        embedding_result = await self.async_embedding_service.embed_document(
+            requirements_text,
+            auto_chunk=True
+        )
+        return self._primary_embedding(embedding_result)
+        
+    async def aembed_candidate_profile(
+        self,
+        name: str,
+        current_title: str,
+        profile_summary: str,
+        skills: List[str],
+        years_of_experience: float,
+        education: str = None,
+        work_history: str = None
+    ) -> Vector:
+        """Async version of ``embed_candidate_profile``."""
+        profile_text = self._candidate_profile_text(
+            name, current_title, profile_summary, skills,
+            years_of_experience, education, work_history
+        )
+        embedding_result = await self.async_embedding_service.embed_document(
+            profile_text,
+            auto_chunk=True
+        )
+        return self._primary_embedding(embedding_result)
+        
+    async def aembed_search_query(self, query: str) -> Vector:
+        """Async version of ``embed_search_query``."""
+        return await self.async_embedding_service.embed_query(query)
+        
+    async def _aembed_canonical_query(self, query_text: str) -> Vector:
+        """Async version of ``_embed_canonical_query``."""
+        vector = self.query_memo.get(query_text)
+        if vector is None:
+            vector = await self.aembed_search_query(query_text)
+            self.query_memo.put(query_text, vector)
+        return vector
+    
+    async def aembed_job_search_query(
+        self,
+        desired_role: str = None,
+        desired_skills: List[str] = None,
+        experience_level: str = None,
+        additional_preferences: str = None
+    ) -> Vector:
+        """Async version of ``embed_job_search_query``."""
+        return await self._aembed_canonical_query(self._job_search_query_text(
+            desired_role, desired_skills, experience_level, additional_preferences
+        ))
+
+    async def aembed_candidate_search_query(
+        self,
+        job_title: str,
+        required_skills: List[str] = None,
+        experience_level: str = None,
+        additional_requirements: str = None
+    ) -> Vector:
+        """Async version of ``embed_candidate_search_query``."""
+        return await self._aembed_canonical_query(self._candidate_search_query_text(
+            job_title, required_skills, experience_level, additional_requirements
+        ))
+    
+    async def aclose(self):
+        """Release the async service's HTTP connections."""
+        for service in self._retired_async_services:
+            await service.aclose()
+        self._retired_async_services = []
+        if self._async_service is not None:
+            await self._async_service.aclose()
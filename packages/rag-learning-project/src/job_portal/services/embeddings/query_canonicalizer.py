@@ -0,0 +1,68 @@
+"""Canonical forms for structured search queries, so equivalent queries embed identically."""
+import re
+from typing import Iterable, List, Optional
+
+
+# Free-form experience levels -> the vocabulary stored on postings
+EXPERIENCE_LEVEL_ALIASES = {
+    "entry": "entry",
+    "entry level": "entry",
+    "junior": "entry",
+    "jr": "entry",
+    "graduate": "entry",
+    "intern": "entry",
+    "mid": "mid",
+    "mid level": "mid",
+    "middle": "mid",
+    "intermediate": "mid",
+    "senior": "senior",
+    "sr": "senior",
+    "lead": "lead",
+    "principal": "lead",
+    "staff": "lead",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_LEVEL_SEPARATORS = re.compile(r"[\s\-_.]+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """
+    Case-fold text and collapse runs of whitespace.
+    
+    Args:
+        text: Free text (None is treated as empty)
+    
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def canonical_skills(skills: Optional[Iterable[str]]) -> List[str]:
+    """
+    Normalize, deduplicate and sort a skill list.
+    
+    Args:
+        skills: Skills in any order and casing
+    
+    Returns:
+        Sorted list of distinct normalized skills
+    """
+    return sorted({normalize_text(skill) for skill in skills or ()} - {""})
+
+
+def canonical_experience_level(level: Optional[str]) -> str:
+    """
+    Map an experience level onto the entry/mid/senior/lead vocabulary.
+    
+    Args:
+        level: Experience level as typed (e.g. "Sr.", "Mid-Level", "junior")
+    
+    Returns:
+        Canonical level, or the normalized input if it is not a known alias
+    """
+    key = _LEVEL_SEPARATORS.sub(" ", normalize_text(level)).strip()
+    return EXPERIENCE_LEVEL_ALIASES.get(key, key)
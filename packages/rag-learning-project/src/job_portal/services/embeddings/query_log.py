@@ -0,0 +1,143 @@
+"""Compact rotating log of search queries, used to warm the embedding cache."""
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+DEFAULT_PATH = os.path.join(".query_log", "queries.jsonl")
+
+
+class QueryLog:
+    """
+    Appends canonical search query texts to a size-bounded JSONL file.
+    
+    Each line is ``{"t": unix time, "k": kind, "q": query}``. When the file
+    would grow past ``max_bytes`` it is rotated to ``<path>.1`` (older
+    files shift up to ``<path>.<backups>`` and the oldest is dropped), so
+    the log never takes more than about ``max_bytes * (backups + 1)``.
+    Logging never raises: a search must not fail because its query could
+    not be recorded.
+    """
+    
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        max_bytes: int = 1024 * 1024,
+        backups: int = 3,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize query log.
+        
+        Args:
+            path: JSONL file to append to (parent directories are created)
+            max_bytes: Size at which the file is rotated
+            backups: Number of rotated files kept
+            clock: Time source (unix seconds)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._clock = clock
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_env(cls) -> Optional["QueryLog"]:
+        """
+        Create a log configured from environment variables.
+        
+        ``QUERY_LOG_PATH`` sets the file (``off`` disables logging) and
+        ``QUERY_LOG_MAX_BYTES`` the rotation size.
+        
+        Returns:
+            Query log, or None if disabled
+        """
+        path = os.getenv("QUERY_LOG_PATH", DEFAULT_PATH)
+        if not path or path.lower() == "off":
+            return None
+        return cls(path=path, max_bytes=int(os.getenv("QUERY_LOG_MAX_BYTES", str(1024 * 1024))))
+    
+    def _files(self) -> List[str]:
+        """Log files from oldest to newest."""
+        rotated = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)]
+        return [path for path in rotated + [self.path] if os.path.exists(path)]
+    
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+    
+    def append(self, query: str, kind: str = "search") -> None:
+        """
+        Record one search query.
+        
+        Args:
+            query: Canonical query text (the exact text that is embedded)
+            kind: Which search issued it (e.g. "jobs", "candidates")
+        """
+        if not query:
+            return
+        line = json.dumps({"t": round(self._clock(), 3), "k": kind, "q": query}, ensure_ascii=False) + "\n"
+        data = line.encode("utf-8")
+        try:
+            with self._lock:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+                    self._rotate()
+                # One write per line in append mode keeps lines whole across processes
+                with open(self.path, "ab") as handle:
+                    handle.write(data)
+        except OSError:
+            pass
+    
+    def entries(self) -> Iterator[Dict[str, object]]:
+        """
+        Read logged queries, oldest file first.
+        
+        Yields:
+            Dicts with "t" (unix time), "k" (kind) and "q" (query); corrupt
+            lines are skipped
+        """
+        for path in self._files():
+            try:
+                with open(path, "r", encoding="utf-8") as handle:
+                    for line in handle:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if isinstance(entry, dict) and entry.get("q"):
+                            yield entry
+            except OSError:
+                continue
+
+
+_default_log: Optional[QueryLog] = None
+_default_loaded = False
+_default_lock = threading.Lock()
+
+
+def get_query_log() -> Optional[QueryLog]:
+    """Get the process-wide query log (None if disabled via QUERY_LOG_PATH=off)."""
+    global _default_log, _default_loaded
+    with _default_lock:
+        if not _default_loaded:
+            _default_log = QueryLog.from_env()
+            _default_loaded = True
+        return _default_log
+
+
+def set_query_log(log: Optional[QueryLog]) -> None:
+    """Replace the process-wide query log (None disables logging)."""
+    global _default_log, _default_loaded
+    with _default_lock:
+        _default_log = log
+        _default_loaded = True
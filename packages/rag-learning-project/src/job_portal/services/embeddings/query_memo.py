@@ -0,0 +1,125 @@
+"""Bounded TTL memo for query embeddings."""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from ...domain.vectors import Vector, VectorLike, as_vector
+except ImportError:
+    from job_portal.domain.vectors import Vector, VectorLike, as_vector
+
+
+class QueryMemo:
+    """
+    Remembers query embeddings by canonical query text.
+    
+    Entries expire ``ttl`` seconds after they are stored and the least
+    recently used entry is dropped once ``max_entries`` is reached. Every
+    hit is a query that did not reach the embedding service.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize query memo.
+        
+        Args:
+            max_entries: Maximum number of remembered queries
+            ttl: Seconds an entry stays valid
+            clock: Time source (monotonic seconds)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Vector]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+    
+    @classmethod
+    def from_env(cls) -> "QueryMemo":
+        """
+        Create a memo configured from environment variables.
+        
+        ``QUERY_MEMO_MAX_ENTRIES`` sets the size bound and
+        ``QUERY_MEMO_TTL_SECONDS`` the entry lifetime.
+        """
+        return cls(
+            max_entries=int(os.getenv("QUERY_MEMO_MAX_ENTRIES", "1024")),
+            ttl=float(os.getenv("QUERY_MEMO_TTL_SECONDS", "3600"))
+        )
+    
+    def get(self, key: str) -> Optional[Vector]:
+        """
+        Look up a remembered query embedding.
+        
+        Args:
+            key: Canonical query text
+        
+        Returns:
+            The embedding (read-only), or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, vector = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+    
+    def put(self, key: str, vector: VectorLike) -> None:
+        """
+        Remember a query embedding.
+        
+        Args:
+            key: Canonical query text
+            vector: Query embedding
+        """
+        if self.max_entries <= 0:
+            return
+        vector = as_vector(vector).copy()
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + self.ttl, vector)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters.
+        
+        Returns:
+            Dict with hits (embedding calls saved), misses, hit ratio,
+            expirations, evictions and current entry count
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+            }
+    
+    def clear(self) -> None:
+        """Forget all entries."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,160 @@
+"""Extract metadata filters from free-text requirements for keyword search."""
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from ..embeddings.query_canonicalizer import EXPERIENCE_LEVEL_ALIASES
+except ImportError:
+    from job_portal.services.embeddings.query_canonicalizer import EXPERIENCE_LEVEL_ALIASES
+
+
+# Skills recognized in requirement text, in the casing stored on documents
+KNOWN_SKILLS = (
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C++", "C#", "Ruby", "PHP",
+    "Scala", "Kotlin", "Swift", "SQL", "Django", "FastAPI", "Flask", "Spring", "React",
+    "Angular", "Vue", "Node.js", "Next.js", "PostgreSQL", "MySQL", "MongoDB", "Redis",
+    "Kafka", "Spark", "Airflow", "Docker", "Kubernetes", "Terraform", "AWS", "GCP", "Azure",
+    "TensorFlow", "PyTorch", "MLOps", "Machine Learning", "Data Engineering",
+    "Data Pipelines", "Distributed Systems", "REST APIs", "GraphQL",
+)
+
+SKILL_ALIASES = {
+    "golang": "Go",
+    "js": "JavaScript",
+    "ts": "TypeScript",
+    "node": "Node.js",
+    "nodejs": "Node.js",
+    "postgres": "PostgreSQL",
+    "k8s": "Kubernetes",
+    "ml": "Machine Learning",
+}
+
+REMOTE_POLICY_PATTERNS = (
+    ("remote", re.compile(r"\b(?:fully[\s-]+)?remote\b", re.I)),
+    ("hybrid", re.compile(r"\bhybrid\b", re.I)),
+    ("onsite", re.compile(r"\b(?:on[\s-]?site|in[\s-]office)\b", re.I)),
+)
+
+# Years of experience that correspond to each level, for candidate profiles
+EXPERIENCE_YEARS = {
+    "entry": (None, 2.0),
+    "mid": (2.0, 5.0),
+    "senior": (5.0, None),
+    "lead": (8.0, None),
+}
+
+# "in Berlin", "based in San Francisco, CA", "near New York"
+_LOCATION = re.compile(
+    r"\b(?:in|near|based in|located in)\s+((?:[A-Z][\w.'-]*)(?:(?:\s+|,\s*)[A-Z][\w.'-]*)*)"
+)
+_NOT_LOCATIONS = {"remote", "hybrid", "office"}
+
+
+def _term_pattern(term: str, ignore_case: bool = True) -> "re.Pattern[str]":
+    # Word boundaries that also work for terms ending in symbols (C++, C#, Node.js)
+    return re.compile(r"(?<![\w.#+])" + re.escape(term) + r"(?![\w#+])", re.I if ignore_case else 0)
+
+
+# Short names like "Go" only count when capitalized as a name
+_SKILL_PATTERNS = [(skill, _term_pattern(skill, ignore_case=len(skill) > 2)) for skill in KNOWN_SKILLS] + [
+    (skill, _term_pattern(alias)) for alias, skill in SKILL_ALIASES.items()
+]
+_LEVEL_PATTERNS = [
+    (level, _term_pattern(alias))
+    for alias, level in sorted(EXPERIENCE_LEVEL_ALIASES.items(), key=lambda item: -len(item[0]))
+]
+
+
+def extract_skills(text: str) -> List[str]:
+    """
+    Find known skills mentioned in text.
+    
+    Args:
+        text: Free-text requirements
+    
+    Returns:
+        Skills in stored casing, in order of first mention
+    """
+    positions: Dict[str, int] = {}
+    for skill, pattern in _SKILL_PATTERNS:
+        match = pattern.search(text)
+        if match and match.start() < positions.get(skill, len(text)):
+            positions[skill] = match.start()
+    return sorted(positions, key=positions.get)
+
+
+def extract_remote_policy(text: str) -> Optional[str]:
+    """Find a remote policy (remote, hybrid or onsite) mentioned in text."""
+    for policy, pattern in REMOTE_POLICY_PATTERNS:
+        if pattern.search(text):
+            return policy
+    return None
+
+
+def extract_experience_level(text: str) -> Optional[str]:
+    """Find an experience level (entry, mid, senior or lead) mentioned in text."""
+    for level, pattern in _LEVEL_PATTERNS:
+        if pattern.search(text):
+            return level
+    return None
+
+
+def extract_location(text: str) -> Optional[str]:
+    """Find a capitalized place name introduced by "in", "near" or "based in"."""
+    for match in _LOCATION.finditer(text):
+        location = match.group(1).strip(" ,.")
+        # "experience in Python" names a skill, not a place
+        if location.casefold() not in _NOT_LOCATIONS and not extract_skills(location):
+            return location
+    return None
+
+
+def extract_filters(text: str) -> Dict[str, Any]:
+    """
+    Extract metadata filters from free-text requirements.
+    
+    Used when embeddings are unavailable, so a search can still be answered
+    from document metadata.
+    
+    Args:
+        text: Requirements, e.g. "Senior Python developer, remote, in Berlin"
+    
+    Returns:
+        Dict with the filters found among skills, location, remote_policy
+        and experience_level (absent keys were not mentioned)
+    """
+    filters: Dict[str, Any] = {
+        "skills": extract_skills(text),
+        "location": extract_location(text),
+        "remote_policy": extract_remote_policy(text),
+        "experience_level": extract_experience_level(text),
+    }
+    return {key: value for key, value in filters.items() if value}
+
+
+def rank_by_skills(
+    documents: Iterable[Dict[str, Any]],
+    skills: List[str],
+    skills_field: str,
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Order keyword-search results by how many requested skills they list.
+    
+    Args:
+        documents: Documents returned by a metadata filter
+        skills: Requested skills
+        skills_field: Field holding the document's skills
+        limit: Maximum number of results
+    
+    Returns:
+        Up to ``limit`` documents, best first, each with a ``matched_skills``
+        count added
+    """
+    wanted = {skill.casefold() for skill in skills}
+    ranked = []
+    for document in documents:
+        have = {skill.casefold() for skill in document.get(skills_field) or ()}
+        ranked.append({**document, "matched_skills": len(wanted & have)})
+    # sorted() is stable, so ties keep the store's order
+    return sorted(ranked, key=lambda document: -document["matched_skills"])[:limit]
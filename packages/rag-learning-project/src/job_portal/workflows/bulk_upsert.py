@@ -0,0 +1,260 @@
+"""Idempotent bulk import of job postings and candidate profiles."""
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from ..repositories.base_vector_store import VectorStore
+    from ..repositories.chunk_repository import ChunkStore
+    from ..repositories.company_repository import CompanyStore
+    from ..repositories.jobseeker_repository import JobSeekerStore
+    from ..services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from .embedding_backfill import is_stale
+except ImportError:
+    from job_portal.repositories.base_vector_store import VectorStore
+    from job_portal.repositories.chunk_repository import ChunkStore
+    from job_portal.repositories.company_repository import CompanyStore
+    from job_portal.repositories.jobseeker_repository import JobSeekerStore
+    from job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from job_portal.workflows.embedding_backfill import is_stale
+
+
+class BulkUpsert:
+    """
+    Upserts feed records by natural key, embedding only records whose text changed.
+    
+    Records are read in chunks. For each chunk, one query fetches the
+    embedding metadata stored for the same keys; records whose embedded
+    text, model and dimension match it keep their stored vector, and the
+    rest are embedded together. Documents are then written with
+    ``VectorStore.bulk_upsert``, after ``VectorStore.ensure_upsert_index``
+    has created the unique index on the key. Re-running a feed therefore embeds nothing
+    and reports its records as unchanged.
+    
+    With a ``chunk_store``, the chunks of documents whose text or chunk
+    metadata changed are synced after each write (``ChunkStore.sync_chunks``
+    only embeds the chunks that changed), so chunk searches see the import.
+    """
+    
+    def __init__(
+        self,
+        store: VectorStore,
+        document_fn: Callable[[Dict[str, Any]], Dict[str, Any]],
+        text_fn: Callable[[Dict[str, Any]], str],
+        embeddings: JobPortalEmbeddings,
+        chunk_size: int = 500,
+        max_retries: int = 3,
+        chunk_store: Optional[ChunkStore] = None
+    ):
+        """
+        Initialize bulk upsert.
+        
+        Args:
+            store: Store owning the collection (its ``upsert_key`` identifies documents)
+            document_fn: Function building a document from a feed record
+            text_fn: Function building a document's embedded text
+            embeddings: Embedding service for new and changed documents
+            chunk_size: Records per lookup, embedding call and bulk write
+            max_retries: Retries of failed writes per chunk
+            chunk_store: Chunk store kept in sync with the documents (see
+                ``ChunkStore.for_store``)
+        """
+        self.store = store
+        self.key_fields = tuple(store.upsert_key)
+        self.document_fn = document_fn
+        self.text_fn = text_fn
+        self.embeddings = embeddings
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.meta_field = f"{store.vector_field}_meta"
+        self.chunk_store = chunk_store
+        # Chunk metadata a re-import can change (insert-only fields it can't)
+        self.synced_fields = tuple(
+            field for field in (chunk_store.metadata_fields if chunk_store else ())
+            if field not in store.insert_only_fields
+        )
+    
+    @classmethod
+    def for_job_postings(
+        cls,
+        store: CompanyStore,
+        embeddings: Optional[JobPortalEmbeddings] = None,
+        **kwargs
+    ) -> "BulkUpsert":
+        """Create a bulk upsert of job posting records (``store_job_posting`` fields)."""
+        return cls(
+            store,
+            lambda record: CompanyStore.job_posting_document(**record),
+            JobPortalEmbeddings.job_posting_document_text,
+            embeddings or JobPortalEmbeddings(generation=store.generation),
+            **kwargs
+        )
+    
+    @classmethod
+    def for_candidate_profiles(
+        cls,
+        store: JobSeekerStore,
+        embeddings: Optional[JobPortalEmbeddings] = None,
+        **kwargs
+    ) -> "BulkUpsert":
+        """Create a bulk upsert of profile records (``store_profile`` fields)."""
+        return cls(
+            store,
+            lambda record: JobSeekerStore.profile_document(**record),
+            JobPortalEmbeddings.candidate_profile_document_text,
+            embeddings or JobPortalEmbeddings(generation=store.generation),
+            **kwargs
+        )
+    
+    def _key(self, document: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(document.get(field) for field in self.key_fields)
+    
+    def _stored(
+        self,
+        documents: List[Dict[str, Any]],
+        fields: Iterable[str]
+    ) -> Dict[Tuple[Any, ...], Dict[str, Any]]:
+        """Fetch the given fields of stored documents with the same keys."""
+        if len(self.key_fields) == 1:
+            field = self.key_fields[0]
+            query = {field: {"$in": [document[field] for document in documents]}}
+        else:
+            query = {"$or": [
+                {field: document[field] for field in self.key_fields} for document in documents
+            ]}
+        projection = {**{field: 1 for field in self.key_fields}, **{field: 1 for field in fields}}
+        if "_id" not in projection:
+            projection["_id"] = 0
+        return {self._key(stored): stored for stored in self.store.collection.find(query, projection)}
+    
+    def _sync_chunks(self, documents: List[Dict[str, Any]], texts: Dict[Tuple[Any, ...], str]) -> int:
+        """Sync the chunks of written documents; returns the number of chunks embedded."""
+        splitter = self.embeddings.embedding_service.text_splitter
+        embedded = 0
+        # Chunk metadata comes from the stored documents, whose insert-only
+        # fields (e.g. a closed status) the import didn't overwrite
+        for key, stored in self._stored(documents, ("_id", *self.chunk_store.metadata_fields)).items():
+            synced = self.chunk_store.sync_chunks(
+                stored["_id"],
+                splitter.split_text(texts[key]),
+                self.embeddings.embed_chunks,
+                self.chunk_store.chunk_metadata(stored)
+            )
+            embedded += synced["embedded"]
+        return embedded
+    
+    def run(self, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Upsert feed records.
+        
+        Args:
+            records: Records with the fields of ``store_job_posting`` /
+                ``store_profile`` (without the embedding)
+        
+        Returns:
+            Dict with 'received', 'skipped' (invalid, or superseded by a
+            later record with the same key in its chunk), 'embedded',
+            'inserted', 'updated', 'unchanged' and 'failed' counts, plus
+            'chunks_embedded' with a chunk store
+        """
+        counts = {
+            "received": 0, "skipped": 0, "embedded": 0,
+            "inserted": 0, "updated": 0, "unchanged": 0, "failed": 0
+        }
+        if self.chunk_store:
+            counts["chunks_embedded"] = 0
+        # Key lookups and concurrent imports rely on the unique key index
+        self.store.ensure_upsert_index()
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                return counts
+            counts["received"] += len(chunk)
+            
+            by_key: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+            for record in chunk:
+                try:
+                    document = self.document_fn(record)
+                except TypeError:
+                    # Missing or unknown fields
+                    continue
+                if any(document.get(field) is None for field in self.key_fields):
+                    continue
+                by_key[self._key(document)] = document
+            documents = list(by_key.values())
+            counts["skipped"] += len(chunk) - len(documents)
+            if not documents:
+                continue
+            
+            stored = self._stored(documents, (self.meta_field, *self.synced_fields))
+            changed = []
+            to_sync = []
+            texts = {}
+            for document in documents:
+                key = self._key(document)
+                text = self.text_fn(document)
+                meta = self.embeddings.embedding_metadata(text)
+                previous = stored.get(key, {})
+                if is_stale(previous.get(self.meta_field), meta):
+                    changed.append((document, text, meta))
+                    to_sync.append(document)
+                elif any(document.get(field) != previous.get(field) for field in self.synced_fields):
+                    to_sync.append(document)
+                texts[key] = text
+            
+            if changed:
+                vectors = self.embeddings.embed_document_texts([text for _, text, _ in changed])
+                for (document, _, meta), vector in zip(changed, vectors):
+                    document.update(self.store.vector_fields(self.store.vector_field, vector, meta))
+                counts["embedded"] += len(changed)
+            
+            written = self.store.bulk_upsert(
+                documents, self.key_fields, chunk_size=self.chunk_size, max_retries=self.max_retries
+            )
+            for key, value in written.items():
+                counts[key] += value
+            
+            if self.chunk_store and to_sync:
+                counts["chunks_embedded"] += self._sync_chunks(to_sync, texts)
+
+
+def bulk_upsert_job_postings(
+    store: CompanyStore,
+    postings: Iterable[Dict[str, Any]],
+    embeddings: Optional[JobPortalEmbeddings] = None,
+    **kwargs
+) -> Dict[str, int]:
+    """
+    Upsert job postings keyed by company_id and job_title.
+    
+    Args:
+        store: Company store to write to
+        postings: Records with the fields of ``CompanyStore.store_job_posting``
+        embeddings: Embedding service (defaults to one for the store's generation)
+        **kwargs: Passed to ``BulkUpsert``
+    
+    Returns:
+        Counts from ``BulkUpsert.run``
+    """
+    return BulkUpsert.for_job_postings(store, embeddings, **kwargs).run(postings)
+
+
+def bulk_upsert_profiles(
+    store: JobSeekerStore,
+    profiles: Iterable[Dict[str, Any]],
+    embeddings: Optional[JobPortalEmbeddings] = None,
+    **kwargs
+) -> Dict[str, int]:
+    """
+    Upsert candidate profiles keyed by user_id.
+    
+    Args:
+        store: Job seeker store to write to
+        profiles: Records with the fields of ``JobSeekerStore.store_profile``
+        embeddings: Embedding service (defaults to one for the store's generation)
+        **kwargs: Passed to ``BulkUpsert``
+    
+    Returns:
+        Counts from ``BulkUpsert.run``
+    """
+    return BulkUpsert.for_candidate_profiles(store, embeddings, **kwargs).run(profiles)
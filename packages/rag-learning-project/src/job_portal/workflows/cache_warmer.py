@@ -0,0 +1,147 @@
+"""Pre-embeds the most frequent logged search queries into the embedding cache."""
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from ..services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from ..services.embeddings.query_log import QueryLog
+except ImportError:
+    from job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from job_portal.services.embeddings.query_log import QueryLog
+
+
+DAY = 24 * 60 * 60
+
+
+def rank_queries(
+    entries: Iterable[Dict[str, Any]],
+    now: float,
+    half_life: float = 7 * DAY,
+    kinds: Optional[Iterable[str]] = None
+) -> List[Tuple[str, float]]:
+    """
+    Rank logged queries by frequency with recency decay.
+    
+    Each occurrence scores ``0.5 ** (age / half_life)``, so a query asked
+    once today counts as much as one asked twice a half-life ago.
+    
+    Args:
+        entries: Query log entries with "t", "k" and "q"
+        now: Current unix time
+        half_life: Seconds after which an occurrence counts half
+        kinds: Only rank entries of these kinds (None ranks all)
+    
+    Returns:
+        (query, score) pairs, highest score first
+    """
+    allowed = set(kinds) if kinds is not None else None
+    scores: Dict[str, float] = defaultdict(float)
+    for entry in entries:
+        if allowed is not None and entry.get("k") not in allowed:
+            continue
+        age = max(0.0, now - float(entry.get("t", now)))
+        scores[entry["q"]] += 0.5 ** (age / half_life)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class CacheWarmer:
+    """
+    Embeds the hottest logged queries so interactive searches hit the cache.
+    
+    The top ``top_n`` queries from ``rank_queries`` are checked against the
+    embedding cache; the uncached ones are embedded in rank order until
+    ``max_tokens`` would be exceeded, packed into as few requests as the
+    batch size allows. Cached queries cost nothing, so re-running the
+    warmer on a schedule only pays for queries that became hot or were
+    evicted since the last run.
+    """
+    
+    def __init__(
+        self,
+        embeddings: JobPortalEmbeddings,
+        log: QueryLog,
+        top_n: int = 200,
+        half_life: float = 7 * DAY,
+        max_tokens: int = 20_000,
+        batch_size: int = 64,
+        kinds: Optional[Iterable[str]] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize cache warmer.
+        
+        Args:
+            embeddings: Embedding service whose cache is warmed
+            log: Query log to rank queries from
+            top_n: Number of top-ranked queries considered
+            half_life: Recency half-life in seconds
+            max_tokens: Token budget for one run
+            batch_size: Maximum queries per API request
+            kinds: Only warm queries of these kinds (None warms all)
+            clock: Time source (unix seconds)
+        """
+        self.embeddings = embeddings
+        self.log = log
+        self.top_n = top_n
+        self.half_life = half_life
+        self.max_tokens = max_tokens
+        self.batch_size = batch_size
+        self.kinds = kinds
+        self._clock = clock
+    
+    def hot_queries(self) -> List[Tuple[str, float]]:
+        """Get the top-N logged queries with their scores."""
+        ranked = rank_queries(self.log.entries(), self._clock(), self.half_life, self.kinds)
+        return ranked[:self.top_n]
+    
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Warm the cache with the hottest uncached queries.
+        
+        Args:
+            dry_run: Plan the run without embedding anything
+        
+        Returns:
+            Dict with "ranked", "cached", "warmed", "over_budget", "failed"
+            query counts and the "tokens" spent (or planned)
+        """
+        service = self.embeddings.embedding_service
+        queries = [query for query, _ in self.hot_queries()]
+        cached = service.cached([[query] for query in queries], "query")
+        
+        planned: List[str] = []
+        tokens = 0
+        over_budget = 0
+        for query, is_cached in zip(queries, cached):
+            if is_cached:
+                continue
+            cost = service.token_counter.count(query)
+            if tokens + cost > self.max_tokens:
+                # A shorter, lower-ranked query may still fit
+                over_budget += 1
+                continue
+            planned.append(query)
+            tokens += cost
+        
+        warmed = 0
+        failed = 0
+        if not dry_run:
+            for start in range(0, len(planned), self.batch_size):
+                batch = planned[start:start + self.batch_size]
+                try:
+                    service.embed_inputs([[query] for query in batch], input_type="query")
+                except Exception:
+                    # Out of budget or provider failing: the rest would fail too
+                    failed = len(planned) - start
+                    break
+                warmed += len(batch)
+        
+        return {
+            "ranked": len(queries),
+            "cached": sum(cached),
+            "warmed": len(planned) if dry_run else warmed,
+            "over_budget": over_budget,
+            "failed": failed,
+            "tokens": tokens,
+        }
@@ -0,0 +1,200 @@
+"""Resumable backfill that re-embeds documents with stale embeddings."""
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from bson import json_util
+from pymongo import UpdateOne
+
+try:
+    from ..infrastructure.voyage.batching import BatchPlanner
+    from ..repositories.base_vector_store import VectorStore
+    from ..repositories.company_repository import CompanyStore
+    from ..repositories.jobseeker_repository import JobSeekerStore
+    from ..services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+except ImportError:
+    from job_portal.infrastructure.voyage.batching import BatchPlanner
+    from job_portal.repositories.base_vector_store import VectorStore
+    from job_portal.repositories.company_repository import CompanyStore
+    from job_portal.repositories.jobseeker_repository import JobSeekerStore
+    from job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+
+
+def is_stale(stored_meta: Optional[Dict[str, Any]], current_meta: Dict[str, Any]) -> bool:
+    """
+    Check whether a stored embedding is out of date.
+    
+    Args:
+        stored_meta: The document's ``<field>_meta`` (None if never recorded)
+        current_meta: Metadata for the document's current text and model
+    
+    Returns:
+        True if the text, model or dimension changed, or nothing was recorded
+    """
+    if not stored_meta:
+        return True
+    return any(
+        stored_meta.get(key) != current_meta[key]
+        for key in ("text_hash", "model", "dimension")
+    )
+
+
+class EmbeddingBackfill:
+    """
+    Re-embeds the documents of one collection whose vectors are stale.
+    
+    Documents are streamed through a cursor in _id order, compared against
+    the metadata recorded next to their vector, and only stale ones are
+    re-embedded. Requests are packed to fit the rate limiter's token budget
+    and results are bulk-written per request. After each write the last
+    _id is saved to a checkpoint file, so an interrupted run resumes where
+    it stopped; a completed run removes the checkpoint.
+    """
+    
+    def __init__(
+        self,
+        store: VectorStore,
+        vector_field: str,
+        text_fn: Callable[[Dict[str, Any]], str],
+        embeddings: JobPortalEmbeddings,
+        checkpoint_path: Optional[str] = None,
+        batch_size: int = 64
+    ):
+        """
+        Initialize backfill.
+        
+        Args:
+            store: Store owning the collection (encodes the new vectors)
+            vector_field: Name of the field containing vector embeddings
+            text_fn: Function rebuilding a document's embedded text
+            embeddings: Embedding service used for re-embedding
+            checkpoint_path: File to save progress to (None disables resuming)
+            batch_size: Maximum documents per API request
+        """
+        self.store = store
+        self.vector_field = vector_field
+        self.text_fn = text_fn
+        self.embeddings = embeddings
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.batch_size = batch_size
+        self.meta_field = f"{vector_field}_meta"
+    
+    @classmethod
+    def for_job_postings(cls, store: CompanyStore, embeddings: JobPortalEmbeddings, **kwargs) -> "EmbeddingBackfill":
+        """Create a backfill for the job postings in a CompanyStore's vector field."""
+        return cls(store, store.vector_field, JobPortalEmbeddings.job_posting_document_text, embeddings, **kwargs)
+    
+    @classmethod
+    def for_candidate_profiles(cls, store: JobSeekerStore, embeddings: JobPortalEmbeddings, **kwargs) -> "EmbeddingBackfill":
+        """Create a backfill for the profiles in a JobSeekerStore's vector field."""
+        return cls(store, store.vector_field, JobPortalEmbeddings.candidate_profile_document_text, embeddings, **kwargs)
+    
+    def stale_documents(
+        self,
+        start_after: Any = None,
+        counts: Optional[Dict[str, int]] = None
+    ) -> Iterator[Tuple[Dict[str, Any], str, Dict[str, Any]]]:
+        """
+        Stream documents whose embeddings are stale.
+        
+        Args:
+            start_after: Only consider documents with a larger _id
+            counts: Optional dict whose 'scanned' entry is incremented per document
+        
+        Yields:
+            (document, current text, current embedding metadata) triples;
+            documents are fetched without their vectors
+        """
+        query = {"_id": {"$gt": start_after}} if start_after is not None else {}
+        projection = {self.vector_field: 0, f"{self.vector_field}_coarse": 0}
+        cursor = self.store.collection.find(query, projection).sort("_id", 1).batch_size(self.batch_size * 4)
+        
+        for document in cursor:
+            if counts is not None:
+                counts["scanned"] += 1
+            text = self.text_fn(document)
+            meta = self.embeddings.embedding_metadata(text)
+            if is_stale(document.get(self.meta_field), meta):
+                yield document, text, meta
+    
+    def run(self, max_documents: Optional[int] = None, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Re-embed stale documents.
+        
+        Args:
+            max_documents: Stop after this many stale documents
+            dry_run: If True, only count stale documents
+        
+        Returns:
+            Dict with 'scanned', 'stale' and 'updated' counts
+        """
+        counts = {"scanned": 0, "stale": 0, "updated": 0}
+        stale = self.stale_documents(self._load_checkpoint(), counts)
+        if max_documents is not None:
+            stale = islice(stale, max_documents)
+        
+        if dry_run:
+            counts["stale"] = sum(1 for _ in stale)
+            return counts
+        
+        service = self.embeddings.embedding_service
+        planner = BatchPlanner(
+            max_inputs=min(self.batch_size, service.batch_planner.max_inputs),
+            max_chunks=service.batch_planner.max_chunks,
+            max_tokens=service.batch_planner.max_tokens,
+            count_tokens=service.batch_planner.count_tokens
+        )
+        items = (((document, meta), self._chunks(text)) for document, text, meta in stale)
+        
+        for batch in planner.pack(items):
+            counts["stale"] += len(batch)
+            doc_embeddings = service.embed_inputs([chunks for _, chunks in batch], input_type="document")
+            operations = [
+                UpdateOne(
+                    {"_id": document["_id"]},
+                    # First chunk, as in embed_job_posting / embed_candidate_profile
+                    {"$set": self.store.vector_fields(self.vector_field, chunk_embeddings[0], meta)}
+                )
+                for ((document, meta), _), chunk_embeddings in zip(batch, doc_embeddings)
+            ]
+            result = self.store.collection.bulk_write(operations, ordered=False)
+            counts["updated"] += result.modified_count
+            self._save_checkpoint(batch[-1][0][0]["_id"])
+        
+        if max_documents is None or counts["stale"] < max_documents:
+            self._clear_checkpoint()
+        return counts
+    
+    def _chunks(self, text: str) -> List[str]:
+        """Split text the way ``embed_document`` does, so cached inputs are shared."""
+        chunks = self.embeddings.embedding_service.text_splitter.split_text(text)
+        return chunks if len(chunks) > 1 else [text]
+    
+    def _checkpoint_key(self) -> str:
+        return f"{self.store.collection.name}.{self.vector_field}"
+    
+    def _load_checkpoint(self) -> Any:
+        """Get the last processed _id from the checkpoint file, if any."""
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return None
+        state = json_util.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        if state.get("key") != self._checkpoint_key():
+            return None
+        return state.get("last_id")
+    
+    def _save_checkpoint(self, last_id: Any) -> None:
+        """Atomically record the last processed _id."""
+        if self.checkpoint_path is None:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(self.checkpoint_path.suffix + ".tmp")
+        tmp_path.write_text(
+            json_util.dumps({"key": self._checkpoint_key(), "last_id": last_id}),
+            encoding="utf-8"
+        )
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def _clear_checkpoint(self) -> None:
+        if self.checkpoint_path is not None and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
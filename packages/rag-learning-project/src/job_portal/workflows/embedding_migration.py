@@ -0,0 +1,258 @@
+"""Online migration of stored vectors to a new embedding model or dimension."""
+import copy
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from pymongo.collection import Collection
+from pymongo.operations import SearchIndexModel
+
+try:
+    from ..domain.embedding_generation import EmbeddingGeneration, load_generation, save_generation
+    from ..repositories.base_vector_store import VectorStore
+    from ..repositories.company_repository import CompanyStore
+    from ..repositories.jobseeker_repository import JobSeekerStore
+    from ..services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from .embedding_backfill import EmbeddingBackfill
+except ImportError:
+    from job_portal.domain.embedding_generation import EmbeddingGeneration, load_generation, save_generation
+    from job_portal.repositories.base_vector_store import VectorStore
+    from job_portal.repositories.company_repository import CompanyStore
+    from job_portal.repositories.jobseeker_repository import JobSeekerStore
+    from job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+    from job_portal.workflows.embedding_backfill import EmbeddingBackfill
+
+
+INDEX_DEFINITIONS = Path(__file__).resolve().parents[1] / "infrastructure" / "mongodb" / "index_definitions.json"
+
+
+def load_index_definitions() -> Dict[str, Any]:
+    """Load the Atlas search index definitions shipped with the package."""
+    with open(INDEX_DEFINITIONS, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class EmbeddingMigration:
+    """
+    Fills one collection's shadow vector field for a target generation.
+    
+    The target generation's store and embeddings write vectors into its own
+    field (e.g. ``requirements_embedding_v2``) with their metadata, next to
+    the live field that searches keep reading. Filling reuses
+    ``EmbeddingBackfill``: requests go out at background priority, so
+    interactive searches in the same process overtake them in the rate
+    limiter, progress is checkpointed, and re-running only embeds documents
+    whose shadow vector is missing or stale (e.g. edited since). Once
+    ``coverage`` reaches 100% and the shadow index is queryable,
+    ``switch_generation`` makes the target generation active.
+    """
+    
+    def __init__(
+        self,
+        store: VectorStore,
+        embeddings: JobPortalEmbeddings,
+        text_fn: Callable[[Dict[str, Any]], str],
+        index_key: str,
+        checkpoint_path: Optional[str] = None,
+        batch_size: int = 64
+    ):
+        """
+        Initialize migration.
+        
+        Args:
+            store: Store for the target generation (its vector_field is the shadow field)
+            embeddings: Embeddings for the target generation's model and dimension
+            text_fn: Function rebuilding a document's embedded text
+            index_key: Key of the live index in the shipped index definitions
+            checkpoint_path: File to save progress to (None disables resuming)
+            batch_size: Maximum documents per API request
+        """
+        self.store = store
+        self.embeddings = embeddings
+        self.generation = store.generation
+        self.index_key = index_key
+        self.backfill = EmbeddingBackfill(
+            store, store.vector_field, text_fn, embeddings,
+            checkpoint_path=checkpoint_path, batch_size=batch_size
+        )
+    
+    @classmethod
+    def for_job_postings(
+        cls,
+        collection: Collection,
+        generation: EmbeddingGeneration,
+        embeddings: Optional[JobPortalEmbeddings] = None,
+        **kwargs
+    ) -> "EmbeddingMigration":
+        """Create a migration of the companies collection's job posting vectors."""
+        return cls(
+            CompanyStore(collection, generation=generation),
+            embeddings or JobPortalEmbeddings(generation=generation),
+            JobPortalEmbeddings.job_posting_document_text,
+            "company_vector_index",
+            **kwargs
+        )
+    
+    @classmethod
+    def for_candidate_profiles(
+        cls,
+        collection: Collection,
+        generation: EmbeddingGeneration,
+        embeddings: Optional[JobPortalEmbeddings] = None,
+        **kwargs
+    ) -> "EmbeddingMigration":
+        """Create a migration of the job_seekers collection's profile vectors."""
+        return cls(
+            JobSeekerStore(collection, generation=generation),
+            embeddings or JobPortalEmbeddings(generation=generation),
+            JobPortalEmbeddings.candidate_profile_document_text,
+            "jobseeker_vector_index",
+            **kwargs
+        )
+    
+    @property
+    def collection_name(self) -> str:
+        return self.store.collection.name
+    
+    def run(self, max_documents: Optional[int] = None, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Embed documents whose shadow vector is missing or stale.
+        
+        Args:
+            max_documents: Stop after this many documents
+            dry_run: If True, only count them
+        
+        Returns:
+            Dict with 'scanned', 'stale' and 'updated' counts
+        """
+        return self.backfill.run(max_documents=max_documents, dry_run=dry_run)
+    
+    def coverage(self) -> Dict[str, Any]:
+        """
+        Measure how much of the collection has current shadow vectors.
+        
+        Returns:
+            Dict with 'total' and 'migrated' document counts and their 'ratio'
+            (1.0 for an empty collection)
+        """
+        counts = {"scanned": 0}
+        stale = sum(1 for _ in self.backfill.stale_documents(counts=counts))
+        total = counts["scanned"]
+        return {
+            "total": total,
+            "migrated": total - stale,
+            "ratio": (total - stale) / total if total else 1.0,
+        }
+    
+    def index_definition(self, definitions: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Build the search index definition for the shadow field.
+        
+        The live index's definition is copied with the shadow index name,
+        the shadow field as vector path and the target dimension; filter
+        fields are kept.
+        
+        Args:
+            definitions: Index definitions (defaults to the shipped ones)
+        
+        Returns:
+            Definition in the shape of ``index_definitions.json`` entries
+        """
+        definitions = definitions or load_index_definitions()
+        index = copy.deepcopy(definitions[self.index_key])
+        index["name"] = self.store.vector_index_name
+        for field in index["definition"]["fields"]:
+            if field["type"] == "vector":
+                field["path"] = self.store.vector_field
+                field["numDimensions"] = self.generation.output_dimension
+        return index
+    
+    def ensure_index(self, definitions: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Create the shadow search index unless it already exists.
+        
+        Args:
+            definitions: Index definitions (defaults to the shipped ones)
+        
+        Returns:
+            True if the index was created, False if it already existed
+        
+        Raises:
+            pymongo.errors.OperationFailure: If the deployment doesn't
+                support search indexes (create it from ``index_definition``
+                in the Atlas UI instead)
+        """
+        index = self.index_definition(definitions)
+        if list(self.store.collection.list_search_indexes(index["name"])):
+            return False
+        self.store.collection.create_search_index(SearchIndexModel(
+            definition=index["definition"], name=index["name"], type=index["type"]
+        ))
+        return True
+    
+    def index_ready(self) -> bool:
+        """Check whether the shadow search index exists and is queryable."""
+        indexes = list(self.store.collection.list_search_indexes(self.store.vector_index_name))
+        return bool(indexes) and bool(indexes[0].get("queryable"))
+
+
+def switch_generation(
+    migrations: Iterable[EmbeddingMigration],
+    path: Optional[str] = None,
+    require_index: bool = True
+) -> EmbeddingGeneration:
+    """
+    Make a migration's target generation active once every collection is covered.
+    
+    The generation file is replaced atomically, so stores and query
+    embeddings created afterwards read the new fields with the new model
+    together. The old fields are left in place for rolling back.
+    
+    Args:
+        migrations: Migrations of every searched collection to one generation
+        path: Generation file (defaults to ``EMBEDDING_GENERATION_FILE``)
+        require_index: Also require each shadow index to be queryable
+    
+    Returns:
+        The newly active generation
+    
+    Raises:
+        ValueError: If the migrations target different generations
+        RuntimeError: If a collection isn't fully migrated or its index isn't ready
+    """
+    migrations = list(migrations)
+    generations = {repr(migration.generation) for migration in migrations}
+    if len(generations) != 1:
+        raise ValueError(f"Migrations target different generations: {sorted(generations)}")
+    
+    for migration in migrations:
+        coverage = migration.coverage()
+        if coverage["ratio"] < 1.0:
+            raise RuntimeError(
+                f"{migration.collection_name} is {coverage['migrated']}/{coverage['total']} migrated; "
+                "run the migration again before switching"
+            )
+        if require_index and not migration.index_ready():
+            raise RuntimeError(
+                f"Search index {migration.store.vector_index_name} on {migration.collection_name} "
+                "is not queryable yet"
+            )
+    
+    generation = migrations[0].generation
+    save_generation(generation, path)
+    return generation
+
+
+def check_target(generation: EmbeddingGeneration, path: Optional[str] = None) -> None:
+    """
+    Refuse a target generation that would overwrite the live vector fields.
+    
+    Raises:
+        ValueError: If the target uses the active generation's field names
+    """
+    active = load_generation(path)
+    if generation.name == active.name:
+        raise ValueError(
+            f"Target generation must have a different name than the active one ({active.name!r}), "
+            "otherwise it would overwrite the vectors searches read"
+        )
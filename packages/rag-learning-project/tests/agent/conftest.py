@@ -0,0 +1,13 @@
+"""Shared fixtures for agent tool tests."""
+import pytest
+
+from src.job_portal.services.embeddings import query_log
+
+
+@pytest.fixture(autouse=True)
+def disabled_query_log():
+    """Keep searches in tests from writing a query log into the working directory."""
+    previous = query_log._default_log, query_log._default_loaded
+    query_log.set_query_log(None)
+    yield
+    query_log._default_log, query_log._default_loaded = previous
@@ -1,8 +1,15 @@
 """Tests for LangChain tools."""
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+import voyageai.error as voyage_error
 from bson import ObjectId
 
+from src.job_portal.infrastructure.voyage.rate_limiter import RateLimitTimeout
+from src.job_portal.infrastructure.voyage.resilience import CircuitOpenError
+from src.job_portal.infrastructure.voyage.sidecar import SidecarProvider
+from src.job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+from src.job_portal.services.embeddings.query_log import QueryLog, set_query_log
+
 # Import tools
 from src.job_portal.agent.tools.job_seeker_tools import (
     search_jobs,
@@ -66,6 +73,35 @@ class TestJobSeekerTools:
         mock_emb_service.embed_search_query.assert_called_once()
         mock_company_store.vector_search.assert_called_once()
     
+    @patch('src.job_portal.agent.tools.job_seeker_tools.SEARCH_CHUNKS', True)
+    @patch('src.job_portal.agent.tools.job_seeker_tools.ChunkStore')
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_embeddings')
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_company_store')
+    def test_search_jobs_searches_chunks(self, mock_store, mock_embeddings, mock_chunk_store):
+        """Test that chunk search returns one result per posting, scored by its best chunk."""
+        mock_emb_service = Mock()
+        mock_emb_service.embed_search_query.return_value = [0.1] * 1024
+        mock_embeddings.return_value = mock_emb_service
+        mock_company_store = Mock()
+        mock_store.return_value = mock_company_store
+        chunk_store = mock_chunk_store.for_store.return_value
+        chunk_store.search_parents.return_value = [{
+            '_id': ObjectId(),
+            'company_name': 'Tech Corp',
+            'job_title': 'Python Developer',
+            'location': 'San Francisco, CA',
+            'score': 0.91,
+            'matched_chunk': 'Kafka streaming experience'
+        }]
+        
+        result = search_jobs.invoke({"requirements": "Kafka streaming", "limit": 3})
+        
+        assert "Found 1 matching job posting(s)" in result
+        assert "Tech Corp" in result and "91.0%" in result
+        mock_chunk_store.for_store.assert_called_once_with(mock_company_store)
+        assert chunk_store.search_parents.call_args.kwargs["limit"] == 3
+        mock_company_store.vector_search.assert_not_called()
+    
     @patch('src.job_portal.agent.tools.job_seeker_tools._get_embeddings')
     @patch('src.job_portal.agent.tools.job_seeker_tools._get_company_store')
     def test_search_jobs_no_results(self, mock_store, mock_embeddings):
@@ -85,6 +121,103 @@ class TestJobSeekerTools:
         # Verify
         assert "No matching job postings found" in result
     
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_embeddings')
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_company_store')
+    def test_search_jobs_logs_canonical_query(self, mock_store, mock_embeddings, tmp_path):
+        """Test that job search embeds and logs the canonical query text."""
+        log = QueryLog(str(tmp_path / "queries.jsonl"))
+        set_query_log(log)
+        mock_emb_service = Mock()
+        mock_emb_service.embed_search_query.return_value = [0.1] * 1024
+        mock_embeddings.return_value = mock_emb_service
+        mock_store.return_value.vector_search.return_value = []
+        
+        search_jobs.invoke({"requirements": "  Senior   PYTHON developer "})
+        
+        assert mock_emb_service.embed_search_query.call_args.args[0] == "senior python developer"
+        assert [(e["k"], e["q"]) for e in log.entries()] == [("jobs", "senior python developer")]
+    
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_embeddings')
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_company_store')
+    def test_search_jobs_keyword_fallback(self, mock_store, mock_embeddings):
+        """Test that job search falls back to metadata when embeddings are throttled."""
+        mock_emb_service = Mock()
+        mock_emb_service.embed_search_query.side_effect = RateLimitTimeout("would wait 20.0s")
+        mock_embeddings.return_value = mock_emb_service
+        
+        mock_company_store = Mock()
+        mock_company_store.filter_by_metadata.return_value = [
+            {'_id': ObjectId(), 'company_name': 'One Skill', 'required_skills': ['Python']},
+            {'_id': ObjectId(), 'company_name': 'Both Skills', 'required_skills': ['Python', 'Django']},
+        ]
+        mock_store.return_value = mock_company_store
+        
+        result = search_jobs.invoke({"requirements": "Senior Python and Django developer, remote"})
+        
+        assert "Keyword-matched 2 job posting(s)" in result
+        assert result.index("Both Skills") < result.index("One Skill")
+        assert "2/2 skills (keyword)" in result
+        mock_company_store.vector_search.assert_not_called()
+        kwargs = mock_company_store.filter_by_metadata.call_args.kwargs
+        assert kwargs["skills"] == ["Python", "Django"]
+        assert kwargs["remote_policy"] == "remote"
+        assert kwargs["experience_level"] == "senior"
+    
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_embeddings')
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_company_store')
+    def test_search_jobs_connection_error_falls_back(self, mock_store, mock_embeddings):
+        """Test that provider connection errors fall back to metadata."""
+        mock_emb_service = Mock()
+        mock_emb_service.embed_search_query.side_effect = voyage_error.APIConnectionError("connection reset")
+        mock_embeddings.return_value = mock_emb_service
+        
+        mock_company_store = Mock()
+        mock_company_store.filter_by_metadata.return_value = [
+            {'_id': ObjectId(), 'company_name': 'Tech Corp', 'required_skills': ['Python']},
+        ]
+        mock_store.return_value = mock_company_store
+        
+        result = search_jobs.invoke({"requirements": "Python developer"})
+        
+        assert "Keyword-matched 1 job posting(s)" in result
+        assert "(APIConnectionError)" in result
+    
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_embeddings')
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_company_store')
+    def test_search_jobs_unreachable_sidecar_falls_back(self, mock_store, mock_embeddings):
+        """Test that a dead embedding sidecar falls back to metadata."""
+        # Nothing listens on port 1
+        provider = SidecarProvider("http://127.0.0.1:1", model="voyage-context-3", output_dimension=1024, timeout=1)
+        mock_embeddings.return_value = JobPortalEmbeddings(provider=provider, use_cache=False)
+        
+        mock_company_store = Mock()
+        mock_company_store.filter_by_metadata.return_value = [
+            {'_id': ObjectId(), 'company_name': 'Tech Corp', 'required_skills': ['Python']},
+        ]
+        mock_store.return_value = mock_company_store
+        
+        result = search_jobs.invoke({"requirements": "Python developer"})
+        
+        assert "Keyword-matched 1 job posting(s)" in result
+        assert "(SidecarError)" in result
+        mock_company_store.vector_search.assert_not_called()
+    
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_embeddings')
+    @patch('src.job_portal.agent.tools.job_seeker_tools._get_company_store')
+    def test_search_jobs_bug_is_not_keyword_matched(self, mock_store, mock_embeddings):
+        """Test that unexpected errors are reported instead of hidden behind the fallback."""
+        mock_emb_service = Mock()
+        mock_emb_service.embed_search_query.side_effect = TypeError("unexpected keyword argument")
+        mock_embeddings.return_value = mock_emb_service
+        mock_company_store = Mock()
+        mock_store.return_value = mock_company_store
+        
+        result = search_jobs.invoke({"requirements": "Python developer"})
+        
+        assert "Error searching" in result
+        assert "unexpected keyword argument" in result
+        mock_company_store.filter_by_metadata.assert_not_called()
+    
     @patch('src.job_portal.agent.tools.job_seeker_tools._get_company_store')
     def test_get_company_details_success(self, mock_store):
         """Test getting company details."""
@@ -265,6 +398,46 @@ class TestCompanyTools:
         # Verify
         assert "No matching candidates found" in result
     
+    @patch('src.job_portal.agent.tools.company_tools._get_embeddings')
+    @patch('src.job_portal.agent.tools.company_tools._get_jobseeker_store')
+    def test_search_candidates_keyword_fallback(self, mock_store, mock_embeddings):
+        """Test that candidate search falls back to metadata while the circuit breaker is open."""
+        mock_emb_service = Mock()
+        mock_emb_service.embed_search_query.side_effect = CircuitOpenError("provider unavailable")
+        mock_embeddings.return_value = mock_emb_service
+        
+        mock_jobseeker_store = Mock()
+        # Nothing matches every filter; the skills-only retry does
+        mock_jobseeker_store.filter_by_metadata.side_effect = [
+            [],
+            [{'_id': ObjectId(), 'name': 'Jane Smith', 'skills': ['Go']}],
+        ]
+        mock_store.return_value = mock_jobseeker_store
+        
+        result = search_candidates.invoke({"job_requirements": "Senior Go engineer in Berlin"})
+        
+        assert "Keyword-matched 1 candidate(s)" in result
+        assert "Jane Smith" in result
+        first, retry = mock_jobseeker_store.filter_by_metadata.call_args_list
+        assert first.kwargs["location"] == "Berlin"
+        assert first.kwargs["min_experience"] == 5.0
+        assert retry.kwargs == {"skills": ["Go"], "limit": 50}
+    
+    @patch('src.job_portal.agent.tools.company_tools._get_embeddings')
+    @patch('src.job_portal.agent.tools.company_tools._get_jobseeker_store')
+    def test_search_candidates_bug_is_not_keyword_matched(self, mock_store, mock_embeddings):
+        """Test that unexpected errors are reported instead of hidden behind the fallback."""
+        mock_emb_service = Mock()
+        mock_emb_service.embed_search_query.side_effect = ValueError("bad vector")
+        mock_embeddings.return_value = mock_emb_service
+        mock_jobseeker_store = Mock()
+        mock_store.return_value = mock_jobseeker_store
+        
+        result = search_candidates.invoke({"job_requirements": "Senior Go engineer"})
+        
+        assert "Error searching for candidates: bad vector" in result
+        mock_jobseeker_store.filter_by_metadata.assert_not_called()
+    
     @patch('src.job_portal.agent.tools.company_tools._get_jobseeker_store')
     def test_get_candidate_details_success(self, mock_store):
         """Test getting candidate details."""
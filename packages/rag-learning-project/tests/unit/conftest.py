@@ -2,6 +2,45 @@
 import pytest
 from unittest.mock import Mock
 
+from src.job_portal.infrastructure.voyage import rate_limiter, resilience, tokenization
+from src.job_portal.services.embeddings import query_log
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate_limiter():
+    """Replace the process-wide Voyage rate limiter so mocked calls never wait."""
+    previous = rate_limiter._default_limiter
+    rate_limiter.set_rate_limiter(rate_limiter.RateLimiter(rpm=None, tpm=None))
+    yield
+    rate_limiter.set_rate_limiter(previous)
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breaker():
+    """Give every test a closed circuit breaker."""
+    previous = resilience._default_breaker
+    resilience.set_circuit_breaker(resilience.CircuitBreaker())
+    yield
+    resilience.set_circuit_breaker(previous)
+
+
+@pytest.fixture(autouse=True)
+def estimated_token_counts():
+    """Count tokens with the character estimate so tests don't load tiktoken encodings."""
+    previous = tokenization._default_counter
+    tokenization.set_token_counter(tokenization.TokenCounter(encoding_name=None))
+    yield
+    tokenization.set_token_counter(previous)
+
+
+@pytest.fixture(autouse=True)
+def disabled_query_log():
+    """Keep searches in tests from writing a query log into the working directory."""
+    previous = query_log._default_log, query_log._default_loaded
+    query_log.set_query_log(None)
+    yield
+    query_log._default_log, query_log._default_loaded = previous
+
 
 @pytest.fixture
 def mock_mongodb_collection():
@@ -0,0 +1,206 @@
+"""Unit tests for the async Voyage AI embedding service."""
+import asyncio
+import os
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import pytest
+
+from src.job_portal.infrastructure.voyage.async_embedding_service import AsyncVoyageEmbeddingService
+from src.job_portal.infrastructure.voyage.batching import BatchPlanner
+from src.job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
+from src.job_portal.infrastructure.voyage.resilience import CircuitBreaker, ResiliencePolicy
+
+
+def _result(*embeddings_per_input):
+    """Build a fake contextualized_embed response."""
+    return Mock(results=[Mock(embeddings=e) for e in embeddings_per_input])
+
+
+def _unavailable():
+    """Build a transient (503) provider error."""
+    error = Exception("service unavailable")
+    error.http_status = 503
+    return error
+
+
+class TestAsyncVoyageEmbeddingService:
+    """Test suite for AsyncVoyageEmbeddingService class."""
+    
+    def test_init_without_api_key_raises_error(self):
+        """Test that missing API key raises ValueError."""
+        with patch.dict(os.environ, {}, clear=True):
+            with pytest.raises(ValueError, match="Voyage API key not found"):
+                AsyncVoyageEmbeddingService()
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_embed_query(self, mock_client_class):
+        """Test embedding a query asynchronously."""
+        mock_client = Mock()
+        mock_client.contextualized_embed = AsyncMock(return_value=_result([[0.1, 0.2]]))
+        mock_client_class.return_value = mock_client
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key") as service:
+                return await service.embed_query("test query")
+        
+        assert asyncio.run(run()) == pytest.approx([0.1, 0.2])
+        mock_client.contextualized_embed.assert_awaited_once_with(
+            inputs=[["test query"]],
+            model="voyage-context-3",
+            input_type="query",
+            output_dimension=1024
+        )
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_concurrency_is_bounded(self, mock_client_class):
+        """Test that no more than max_concurrency requests are in flight."""
+        in_flight = 0
+        peak = 0
+        
+        async def contextualized_embed(inputs, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _result([[1.0]])
+        
+        mock_client = Mock()
+        mock_client.contextualized_embed = contextualized_embed
+        mock_client_class.return_value = mock_client
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key", max_concurrency=2) as service:
+                return await asyncio.gather(*(service.embed_query(f"q{i}") for i in range(6)))
+        
+        results = asyncio.run(run())
+        assert len(results) == 6
+        assert peak == 2
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_cancellation_releases_slot(self, mock_client_class):
+        """Test that cancelling a request frees its concurrency slot."""
+        calls = []
+        
+        async def contextualized_embed(inputs, **kwargs):
+            calls.append(inputs)
+            if inputs == [["slow"]]:
+                await asyncio.sleep(10)
+            return _result([[1.0]])
+        
+        mock_client = Mock()
+        mock_client.contextualized_embed = contextualized_embed
+        mock_client_class.return_value = mock_client
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key", max_concurrency=1) as service:
+                slow = asyncio.create_task(service.embed_query("slow"))
+                await asyncio.sleep(0.01)
+                slow.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await slow
+                return await asyncio.wait_for(service.embed_query("fast"), timeout=1)
+        
+        assert asyncio.run(run()) == [1.0]
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_embed_document_chunked(self, mock_client_class):
+        """Test that long documents are chunked like the sync service."""
+        mock_client = Mock()
+        mock_client.contextualized_embed = AsyncMock(return_value=_result([[0.1], [0.2]]))
+        mock_client_class.return_value = mock_client
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key") as service:
+                return await service.embed_document("word " * 300)
+        
+        result = asyncio.run(run())
+        assert result["num_chunks"] == 2
+        assert result["embeddings"] == pytest.approx(np.array([[0.1], [0.2]]))
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_cache_shared_across_calls(self, mock_client_class):
+        """Test that cached inputs skip the API."""
+        mock_client = Mock()
+        mock_client.contextualized_embed = AsyncMock(return_value=_result([[0.5]]))
+        mock_client_class.return_value = mock_client
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key", cache=EmbeddingCache()) as service:
+                await service.embed_query("same")
+                return await service.embed_query("same")
+        
+        assert asyncio.run(run()) == [0.5]
+        assert mock_client.contextualized_embed.await_count == 1
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_misses_are_planned_into_requests(self, mock_client_class):
+        """Test that misses are packed within the request limits."""
+        async def contextualized_embed(inputs, **kwargs):
+            return _result(*[[[float(len(chunks[0]))]] for chunks in inputs])
+        
+        mock_client = Mock()
+        mock_client.contextualized_embed = AsyncMock(side_effect=contextualized_embed)
+        mock_client_class.return_value = mock_client
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key") as service:
+                service.batch_planner = BatchPlanner(max_inputs=2)
+                return await service.embed_inputs([["a"], ["bb"], ["ccc"]], "document")
+        
+        results = asyncio.run(run())
+        assert [float(matrix[0][0]) for matrix in results] == [1.0, 2.0, 3.0]
+        assert mock_client.contextualized_embed.await_count == 2
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_identical_inputs_sent_once(self, mock_client_class):
+        """Test that duplicate inputs in one call share a request slot."""
+        mock_client = Mock()
+        mock_client.contextualized_embed = AsyncMock(return_value=_result([[0.3]]))
+        mock_client_class.return_value = mock_client
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key") as service:
+                return await service.embed_inputs([["same"], ["same"]], "document")
+        
+        results = asyncio.run(run())
+        assert [float(matrix[0][0]) for matrix in results] == pytest.approx([0.3, 0.3])
+        assert mock_client.contextualized_embed.call_args.kwargs["inputs"] == [["same"]]
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_cache_runs_off_the_event_loop(self, mock_client_class):
+        """Test that cache reads and writes happen in a worker thread."""
+        mock_client = Mock()
+        mock_client.contextualized_embed = AsyncMock(return_value=_result([[0.5]]))
+        mock_client_class.return_value = mock_client
+        cache = EmbeddingCache()
+        threads = []
+        get, put = cache.get, cache.put
+        cache.get = lambda key: threads.append(threading.current_thread()) or get(key)
+        cache.put = lambda key, value: threads.append(threading.current_thread()) or put(key, value)
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key", cache=cache) as service:
+                await service.embed_query("cached")
+        
+        asyncio.run(run())
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+    
+    @patch('src.job_portal.infrastructure.voyage.async_embedding_service.voyageai.AsyncClient')
+    def test_transient_error_is_retried(self, mock_client_class):
+        """Test that requests run under the resilience policy."""
+        mock_client = Mock()
+        mock_client.contextualized_embed = AsyncMock(side_effect=[_unavailable(), _result([[0.7]])])
+        mock_client_class.return_value = mock_client
+        policy = ResiliencePolicy(base_delay=0.0, hedge_percentile=None, breaker=CircuitBreaker())
+        
+        async def run():
+            async with AsyncVoyageEmbeddingService(api_key="test_key", resilience=policy) as service:
+                return await service.embed_query("retry me")
+        
+        assert asyncio.run(run()) == pytest.approx([0.7])
+        assert mock_client.contextualized_embed.await_count == 2
+
@@ -2,8 +2,12 @@
 import pytest
 from unittest.mock import Mock, MagicMock
 from bson import ObjectId
+from bson.binary import Binary
 
-from src.job_portal.repositories.base_vector_store import VectorStore
+from src.job_portal.infrastructure.mongodb.vector_codec import encode_vector
+
+from src.job_portal.domain.search_hit import SearchHit
+from src.job_portal.repositories.base_vector_store import VectorStore, apply_projection
 
 
 class TestVectorStore:
@@ -231,3 +235,214 @@ class TestVectorStore:
         
         assert count == 10
         mock_collection.count_documents.assert_called_once_with({"status": "active"})
+    
+    def test_vector_format_from_env(self, monkeypatch):
+        """Test selecting the vector storage format through the environment."""
+        monkeypatch.setenv("VECTOR_STORAGE_FORMAT", "int8")
+        assert VectorStore(Mock()).vector_format == "int8"
+        assert VectorStore(Mock(), vector_format="float32").vector_format == "float32"
+    
+    def test_invalid_vector_format(self):
+        """Test that an unknown vector format is rejected."""
+        with pytest.raises(ValueError):
+            VectorStore(Mock(), vector_format="bfloat16")
+    
+    def test_vector_search_encodes_query(self):
+        """Test that the query vector is sent in the store's format."""
+        mock_collection = Mock()
+        mock_collection.aggregate.return_value = []
+        
+        store = VectorStore(mock_collection, vector_format="float32")
+        store.vector_search(query_vector=[0.5, 0.25])
+        
+        query_vector = mock_collection.aggregate.call_args[0][0][0]["$vectorSearch"]["queryVector"]
+        assert isinstance(query_vector, Binary)
+        assert query_vector.as_vector().data == [0.5, 0.25]
+    
+    def test_convert_vector_field(self):
+        """Test converting stored arrays to packed vectors."""
+        mock_collection = MagicMock()
+        packed = encode_vector([0.3, 0.4], "float32")
+        mock_collection.find.return_value.batch_size.return_value = [
+            {"_id": 1, "embedding": [0.1, 0.2]},
+            {"_id": 2, "embedding": packed},
+            {"_id": 3, "embedding": [0.5, 0.6]},
+        ]
+        
+        store = VectorStore(mock_collection, vector_format="float32")
+        counts = store.convert_vector_field("embedding", batch_size=1)
+        
+        assert counts == {"converted": 2, "skipped": 1}
+        assert mock_collection.bulk_write.call_count == 2
+        operation = mock_collection.bulk_write.call_args_list[0][0][0][0]
+        assert isinstance(operation._doc["$set"]["embedding"], Binary)
+    
+    def test_convert_vector_field_dry_run(self):
+        """Test that a dry run only counts documents."""
+        mock_collection = MagicMock()
+        mock_collection.find.return_value.batch_size.return_value = [
+            {"_id": 1, "embedding": [0.1, 0.2]},
+        ]
+        
+        store = VectorStore(mock_collection, vector_format="int8")
+        counts = store.convert_vector_field("embedding", dry_run=True)
+        
+        assert counts == {"converted": 1, "skipped": 0}
+        mock_collection.bulk_write.assert_not_called()
+    
+    def test_vector_fields_with_coarse_copy(self):
+        """Test that two-stage stores keep a normalized prefix of each vector."""
+        store = VectorStore(Mock(), coarse_dimensions=2)
+        fields = store.vector_fields("embedding", [3.0, 4.0, 5.0])
+        
+        assert fields["embedding"] == [3.0, 4.0, 5.0]
+        assert fields["embedding_coarse"] == pytest.approx([0.6, 0.8])
+    
+    def test_vector_fields_without_coarse_copy(self):
+        """Test that single-stage stores only write the full vector."""
+        store = VectorStore(Mock())
+        assert store.vector_fields("embedding", [0.1]) == {"embedding": [0.1]}
+    
+    def test_two_stage_search(self):
+        """Test over-fetching on the coarse index and rescoring on full vectors."""
+        mock_collection = Mock()
+        mock_collection.aggregate.return_value = [
+            {"_id": "a", "embedding": [1.0, 0.0, 0.0], "score": 0.99},
+            {"_id": "b", "embedding": [0.0, 1.0, 0.0], "score": 0.98},
+            {"_id": "c", "embedding": [0.6, 0.8, 0.0], "score": 0.97},
+        ]
+        
+        store = VectorStore(mock_collection, vector_index_name="idx", coarse_dimensions=2, rescore_factor=3)
+        results = store.vector_search(
+            query_vector=[0.0, 1.0, 0.0],
+            limit=2,
+            num_candidates=20,
+            filter_criteria={"status": "active"},
+            vector_field="embedding"
+        )
+        
+        stage = mock_collection.aggregate.call_args[0][0][0]["$vectorSearch"]
+        assert stage["index"] == "idx_coarse"
+        assert stage["path"] == "embedding_coarse"
+        assert stage["queryVector"] == [0.0, 1.0]
+        assert stage["limit"] == 6
+        assert stage["numCandidates"] == 20
+        assert stage["filter"] == {"status": "active"}
+        
+        assert [doc["_id"] for doc in results] == ["b", "c"]
+        assert results[0]["score"] == pytest.approx(1.0)
+        assert results[1]["score"] == pytest.approx(0.9)
+        assert "embedding" not in results[0]
+    
+    def test_coarse_dimensions_from_env(self, monkeypatch):
+        """Test enabling two-stage search through the environment."""
+        monkeypatch.setenv("VECTOR_COARSE_DIMENSIONS", "256")
+        assert VectorStore(Mock()).coarse_dimensions == 256
+    
+    def test_convert_vector_field_backfills_coarse(self):
+        """Test that conversion fills in missing coarse vectors."""
+        mock_collection = MagicMock()
+        mock_collection.find.return_value.batch_size.return_value = [
+            {"_id": 1, "embedding": [0.6, 0.8, 0.1]},
+            {"_id": 2, "embedding": [0.6, 0.8, 0.1], "embedding_coarse": [0.6, 0.8]},
+        ]
+        
+        store = VectorStore(mock_collection, coarse_dimensions=2)
+        counts = store.convert_vector_field("embedding")
+        
+        assert counts == {"converted": 1, "skipped": 1}
+        update = mock_collection.bulk_write.call_args[0][0][0]._doc["$set"]
+        assert update["embedding_coarse"] == pytest.approx([0.6, 0.8])
+    
+    def test_vector_search_excludes_vectors(self):
+        """Test that searches project vectors out unless asked for them."""
+        mock_collection = Mock()
+        mock_collection.aggregate.return_value = []
+        store = VectorStore(mock_collection, vector_fields=["embedding", "embedding_v2"])
+        
+        store.vector_search([0.1, 0.2])
+        default = mock_collection.aggregate.call_args[0][0]
+        store.vector_search([0.1, 0.2], include_vectors=True)
+        with_vectors = mock_collection.aggregate.call_args[0][0]
+        store.vector_search([0.1, 0.2], projection={"name": 1})
+        explicit = mock_collection.aggregate.call_args[0][0]
+        
+        assert default[-1] == {"$project": {
+            "embedding": 0, "embedding_coarse": 0, "embedding_v2": 0, "embedding_v2_coarse": 0
+        }}
+        assert "$project" not in with_vectors[-1]
+        assert explicit[-1] == {"$project": {"name": 1}}
+    
+    def test_vector_search_as_hits(self):
+        """Test that hits expose the id, score and fields like the result document."""
+        mock_collection = Mock()
+        mock_collection.aggregate.return_value = [{"_id": "1", "name": "doc1", "score": 0.95}]
+        
+        hits = VectorStore(mock_collection).vector_search([0.1, 0.2], as_hits=True)
+        
+        assert isinstance(hits[0], SearchHit)
+        assert (hits[0].id, hits[0].score) == ("1", 0.95)
+        assert hits[0]["name"] == "doc1" and hits[0].get("_id") == "1"
+        assert hits[0].get("missing", "n/a") == "n/a"
+        assert hits[0].to_dict() == {"_id": "1", "name": "doc1", "score": 0.95}
+    
+    def test_get_by_id_excludes_vectors(self):
+        """Test that get_by_id leaves vectors out unless asked for them."""
+        mock_collection = Mock()
+        store = VectorStore(mock_collection)
+        
+        store.get_by_id("507f1f77bcf86cd799439011")
+        store.get_by_id("507f1f77bcf86cd799439011", include_vectors=True)
+        
+        default, with_vectors = mock_collection.find_one.call_args_list
+        assert default[0][1] == {"embedding": 0, "embedding_coarse": 0}
+        assert with_vectors[0][1] is None
+    
+    def test_apply_projection(self):
+        """Test in-memory inclusion and exclusion projections on dotted paths."""
+        document = {"_id": 1, "name": "a", "salary": {"min": 1, "max": 2}, "embedding": [0.1], "score": 0.5}
+        
+        assert apply_projection(document, {"name": 1, "salary.max": 1}) == {
+            "_id": 1, "name": "a", "salary": {"max": 2}, "score": 0.5
+        }
+        assert apply_projection(document, {"embedding": 0, "salary.min": 0, "_id": 0}) == {
+            "name": "a", "salary": {"max": 2}, "score": 0.5
+        }
+        assert document["salary"] == {"min": 1, "max": 2}
+
+    def test_search_many_keeps_order_and_isolates_errors(self):
+        """Test that concurrent searches return in query order with failures in place."""
+        import time
+        
+        def aggregate(pipeline):
+            first = pipeline[0]["$vectorSearch"]["queryVector"][0]
+            time.sleep(0.01 * (5 - first))
+            if first == 2:
+                raise RuntimeError("search failed")
+            return [{"_id": first, "score": 0.9}]
+        
+        mock_collection = Mock()
+        mock_collection.aggregate.side_effect = aggregate
+        store = VectorStore(mock_collection)
+        
+        results = store.search_many([[float(i), 0.0] for i in range(5)], limit=1, max_workers=5)
+        
+        assert [r[0]["_id"] for r in results if not isinstance(r, Exception)] == [0, 1, 3, 4]
+        assert isinstance(results[2], RuntimeError)
+    
+    def test_search_many_filters(self):
+        """Test shared and per-query filters."""
+        mock_collection = Mock()
+        mock_collection.aggregate.return_value = []
+        store = VectorStore(mock_collection)
+        
+        store.search_many([[0.1], [0.2]], filter_criteria={"status": "active"}, max_workers=1)
+        shared = [c[0][0][0]["$vectorSearch"]["filter"] for c in mock_collection.aggregate.call_args_list]
+        mock_collection.aggregate.reset_mock()
+        store.search_many([[0.1], [0.2]], filter_criteria=[{"industry": "a"}, None], max_workers=1)
+        per_query = [c[0][0][0]["$vectorSearch"].get("filter") for c in mock_collection.aggregate.call_args_list]
+        
+        assert shared == [{"status": "active"}] * 2
+        assert per_query == [{"industry": "a"}, None]
+        with pytest.raises(ValueError):
+            store.search_many([[0.1], [0.2]], filter_criteria=[None])
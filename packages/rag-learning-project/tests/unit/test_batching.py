@@ -0,0 +1,124 @@
+"""Unit tests for the contextualized_embed batch planner."""
+import itertools
+from unittest.mock import Mock, patch
+
+from src.job_portal.infrastructure.voyage.batching import BatchPlanner, estimate_tokens
+from src.job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+
+
+def _echo_embed(inputs, **kwargs):
+    """Fake contextualized_embed returning the chunk length as a 1-dim vector."""
+    return Mock(results=[Mock(embeddings=[[float(len(c))] for c in chunks]) for chunks in inputs])
+
+
+class TestBatchPlanner:
+    """Test suite for BatchPlanner class."""
+    
+    def test_estimate_tokens(self):
+        """Test the character-based token estimate."""
+        assert estimate_tokens("") == 1
+        assert estimate_tokens("a" * 400) == 100
+    
+    def test_everything_fits_in_one_batch(self):
+        """Test that small inputs are packed into a single request."""
+        planner = BatchPlanner()
+        assert planner.plan([["a"], ["b"], ["c"]]) == [[0, 1, 2]]
+    
+    def test_input_limit(self):
+        """Test splitting on the per-request input limit."""
+        planner = BatchPlanner(max_inputs=2)
+        assert planner.plan([["a"], ["b"], ["c"]]) == [[0, 1], [2]]
+    
+    def test_chunk_limit(self):
+        """Test splitting on the per-request chunk limit."""
+        planner = BatchPlanner(max_chunks=3)
+        assert planner.plan([["a", "b"], ["c", "d"], ["e"]]) == [[0], [1, 2]]
+    
+    def test_token_limit(self):
+        """Test splitting on the per-request token limit."""
+        planner = BatchPlanner(max_tokens=10, count_tokens=len)
+        assert planner.plan([["x" * 6], ["x" * 6], ["x" * 3]]) == [[0], [1, 2]]
+    
+    def test_oversized_input_is_sent_alone(self):
+        """Test that an input over the limit gets its own batch."""
+        planner = BatchPlanner(max_tokens=10, count_tokens=len)
+        assert planner.plan([["x"], ["x" * 50], ["x"]]) == [[0], [1], [2]]
+    
+    def test_pack_is_lazy(self):
+        """Test that packing consumes only as much input as needed."""
+        planner = BatchPlanner(max_inputs=2)
+        items = ((i, ["text"]) for i in itertools.count())
+        first = next(planner.pack(items))
+        assert [item for item, _ in first] == [0, 1]
+
+
+class TestServiceBatching:
+    """Test batch planning inside VoyageEmbeddingService."""
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_large_batch_is_split(self, mock_client_class):
+        """Test that embed_documents_batch respects the input limit."""
+        mock_client = Mock()
+        mock_client.contextualized_embed.side_effect = _echo_embed
+        mock_client_class.return_value = mock_client
+        
+        service = VoyageEmbeddingService(api_key="test_key")
+        service.batch_planner = BatchPlanner(max_inputs=2)
+        docs = ["a", "bb", "ccc", "dddd", "eeeee"]
+        embeddings = service.embed_documents_batch(docs)
+        
+        assert embeddings == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+        assert mock_client.contextualized_embed.call_count == 3
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_duplicate_documents_sent_once(self, mock_client_class):
+        """Test that identical documents in one batch are deduplicated."""
+        mock_client = Mock()
+        mock_client.contextualized_embed.side_effect = _echo_embed
+        mock_client_class.return_value = mock_client
+        
+        service = VoyageEmbeddingService(api_key="test_key")
+        embeddings = service.embed_documents_batch(["same", "other", "same"])
+        
+        assert embeddings == [[4.0], [5.0], [4.0]]
+        assert mock_client.contextualized_embed.call_args[1]["inputs"] == [["same"], ["other"]]
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_embed_stream(self, mock_client_class):
+        """Test streaming (document, vector) pairs from a generator."""
+        mock_client = Mock()
+        mock_client.contextualized_embed.side_effect = _echo_embed
+        mock_client_class.return_value = mock_client
+        
+        service = VoyageEmbeddingService(api_key="test_key")
+        service.batch_planner = BatchPlanner(max_inputs=3)
+        postings = ({"id": i, "text": "x" * (i + 1)} for i in range(10))
+        
+        pairs = list(service.embed_stream(postings, text_fn=lambda p: p["text"], max_parallel=2))
+        
+        assert len(pairs) == 10
+        assert all(vector == [float(doc["id"] + 1)] for doc, vector in pairs)
+        assert mock_client.contextualized_embed.call_count == 4
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_embed_stream_reads_input_lazily(self, mock_client_class):
+        """Test that the stream does not consume the whole input up front."""
+        mock_client = Mock()
+        mock_client.contextualized_embed.side_effect = _echo_embed
+        mock_client_class.return_value = mock_client
+        
+        service = VoyageEmbeddingService(api_key="test_key")
+        service.batch_planner = BatchPlanner(max_inputs=2)
+        consumed = []
+        
+        def documents():
+            for i in itertools.count():
+                consumed.append(i)
+                yield f"doc {i}"
+        
+        stream = service.embed_stream(documents(), max_parallel=1)
+        first = next(stream)
+        stream.close()
+        
+        assert first[0] == "doc 0"
+        assert len(consumed) < 10
@@ -0,0 +1,272 @@
+"""Unit tests for VectorStore.bulk_upsert and the bulk import workflow."""
+from unittest.mock import MagicMock, Mock, patch
+
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from src.job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+from src.job_portal.repositories.chunk_repository import ChunkStore
+from src.job_portal.repositories.company_repository import CompanyStore
+from src.job_portal.repositories.jobseeker_repository import JobSeekerStore
+from src.job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+from src.job_portal.workflows.bulk_upsert import bulk_upsert_job_postings, bulk_upsert_profiles
+
+
+def _posting(company_id, job_title, **fields):
+    return {
+        "company_id": company_id,
+        "company_name": f"Company {company_id}",
+        "job_title": job_title,
+        "job_description": "Build data pipelines",
+        "company_size": "50-200",
+        "location": "Berlin",
+        "industry": "Software",
+        "required_skills": ["Python"],
+        **fields
+    }
+
+
+def _profile(user_id, **fields):
+    return {
+        "user_id": user_id,
+        "name": f"Candidate {user_id}",
+        "profile_summary": "Backend engineer",
+        "years_of_experience": 4,
+        "skills": ["Python", "MongoDB"],
+        "desired_location": "Remote",
+        **fields
+    }
+
+
+def _matches(document, query):
+    if "$or" in query:
+        return any(_matches(document, clause) for clause in query["$or"])
+    return all(
+        document.get(field) in spec["$in"] if isinstance(spec, dict) else document.get(field) == spec
+        for field, spec in query.items()
+    )
+
+
+def _collection():
+    """Mock collection applying upserts to an in-memory list of documents."""
+    mock_collection = MagicMock()
+    documents = []
+    
+    def find(query, projection=None):
+        return [dict(document) for document in documents if _matches(document, query)]
+    
+    def bulk_write(operations, ordered):
+        result = {"nUpserted": 0, "nMatched": 0, "nModified": 0}
+        for operation in operations:
+            existing = next((document for document in documents if _matches(document, operation._filter)), None)
+            if existing is None:
+                documents.append({"_id": ObjectId(), **operation._doc["$setOnInsert"], **operation._doc["$set"]})
+                result["nUpserted"] += 1
+                continue
+            result["nMatched"] += 1
+            changed = {key: value for key, value in operation._doc["$set"].items() if existing.get(key) != value}
+            unset = [key for key in operation._doc.get("$unset", {}) if key in existing]
+            if changed or unset:
+                existing.update(changed)
+                for key in unset:
+                    del existing[key]
+                result["nModified"] += 1
+        return Mock(bulk_api_result=result)
+    
+    def update_one(query, update):
+        matched = [document for document in documents if _matches(document, query)][:1]
+        for document in matched:
+            document.update(update["$set"])
+        return Mock(modified_count=len(matched))
+    
+    mock_collection.find.side_effect = find
+    mock_collection.update_one.side_effect = update_one
+    mock_collection.bulk_write.side_effect = bulk_write
+    mock_collection.documents = documents
+    return mock_collection
+
+
+def _embeddings():
+    embeddings = JobPortalEmbeddings(provider=HashingEmbeddingProvider(output_dimension=64), use_cache=False)
+    embeddings.embed_document_texts = Mock(wraps=embeddings.embed_document_texts)
+    return embeddings
+
+
+class TestBulkWrite:
+    """Test suite for VectorStore.bulk_upsert retries and counts."""
+    
+    def test_retries_transient_errors_only(self):
+        """Test that retryable write errors are resent and others are counted as failed."""
+        collection = MagicMock()
+        store = CompanyStore(collection)
+        error = BulkWriteError({
+            "nUpserted": 1, "nMatched": 0, "nModified": 0,
+            "writeErrors": [{"index": 1, "code": 11000}, {"index": 2, "code": 121}],
+        })
+        collection.bulk_write.side_effect = [error, Mock(bulk_api_result={"nUpserted": 0, "nMatched": 1, "nModified": 1})]
+        documents = [_posting("c1", title) for title in ("A", "B", "C")]
+        
+        with patch("time.sleep"):
+            counts = store.bulk_upsert(documents, store.upsert_key)
+        
+        assert counts == {"inserted": 1, "updated": 1, "unchanged": 0, "failed": 1}
+        retried = collection.bulk_write.call_args_list[1].args[0]
+        assert [operation._filter for operation in retried] == [{"company_id": "c1", "job_title": "B"}]
+    
+    def test_resends_chunk_after_connection_loss(self):
+        """Test that a chunk is resent whole after AutoReconnect and gives up after max_retries."""
+        collection = MagicMock()
+        store = JobSeekerStore(collection)
+        collection.bulk_write.side_effect = [
+            AutoReconnect("primary stepped down"),
+            Mock(bulk_api_result={"nUpserted": 2, "nMatched": 0, "nModified": 0}),
+            AutoReconnect("primary stepped down"),
+            AutoReconnect("primary stepped down"),
+        ]
+        
+        with patch("time.sleep"):
+            first = store.bulk_upsert([_profile("u1"), _profile("u2")], store.upsert_key)
+            second = store.bulk_upsert([_profile("u3")], store.upsert_key, max_retries=1)
+        
+        assert first == {"inserted": 2, "updated": 0, "unchanged": 0, "failed": 0}
+        assert second == {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 1}
+    
+    def test_writes_in_chunks_without_overwriting_created_at(self):
+        """Test that upserts are unordered, chunked and only set created_at on insert."""
+        collection = MagicMock()
+        collection.bulk_write.return_value = Mock(bulk_api_result={"nUpserted": 2})
+        store = JobSeekerStore(collection)
+        
+        store.bulk_upsert([_profile(f"u{i}", created_at=None, status="active") for i in range(5)], ("user_id",), chunk_size=2)
+        
+        assert collection.bulk_write.call_count == 3
+        operation = collection.bulk_write.call_args_list[0].args[0][0]
+        assert collection.bulk_write.call_args_list[0].kwargs == {"ordered": False}
+        assert operation._filter == {"user_id": "u0"}
+        assert "created_at" not in operation._doc["$set"]
+        assert "created_at" in operation._doc["$setOnInsert"]
+        assert "status" not in operation._doc["$set"]
+        assert operation._doc["$setOnInsert"]["status"] == "active"
+
+
+class TestBulkUpsertWorkflow:
+    """Test suite for bulk_upsert_job_postings and bulk_upsert_profiles."""
+    
+    def test_rerun_is_idempotent(self):
+        """Test that re-importing the same feed embeds nothing and reports it unchanged."""
+        collection = _collection()
+        store = CompanyStore(collection)
+        embeddings = _embeddings()
+        postings = [_posting("c1", "Data Engineer"), _posting("c2", "Data Engineer")]
+        
+        first = bulk_upsert_job_postings(store, postings, embeddings=embeddings)
+        second = bulk_upsert_job_postings(store, postings, embeddings=embeddings)
+        
+        assert first["inserted"] == 2 and first["embedded"] == 2
+        assert second == {
+            "received": 2, "skipped": 0, "embedded": 0,
+            "inserted": 0, "updated": 0, "unchanged": 2, "failed": 0
+        }
+        assert embeddings.embed_document_texts.call_count == 1
+        assert len(collection.documents) == 2
+        assert all(len(document["requirements_embedding"]) == 64 for document in collection.documents)
+    
+    def test_creates_unique_key_index(self):
+        """Test that imports make sure the natural key has a unique index."""
+        collection = _collection()
+        
+        bulk_upsert_profiles(JobSeekerStore(collection), [_profile("u1")], embeddings=_embeddings())
+        CompanyStore(collection).ensure_upsert_index()
+        
+        assert collection.create_index.call_args_list[0].args == ([("user_id", 1)],)
+        assert collection.create_index.call_args_list[0].kwargs == {"unique": True}
+        assert collection.create_index.call_args_list[1].args == ([("company_id", 1), ("job_title", 1)],)
+    
+    def test_rerun_keeps_closed_status(self):
+        """Test that re-importing a closed posting leaves it closed and reports it unchanged."""
+        collection = _collection()
+        store = CompanyStore(collection)
+        embeddings = _embeddings()
+        postings = [_posting("c1", "Data Engineer")]
+        bulk_upsert_job_postings(store, postings, embeddings=embeddings)
+        store.update_job_status(str(collection.documents[0]["_id"]), "closed")
+        
+        counts = bulk_upsert_job_postings(store, postings, embeddings=embeddings)
+        
+        assert collection.documents[0]["status"] == "closed"
+        assert counts["updated"] == 0 and counts["unchanged"] == 1
+    
+    def test_location_moved_to_unknown_place_drops_point(self):
+        """Test that re-importing a posting at an unknown place removes its old point."""
+        collection = _collection()
+        store = CompanyStore(collection)
+        embeddings = _embeddings()
+        bulk_upsert_job_postings(store, [_posting("c1", "Data Engineer", location="Austin, TX")], embeddings=embeddings)
+        assert "location_point" in collection.documents[0]
+        
+        counts = bulk_upsert_job_postings(
+            store, [_posting("c1", "Data Engineer", location="Smallville")], embeddings=embeddings
+        )
+        
+        assert counts["updated"] == 1
+        assert "location_point" not in collection.documents[0]
+        assert collection.documents[0]["location_tokens"] == ["smallville"]
+    
+    def test_syncs_chunks_of_changed_documents(self):
+        """Test that chunks follow new, edited and relocated postings but not unchanged ones."""
+        collection = _collection()
+        store = CompanyStore(collection)
+        chunk_store = ChunkStore(MagicMock(), store.chunk_index_name, metadata_fields=store.chunk_metadata_fields)
+        chunk_store.sync_chunks = Mock(return_value={"embedded": 2, "reused": 0, "deleted": 0})
+        embeddings = _embeddings()
+        postings = [_posting("c1", "Data Engineer"), _posting("c2", "Analyst")]
+        
+        first = bulk_upsert_job_postings(store, postings, embeddings=embeddings, chunk_store=chunk_store)
+        second = bulk_upsert_job_postings(store, postings, embeddings=embeddings, chunk_store=chunk_store)
+        assert first["chunks_embedded"] == 4 and second["chunks_embedded"] == 0
+        
+        store.update_job_status(str(collection.documents[0]["_id"]), "closed")
+        chunk_store.sync_chunks.reset_mock()
+        bulk_upsert_job_postings(store, [
+            _posting("c1", "Data Engineer", location="Munich"), _posting("c2", "Analyst")
+        ], embeddings=embeddings, chunk_store=chunk_store)
+        
+        parent_id, chunks, embed_fn, metadata = chunk_store.sync_chunks.call_args.args
+        assert chunk_store.sync_chunks.call_count == 1
+        assert parent_id == collection.documents[0]["_id"]
+        assert chunks and embed_fn == embeddings.embed_chunks
+        assert metadata["status"] == "closed"
+        assert metadata["location_tokens"] == collection.documents[0]["location_tokens"]
+    
+    def test_only_changed_text_is_reembedded(self):
+        """Test that metadata-only changes keep the stored vector and text changes replace it."""
+        collection = _collection()
+        store = JobSeekerStore(collection)
+        embeddings = _embeddings()
+        bulk_upsert_profiles(store, [_profile("u1"), _profile("u2")], embeddings=embeddings)
+        old_vector = collection.documents[0]["profile_embedding"]
+        
+        counts = bulk_upsert_profiles(store, [
+            _profile("u1", availability="2_weeks"),
+            _profile("u2", profile_summary="Data engineer"),
+        ], embeddings=embeddings)
+        
+        assert counts["updated"] == 2 and counts["embedded"] == 1
+        assert embeddings.embed_document_texts.call_args.args[0][0].count("Data engineer") == 1
+        assert collection.documents[0]["profile_embedding"] == old_vector
+        assert collection.documents[0]["availability"] == "2_weeks"
+        assert collection.documents[1]["profile_embedding"] != old_vector
+    
+    def test_duplicate_and_invalid_records_are_skipped(self):
+        """Test that the last record per key wins and records missing fields are skipped."""
+        collection = _collection()
+        store = CompanyStore(collection)
+        
+        counts = bulk_upsert_job_postings(store, [
+            _posting("c1", "Data Engineer", location="Paris"),
+            _posting("c1", "Data Engineer", location="Lisbon"),
+            {"company_id": "c2", "job_title": "Analyst"},
+        ], embeddings=_embeddings(), chunk_size=10)
+        
+        assert counts["received"] == 3 and counts["skipped"] == 2 and counts["inserted"] == 1
+        assert collection.documents[0]["location"] == "Lisbon"
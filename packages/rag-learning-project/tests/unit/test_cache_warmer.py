@@ -0,0 +1,86 @@
+"""Unit tests for the query cache warmer."""
+from src.job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+from src.job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
+from src.job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+from src.job_portal.services.embeddings.query_log import QueryLog
+from src.job_portal.workflows.cache_warmer import DAY, CacheWarmer, rank_queries
+
+
+NOW = 100 * DAY
+
+
+def _log(tmp_path, entries):
+    """Query log holding (age in days, query) entries."""
+    log = QueryLog(str(tmp_path / "queries.jsonl"))
+    for age, query in entries:
+        log._clock = lambda age=age: NOW - age * DAY
+        log.append(query, "jobs")
+    return log
+
+
+def _embeddings():
+    """Embeddings over the local hashing provider with an in-memory cache."""
+    return JobPortalEmbeddings(cache=EmbeddingCache(), provider=HashingEmbeddingProvider())
+
+
+class TestRankQueries:
+    """Test suite for rank_queries."""
+    
+    def test_frequency_with_recency_decay(self):
+        """Test that old occurrences count for less than recent ones."""
+        entries = [
+            {"t": NOW - 14 * DAY, "k": "jobs", "q": "old"},
+            {"t": NOW - 14 * DAY, "k": "jobs", "q": "old"},
+            {"t": NOW - 14 * DAY, "k": "jobs", "q": "old"},
+            {"t": NOW, "k": "jobs", "q": "fresh"},
+            {"t": NOW, "k": "jobs", "q": "fresh"},
+            {"t": NOW, "k": "candidates", "q": "other"},
+        ]
+        
+        ranked = rank_queries(entries, NOW, half_life=7 * DAY)
+        
+        assert [query for query, _ in ranked] == ["fresh", "other", "old"]
+        assert ranked[2][1] == 0.75
+        assert [query for query, _ in rank_queries(entries, NOW, kinds=["candidates"])] == ["other"]
+
+
+class TestCacheWarmer:
+    """Test suite for CacheWarmer class."""
+    
+    def test_warms_top_queries(self, tmp_path):
+        """Test that the top-N queries are embedded into the cache."""
+        log = _log(tmp_path, [(0, "python"), (0, "python"), (0, "rust"), (1, "cobol")])
+        embeddings = _embeddings()
+        warmer = CacheWarmer(embeddings, log, top_n=2, clock=lambda: NOW)
+        
+        report = warmer.run()
+        
+        assert report["ranked"] == 2
+        assert report["warmed"] == 2
+        assert embeddings.embedding_service.cached([["python"], ["rust"], ["cobol"]], "query") == [True, True, False]
+    
+    def test_cached_queries_are_free(self, tmp_path):
+        """Test that a second run only counts queries as cached."""
+        log = _log(tmp_path, [(0, "python"), (0, "rust")])
+        warmer = CacheWarmer(_embeddings(), log, clock=lambda: NOW)
+        warmer.run()
+        
+        report = warmer.run()
+        
+        assert report["cached"] == 2
+        assert report["warmed"] == 0
+        assert report["tokens"] == 0
+    
+    def test_token_budget(self, tmp_path):
+        """Test that queries past the budget are skipped but shorter ones still fit."""
+        long_query = "senior backend engineer " * 10
+        log = _log(tmp_path, [(0, "python"), (0, "python"), (0, long_query), (1, "go")])
+        embeddings = _embeddings()
+        warmer = CacheWarmer(embeddings, log, max_tokens=5, clock=lambda: NOW)
+        
+        report = warmer.run(dry_run=True)
+        
+        assert report["warmed"] == 2
+        assert report["over_budget"] == 1
+        assert report["tokens"] <= 5
+        assert embeddings.embedding_service.cached([["python"]], "query") == [False]
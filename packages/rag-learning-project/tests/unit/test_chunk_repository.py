@@ -0,0 +1,175 @@
+"""Unit tests for ChunkStore repository."""
+from unittest.mock import MagicMock, Mock
+
+from bson import ObjectId
+from pymongo import DeleteMany, InsertOne, UpdateOne
+
+from src.job_portal.repositories.chunk_repository import ChunkStore
+from src.job_portal.repositories.company_repository import CompanyStore
+
+
+PARENT_ID = "507f1f77bcf86cd799439011"
+
+
+def _stored(texts):
+    """Build stored chunk documents for the given texts."""
+    return [
+        {"_id": f"c{i}", "text_hash": ChunkStore.chunk_hash(text), "chunk_index": i}
+        for i, text in enumerate(texts)
+    ]
+
+
+def _store_with(existing):
+    mock_collection = MagicMock()
+    mock_collection.find.return_value.sort.return_value = existing
+    return ChunkStore(mock_collection, "job_chunk_vector_index"), mock_collection
+
+
+def _operations(mock_collection, kind):
+    return [op for op in mock_collection.bulk_write.call_args[0][0] if isinstance(op, kind)]
+
+
+class TestChunkStore:
+    """Test suite for ChunkStore class."""
+    
+    def test_init(self):
+        """Test initialization."""
+        store = ChunkStore(Mock(), "job_chunk_vector_index", parent_collection="companies")
+        assert store.vector_index_name == "job_chunk_vector_index"
+        assert store.parent_collection == "companies"
+        assert store.coarse_dimensions is None
+    
+    def test_for_store(self):
+        """Test opening the chunk store of a company store."""
+        database = MagicMock()
+        collection = MagicMock(database=database)
+        collection.name = "companies"
+        parent = CompanyStore(collection, vector_format="array", coarse_dimensions=0, local_index=Mock())
+        
+        store = ChunkStore.for_store(parent)
+        
+        database.__getitem__.assert_called_once_with("job_chunks")
+        assert store.vector_index_name == "job_chunk_vector_index"
+        assert store.parent_collection == "companies"
+        assert store.parent_vector_fields == parent.vector_field_names
+        assert "location_tokens" in store.metadata_fields
+        assert store.chunk_metadata({"location_tokens": ["austin"], "job_title": "x"}) == {
+            "location_tokens": ["austin"]
+        }
+    
+    def test_sync_new_parent(self):
+        """Test that every chunk of a new parent is embedded."""
+        store, mock_collection = _store_with([])
+        embed_fn = Mock(return_value=[[0.1], [0.2]])
+        
+        counts = store.sync_chunks(PARENT_ID, ["first", "second"], embed_fn, metadata={"status": "active"})
+        
+        assert counts == {"embedded": 2, "reused": 0, "deleted": 0}
+        embed_fn.assert_called_once_with(["first", "second"])
+        inserted = [op._doc for op in _operations(mock_collection, InsertOne)]
+        assert inserted[0]["parent_id"] == ObjectId(PARENT_ID)
+        assert inserted[1]["chunk_index"] == 1
+        assert inserted[1]["embedding"] == [0.2]
+        assert inserted[1]["status"] == "active"
+        assert inserted[1]["text_hash"] == ChunkStore.chunk_hash("second")
+    
+    def test_sync_only_embeds_changed_chunks(self):
+        """Test that an edit re-embeds only the edited chunk."""
+        store, mock_collection = _store_with(_stored(["intro", "old body", "outro"]))
+        embed_fn = Mock(return_value=[[0.5]])
+        
+        counts = store.sync_chunks(PARENT_ID, ["intro", "new body", "outro"], embed_fn)
+        
+        assert counts == {"embedded": 1, "reused": 2, "deleted": 1}
+        embed_fn.assert_called_once_with(["new body"])
+        assert _operations(mock_collection, DeleteMany)[0]._filter == {"_id": {"$in": ["c1"]}}
+        assert not _operations(mock_collection, UpdateOne)
+    
+    def test_sync_moved_chunks_keep_vectors(self):
+        """Test that inserting a chunk only renumbers the chunks after it."""
+        store, mock_collection = _store_with(_stored(["a", "b"]))
+        embed_fn = Mock(return_value=[[0.9]])
+        
+        counts = store.sync_chunks(PARENT_ID, ["new", "a", "b"], embed_fn)
+        
+        assert counts == {"embedded": 1, "reused": 2, "deleted": 0}
+        updates = [op._doc["$set"]["chunk_index"] for op in _operations(mock_collection, UpdateOne)]
+        assert updates == [1, 2]
+    
+    def test_sync_unchanged_parent(self):
+        """Test that an unchanged parent makes no API call and no writes."""
+        store, mock_collection = _store_with(_stored(["a", "b"]))
+        embed_fn = Mock()
+        
+        counts = store.sync_chunks(PARENT_ID, ["a", "b"], embed_fn)
+        
+        assert counts == {"embedded": 0, "reused": 2, "deleted": 0}
+        embed_fn.assert_not_called()
+        mock_collection.bulk_write.assert_not_called()
+    
+    def test_sync_duplicate_chunks(self):
+        """Test parents containing the same chunk text twice."""
+        store, mock_collection = _store_with(_stored(["same"]))
+        embed_fn = Mock(return_value=[[0.3]])
+        
+        counts = store.sync_chunks(PARENT_ID, ["same", "same"], embed_fn)
+        
+        assert counts == {"embedded": 1, "reused": 1, "deleted": 0}
+    
+    def test_delete_chunks(self):
+        """Test deleting all chunks of a parent."""
+        mock_collection = Mock()
+        mock_collection.delete_many.return_value = Mock(deleted_count=3)
+        store = ChunkStore(mock_collection, "job_chunk_vector_index")
+        
+        assert store.delete_chunks(PARENT_ID) == 3
+        mock_collection.delete_many.assert_called_once_with({"parent_id": ObjectId(PARENT_ID)})
+    
+    def test_search_parents_groups_by_parent(self):
+        """Test the max-sim aggregation pipeline."""
+        mock_collection = Mock()
+        mock_collection.aggregate.return_value = [{"_id": "p1", "score": 0.9}]
+        store = ChunkStore(mock_collection, "job_chunk_vector_index")
+        
+        results = store.search_parents([0.1, 0.2], limit=5, filter_criteria={"status": "active"})
+        
+        assert results == [{"_id": "p1", "score": 0.9}]
+        pipeline = mock_collection.aggregate.call_args[0][0]
+        stage = pipeline[0]["$vectorSearch"]
+        assert stage["index"] == "job_chunk_vector_index"
+        assert stage["limit"] == 15
+        assert stage["filter"] == {"status": "active"}
+        group = next(step["$group"] for step in pipeline if "$group" in step)
+        assert group["_id"] == "$parent_id"
+        assert group["score"] == {"$max": "$score"}
+        assert pipeline[-1] == {"$limit": 5}
+    
+    def test_search_parents_joins_parent_documents(self):
+        """Test that results are merged into the parent documents."""
+        mock_collection = Mock()
+        mock_collection.aggregate.return_value = []
+        store = ChunkStore(mock_collection, "job_chunk_vector_index", parent_collection="companies")
+        
+        store.search_parents([0.1], limit=2)
+        
+        pipeline = mock_collection.aggregate.call_args[0][0]
+        lookup = next(step["$lookup"] for step in pipeline if "$lookup" in step)
+        assert lookup["from"] == "companies"
+        assert "$replaceRoot" in pipeline[-1]
+    
+    def test_search_parents_leaves_out_parent_vectors(self):
+        """Test that joined parent documents come back without their vectors."""
+        mock_collection = Mock()
+        mock_collection.aggregate.return_value = [{"_id": "p1", "score": 0.9, "job_title": "Engineer"}]
+        store = ChunkStore(
+            mock_collection, "job_chunk_vector_index",
+            parent_collection="companies", parent_vector_fields=["requirements_embedding"]
+        )
+        
+        hits = store.search_parents([0.1], limit=2, as_hits=True)
+        
+        pipeline = mock_collection.aggregate.call_args[0][0]
+        assert pipeline[-1] == {"$project": {
+            "requirements_embedding": 0, "requirements_embedding_coarse": 0
+        }}
+        assert hits[0].id == "p1" and hits[0]["job_title"] == "Engineer"
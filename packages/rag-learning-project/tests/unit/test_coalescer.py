@@ -0,0 +1,119 @@
+"""Unit tests for the embedding request coalescer."""
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.job_portal.infrastructure.voyage.coalescer import RequestCoalescer
+from src.job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+
+
+def _fake_embed(inputs, input_type):
+    """Return one 1-dim embedding per chunk, encoding the chunk length."""
+    return [[[float(len(chunk))] for chunk in chunks] for chunks in inputs]
+
+
+def _run_concurrently(fn, args_list):
+    """Call fn once per argument on separate threads and collect results."""
+    results = [None] * len(args_list)
+    
+    def worker(i, arg):
+        results[i] = fn(arg)
+    
+    threads = [threading.Thread(target=worker, args=(i, a)) for i, a in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestRequestCoalescer:
+    """Test suite for RequestCoalescer class."""
+    
+    def test_single_request(self):
+        """Test that a lone request is sent after the window."""
+        embed_fn = Mock(side_effect=_fake_embed)
+        coalescer = RequestCoalescer(embed_fn, window=0.01)
+        
+        assert coalescer.embed([["abc"]], "query") == [[[3.0]]]
+        embed_fn.assert_called_once_with([["abc"]], "query")
+    
+    def test_concurrent_requests_share_one_call(self):
+        """Test that concurrent callers are merged into one API call."""
+        embed_fn = Mock(side_effect=_fake_embed)
+        coalescer = RequestCoalescer(embed_fn, window=0.2)
+        
+        texts = ["a", "bb", "ccc", "dddd"]
+        results = _run_concurrently(lambda t: coalescer.embed([[t]], "query")[0], texts)
+        
+        assert results == [[[1.0]], [[2.0]], [[3.0]], [[4.0]]]
+        assert embed_fn.call_count == 1
+        assert coalescer.stats()["avg_batch_size"] == 4
+    
+    def test_identical_inputs_are_deduplicated(self):
+        """Test that identical in-flight inputs are sent once."""
+        embed_fn = Mock(side_effect=_fake_embed)
+        coalescer = RequestCoalescer(embed_fn, window=0.2)
+        
+        results = _run_concurrently(lambda t: coalescer.embed([[t]], "query")[0], ["same"] * 3)
+        
+        assert results == [[[4.0]]] * 3
+        sent_inputs = embed_fn.call_args[0][0]
+        assert sent_inputs == [["same"]]
+        assert coalescer.stats()["deduplicated"] == 2
+    
+    def test_input_types_are_batched_separately(self):
+        """Test that queries and documents never share a request."""
+        embed_fn = Mock(side_effect=_fake_embed)
+        coalescer = RequestCoalescer(embed_fn, window=0.01)
+        
+        coalescer.embed([["a"]], "query")
+        coalescer.embed([["a"]], "document")
+        
+        input_types = [call[0][1] for call in embed_fn.call_args_list]
+        assert input_types == ["query", "document"]
+    
+    def test_full_batch_is_sent_immediately(self):
+        """Test that max_batch_size bounds each request."""
+        embed_fn = Mock(side_effect=_fake_embed)
+        coalescer = RequestCoalescer(embed_fn, window=0.01, max_batch_size=2)
+        
+        results = coalescer.embed([["a"], ["bb"], ["ccc"]], "document")
+        
+        assert results == [[[1.0]], [[2.0]], [[3.0]]]
+        assert [len(call[0][0]) for call in embed_fn.call_args_list] == [2, 1]
+    
+    def test_errors_reach_every_caller(self):
+        """Test that an API failure is raised to all callers in the batch."""
+        embed_fn = Mock(side_effect=RuntimeError("boom"))
+        coalescer = RequestCoalescer(embed_fn, window=0.01)
+        
+        with pytest.raises(RuntimeError, match="boom"):
+            coalescer.embed([["a"], ["b"]], "query")
+        
+        # Failed inputs are no longer in flight and can be retried
+        embed_fn.side_effect = _fake_embed
+        assert coalescer.embed([["a"]], "query") == [[[1.0]]]
+
+
+class TestServiceCoalescing:
+    """Test coalescing wired into VoyageEmbeddingService."""
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_concurrent_queries_use_one_api_call(self, mock_client_class):
+        """Test that concurrent embed_query calls become one contextualized_embed request."""
+        mock_client = Mock()
+        
+        def contextualized_embed(inputs, **kwargs):
+            return Mock(results=[Mock(embeddings=[[float(len(c[0]))]]) for c in inputs])
+        
+        mock_client.contextualized_embed.side_effect = contextualized_embed
+        mock_client_class.return_value = mock_client
+        
+        service = VoyageEmbeddingService(api_key="test_key", coalesce_window=0.2)
+        results = _run_concurrently(service.embed_query, ["a", "bb", "ccc"])
+        
+        assert results == [[1.0], [2.0], [3.0]]
+        mock_client.contextualized_embed.assert_called_once()
+        assert mock_client.contextualized_embed.call_args[1]["input_type"] == "query"
@@ -47,6 +47,26 @@ class TestCompanyStore:
         assert call_args["status"] == "active"
         assert call_args["remote_policy"] == "onsite"
     
+    def test_store_job_posting_packed_vector(self):
+        """Test storing the embedding as a packed float32 vector."""
+        mock_collection = Mock()
+        mock_collection.insert_one.return_value = Mock(inserted_id="job123")
+        
+        store = CompanyStore(mock_collection, vector_format="float32")
+        store.store_job_posting(
+            company_id="comp1",
+            company_name="TechCorp",
+            job_title="Software Engineer",
+            job_description="Build software",
+            job_requirements_embedding=[0.5, 0.25],
+            company_size="51-200",
+            location="San Francisco",
+            industry="Technology"
+        )
+        
+        stored = mock_collection.insert_one.call_args[0][0]["requirements_embedding"]
+        assert stored.as_vector().data == [0.5, 0.25]
+    
     def test_store_job_posting_full(self):
         """Test storing a job posting with all fields."""
         mock_collection = Mock()
@@ -118,7 +138,8 @@ class TestCompanyStore:
         assert filter_criteria["industry"] == "Technology"
         assert filter_criteria["remote_policy"] == "remote"
         assert filter_criteria["experience_level"] == "senior"
-        assert "$regex" in filter_criteria["location"]
+        assert filter_criteria["$and"] == [{"location_tokens": "san francisco"}, {"location_tokens": "california"}, {"location_tokens": "united states"}]
+        assert "location" not in filter_criteria
     
     def test_get_jobs_by_company(self):
         """Test getting all jobs for a company."""
@@ -156,7 +177,9 @@ class TestCompanyStore:
         store = CompanyStore(mock_collection)
         results = store.filter_by_metadata(limit=10)
         
-        mock_collection.find.assert_called_once_with({"status": "active"})
+        mock_collection.find.assert_called_once_with(
+            {"status": "active"}, {"requirements_embedding": 0, "requirements_embedding_coarse": 0}
+        )
         mock_cursor.limit.assert_called_once_with(10)
     
     def test_filter_by_metadata_with_all_filters(self):
@@ -173,12 +196,17 @@ class TestCompanyStore:
             industry="Tech",
             remote_policy="remote",
             salary_min=100000,
+            skills=["Python"],
+            experience_level="senior",
             limit=20
         )
         
         call_args = mock_collection.find.call_args[0][0]
+        assert call_args["required_skills"]["$in"] == ["Python"]
+        assert call_args["experience_level"] == "senior"
         assert call_args["company_size"] == "51-200"
         assert call_args["industry"] == "Tech"
         assert call_args["remote_policy"] == "remote"
-        assert "$regex" in call_args["location"]
+        assert call_args["$and"] == [{"location_tokens": "san francisco"}, {"location_tokens": "california"}, {"location_tokens": "united states"}]
+        assert "location" not in call_args
         assert call_args["salary_range.max"]["$gte"] == 100000
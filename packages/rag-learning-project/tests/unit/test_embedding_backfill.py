@@ -0,0 +1,135 @@
+"""Unit tests for the stale embedding backfill workflow."""
+from unittest.mock import MagicMock, Mock
+
+from pymongo import UpdateOne
+
+from src.job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+from src.job_portal.repositories.company_repository import CompanyStore
+from src.job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+from src.job_portal.workflows.embedding_backfill import EmbeddingBackfill, is_stale
+
+
+def _job(index, **fields):
+    return {
+        "_id": index,
+        "job_title": f"Engineer {index}",
+        "job_description": "Build services",
+        "required_skills": ["Python"],
+        "experience_level": "mid",
+        **fields
+    }
+
+
+def _backfill(documents, embeddings, **kwargs):
+    """Build a backfill over a mock collection serving the given documents."""
+    mock_collection = MagicMock()
+    mock_collection.name = "companies"
+    
+    def find(query, projection):
+        start_after = query.get("_id", {}).get("$gt")
+        cursor = MagicMock()
+        cursor.sort.return_value.batch_size.return_value = [
+            doc for doc in documents if start_after is None or doc["_id"] > start_after
+        ]
+        return cursor
+    
+    mock_collection.find.side_effect = find
+    mock_collection.bulk_write.side_effect = lambda ops, ordered: Mock(modified_count=len(ops))
+    store = CompanyStore(mock_collection, vector_format="array")
+    return EmbeddingBackfill.for_job_postings(store, embeddings, **kwargs), mock_collection
+
+
+def _written_ids(mock_collection):
+    return [
+        op._filter["_id"]
+        for call in mock_collection.bulk_write.call_args_list
+        for op in call[0][0]
+        if isinstance(op, UpdateOne)
+    ]
+
+
+class TestEmbeddingBackfill:
+    """Test suite for EmbeddingBackfill class."""
+    
+    def setup_method(self):
+        self.embeddings = JobPortalEmbeddings(provider=HashingEmbeddingProvider(output_dimension=64))
+    
+    def _current_meta(self, document):
+        return self.embeddings.embedding_metadata(JobPortalEmbeddings.job_posting_document_text(document))
+    
+    def test_is_stale(self):
+        """Test staleness checks against stored metadata."""
+        meta = self._current_meta(_job(1))
+        
+        assert is_stale(None, meta)
+        assert not is_stale(dict(meta), meta)
+        assert is_stale({**meta, "model": "voyage-context-2"}, meta)
+        assert is_stale({**meta, "dimension": 512}, meta)
+        assert is_stale({**meta, "text_hash": "old"}, meta)
+    
+    def test_document_text_matches_embedded_text(self):
+        """Test that stored documents rebuild the text embed_job_posting embeds."""
+        document = _job(1)
+        expected = JobPortalEmbeddings._job_posting_text(
+            "Engineer 1", "Build services", ["Python"], "mid"
+        )
+        assert JobPortalEmbeddings.job_posting_document_text(document) == expected
+    
+    def test_run_only_reembeds_stale_documents(self):
+        """Test that fresh documents are skipped and stale ones written with metadata."""
+        fresh = _job(2)
+        fresh["requirements_embedding_meta"] = self._current_meta(fresh)
+        documents = [_job(1), fresh, _job(3, job_description="Changed")]
+        backfill, mock_collection = _backfill(documents, self.embeddings)
+        
+        counts = backfill.run()
+        
+        assert counts == {"scanned": 3, "stale": 2, "updated": 2}
+        assert _written_ids(mock_collection) == [1, 3]
+        update = mock_collection.bulk_write.call_args[0][0][0]._doc["$set"]
+        assert len(update["requirements_embedding"]) == 64
+        assert update["requirements_embedding_meta"]["model"] == "local-hashing-v1-s0"
+        assert mock_collection.bulk_write.call_args[1] == {"ordered": False}
+    
+    def test_run_batches_requests(self):
+        """Test that stale documents are embedded in request-sized batches."""
+        documents = [_job(index) for index in range(5)]
+        backfill, mock_collection = _backfill(documents, self.embeddings, batch_size=2)
+        
+        backfill.run()
+        
+        assert [len(call[0][0]) for call in mock_collection.bulk_write.call_args_list] == [2, 2, 1]
+    
+    def test_dry_run_writes_nothing(self):
+        """Test counting stale documents without embedding them."""
+        backfill, mock_collection = _backfill([_job(1), _job(2)], self.embeddings)
+        
+        counts = backfill.run(dry_run=True)
+        
+        assert counts == {"scanned": 2, "stale": 2, "updated": 0}
+        mock_collection.bulk_write.assert_not_called()
+    
+    def test_resume_from_checkpoint(self, tmp_path):
+        """Test that an interrupted run resumes after the last written document."""
+        checkpoint = tmp_path / "companies.json"
+        documents = [_job(index) for index in range(1, 6)]
+        backfill, mock_collection = _backfill(
+            documents, self.embeddings, checkpoint_path=str(checkpoint), batch_size=2
+        )
+        
+        backfill.run(max_documents=2)
+        assert checkpoint.exists()
+        
+        counts = backfill.run()
+        
+        assert counts["scanned"] == 3
+        assert _written_ids(mock_collection) == [1, 2, 3, 4, 5]
+        assert not checkpoint.exists()
+    
+    def test_checkpoint_for_other_field_ignored(self, tmp_path):
+        """Test that a checkpoint written for another collection is not reused."""
+        checkpoint = tmp_path / "progress.json"
+        checkpoint.write_text('{"key": "job_seekers.profile_embedding", "last_id": 3}')
+        backfill, _ = _backfill([_job(1)], self.embeddings, checkpoint_path=str(checkpoint))
+        
+        assert backfill.run(dry_run=True)["scanned"] == 1
@@ -0,0 +1,107 @@
+"""Unit tests for the embedding cache."""
+import numpy as np
+import pytest
+
+from src.job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache, make_cache_key
+
+
+class TestMakeCacheKey:
+    """Test suite for make_cache_key."""
+    
+    def test_key_is_stable(self):
+        """Test that identical inputs produce identical keys."""
+        key1 = make_cache_key("voyage-context-3", 1024, "query", ["python"])
+        key2 = make_cache_key("voyage-context-3", 1024, "query", ["python"])
+        assert key1 == key2
+    
+    @pytest.mark.parametrize("args", [
+        ("voyage-3", 1024, "query", ["python"]),
+        ("voyage-context-3", 512, "query", ["python"]),
+        ("voyage-context-3", 1024, "document", ["python"]),
+        ("voyage-context-3", 1024, "query", ["java"]),
+        ("voyage-context-3", 1024, "query", ["pyt", "hon"]),
+    ])
+    def test_key_changes_with_each_component(self, args):
+        """Test that model, dimension, input type and text all affect the key."""
+        base = make_cache_key("voyage-context-3", 1024, "query", ["python"])
+        assert make_cache_key(*args) != base
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache class."""
+    
+    def test_miss_then_hit(self):
+        """Test memory tier hit/miss counters."""
+        cache = EmbeddingCache()
+        assert cache.get("k") is None
+        cache.put("k", [0.1, 0.2, 0.3])
+        
+        vectors = cache.get("k")
+        assert vectors.shape == (1, 3)
+        assert vectors.dtype == np.float32
+        
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["hit_ratio"] == 0.5
+    
+    def test_stores_multiple_chunks(self):
+        """Test that chunked documents keep one row per chunk."""
+        cache = EmbeddingCache()
+        cache.put("doc", [[0.1, 0.2], [0.3, 0.4]])
+        assert cache.get("doc").shape == (2, 2)
+    
+    def test_memory_tier_evicts_least_recently_used(self):
+        """Test size-based LRU eviction in memory."""
+        vector = np.zeros(256, dtype=np.float32)  # 1 KB
+        cache = EmbeddingCache(max_memory_bytes=2 * vector.nbytes)
+        cache.put("a", vector)
+        cache.put("b", vector)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", vector)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+    
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Test that entries persist across cache instances."""
+        path = tmp_path / "cache.sqlite3"
+        cache = EmbeddingCache(path=path)
+        cache.put("k", [0.5, 0.25])
+        cache.close()
+        
+        reopened = EmbeddingCache(path=path)
+        vectors = reopened.get("k")
+        assert vectors.tolist() == [[0.5, 0.25]]
+        assert reopened.stats()["disk_hits"] == 1
+        reopened.close()
+    
+    def test_disk_tier_evicts_over_budget(self, tmp_path):
+        """Test size-based eviction on disk."""
+        vector = np.zeros(256, dtype=np.float32)
+        cache = EmbeddingCache(
+            path=tmp_path / "cache.sqlite3",
+            max_memory_bytes=vector.nbytes,
+            max_disk_bytes=3 * vector.nbytes
+        )
+        for key in ["a", "b", "c", "d"]:
+            cache.put(key, vector)
+        
+        assert cache.stats()["disk_bytes"] <= 3 * vector.nbytes
+        assert cache.get("a") is None
+        assert cache.get("d") is not None
+        cache.close()
+    
+    def test_from_env_without_disk(self, monkeypatch):
+        """Test disabling the disk tier through the environment."""
+        monkeypatch.setenv("EMBEDDING_CACHE_PATH", "none")
+        assert EmbeddingCache.from_env().path is None
+    
+    def test_clear(self, tmp_path):
+        """Test clearing both tiers."""
+        cache = EmbeddingCache(path=tmp_path / "cache.sqlite3")
+        cache.put("k", [0.1])
+        cache.clear()
+        assert cache.get("k") is None
+        cache.close()
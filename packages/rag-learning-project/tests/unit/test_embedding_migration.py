@@ -0,0 +1,217 @@
+"""Unit tests for embedding generations and the shadow-field migration workflow."""
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from src.job_portal.domain.embedding_generation import (
+    EmbeddingGeneration, load_generation, other_generation_fields, register_generation, save_generation
+)
+from src.job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+from src.job_portal.repositories.company_repository import CompanyStore
+from src.job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+from src.job_portal.workflows.embedding_migration import EmbeddingMigration, check_target, switch_generation
+
+
+TARGET = EmbeddingGeneration("v2", model="voyage-3.5", output_dimension=64)
+
+
+def _job(index, **fields):
+    return {
+        "_id": index,
+        "job_title": f"Engineer {index}",
+        "job_description": "Build services",
+        "required_skills": ["Python"],
+        "requirements_embedding": [0.5] * 8,
+        **fields
+    }
+
+
+def _collection(documents):
+    """Mock collection serving documents and applying bulk $set updates to them."""
+    mock_collection = MagicMock()
+    mock_collection.name = "companies"
+    by_id = {doc["_id"]: doc for doc in documents}
+    
+    def find(query, projection):
+        cursor = MagicMock()
+        cursor.sort.return_value.batch_size.return_value = [dict(doc) for doc in documents]
+        return cursor
+    
+    def bulk_write(operations, ordered):
+        for operation in operations:
+            by_id[operation._filter["_id"]].update(operation._doc["$set"])
+        return Mock(modified_count=len(operations))
+    
+    mock_collection.find.side_effect = find
+    mock_collection.bulk_write.side_effect = bulk_write
+    return mock_collection
+
+
+def _migration(documents):
+    embeddings = JobPortalEmbeddings(provider=HashingEmbeddingProvider(output_dimension=64), generation=TARGET)
+    return EmbeddingMigration.for_job_postings(_collection(documents), TARGET, embeddings=embeddings)
+
+
+class TestEmbeddingGeneration:
+    """Test suite for EmbeddingGeneration and the generation file."""
+    
+    def test_field_and_index_names(self):
+        """Test that named generations suffix field and index names."""
+        assert EmbeddingGeneration().field("profile_embedding") == "profile_embedding"
+        assert TARGET.field("profile_embedding") == "profile_embedding_v2"
+        assert TARGET.index("jobseeker_vector_index") == "jobseeker_vector_index_v2"
+        with pytest.raises(ValueError):
+            EmbeddingGeneration("v-2")
+    
+    def test_load_and_save(self, tmp_path):
+        """Test that a missing file means the default generation and saves round-trip."""
+        path = str(tmp_path / "generation.json")
+        assert load_generation(path) == EmbeddingGeneration()
+        
+        save_generation(TARGET, path)
+        
+        assert load_generation(path) == TARGET
+    
+    def test_reads_leave_out_shadow_fields(self, tmp_path, monkeypatch):
+        """Test that a migration's shadow vectors stay out of reads, before and after the switch."""
+        monkeypatch.setenv("EMBEDDING_GENERATION_FILE", str(tmp_path / "generation.json"))
+        store = CompanyStore(Mock())
+        assert "requirements_embedding_v2" not in store.read_projection()
+        
+        register_generation(TARGET)
+        
+        assert load_generation() == EmbeddingGeneration()
+        assert not store.reload_generation()
+        assert store.read_projection()["requirements_embedding_v2"] == 0
+        assert CompanyStore(Mock()).read_projection()["requirements_embedding_v2_coarse"] == 0
+        
+        save_generation(TARGET)
+        save_generation(EmbeddingGeneration("v3"))
+        
+        assert other_generation_fields("profile_embedding") == ["profile_embedding_v2"]
+        assert store.reload_generation()
+        projection = store.read_projection()
+        assert projection["requirements_embedding_v2"] == projection["requirements_embedding"] == 0
+    
+    def test_stores_follow_generation(self):
+        """Test that stores read and write the generation's field and index."""
+        store = CompanyStore(Mock(), generation=TARGET)
+        
+        assert store.vector_field == "requirements_embedding_v2"
+        assert store.vector_index_name == "company_vector_index_v2"
+    
+    def test_local_provider_uses_generation_dimension(self, monkeypatch):
+        """Test that the env-selected hashing provider emits the generation's dimension."""
+        monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+        embeddings = JobPortalEmbeddings(use_cache=False, generation=TARGET)
+        
+        assert len(embeddings.embed_search_query("python developer")) == 64
+    
+    def test_long_lived_instances_reload_generation(self, tmp_path, monkeypatch):
+        """Test that stores and query embeddings follow a switch made after they were created."""
+        monkeypatch.setenv("EMBEDDING_GENERATION_FILE", str(tmp_path / "generation.json"))
+        monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+        store = CompanyStore(Mock())
+        embeddings = JobPortalEmbeddings(use_cache=False)
+        embeddings.embed_job_search_query(desired_skills=["Python"])
+        assert not store.reload_generation()
+        assert not embeddings.reload_generation()
+        
+        save_generation(TARGET)
+        
+        assert store.reload_generation()
+        assert store.vector_field == "requirements_embedding_v2"
+        assert store.vector_index_name == "company_vector_index_v2"
+        assert embeddings.reload_generation()
+        assert embeddings.embedding_service.model == HashingEmbeddingProvider(output_dimension=64).model
+        assert len(embeddings.embed_job_search_query(desired_skills=["Python"])) == 64
+
+
+class TestEmbeddingMigration:
+    """Test suite for EmbeddingMigration class."""
+    
+    def test_run_fills_shadow_field(self):
+        """Test that vectors go to the shadow field and the live field is untouched."""
+        documents = [_job(1), _job(2)]
+        migration = _migration(documents)
+        
+        counts = migration.run()
+        
+        assert counts["updated"] == 2
+        assert len(documents[0]["requirements_embedding_v2"]) == 64
+        assert documents[0]["requirements_embedding_v2_meta"]["dimension"] == 64
+        assert documents[0]["requirements_embedding"] == [0.5] * 8
+    
+    def test_coverage(self):
+        """Test that coverage counts documents with current shadow vectors."""
+        documents = [_job(1), _job(2), _job(3)]
+        migration = _migration(documents)
+        assert migration.coverage() == {"total": 3, "migrated": 0, "ratio": 0.0}
+        
+        migration.run(max_documents=2)
+        assert migration.coverage()["migrated"] == 2
+        
+        documents[0]["job_description"] = "Edited after migrating"
+        migration.run()
+        assert migration.coverage() == {"total": 3, "migrated": 3, "ratio": 1.0}
+    
+    def test_index_definition(self):
+        """Test that the shadow index copies the live one for the new field and dimension."""
+        definition = _migration([]).index_definition()
+        
+        assert definition["name"] == "company_vector_index_v2"
+        vector = [field for field in definition["definition"]["fields"] if field["type"] == "vector"]
+        assert vector == [{
+            "type": "vector", "path": "requirements_embedding_v2", "numDimensions": 64, "similarity": "cosine"
+        }]
+        assert {"type": "filter", "path": "status"} in definition["definition"]["fields"]
+    
+    def test_ensure_index(self):
+        """Test that the shadow index is created only once."""
+        migration = _migration([])
+        collection = migration.store.collection
+        collection.list_search_indexes.return_value = []
+        
+        assert migration.ensure_index() is True
+        model = collection.create_search_index.call_args[0][0]
+        assert model.document["name"] == "company_vector_index_v2"
+        
+        collection.list_search_indexes.return_value = [{"name": "company_vector_index_v2"}]
+        assert migration.ensure_index() is False
+
+
+class TestSwitchGeneration:
+    """Test suite for switching the active generation."""
+    
+    def test_switch_requires_full_coverage(self, tmp_path):
+        """Test that reads only switch once every document is migrated and indexed."""
+        path = str(tmp_path / "generation.json")
+        migration = _migration([_job(1), _job(2)])
+        migration.store.collection.list_search_indexes.return_value = [{"queryable": True}]
+        
+        with pytest.raises(RuntimeError, match="0/2 migrated"):
+            switch_generation([migration], path)
+        assert load_generation(path) == EmbeddingGeneration()
+        
+        migration.run()
+        
+        assert switch_generation([migration], path) == TARGET
+        assert CompanyStore(Mock(), generation=load_generation(path)).vector_field == "requirements_embedding_v2"
+    
+    def test_switch_requires_queryable_index(self, tmp_path):
+        """Test that a building index blocks the switch."""
+        migration = _migration([])
+        migration.store.collection.list_search_indexes.return_value = [{"queryable": False}]
+        
+        with pytest.raises(RuntimeError, match="not queryable"):
+            switch_generation([migration], str(tmp_path / "generation.json"))
+    
+    def test_target_must_not_be_active(self, tmp_path):
+        """Test that migrating into the live fields is refused."""
+        path = str(tmp_path / "generation.json")
+        check_target(TARGET, path)
+        
+        save_generation(TARGET, path)
+        
+        with pytest.raises(ValueError):
+            check_target(EmbeddingGeneration("v2", output_dimension=512), path)
@@ -0,0 +1,118 @@
+"""Unit tests for embedding providers."""
+import asyncio
+import os
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+from src.job_portal.infrastructure.voyage.async_embedding_service import AsyncVoyageEmbeddingService
+from src.job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
+from src.job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+from src.job_portal.infrastructure.voyage.provider import VoyageProvider
+
+
+def _cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestHashingEmbeddingProvider:
+    """Test suite for HashingEmbeddingProvider class."""
+    
+    def test_output_dimension(self):
+        """Test that vectors have the configured dimension and unit length."""
+        provider = HashingEmbeddingProvider(output_dimension=1024)
+        [[vector]] = provider.embed([["Senior Python developer"]], input_type="query")
+        assert len(vector) == 1024
+        assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-5)
+    
+    def test_deterministic_across_instances(self):
+        """Test that the same text always maps to the same vector."""
+        first = HashingEmbeddingProvider().embed_texts(["Machine learning engineer"])
+        second = HashingEmbeddingProvider().embed_texts(["Machine learning engineer"])
+        np.testing.assert_array_equal(first, second)
+    
+    def test_seed_changes_vectors(self):
+        """Test that the seed is part of the model identity."""
+        first = HashingEmbeddingProvider(seed=0)
+        second = HashingEmbeddingProvider(seed=1)
+        assert first.model != second.model
+        assert not np.allclose(first.embed_texts(["python"]), second.embed_texts(["python"]))
+    
+    def test_similar_texts_score_higher(self):
+        """Test that overlapping texts are closer than unrelated ones."""
+        provider = HashingEmbeddingProvider()
+        query, near, far = provider.embed_texts([
+            "Python backend developer with Django experience",
+            "Backend developer experienced in Python and Django",
+            "Registered nurse for night shifts at the hospital",
+        ])
+        assert _cosine(query, near) > _cosine(query, far) + 0.3
+    
+    def test_empty_text(self):
+        """Test that texts without words embed to a zero vector."""
+        matrix = HashingEmbeddingProvider(output_dimension=8).embed_texts(["", "!!!"])
+        assert matrix.shape == (2, 8)
+        assert not matrix.any()
+    
+    def test_contextualized_chunks(self):
+        """Test that chunks of one input are pulled towards the input's context."""
+        provider = HashingEmbeddingProvider()
+        chunks = ["Python developer", "Remote team in Berlin"]
+        [contextual] = provider.embed([chunks], input_type="document")
+        standalone = provider.embed_texts(chunks)
+        
+        assert len(contextual) == 2
+        assert _cosine(contextual[0], contextual[1]) > _cosine(standalone[0], standalone[1])
+    
+    def test_aembed(self):
+        """Test the async wrapper."""
+        provider = HashingEmbeddingProvider(output_dimension=16)
+        result = asyncio.run(provider.aembed([["a b"], ["c"]], input_type="document"))
+        assert np.allclose(result[0][0], provider.embed_texts(["a b"])[0])
+        assert len(result) == 2
+
+
+class TestServicesWithProvider:
+    """Test embedding services backed by a non-Voyage provider."""
+    
+    def test_sync_service_without_api_key(self):
+        """Test that a local provider needs no API key and skips the rate limiter."""
+        limiter = Mock(tpm=None)
+        with patch.dict(os.environ, {}, clear=True):
+            service = VoyageEmbeddingService(
+                provider=HashingEmbeddingProvider(output_dimension=1024),
+                rate_limiter=limiter
+            )
+        embedding = service.embed_query("data engineer")
+        
+        assert len(embedding) == 1024
+        assert service.model.startswith("local-hashing")
+        limiter.acquire.assert_not_called()
+    
+    def test_sync_service_batch_and_cache(self):
+        """Test batch embedding and caching through the local provider."""
+        cache = EmbeddingCache()
+        service = VoyageEmbeddingService(provider=HashingEmbeddingProvider(), cache=cache)
+        
+        first = service.embed_documents_batch(["doc one", "doc two"])
+        second = service.embed_documents_batch(["doc one", "doc two"])
+        
+        assert np.array_equal(first, second)
+        assert cache.stats()["memory_hits"] == 2
+    
+    def test_async_service(self):
+        """Test the async service with a local provider."""
+        with patch.dict(os.environ, {}, clear=True):
+            service = AsyncVoyageEmbeddingService(provider=HashingEmbeddingProvider(output_dimension=32))
+        embedding = asyncio.run(service.embed_query("site reliability engineer"))
+        assert len(embedding) == 32
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_default_provider_is_voyage(self, mock_client_class):
+        """Test that the service wraps the Voyage client by default."""
+        service = VoyageEmbeddingService(api_key="test_key", output_dimension=512)
+        assert isinstance(service.provider, VoyageProvider)
+        assert service.provider.client is mock_client_class.return_value
+        assert service.provider.output_dimension == 512
@@ -1,9 +1,11 @@
 """Unit tests for Voyage AI embedding service."""
 import os
+import numpy as np
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 
 from src.job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+from src.job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
 
 
 class TestVoyageEmbeddingService:
@@ -56,7 +58,7 @@ class TestVoyageEmbeddingService:
         embedding = service.embed_query("test query")
         
         # Assertions
-        assert embedding == [0.1, 0.2, 0.3]
+        assert embedding == pytest.approx([0.1, 0.2, 0.3])
         mock_client.contextualized_embed.assert_called_once_with(
             inputs=[["test query"]],
             model="voyage-context-3",
@@ -79,7 +81,7 @@ class TestVoyageEmbeddingService:
         embedding = service.embed_document("short document", auto_chunk=False)
         
         # Assertions
-        assert embedding == [0.1, 0.2, 0.3]
+        assert embedding == pytest.approx([0.1, 0.2, 0.3])
         mock_client.contextualized_embed.assert_called_once_with(
             inputs=[["short document"]],
             model="voyage-context-3",
@@ -102,7 +104,7 @@ class TestVoyageEmbeddingService:
         embedding = service.embed_document("short document", auto_chunk=True)
         
         # Should return single embedding, not dict
-        assert embedding == [0.1, 0.2, 0.3]
+        assert embedding == pytest.approx([0.1, 0.2, 0.3])
     
     @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
     def test_embed_document_with_auto_chunking_multiple_chunks(self, mock_client_class):
@@ -124,7 +126,7 @@ class TestVoyageEmbeddingService:
         assert "embeddings" in result
         assert "chunks" in result
         assert "num_chunks" in result
-        assert result["embeddings"] == [[0.1, 0.2], [0.3, 0.4]]
+        assert result["embeddings"] == pytest.approx(np.array([[0.1, 0.2], [0.3, 0.4]]))
         assert result["num_chunks"] == 2
     
     @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
@@ -148,7 +150,7 @@ class TestVoyageEmbeddingService:
         )
         
         # Assertions
-        assert embeddings == [[0.1, 0.2], [0.3, 0.4]]
+        assert np.array(embeddings) == pytest.approx(np.array([[0.1, 0.2], [0.3, 0.4]]))
         mock_client.contextualized_embed.assert_called_once()
     
     @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
@@ -175,14 +177,88 @@ class TestVoyageEmbeddingService:
         assert len(embeddings) == 2
         # First embedding is averaged (numpy does this internally)
         assert len(embeddings[0]) == 2
-        assert embeddings[1] == [0.5, 0.6]  # Single chunk
+        assert embeddings[1] == pytest.approx([0.5, 0.6])  # Single chunk
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_embeddings_are_float32_arrays(self, mock_client_class):
+        """Test that vectors stay float32 NumPy arrays, including averaged ones."""
+        mock_client = Mock()
+        mock_result = Mock()
+        mock_result.results = [Mock(embeddings=[[0.25, 0.5], [0.75, 1.0]])]
+        mock_client.contextualized_embed.return_value = mock_result
+        mock_client_class.return_value = mock_client
+        
+        service = VoyageEmbeddingService(api_key="test_key")
+        chunked = service.embed_inputs([["a", "b"]], input_type="document")[0]
+        averaged = service.embed_documents_batch(["a"], auto_chunk=False)[0]
+        
+        assert isinstance(chunked, np.ndarray)
+        assert chunked.dtype == np.float32
+        assert chunked.shape == (2, 2)
+        assert averaged.dtype == np.float32
+        assert averaged.tolist() == [0.5, 0.75]
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_embed_query_served_from_cache(self, mock_client_class):
+        """Test that a repeated query does not call the API again."""
+        mock_client = Mock()
+        mock_result = Mock()
+        mock_result.results = [Mock(embeddings=[[0.5, 0.25]])]
+        mock_client.contextualized_embed.return_value = mock_result
+        mock_client_class.return_value = mock_client
+        
+        cache = EmbeddingCache()
+        service = VoyageEmbeddingService(api_key="test_key", cache=cache)
+        first = service.embed_query("python developer")
+        second = service.embed_query("python developer")
+        
+        assert first.tolist() == [0.5, 0.25]
+        assert second.tolist() == [0.5, 0.25]
+        mock_client.contextualized_embed.assert_called_once()
+        assert cache.stats()["memory_hits"] == 1
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_cache_key_includes_input_type(self, mock_client_class):
+        """Test that query and document embeddings of the same text are cached separately."""
+        mock_client = Mock()
+        mock_result = Mock()
+        mock_result.results = [Mock(embeddings=[[0.5, 0.25]])]
+        mock_client.contextualized_embed.return_value = mock_result
+        mock_client_class.return_value = mock_client
+        
+        service = VoyageEmbeddingService(api_key="test_key", cache=EmbeddingCache())
+        service.embed_query("python developer")
+        service.embed_document("python developer", auto_chunk=False)
+        
+        assert mock_client.contextualized_embed.call_count == 2
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_embed_documents_batch_only_sends_misses(self, mock_client_class):
+        """Test batch embedding sends only uncached documents to the API."""
+        mock_client = Mock()
+        first_result = Mock()
+        first_result.results = [Mock(embeddings=[[0.1, 0.2]])]
+        second_result = Mock()
+        second_result.results = [Mock(embeddings=[[0.3, 0.4]])]
+        mock_client.contextualized_embed.side_effect = [first_result, second_result]
+        mock_client_class.return_value = mock_client
+        
+        service = VoyageEmbeddingService(api_key="test_key", cache=EmbeddingCache())
+        service.embed_documents_batch(["doc1"])
+        embeddings = service.embed_documents_batch(["doc1", "doc2"])
+        
+        assert len(embeddings) == 2
+        assert embeddings[1] == pytest.approx([0.3, 0.4])
+        last_call = mock_client.contextualized_embed.call_args
+        assert last_call[1]["inputs"] == [["doc2"]]
     
     @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
     def test_text_splitter_configuration(self, mock_client_class):
         """Test that text splitter is configured correctly."""
         service = VoyageEmbeddingService(api_key="test_key")
         
-        # Text splitter uses _chunk_size internally
-        assert service.text_splitter._chunk_size == 1000
+        # Chunks are measured in tokens by the service's counter
+        assert service.text_splitter._chunk_size == 512
         assert service.text_splitter._chunk_overlap == 0
         assert service.text_splitter._separators == ["\n\n", "\n", ". ", " "]
+        assert service.text_splitter._length_function is service.token_counter
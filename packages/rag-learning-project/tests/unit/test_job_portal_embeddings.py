@@ -1,8 +1,11 @@
 """Unit tests for JobPortalEmbeddings service."""
+import asyncio
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 from src.job_portal.services.embeddings.job_portal_embeddings import JobPortalEmbeddings
+from src.job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
+from src.job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
 
 
 class TestJobPortalEmbeddings:
@@ -12,7 +15,63 @@ class TestJobPortalEmbeddings:
     def test_init(self, mock_service_class):
         """Test initialization."""
         embeddings = JobPortalEmbeddings(api_key="test_key")
-        mock_service_class.assert_called_once_with(api_key="test_key")
+        mock_service_class.assert_called_once()
+        call_kwargs = mock_service_class.call_args[1]
+        assert call_kwargs["api_key"] == "test_key"
+        assert isinstance(call_kwargs["cache"], EmbeddingCache)
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_init_with_cache_disabled(self, mock_service_class):
+        """Test initialization without the embedding cache."""
+        embeddings = JobPortalEmbeddings(api_key="test_key", use_cache=False)
+        assert mock_service_class.call_args[1]["cache"] is None
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_init_with_explicit_cache(self, mock_service_class):
+        """Test initialization with a caller-provided cache."""
+        cache = EmbeddingCache()
+        embeddings = JobPortalEmbeddings(api_key="test_key", cache=cache)
+        assert mock_service_class.call_args[1]["cache"] is cache
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_init_coalesce_window_from_env(self, mock_service_class, monkeypatch):
+        """Test enabling request coalescing through the environment."""
+        monkeypatch.setenv("EMBEDDING_COALESCE_WINDOW_MS", "50")
+        embeddings = JobPortalEmbeddings(api_key="test_key")
+        assert mock_service_class.call_args[1]["coalesce_window"] == 0.05
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_embed_chunks(self, mock_service_class):
+        """Test embedding the chunks of one document as a single input."""
+        mock_service = Mock(output_dimension=1)
+        mock_service.embed_inputs.return_value = [[[0.1], [0.2]]]
+        mock_service_class.return_value = mock_service
+        
+        embeddings = JobPortalEmbeddings(api_key="test_key")
+        
+        assert embeddings.embed_chunks(["a", "b"]) == [[0.1], [0.2]]
+        mock_service.embed_inputs.assert_called_once_with([["a", "b"]], input_type="document")
+        assert embeddings.embed_chunks([]).shape == (0, 1)
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_job_posting_chunks(self, mock_service_class):
+        """Test splitting a job posting with the service's text splitter."""
+        mock_service = Mock()
+        mock_service.text_splitter.split_text.return_value = ["chunk"]
+        mock_service_class.return_value = mock_service
+        
+        embeddings = JobPortalEmbeddings(api_key="test_key")
+        chunks = embeddings.job_posting_chunks("Engineer", "Build things", ["Python"])
+        
+        assert chunks == ["chunk"]
+        assert "Job Title: Engineer" in mock_service.text_splitter.split_text.call_args[0][0]
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_init_local_provider_from_env(self, mock_service_class, monkeypatch):
+        """Test selecting the local hashing provider through the environment."""
+        monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+        embeddings = JobPortalEmbeddings(use_cache=False)
+        assert isinstance(mock_service_class.call_args[1]["provider"], HashingEmbeddingProvider)
     
     @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
     def test_embed_job_posting_basic(self, mock_service_class):
@@ -152,10 +211,10 @@ class TestJobPortalEmbeddings:
         
         assert result == [0.1, 0.2]
         call_args = mock_service.embed_query.call_args[0][0]
-        assert "ML Engineer" in call_args
-        assert "Python" in call_args
+        assert "ml engineer" in call_args
+        assert "python, tensorflow" in call_args
         assert "senior" in call_args
-        assert "Remote" in call_args
+        assert "remote" in call_args
     
     @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
     def test_embed_job_search_query_minimal(self, mock_service_class):
@@ -169,7 +228,7 @@ class TestJobPortalEmbeddings:
         
         assert result == [0.1, 0.2]
         call_args = mock_service.embed_query.call_args[0][0]
-        assert "Developer" in call_args
+        assert "developer" in call_args
     
     @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
     def test_embed_candidate_search_query_full(self, mock_service_class):
@@ -188,8 +247,8 @@ class TestJobPortalEmbeddings:
         
         assert result == [0.3, 0.4]
         call_args = mock_service.embed_query.call_args[0][0]
-        assert "Backend Engineer" in call_args
-        assert "Go" in call_args
+        assert "backend engineer" in call_args
+        assert "go, kubernetes" in call_args
         assert "mid" in call_args
         assert "distributed systems" in call_args
     
@@ -205,4 +264,86 @@ class TestJobPortalEmbeddings:
         
         assert result == [0.3, 0.4]
         call_args = mock_service.embed_query.call_args[0][0]
-        assert "Engineer" in call_args
+        assert "engineer" in call_args
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_equivalent_search_queries_share_one_call(self, mock_service_class):
+        """Test that reordered skills and aliased levels hit the query memo."""
+        mock_service = Mock()
+        mock_service.embed_query.return_value = [0.1, 0.2]
+        mock_service_class.return_value = mock_service
+        
+        embeddings = JobPortalEmbeddings(api_key="test_key")
+        first = embeddings.embed_job_search_query(
+            desired_role="Backend  Developer",
+            desired_skills=["Python", "Django"],
+            experience_level="Sr."
+        )
+        second = embeddings.embed_job_search_query(
+            desired_role="backend developer",
+            desired_skills=["django", "python", "Python"],
+            experience_level="senior"
+        )
+        
+        assert first == pytest.approx([0.1, 0.2])
+        assert second == pytest.approx([0.1, 0.2])
+        mock_service.embed_query.assert_called_once_with(
+            "Looking for: backend developer\nExperience level: senior\nSkills: django, python"
+        )
+        assert embeddings.query_memo.stats()["hits"] == 1
+
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.AsyncVoyageEmbeddingService')
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_aembed_job_posting(self, mock_service_class, mock_async_class):
+        """Test async job posting embedding uses the same text as the sync path."""
+        mock_async = Mock()
+        mock_async.embed_document = AsyncMock(return_value={
+            "embeddings": [[0.1, 0.2], [0.3, 0.4]],
+            "chunks": ["chunk1", "chunk2"],
+            "num_chunks": 2
+        })
+        mock_async_class.return_value = mock_async
+        
+        embeddings = JobPortalEmbeddings(api_key="test_key")
+        result = asyncio.run(embeddings.aembed_job_posting(
+            job_title="Engineer",
+            job_description="Build things",
+            required_skills=["Python"]
+        ))
+        
+        assert result == [0.1, 0.2]
+        text = mock_async.embed_document.call_args[0][0]
+        assert text == JobPortalEmbeddings._job_posting_text("Engineer", "Build things", ["Python"])
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.AsyncVoyageEmbeddingService')
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_aembed_candidate_search_query(self, mock_service_class, mock_async_class):
+        """Test async candidate search query embedding."""
+        mock_async = Mock()
+        mock_async.embed_query = AsyncMock(return_value=[0.5])
+        mock_async_class.return_value = mock_async
+        
+        embeddings = JobPortalEmbeddings(api_key="test_key")
+        result = asyncio.run(embeddings.aembed_candidate_search_query(
+            job_title="Engineer",
+            required_skills=["Go"]
+        ))
+        
+        assert result == [0.5]
+        query = mock_async.embed_query.call_args[0][0]
+        assert "engineer" in query and "go" in query
+    
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.AsyncVoyageEmbeddingService')
+    @patch('src.job_portal.services.embeddings.job_portal_embeddings.VoyageEmbeddingService')
+    def test_async_service_created_lazily_and_shared(self, mock_service_class, mock_async_class):
+        """Test that the async service is created once, on first use, with the shared cache."""
+        cache = EmbeddingCache()
+        embeddings = JobPortalEmbeddings(api_key="test_key", cache=cache)
+        mock_async_class.assert_not_called()
+        
+        first = embeddings.async_embedding_service
+        second = embeddings.async_embedding_service
+        
+        assert first is second
+        mock_async_class.assert_called_once()
+        assert mock_async_class.call_args[1]["cache"] is cache
@@ -139,7 +139,8 @@ class TestJobSeekerStore:
         filter_criteria = call_kwargs["filter_criteria"]
         assert filter_criteria["years_of_experience"]["$gte"] == 5.0
         assert filter_criteria["skills"]["$in"] == ["Python", "AWS"]
-        assert "$regex" in filter_criteria["desired_location"]
+        assert filter_criteria["$and"] == [{"desired_location_tokens": "san francisco"}, {"desired_location_tokens": "california"}, {"desired_location_tokens": "united states"}]
+        assert "desired_location" not in filter_criteria
         assert filter_criteria["industries_of_interest"] == "Technology"
         assert "$or" in filter_criteria  # Remote policy check
     
@@ -204,7 +205,9 @@ class TestJobSeekerStore:
         store = JobSeekerStore(mock_collection)
         results = store.filter_by_metadata(limit=10)
         
-        mock_collection.find.assert_called_once_with({"status": "active"})
+        mock_collection.find.assert_called_once_with(
+            {"status": "active"}, {"profile_embedding": 0, "profile_embedding_coarse": 0}
+        )
         mock_cursor.limit.assert_called_once_with(10)
     
     def test_filter_by_metadata_with_all_filters(self):
@@ -222,6 +225,7 @@ class TestJobSeekerStore:
             location="SF",
             education_level="bachelors",
             availability="immediately",
+            remote_policy="remote",
             limit=20
         )
         
@@ -229,6 +233,8 @@ class TestJobSeekerStore:
         assert call_args["years_of_experience"]["$gte"] == 3.0
         assert call_args["years_of_experience"]["$lte"] == 8.0
         assert call_args["skills"]["$in"] == ["Python", "Go"]
-        assert "$regex" in call_args["desired_location"]
+        assert call_args["$and"] == [{"desired_location_tokens": "san francisco"}, {"desired_location_tokens": "california"}, {"desired_location_tokens": "united states"}]
+        assert "desired_location" not in call_args
         assert call_args["education_level"] == "bachelors"
         assert call_args["availability"] == "immediately"
+        assert call_args["desired_remote_policy"] == "remote"
@@ -0,0 +1,53 @@
+"""Unit tests for keyword filter extraction used by degraded-mode search."""
+from src.job_portal.services.matching.keyword_filters import (
+    extract_filters,
+    extract_location,
+    extract_skills,
+    rank_by_skills,
+)
+
+
+class TestKeywordFilters:
+    """Test suite for filter extraction from requirement text."""
+    
+    def test_extract_all_filters(self):
+        """Test that skills, location, remote policy and level are found."""
+        filters = extract_filters("Senior Python developer with Django and k8s, remote, based in San Francisco, CA")
+        
+        assert filters == {
+            "skills": ["Python", "Django", "Kubernetes"],
+            "location": "San Francisco, CA",
+            "remote_policy": "remote",
+            "experience_level": "senior",
+        }
+    
+    def test_missing_filters_are_omitted(self):
+        """Test that only mentioned filters are returned."""
+        assert extract_filters("someone great") == {}
+    
+    def test_skills_with_symbols_and_aliases(self):
+        """Test skills like C++ and Node.js, aliases, and stored casing."""
+        assert extract_skills("c++ or C# and nodejs, some golang") == ["C++", "C#", "Node.js", "Go"]
+    
+    def test_short_skills_need_capitals(self):
+        """Test that ordinary words aren't read as short skill names."""
+        assert extract_skills("ready to go") == []
+        assert extract_skills("Go backend") == ["Go"]
+    
+    def test_skill_is_not_a_location(self):
+        """Test that "experience in Python" isn't read as a place."""
+        assert extract_location("5 years experience in Python") is None
+        assert extract_location("Data engineer in New York") == "New York"
+    
+    def test_rank_by_skills(self):
+        """Test that results listing more requested skills come first."""
+        documents = [
+            {"name": "a", "skills": ["python"]},
+            {"name": "b", "skills": ["Python", "Go"]},
+            {"name": "c", "skills": []},
+        ]
+        
+        ranked = rank_by_skills(documents, ["Python", "Go"], "skills", limit=2)
+        
+        assert [doc["name"] for doc in ranked] == ["b", "a"]
+        assert [doc["matched_skills"] for doc in ranked] == [2, 1]
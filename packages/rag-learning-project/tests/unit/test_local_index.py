@@ -0,0 +1,338 @@
+"""Unit tests for local vector indexes mirroring MongoDB collections."""
+import re
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from pymongo.errors import OperationFailure
+
+from src.job_portal.domain.embedding_generation import EmbeddingGeneration, save_generation
+from src.job_portal.infrastructure.local_index import factory
+from src.job_portal.infrastructure.local_index.columns import ColumnarMetadata
+from src.job_portal.infrastructure.local_index.faiss_index import FaissVectorIndex
+from src.job_portal.infrastructure.local_index.filters import matches
+from src.job_portal.infrastructure.local_index.numpy_index import NumpyVectorIndex
+from src.job_portal.repositories.company_repository import CompanyStore
+from src.job_portal.repositories.jobseeker_repository import JobSeekerStore
+
+
+DIMENSION = 16
+
+
+def _vector(index):
+    return np.random.default_rng(index).standard_normal(DIMENSION).astype(np.float32).tolist()
+
+
+def _job(index, **fields):
+    return {
+        "_id": index,
+        "job_title": f"Engineer {index}",
+        "status": "active" if index % 2 else "closed",
+        "required_skills": ["Python"],
+        "requirements_embedding": _vector(index),
+        **fields
+    }
+
+
+def _collection(documents):
+    """Mock collection serving its documents to scans, without change streams."""
+    mock_collection = MagicMock()
+    mock_collection.name = "companies"
+    mock_collection.full_name = "job_portal.companies"
+    mock_collection.find.side_effect = lambda query: [dict(doc) for doc in documents]
+    mock_collection.watch.side_effect = OperationFailure("The $changeStream stage is only supported on replica sets")
+    return mock_collection
+
+
+def _index(documents, index_class=FaissVectorIndex, **kwargs):
+    index = index_class(_collection(documents), "requirements_embedding", **kwargs)
+    index.build()
+    return index
+
+
+class TestFilters:
+    """Test suite for in-memory MongoDB filter evaluation."""
+    
+    def test_operators(self):
+        """Test equality, comparison, set and regex operators."""
+        document = {"status": "active", "skills": ["Python", "Go"], "salary": {"min": 80, "max": 120}}
+        
+        assert matches(document, {"status": "active", "skills": "Go"})
+        assert matches(document, {"salary.max": {"$gte": 100, "$lt": 150}})
+        assert matches(document, {"skills": {"$in": ["Rust", "Python"]}, "status": {"$ne": "closed"}})
+        assert matches(document, {"status": {"$regex": "^ACT", "$options": "i"}})
+        assert matches(document, {"status": re.compile("tiv")})
+        assert not matches(document, {"salary.min": {"$gt": 100}})
+        assert not matches(document, {"skills": {"$nin": ["Go"]}})
+    
+    def test_combinators_and_missing_fields(self):
+        """Test $and/$or/$nor, $exists and $not on missing fields."""
+        document = {"status": "active", "location": "Berlin"}
+        
+        assert matches(document, {"$or": [{"location": "Paris"}, {"location": "Berlin"}]})
+        assert matches(document, {"$nor": [{"status": "closed"}], "remote": {"$exists": False}})
+        assert matches(document, {"remote": None, "status": {"$not": {"$eq": "closed"}}})
+        assert not matches(document, {"$and": [{"status": "active"}, {"location": "Paris"}]})
+    
+    def test_unsupported_operator(self):
+        """Test that unsupported operators are rejected instead of ignored."""
+        with pytest.raises(ValueError):
+            matches({"location": "Berlin"}, {"location": {"$near": [0, 0]}})
+
+
+class TestColumnarMetadata:
+    """Test suite for filters compiled into column masks."""
+    
+    def test_masks_agree_with_matches(self):
+        """Test that compiled masks select exactly the documents matches() accepts."""
+        documents = [
+            {"status": "active", "years_of_experience": 5, "skills": ["Python", "Go"], "desired_location": "Berlin"},
+            {"status": "active", "years_of_experience": 12, "skills": ["Java"], "desired_remote_policy": "any"},
+            {"status": "closed", "years_of_experience": "senior", "skills": "Python"},
+            {"status": "active", "years_of_experience": [3, 9], "desired_remote_policy": "remote"},
+            {"status": True, "salary_range": {"max": 150000}},
+        ]
+        filters = [
+            {"status": "active", "years_of_experience": {"$gte": 4, "$lte": 10}},
+            {"skills": {"$in": ["Python"]}, "desired_location": {"$regex": "ber", "$options": "i"}},
+            {"$or": [{"desired_remote_policy": "remote"}, {"desired_remote_policy": "any"}]},
+            {"$nor": [{"status": "active"}], "salary_range.max": {"$gt": 100000}},
+            {"years_of_experience": {"$exists": False}},
+            {"status": {"$ne": "closed"}, "skills": {"$nin": ["Java"]}},
+        ]
+        columns = ColumnarMetadata()
+        
+        for criteria in filters:
+            expected = [matches(document, criteria) for document in documents]
+            assert columns.mask(criteria, documents).tolist() == expected, criteria
+    
+    def test_columns_follow_appended_documents(self):
+        """Test that built columns encode documents appended later."""
+        documents = [{"status": "active"}, {"status": "closed"}]
+        columns = ColumnarMetadata()
+        columns.mask({"status": "active"}, documents)
+        
+        documents.append({"status": "active"})
+        columns.append(documents[2:])
+        
+        assert columns.mask({"status": "active"}, documents).tolist() == [True, False, True]
+
+
+class TestFaissVectorIndex:
+    """Test suite for FaissVectorIndex."""
+    
+    def test_build_and_search(self):
+        """Test that the nearest document comes first with a cosine score and no vector."""
+        index = _index([_job(i) for i in range(50)])
+        
+        results = index.search(_vector(7), limit=3)
+        
+        assert len(index) == 50
+        assert results[0]["_id"] == 7
+        assert results[0]["score"] == pytest.approx(1.0, abs=1e-5)
+        assert "requirements_embedding" not in results[0]
+        assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    
+    @pytest.mark.parametrize("index_type", ["hnsw", "ivf", "flat"])
+    def test_index_types(self, index_type):
+        """Test that every FAISS index type finds an exact match."""
+        index = _index([_job(i) for i in range(300)], index_type=index_type, exact_threshold=0)
+        
+        assert index.search(_vector(42), limit=1)[0]["_id"] == 42
+    
+    def test_filtered_search(self):
+        """Test that filters restrict results, exactly and through the index."""
+        for threshold in (2048, 0):
+            index = _index([_job(i) for i in range(100)], exact_threshold=threshold)
+            
+            results = index.search(_vector(8), limit=5, filter_criteria={"status": "active"})
+            
+            assert len(results) == 5
+            assert all(r["status"] == "active" for r in results)
+            assert 8 not in [r["_id"] for r in results]
+    
+    def test_updates_and_deletes(self):
+        """Test that upserts replace a document's vector and removed documents are never returned."""
+        index = _index([_job(i) for i in range(20)])
+        
+        index.upsert(_job(3, requirements_embedding=_vector(100)))
+        index.remove(5)
+        
+        assert index.search(_vector(100), limit=1)[0]["_id"] == 3
+        assert 5 not in [r["_id"] for r in index.search(_vector(5), limit=20)]
+        assert len(index) == 19
+    
+    def test_poll_applies_differences(self):
+        """Test that polling only re-indexes changed documents and drops deleted ones."""
+        documents = [_job(i) for i in range(10)]
+        index = _index(documents)
+        
+        documents[2] = _job(2, job_title="Staff Engineer")
+        del documents[4]
+        documents.append(_job(10))
+        
+        assert index.poll() == {"upserted": 2, "removed": 1}
+        assert index.search(_vector(2), limit=1)[0]["job_title"] == "Staff Engineer"
+    
+    def test_apply_change_events(self):
+        """Test that change stream inserts, updates and deletes are applied."""
+        index = _index([_job(i) for i in range(10)])
+        
+        index.apply_change({"operationType": "insert", "fullDocument": _job(10), "documentKey": {"_id": 10}})
+        index.apply_change({"operationType": "delete", "documentKey": {"_id": 1}})
+        index.apply_change({"operationType": "update", "fullDocument": None, "documentKey": {"_id": 2}})
+        
+        ids = [r["_id"] for r in index.search(_vector(10), limit=20)]
+        assert ids[0] == 10
+        assert 1 not in ids and 2 not in ids
+    
+    def test_save_and_load(self, tmp_path):
+        """Test that a persisted index loads with the same documents and results."""
+        index = _index([_job(i) for i in range(30)], path=str(tmp_path))
+        index.remove(4)
+        index.save()
+        
+        loaded = FaissVectorIndex(_collection([]), "requirements_embedding", path=str(tmp_path))
+        
+        assert loaded.load()
+        assert len(loaded) == 29
+        assert loaded.search(_vector(9), limit=1)[0]["_id"] == 9
+    
+    def test_start_falls_back_to_polling(self):
+        """Test that without change streams the index is built and kept current by polling."""
+        index = FaissVectorIndex(_collection([_job(i) for i in range(5)]), "requirements_embedding", poll_interval=60)
+        
+        index.start()
+        try:
+            assert index.mode == "polling"
+            assert len(index) == 5
+        finally:
+            index.close()
+
+
+class TestNumpyVectorIndex:
+    """Test suite for NumpyVectorIndex."""
+    
+    def test_matches_brute_force(self):
+        """Test that blocked search returns the exact top-k across block boundaries."""
+        documents = [_job(i) for i in range(100)]
+        index = _index(documents, NumpyVectorIndex, block_size=7)
+        matrix = np.array([doc["requirements_embedding"] for doc in documents])
+        query = np.array(_vector(1000))
+        cosine = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+        
+        results = index.search(query.tolist(), limit=10)
+        
+        assert [r["_id"] for r in results] == np.argsort(-cosine)[:10].tolist()
+        assert [r["score"] for r in results] == pytest.approx(((1 + np.sort(cosine)[::-1][:10]) / 2).tolist(), abs=1e-5)
+    
+    def test_filters_and_dead_slots(self):
+        """Test that filtered searches and removed documents follow the collection."""
+        index = _index([_job(i) for i in range(40)], NumpyVectorIndex, block_size=8, exact_threshold=0)
+        index.remove(11)
+        
+        filtered = index.search(_vector(11), limit=40, filter_criteria={"status": "active"})
+        unfiltered = index.search(_vector(11), limit=40)
+        
+        assert len(filtered) == 19
+        assert all(r["status"] == "active" for r in filtered)
+        assert len(unfiltered) == 39
+        assert 11 not in [r["_id"] for r in unfiltered]
+
+
+class TestBatchedSearch:
+    """Test suite for searching many queries at once."""
+    
+    @pytest.mark.parametrize("index_class", [FaissVectorIndex, NumpyVectorIndex])
+    def test_search_many_matches_single_searches(self, index_class):
+        """Test that batched searches return the same results as one search per query."""
+        index = _index([_job(i) for i in range(200)], index_class, exact_threshold=0)
+        queries = [_vector(i) for i in (3, 50, 1000)]
+        
+        batch = index.search_many(queries, limit=5, filter_criteria={"status": "active"})
+        
+        singles = [index.search(q, limit=5, filter_criteria={"status": "active"}) for q in queries]
+        assert [[r["_id"] for r in rs] for rs in batch] == [[r["_id"] for r in rs] for rs in singles]
+        assert [r["score"] for rs in batch for r in rs] == pytest.approx([r["score"] for rs in singles for r in rs])
+    
+    def test_store_groups_queries_by_filter(self):
+        """Test that a store scores each filter's queries in one batch and isolates bad queries."""
+        index = _index([_job(i) for i in range(20)], NumpyVectorIndex)
+        store = CompanyStore(index.collection, local_index=index)
+        filters = [{"status": "active"}, None, {"status": "active"}, None]
+        queries = [_vector(1), _vector(2), _vector(3), [1.0, 0.0]]
+        
+        results = store.search_many(queries, limit=1, filter_criteria=filters, vector_field=store.vector_field, as_hits=True)
+        
+        assert [r[0].id for r in results[:3]] == [1, 2, 3]
+        assert isinstance(results[3], ValueError)
+        index.collection.aggregate.assert_not_called()
+
+
+class TestLocalIndexStore:
+    """Test suite for stores searching a local index."""
+    
+    def test_vector_search_uses_local_index(self):
+        """Test that searches on the mirrored field skip $vectorSearch."""
+        documents = [_job(i) for i in range(10)]
+        index = _index(documents)
+        store = CompanyStore(index.collection, local_index=index)
+        
+        results = store.vector_search(_vector(6), limit=2, vector_field="requirements_embedding")
+        
+        assert results[0]["_id"] == 6
+        index.collection.aggregate.assert_not_called()
+    
+    def test_backend_from_configuration(self, monkeypatch):
+        """Test that VECTOR_SEARCH_BACKEND switches a store's search to a shared local index."""
+        monkeypatch.setenv("VECTOR_SEARCH_BACKEND", "numpy")
+        monkeypatch.setenv("LOCAL_INDEX_DIR", "off")
+        profiles = [
+            {"_id": i, "status": "active", "years_of_experience": i, "profile_embedding": _vector(i)}
+            for i in range(10)
+        ]
+        collection = _collection(profiles)
+        try:
+            store = JobSeekerStore(collection)
+            
+            results = store.search_matching_jobs(_vector(3), min_experience=3, limit=3)
+            
+            assert isinstance(store.local_index, NumpyVectorIndex)
+            assert JobSeekerStore(collection).local_index is store.local_index
+            assert results[0]["_id"] == 3
+            assert all(r["years_of_experience"] >= 3 for r in results)
+            collection.aggregate.assert_not_called()
+        finally:
+            factory.close_local_indexes()
+    
+    def test_generation_switch_replaces_configured_index(self, monkeypatch, tmp_path):
+        """Test that a store following a switch closes the old field's mirror and keeps injected indexes."""
+        monkeypatch.setenv("EMBEDDING_GENERATION_FILE", str(tmp_path / "generation.json"))
+        monkeypatch.setenv("VECTOR_SEARCH_BACKEND", "numpy")
+        monkeypatch.setenv("LOCAL_INDEX_DIR", "off")
+        collection = _collection([_job(i) for i in range(4)])
+        injected = _index([_job(i) for i in range(4)], NumpyVectorIndex)
+        try:
+            store = CompanyStore(collection)
+            injected_store = CompanyStore(collection, local_index=injected)
+            old_index = store.local_index
+            
+            save_generation(EmbeddingGeneration("v2", output_dimension=DIMENSION))
+            assert store.reload_generation() and injected_store.reload_generation()
+            
+            assert store.local_index.vector_field == "requirements_embedding_v2"
+            assert old_index._stop.is_set()
+            assert old_index not in factory._open_indexes.values()
+            assert injected_store.local_index is injected
+            assert not injected._stop.is_set()
+        finally:
+            factory.close_local_indexes()
+    
+    def test_default_backend_is_atlas(self, monkeypatch):
+        """Test that stores have no local index unless VECTOR_SEARCH_BACKEND selects one."""
+        monkeypatch.delenv("VECTOR_SEARCH_BACKEND", raising=False)
+        
+        assert CompanyStore(MagicMock()).local_index is None
+        
+        monkeypatch.setenv("VECTOR_SEARCH_BACKEND", "")
+        assert CompanyStore(MagicMock()).local_index is None
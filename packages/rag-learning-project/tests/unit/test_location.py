@@ -0,0 +1,150 @@
+"""Unit tests for location normalization and indexed location filters."""
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from src.job_portal.domain.location import location_fields, location_filter, normalize_location
+from src.job_portal.infrastructure.local_index.filters import matches
+from src.job_portal.repositories.company_repository import CompanyStore
+from src.job_portal.repositories.jobseeker_repository import JobSeekerStore
+
+
+class TestNormalizeLocation:
+    """Test suite for normalize_location and location_fields."""
+    
+    def test_expands_aliases_and_fills_known_cities(self):
+        """Test that abbreviations expand and gazetteer cities get region, country and point."""
+        location = normalize_location("SF")
+        
+        assert location["tokens"] == ["san francisco", "california", "united states"]
+        assert location["point"] == {"type": "Point", "coordinates": [-122.4194, 37.7749]}
+        assert normalize_location("Austin, TX")["tokens"] == ["austin", "texas", "united states"]
+        assert normalize_location("Berlin, Deutschland")["tokens"] == ["berlin", "germany"]
+    
+    def test_unknown_places_keep_their_parts_without_a_point(self):
+        """Test that unknown or contradicting places aren't resolved through the gazetteer."""
+        assert normalize_location("Springfield, IL") == {
+            "city": "springfield", "region": "illinois", "country": "united states",
+            "tokens": ["springfield", "illinois", "united states"], "point": None
+        }
+        # Not Portland, Oregon
+        assert normalize_location("Portland, ME")["point"] is None
+        assert normalize_location("Paris, TX")["tokens"] == ["paris", "texas", "united states"]
+    
+    def test_remote_and_region_only(self):
+        """Test remote locations and queries naming only a region or country."""
+        assert normalize_location("Remote")["tokens"] == ["remote"]
+        assert normalize_location("Remote, USA")["tokens"] == ["remote", "united states"]
+        assert normalize_location("TX")["tokens"] == ["texas", "united states"]
+        assert normalize_location("")["tokens"] == []
+    
+    def test_location_fields(self):
+        """Test the stored fields, with caller coordinates for unknown places."""
+        assert location_fields("desired_location", "Remote") == {"desired_location_tokens": ["remote"]}
+        fields = location_fields("location", "Springfield, IL", coordinates=(-89.65, 39.78))
+        
+        assert fields["location_point"] == {"type": "Point", "coordinates": [-89.65, 39.78]}
+
+
+class TestLocationFilter:
+    """Test suite for location_filter."""
+    
+    def test_exact_token_filters(self):
+        """Test that a query matches every one of its normalized tokens."""
+        assert location_filter("location", "Berlin") == {
+            "$and": [{"location_tokens": "berlin"}, {"location_tokens": "germany"}]
+        }
+        assert location_filter("location", "Remote") == {"location_tokens": "remote"}
+        assert location_filter("location") == {}
+    
+    def test_radius_filter(self):
+        """Test that radius filters use $geoWithin with the radius in radians."""
+        criteria = location_filter("location", near="Austin", radius_km=63.781)
+        
+        center, radius = criteria["location_point"]["$geoWithin"]["$centerSphere"]
+        assert center == [-97.7431, 30.2672]
+        assert radius == pytest.approx(0.01)
+        with pytest.raises(ValueError):
+            location_filter("location", near="Atlantis", radius_km=10)
+        with pytest.raises(ValueError):
+            location_filter("location", near=(0.0, 0.0))
+    
+    def test_filters_match_stored_fields(self):
+        """Test that token and radius filters match stored documents locally."""
+        austin = {"location": "Austin, TX", **location_fields("location", "Austin, TX")}
+        dallas = {"location": "Dallas, TX", **location_fields("location", "Dallas, TX")}
+        
+        assert matches(austin, location_filter("location", "Austin"))
+        assert matches(dallas, location_filter("location", "tx"))
+        assert not matches(dallas, location_filter("location", "Austin"))
+        near_austin = location_filter("location", near=(-97.74, 30.27), radius_km=50)
+        assert matches(austin, near_austin)
+        # Dallas is ~300 km away
+        assert not matches(dallas, near_austin)
+        assert matches(dallas, location_filter("location", near="Austin", radius_km=350))
+
+
+class TestLocationSearch:
+    """Test suite for location filters in store searches."""
+    
+    def test_radius_search_prefilters_by_id_on_atlas(self):
+        """Test that $geoWithin is answered by the 2dsphere index and passed to Atlas as _id."""
+        mock_collection = MagicMock()
+        mock_collection.find.return_value = [{"_id": "p1"}, {"_id": "p2"}]
+        mock_collection.aggregate.return_value = []
+        store = JobSeekerStore(mock_collection)
+        
+        store.search_matching_jobs([0.1, 0.2], location="Remote", near="Berlin", radius_km=25)
+        
+        geo_query = mock_collection.find.call_args.args[0]
+        assert "$geoWithin" in geo_query["desired_location_point"]
+        stage = mock_collection.aggregate.call_args.args[0][0]["$vectorSearch"]
+        assert stage["filter"] == {
+            "status": "active",
+            "desired_location_tokens": "remote",
+            "_id": {"$in": ["p1", "p2"]},
+        }
+    
+    def test_wide_radius_is_matched_after_the_search(self, monkeypatch):
+        """Test that a radius over the prefilter limit becomes a $match instead of an unbounded _id list."""
+        monkeypatch.setattr("src.job_portal.repositories.base_vector_store.GEO_PREFILTER_LIMIT", 2)
+        mock_collection = MagicMock()
+        mock_collection.find.return_value = [{"_id": "p1"}, {"_id": "p2"}, {"_id": "p3"}]
+        mock_collection.aggregate.return_value = []
+        store = JobSeekerStore(mock_collection)
+        
+        store.search_matching_jobs([0.1, 0.2], near="Berlin", radius_km=500, limit=5)
+        
+        assert mock_collection.find.call_args.kwargs["limit"] == 3
+        pipeline = mock_collection.aggregate.call_args.args[0]
+        stage = pipeline[0]["$vectorSearch"]
+        assert stage["filter"] == {"status": "active"}
+        assert stage["limit"] == 50
+        assert stage["numCandidates"] >= 50
+        assert "$geoWithin" in pipeline[1]["$match"]["desired_location_point"]
+        assert pipeline[2] == {"$limit": 5}
+    
+    def test_stored_documents_get_location_fields(self):
+        """Test that stored postings carry tokens and a point next to the location text."""
+        mock_collection = Mock()
+        mock_collection.insert_one.return_value = Mock(inserted_id="id1")
+        store = CompanyStore(mock_collection)
+        
+        store.store_job_posting(
+            company_id="c1", company_name="Acme", job_title="Engineer", job_description="Build things",
+            job_requirements_embedding=[0.1] * 4, company_size="51-200", location="NYC", industry="Tech"
+        )
+        
+        document = mock_collection.insert_one.call_args.args[0]
+        assert document["location"] == "NYC"
+        assert document["location_tokens"] == ["new york", "united states"]
+        assert document["location_point"]["type"] == "Point"
+    
+    def test_ensure_location_indexes(self):
+        """Test that the multikey token index and the 2dsphere index are created."""
+        mock_collection = Mock()
+        mock_collection.create_index.side_effect = lambda keys: "_".join(f"{k}_{v}" for k, v in keys)
+        
+        names = CompanyStore(mock_collection).ensure_location_indexes()
+        
+        assert names == ["location_tokens_1", "location_point_2dsphere"]
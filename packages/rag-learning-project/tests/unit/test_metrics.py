@@ -0,0 +1,126 @@
+"""Unit tests for the metrics registry and embedding instrumentation."""
+import pytest
+
+from src.job_portal.infrastructure.observability.metrics import MetricsRegistry
+from src.job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+from src.job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
+from src.job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+from src.job_portal.infrastructure.voyage.instrumentation import EmbeddingMetrics
+from src.job_portal.infrastructure.voyage.rate_limiter import BACKGROUND
+
+
+class TestMetricsRegistry:
+    """Test suite for MetricsRegistry class."""
+    
+    def test_counter(self):
+        """Test labelled counters."""
+        registry = MetricsRegistry()
+        counter = registry.counter("calls_total", "Calls.", ("kind",))
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        
+        assert counter.value(kind="a") == 3
+        assert counter.value(kind="b") == 0
+        assert registry.counter("calls_total", "Calls.", ("kind",)) is counter
+    
+    def test_counter_rejects_bad_usage(self):
+        """Test that counters can't decrease and labels must match."""
+        counter = MetricsRegistry().counter("calls_total", "Calls.", ("kind",))
+        
+        with pytest.raises(ValueError):
+            counter.inc(-1, kind="a")
+        with pytest.raises(ValueError):
+            counter.inc(other="a")
+    
+    def test_name_conflict(self):
+        """Test that one name can't be two metric types."""
+        registry = MetricsRegistry()
+        registry.counter("x", "X.")
+        
+        with pytest.raises(ValueError, match="already registered"):
+            registry.histogram("x", "X.")
+    
+    def test_prometheus_histogram(self):
+        """Test cumulative histogram buckets in the text format."""
+        registry = MetricsRegistry(namespace="app")
+        histogram = registry.histogram("latency_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, op="get")
+        histogram.observe(0.5, op="get")
+        histogram.observe(5.0, op="get")
+        
+        text = registry.render_prometheus()
+        
+        assert "# TYPE app_latency_seconds histogram" in text
+        assert 'app_latency_seconds_bucket{op="get",le="0.1"} 1' in text
+        assert 'app_latency_seconds_bucket{op="get",le="1"} 2' in text
+        assert 'app_latency_seconds_bucket{op="get",le="+Inf"} 3' in text
+        assert 'app_latency_seconds_sum{op="get"} 5.55' in text
+        assert 'app_latency_seconds_count{op="get"} 3' in text
+    
+    def test_callback_gauge_and_snapshot(self):
+        """Test gauges read at collection time and the in-process snapshot."""
+        registry = MetricsRegistry(namespace="")
+        registry.gauge("queue_depth", "Depth.", ("queue",), callback=lambda: {("jobs",): 4})
+        registry.counter("done_total", "Done.").inc()
+        
+        assert 'queue_depth{queue="jobs"} 4' in registry.render_prometheus()
+        assert registry.snapshot() == {
+            "queue_depth": {"queue=jobs": 4},
+            "done_total": {"": 1.0},
+        }
+    
+    def test_label_values_escaped(self):
+        """Test escaping of quotes in label values."""
+        registry = MetricsRegistry(namespace="")
+        registry.counter("c", "C.", ("name",)).inc(name='say "hi"')
+        
+        assert 'c{name="say \\"hi\\""} 1' in registry.render_prometheus()
+
+
+class TestEmbeddingMetrics:
+    """Test the instrumentation recorded by the embedding service."""
+    
+    def test_service_records_requests_and_cache(self):
+        """Test latency, size and cache metrics of local embedding calls."""
+        metrics = EmbeddingMetrics(MetricsRegistry())
+        service = VoyageEmbeddingService(
+            provider=HashingEmbeddingProvider(output_dimension=32),
+            cache=EmbeddingCache(),
+            metrics=metrics
+        )
+        
+        service.embed_documents_batch(["first doc", "second doc"])
+        service.embed_query("python")
+        service.embed_query("python")
+        
+        latency = metrics.request_seconds.snapshot()
+        assert latency[("local", "document")]["count"] == 1
+        assert latency[("local", "query")]["count"] == 1
+        assert metrics.request_inputs.snapshot()[("local", "document")]["sum"] == 2
+        assert metrics.request_tokens.snapshot()[("local", "query")]["sum"] > 0
+        assert metrics.requests.value(provider="local", input_type="query", outcome="ok") == 1
+        assert metrics.cache_hit_ratio("query") == 0.5
+        assert metrics.cache_hit_ratio() == 0.25
+        assert 'job_portal_embedding_cache_hit_ratio{input_type="query"} 0.5' in (
+            metrics.registry.render_prometheus()
+        )
+    
+    def test_failed_request_counted(self):
+        """Test that provider errors are recorded with their latency."""
+        provider = HashingEmbeddingProvider(output_dimension=8)
+        provider.embed = lambda inputs, input_type: (_ for _ in ()).throw(RuntimeError("down"))
+        metrics = EmbeddingMetrics(MetricsRegistry())
+        service = VoyageEmbeddingService(provider=provider, metrics=metrics)
+        
+        with pytest.raises(RuntimeError):
+            service.embed_query("python")
+        
+        assert metrics.requests.value(provider="local", input_type="query", outcome="error") == 1
+        assert metrics.request_seconds.snapshot()[("local", "query")]["count"] == 1
+    
+    def test_rate_limit_wait(self):
+        """Test recording rate-limiter waits by priority."""
+        metrics = EmbeddingMetrics(MetricsRegistry())
+        metrics.observe_rate_limit_wait(BACKGROUND, 1.5)
+        
+        assert metrics.rate_limit_wait_seconds.snapshot()[("background",)] == {"count": 1, "sum": 1.5}
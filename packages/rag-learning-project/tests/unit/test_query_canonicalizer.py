@@ -0,0 +1,107 @@
+"""Unit tests for query canonicalization and the query memo."""
+import numpy as np
+import pytest
+
+from src.job_portal.services.embeddings.query_canonicalizer import (
+    canonical_experience_level,
+    canonical_skills,
+    normalize_text,
+)
+from src.job_portal.services.embeddings.query_memo import QueryMemo
+
+
+class FakeClock:
+    """Manually advanced clock."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestQueryCanonicalizer:
+    """Test suite for canonicalization functions."""
+    
+    def test_normalize_text(self):
+        """Test case folding and whitespace collapsing."""
+        assert normalize_text("  Senior   Python\n Developer ") == "senior python developer"
+        assert normalize_text(None) == ""
+    
+    def test_canonical_skills(self):
+        """Test that skill order, case and duplicates don't matter."""
+        assert canonical_skills(["Python", "Django"]) == canonical_skills(["django", " python", "PYTHON"])
+        assert canonical_skills(["Django", "", "python"]) == ["django", "python"]
+        assert canonical_skills(None) == []
+    
+    def test_canonical_experience_level(self):
+        """Test mapping experience level aliases onto the stored vocabulary."""
+        assert canonical_experience_level("Sr.") == "senior"
+        assert canonical_experience_level("Mid-Level") == "mid"
+        assert canonical_experience_level("junior") == "entry"
+        assert canonical_experience_level("Entry_Level") == "entry"
+        assert canonical_experience_level("Principal") == "lead"
+        assert canonical_experience_level("Executive") == "executive"
+        assert canonical_experience_level(None) == ""
+
+
+class TestQueryMemo:
+    """Test suite for QueryMemo class."""
+    
+    def test_hit_and_miss(self):
+        """Test remembering a query and counting hits and misses."""
+        memo = QueryMemo()
+        
+        assert memo.get("q") is None
+        memo.put("q", [0.1, 0.2])
+        
+        assert memo.get("q") == pytest.approx([0.1, 0.2])
+        stats = memo.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+    
+    def test_entries_expire(self):
+        """Test that entries are dropped after the TTL."""
+        clock = FakeClock()
+        memo = QueryMemo(ttl=10, clock=clock)
+        memo.put("q", [0.1])
+        
+        clock.now = 9.9
+        assert memo.get("q") == pytest.approx([0.1])
+        clock.now = 10.0
+        assert memo.get("q") is None
+        assert memo.stats()["expirations"] == 1
+        assert memo.stats()["entries"] == 0
+    
+    def test_bounded_lru(self):
+        """Test that the least recently used entry is evicted."""
+        memo = QueryMemo(max_entries=2)
+        memo.put("a", [1.0])
+        memo.put("b", [2.0])
+        memo.get("a")
+        memo.put("c", [3.0])
+        
+        assert memo.get("b") is None
+        assert memo.get("a").tolist() == [1.0]
+        assert memo.stats()["evictions"] == 1
+    
+    def test_stores_read_only_float32_vectors(self):
+        """Test that callers can't mutate remembered vectors."""
+        memo = QueryMemo()
+        vector = np.array([0.5, 0.25])
+        memo.put("q", vector)
+        vector[0] = 0.0
+        
+        remembered = memo.get("q")
+        assert remembered.dtype == np.float32
+        assert remembered.tolist() == [0.5, 0.25]
+        with pytest.raises(ValueError):
+            remembered[0] = 1.0
+    
+    def test_disabled(self):
+        """Test that max_entries=0 remembers nothing."""
+        memo = QueryMemo(max_entries=0)
+        memo.put("q", [0.1])
+        
+        assert memo.get("q") is None
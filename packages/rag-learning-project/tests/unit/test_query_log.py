@@ -0,0 +1,59 @@
+"""Unit tests for the rotating search query log."""
+import json
+
+from src.job_portal.services.embeddings.query_log import QueryLog
+
+
+class TestQueryLog:
+    """Test suite for QueryLog class."""
+    
+    def test_append_and_read(self, tmp_path):
+        """Test that appended queries are read back in order."""
+        log = QueryLog(str(tmp_path / "logs" / "queries.jsonl"), clock=lambda: 100.0)
+        log.append("python developer", "jobs")
+        log.append("data engineer", "candidates")
+        log.append("", "jobs")
+        
+        assert list(log.entries()) == [
+            {"t": 100.0, "k": "jobs", "q": "python developer"},
+            {"t": 100.0, "k": "candidates", "q": "data engineer"},
+        ]
+    
+    def test_rotation_bounds_size(self, tmp_path):
+        """Test that the log rotates and drops files beyond the backup count."""
+        path = tmp_path / "queries.jsonl"
+        log = QueryLog(str(path), max_bytes=100, backups=2)
+        for i in range(30):
+            log.append(f"query number {i}", "jobs")
+        
+        files = sorted(p.name for p in tmp_path.iterdir())
+        assert files == ["queries.jsonl", "queries.jsonl.1", "queries.jsonl.2"]
+        assert all(p.stat().st_size <= 100 for p in tmp_path.iterdir())
+        queries = [entry["q"] for entry in log.entries()]
+        assert queries[-1] == "query number 29"
+        assert queries == sorted(queries, key=lambda q: int(q.split()[-1]))
+    
+    def test_corrupt_lines_are_skipped(self, tmp_path):
+        """Test that unreadable lines don't stop reading."""
+        path = tmp_path / "queries.jsonl"
+        path.write_text('not json\n{"t": 1, "k": "jobs", "q": "go developer"}\n{"t": 2}\n', encoding="utf-8")
+        
+        assert [entry["q"] for entry in QueryLog(str(path)).entries()] == ["go developer"]
+    
+    def test_append_never_raises(self, tmp_path):
+        """Test that an unwritable path doesn't fail the search."""
+        blocker = tmp_path / "file"
+        blocker.write_text("x")
+        
+        QueryLog(str(blocker / "queries.jsonl")).append("python", "jobs")
+    
+    def test_from_env(self, monkeypatch, tmp_path):
+        """Test that QUERY_LOG_PATH configures or disables the log."""
+        monkeypatch.setenv("QUERY_LOG_PATH", str(tmp_path / "q.jsonl"))
+        monkeypatch.setenv("QUERY_LOG_MAX_BYTES", "2048")
+        log = QueryLog.from_env()
+        assert log.path == str(tmp_path / "q.jsonl")
+        assert log.max_bytes == 2048
+        
+        monkeypatch.setenv("QUERY_LOG_PATH", "off")
+        assert QueryLog.from_env() is None
@@ -0,0 +1,177 @@
+"""Unit tests for the process-wide Voyage AI rate limiter."""
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.job_portal.infrastructure.voyage.rate_limiter import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimiter,
+    RateLimitTimeout,
+    get_rate_limiter,
+    set_rate_limiter,
+)
+from src.job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter class."""
+    
+    def test_unlimited_never_waits(self):
+        """Test that disabled budgets admit requests immediately."""
+        limiter = RateLimiter(rpm=None, tpm=None)
+        for _ in range(100):
+            assert limiter.acquire(tokens=10 ** 6) < 0.05
+        assert limiter.stats()["admitted"]["interactive"] == 100
+    
+    def test_request_budget_spaces_requests(self):
+        """Test that the request bucket spaces requests at 60/rpm seconds."""
+        limiter = RateLimiter(rpm=600, tpm=None)
+        limiter.acquire()
+        waited = limiter.acquire()
+        assert 0.05 <= waited < 0.5
+    
+    def test_token_budget(self):
+        """Test that a request waits for enough tokens to refill."""
+        limiter = RateLimiter(rpm=None, tpm=6000)
+        limiter.acquire(tokens=6000)
+        waited = limiter.acquire(tokens=10)
+        assert 0.05 <= waited < 0.5
+    
+    def test_timeout(self):
+        """Test that a request gives up after its timeout."""
+        limiter = RateLimiter(rpm=1, tpm=None)
+        limiter.acquire()
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire(timeout=0.05)
+        stats = limiter.stats()
+        assert stats["timeouts"] == 1
+        assert stats["queued"] == 0
+    
+    def test_interactive_overtakes_background(self):
+        """Test that queued interactive requests are admitted before background ones."""
+        limiter = RateLimiter(rpm=600, tpm=None)
+        limiter.acquire()
+        order = []
+        
+        def worker(name, priority):
+            limiter.acquire(priority=priority)
+            order.append(name)
+        
+        background = [
+            threading.Thread(target=worker, args=(f"bg{i}", BACKGROUND)) for i in range(3)
+        ]
+        for thread in background:
+            thread.start()
+        time.sleep(0.02)
+        interactive = threading.Thread(target=worker, args=("search", INTERACTIVE))
+        interactive.start()
+        
+        for thread in background + [interactive]:
+            thread.join(timeout=5)
+        assert order[0] == "search"
+        assert sorted(order[1:]) == ["bg0", "bg1", "bg2"]
+    
+    def test_estimate_wait(self):
+        """Test wait estimates for an exhausted bucket."""
+        limiter = RateLimiter(rpm=60, tpm=None)
+        assert limiter.estimate_wait() == 0.0
+        limiter.acquire()
+        assert limiter.estimate_wait() == pytest.approx(1.0, abs=0.1)
+    
+    def test_acquire_async(self):
+        """Test that async callers wait without blocking the event loop."""
+        limiter = RateLimiter(rpm=600, tpm=None)
+        ticks = []
+        
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+        
+        async def main():
+            await limiter.acquire_async()
+            return await asyncio.gather(limiter.acquire_async(priority=BACKGROUND), ticker())
+        
+        waited, _ = asyncio.run(main())
+        assert waited >= 0.05
+        assert len(ticks) == 5
+        assert limiter.stats()["admitted"] == {"interactive": 1, "background": 1}
+    
+    def test_stats(self):
+        """Test admitted token and wait metrics."""
+        limiter = RateLimiter(rpm=None, tpm=1000)
+        limiter.acquire(tokens=100)
+        limiter.acquire(tokens=50, priority=BACKGROUND)
+        stats = limiter.stats()
+        assert stats["tokens_admitted"] == 150
+        assert stats["tokens_available"] == pytest.approx(850, abs=5)
+        assert "requests_available" not in stats
+    
+    @patch.dict('os.environ', {'VOYAGE_RPM': '0', 'VOYAGE_TPM': '2000'})
+    def test_from_env(self):
+        """Test configuring budgets from environment variables."""
+        limiter = RateLimiter.from_env()
+        assert limiter.rpm is None
+        assert limiter.tpm == 2000
+    
+    def test_shared_default(self):
+        """Test that the process-wide limiter is shared until replaced."""
+        custom = RateLimiter(rpm=None, tpm=None)
+        set_rate_limiter(custom)
+        assert get_rate_limiter() is custom
+        assert get_rate_limiter() is get_rate_limiter()
+
+
+class TestServiceRateLimiting:
+    """Test that embedding requests go through the limiter."""
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_queries_are_interactive(self, mock_client_class, mock_voyage_client):
+        """Test that query requests acquire interactive budget."""
+        mock_client_class.return_value = mock_voyage_client
+        limiter = Mock(tpm=None, **{"acquire.return_value": 0.0})
+        service = VoyageEmbeddingService(api_key="test_key", rate_limiter=limiter)
+        
+        service.embed_query("a" * 40)
+        
+        limiter.acquire.assert_called_once()
+        kwargs = limiter.acquire.call_args.kwargs
+        assert (kwargs["tokens"], kwargs["priority"]) == (10, INTERACTIVE)
+        # Queueing for budget doesn't count against the query deadline
+        assert kwargs["timeout"] is None
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_documents_are_background(self, mock_client_class, mock_voyage_client):
+        """Test that document requests acquire background budget."""
+        mock_client_class.return_value = mock_voyage_client
+        limiter = Mock(tpm=None, **{"acquire.return_value": 0.0})
+        service = VoyageEmbeddingService(api_key="test_key", rate_limiter=limiter)
+        
+        service.embed_document("short", auto_chunk=False)
+        
+        assert limiter.acquire.call_args.kwargs["priority"] == BACKGROUND
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_query_max_wait(self, mock_client_class, mock_voyage_client):
+        """Test that a query fails fast instead of waiting past max_wait."""
+        mock_client_class.return_value = mock_voyage_client
+        limiter = RateLimiter(rpm=1, tpm=None)
+        service = VoyageEmbeddingService(api_key="test_key", rate_limiter=limiter)
+        service.embed_query("first", max_wait=0)
+        
+        with pytest.raises(RateLimitTimeout):
+            service.embed_query("second", max_wait=0)
+        assert mock_voyage_client.contextualized_embed.call_count == 1
+    
+    @patch('src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client')
+    def test_batches_fit_token_budget(self, mock_client_class):
+        """Test that one request never asks for more than a minute of tokens."""
+        service = VoyageEmbeddingService(
+            api_key="test_key",
+            rate_limiter=RateLimiter(rpm=None, tpm=5000)
+        )
+        assert service.batch_planner.max_tokens == 5000
@@ -0,0 +1,263 @@
+"""Unit tests for embedding request resilience (deadlines, retries, hedging, breaker)."""
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import voyageai.error as voyage_error
+
+from src.job_portal.infrastructure.observability.metrics import MetricsRegistry
+from src.job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+from src.job_portal.infrastructure.voyage.instrumentation import EmbeddingMetrics
+from src.job_portal.infrastructure.voyage.rate_limiter import RateLimiter, RateLimitTimeout
+from src.job_portal.infrastructure.voyage.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EmbeddingTimeout,
+    LatencyTracker,
+    ResiliencePolicy,
+    is_retryable,
+)
+
+
+def _policy(**kwargs):
+    kwargs.setdefault("breaker", CircuitBreaker())
+    kwargs.setdefault("sleep", lambda seconds: None)
+    return ResiliencePolicy(**kwargs)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Test suite for CircuitBreaker class."""
+    
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the breaker and calls fail fast."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=FakeClock())
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert breaker.rejected == 1
+    
+    def test_half_open_trial(self):
+        """Test that one trial call is let through after the reset timeout."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 31
+        
+        assert breaker.state == "half_open"
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        
+        breaker.record_success()
+        assert breaker.state == "closed"
+        breaker.before_call()
+    
+    def test_failed_trial_reopens(self):
+        """Test that a failed trial call opens the breaker again."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 31
+        breaker.before_call()
+        breaker.record_failure()
+        
+        assert breaker.state == "open"
+
+
+class TestResiliencePolicy:
+    """Test suite for ResiliencePolicy class."""
+    
+    def test_retryable_errors(self):
+        """Test which provider errors are retried."""
+        assert is_retryable(voyage_error.RateLimitError("slow down"))
+        assert is_retryable(voyage_error.ServiceUnavailableError("down"))
+        assert is_retryable(EmbeddingTimeout())
+        assert not is_retryable(voyage_error.InvalidRequestError("bad"))
+        assert not is_retryable(ValueError("bug"))
+    
+    def test_retries_transient_errors(self):
+        """Test that 429/5xx errors are retried, each attempt admitted by the limiter."""
+        send = Mock(side_effect=[voyage_error.RateLimitError("slow down"), voyage_error.ServerError("oops"), "ok"])
+        admit = Mock()
+        on_retry = Mock()
+        
+        result = _policy().call(send, admit, "document", on_retry=on_retry)
+        
+        assert result == "ok"
+        assert send.call_count == 3
+        assert admit.call_count == 3
+        assert on_retry.call_count == 2
+    
+    def test_gives_up_after_max_attempts(self):
+        """Test that the last error is raised once attempts run out."""
+        send = Mock(side_effect=voyage_error.ServerError("oops"))
+        
+        with pytest.raises(voyage_error.ServerError):
+            _policy(max_attempts=2).call(send, Mock(), "query")
+        assert send.call_count == 2
+    
+    def test_does_not_retry_bad_requests(self):
+        """Test that non-transient errors are raised immediately."""
+        send = Mock(side_effect=voyage_error.InvalidRequestError("bad"))
+        policy = _policy()
+        
+        with pytest.raises(voyage_error.InvalidRequestError):
+            policy.call(send, Mock(), "query")
+        assert send.call_count == 1
+        assert policy.breaker.state == "closed"
+    
+    def test_retry_after_header_is_honoured(self):
+        """Test that backoff waits at least the server's Retry-After."""
+        error = voyage_error.RateLimitError("slow down", headers={"retry-after": "2"})
+        sleeps = []
+        policy = _policy(sleep=sleeps.append)
+        
+        policy.call(Mock(side_effect=[error, "ok"]), Mock(), "document")
+        
+        assert sleeps and sleeps[0] >= 2
+    
+    def test_deadline(self):
+        """Test that a request past its deadline raises EmbeddingTimeout."""
+        release = threading.Event()
+        policy = _policy(max_attempts=1, query_deadline=0.05, hedge_percentile=None)
+        
+        try:
+            with pytest.raises(EmbeddingTimeout):
+                policy.call(lambda: release.wait(5), Mock(), "query")
+        finally:
+            release.set()
+    
+    def test_deadline_starts_after_admission(self):
+        """Test that waiting for rate-limit budget doesn't use up the request deadline."""
+        policy = _policy(query_deadline=0.05, hedge_percentile=None)
+        admit = Mock(side_effect=lambda timeout: time.sleep(0.1))
+        
+        assert policy.call(lambda: "ok", admit, "query") == "ok"
+        admit.assert_called_once_with(None)
+    
+    def test_policies_share_one_executor(self):
+        """Test that policies run attempts on the process-wide executor."""
+        assert _policy()._executor is _policy()._executor
+    
+    def test_rate_limit_timeout_propagates(self):
+        """Test that a request is abandoned if budget isn't available before the deadline."""
+        send = Mock()
+        admit = Mock(side_effect=RateLimitTimeout("no budget"))
+        
+        with pytest.raises(RateLimitTimeout):
+            _policy().call(send, admit, "query")
+        send.assert_not_called()
+    
+    def test_open_breaker_fails_fast(self):
+        """Test that calls are rejected without reaching the provider while the breaker is open."""
+        policy = _policy(max_attempts=2, breaker=CircuitBreaker(failure_threshold=2))
+        send = Mock(side_effect=voyage_error.ServiceUnavailableError("down"))
+        with pytest.raises(voyage_error.ServiceUnavailableError):
+            policy.call(send, Mock(), "query")
+        
+        with pytest.raises(CircuitOpenError):
+            policy.call(send, Mock(), "query")
+        assert send.call_count == 2
+    
+    def test_hedges_slow_queries(self):
+        """Test that a slow query gets a duplicate request once it passes the latency percentile."""
+        policy = _policy(hedge_percentile=0.5, hedge_min_samples=5)
+        for _ in range(5):
+            policy.latencies.record(0.01)
+        release = threading.Event()
+        calls = []
+        
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+        
+        admit = Mock()
+        on_hedge = Mock()
+        try:
+            result = policy.call(send, admit, "query", on_hedge=on_hedge)
+        finally:
+            release.set()
+        
+        assert result == "fast"
+        on_hedge.assert_called_once()
+        assert admit.call_count == 2
+        admit.assert_called_with(0.0)
+    
+    def test_hedge_skipped_without_budget(self):
+        """Test that no hedge is sent when it would have to wait for rate-limit budget."""
+        policy = _policy(hedge_percentile=0.5, hedge_min_samples=1)
+        policy.latencies.record(0.001)
+        admit = Mock(side_effect=[None, RateLimitTimeout("no budget")])
+        on_hedge = Mock()
+        
+        result = policy.call(lambda: time.sleep(0.05) or "ok", admit, "query", on_hedge=on_hedge)
+        
+        assert result == "ok"
+        on_hedge.assert_not_called()
+    
+    def test_latency_percentile(self):
+        """Test latency percentiles need enough samples."""
+        tracker = LatencyTracker()
+        assert tracker.percentile(0.95, min_samples=1) is None
+        for value in range(1, 101):
+            tracker.record(value / 100)
+        assert tracker.percentile(0.95) == pytest.approx(0.96)
+
+
+class TestServiceResilience:
+    """Test the resilience policy wired into VoyageEmbeddingService."""
+    
+    @patch("src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client")
+    def test_service_retries_and_records(self, mock_client_class):
+        """Test that the service retries transient errors through the rate limiter."""
+        mock_result = Mock()
+        mock_result.results = [Mock(embeddings=[[0.1, 0.2]])]
+        mock_client = Mock()
+        mock_client.contextualized_embed.side_effect = [voyage_error.ServerError("oops"), mock_result]
+        mock_client_class.return_value = mock_client
+        limiter = RateLimiter(rpm=None, tpm=None)
+        metrics = EmbeddingMetrics(MetricsRegistry())
+        
+        service = VoyageEmbeddingService(
+            api_key="test-key", rate_limiter=limiter, metrics=metrics, resilience=_policy()
+        )
+        vector = service.embed_query("python")
+        
+        assert vector.tolist() == pytest.approx([0.1, 0.2])
+        assert limiter.stats()["admitted"]["interactive"] == 2
+        assert metrics.retries.value(provider="voyage", input_type="query") == 1
+        assert metrics.requests.value(provider="voyage", input_type="query", outcome="error") == 1
+    
+    @patch("src.job_portal.infrastructure.voyage.embedding_service.voyageai.Client")
+    def test_back_to_back_queries_wait_for_budget(self, mock_client_class):
+        """Test that two queries within one refill interval both succeed."""
+        mock_result = Mock()
+        mock_result.results = [Mock(embeddings=[[0.1, 0.2]])]
+        mock_client_class.return_value.contextualized_embed.return_value = mock_result
+        # One request every 0.5s, longer than the query deadline
+        limiter = RateLimiter(rpm=120, tpm=10000)
+        
+        service = VoyageEmbeddingService(
+            api_key="test-key", rate_limiter=limiter, resilience=_policy(query_deadline=0.2)
+        )
+        service.embed_query("python")
+        service.embed_query("golang")
+        
+        assert limiter.stats()["admitted"]["interactive"] == 2
@@ -0,0 +1,152 @@
+"""Unit tests for the shared embedding sidecar and its client provider."""
+import os
+import socket
+import tempfile
+
+import numpy as np
+import pytest
+
+from src.job_portal.infrastructure.observability.metrics import MetricsRegistry
+from src.job_portal.infrastructure.providers.base import EmbeddingProvider
+from src.job_portal.infrastructure.providers.hashing import HashingEmbeddingProvider
+from src.job_portal.infrastructure.voyage.embedding_cache import EmbeddingCache
+from src.job_portal.infrastructure.voyage.embedding_service import VoyageEmbeddingService
+from src.job_portal.infrastructure.voyage.instrumentation import EmbeddingMetrics
+from src.job_portal.infrastructure.voyage.rate_limiter import RateLimiter, RateLimitTimeout
+from src.job_portal.infrastructure.voyage.sidecar import (
+    EmbeddingSidecar,
+    SidecarError,
+    SidecarProvider,
+    decode_matrix,
+    encode_matrix,
+)
+
+
+class CountingRemoteProvider(EmbeddingProvider):
+    """Remote-looking provider that counts the requests reaching it."""
+    
+    name = "counting"
+    model = "counting-model"
+    output_dimension = 4
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def embed(self, inputs, input_type):
+        self.calls += 1
+        return [np.ones((len(chunks), 4), dtype=np.float32) for chunks in inputs]
+
+
+@pytest.fixture
+def local_service():
+    return VoyageEmbeddingService(
+        provider=HashingEmbeddingProvider(output_dimension=64),
+        cache=EmbeddingCache(),
+        metrics=EmbeddingMetrics(MetricsRegistry())
+    )
+
+
+@pytest.fixture
+def sidecar(local_service):
+    server = EmbeddingSidecar(local_service, port=0).start()
+    yield server
+    server.shutdown()
+
+
+class TestEmbeddingSidecar:
+    """Test suite for EmbeddingSidecar and SidecarProvider."""
+    
+    def test_matrix_wire_format(self):
+        """Test that matrices survive encoding unchanged."""
+        matrix = np.arange(6, dtype=np.float32).reshape(2, 3)
+        decoded = decode_matrix(encode_matrix(matrix))
+        
+        assert decoded.dtype == np.float32
+        assert np.array_equal(decoded, matrix)
+    
+    def test_provider_reads_model_from_sidecar(self, sidecar, local_service):
+        """Test that the client learns model and dimension from the sidecar."""
+        provider = SidecarProvider(sidecar.url)
+        
+        assert provider.model == local_service.model
+        assert provider.output_dimension == 64
+        assert provider.remote is False
+    
+    def test_embeddings_match_direct_service(self, sidecar, local_service):
+        """Test that embedding through the sidecar returns the service's vectors."""
+        client = VoyageEmbeddingService(provider=SidecarProvider(sidecar.url))
+        inputs = [["senior python developer"], ["chunk one", "chunk two"]]
+        
+        via_sidecar = client.embed_inputs(inputs, "document")
+        direct = local_service.embed_inputs(inputs, "document")
+        
+        assert [m.shape for m in via_sidecar] == [(1, 64), (2, 64)]
+        for got, expected in zip(via_sidecar, direct):
+            assert np.allclose(got, expected)
+    
+    def test_clients_share_the_sidecar_cache(self, sidecar, local_service):
+        """Test that a second client process is served from the sidecar's cache."""
+        first = VoyageEmbeddingService(provider=SidecarProvider(sidecar.url))
+        second = VoyageEmbeddingService(provider=SidecarProvider(sidecar.url))
+        
+        first.embed_query("python")
+        second.embed_query("python")
+        
+        assert local_service.cache.stats()["memory_hits"] == 1
+    
+    def test_rate_limit_is_enforced_by_the_sidecar(self):
+        """Test that quota checks and waits happen in the sidecar, not the client."""
+        remote = CountingRemoteProvider()
+        service = VoyageEmbeddingService(
+            provider=remote,
+            rate_limiter=RateLimiter(rpm=1, tpm=None),
+            metrics=EmbeddingMetrics(MetricsRegistry())
+        )
+        server = EmbeddingSidecar(service, port=0).start()
+        try:
+            client = VoyageEmbeddingService(provider=SidecarProvider(server.url))
+            client.embed_query("first", max_wait=0)
+            
+            with pytest.raises(RateLimitTimeout):
+                client.embed_query("second", max_wait=0)
+            assert remote.calls == 1
+        finally:
+            server.shutdown()
+    
+    def test_bad_request(self, sidecar):
+        """Test that malformed requests are rejected."""
+        provider = SidecarProvider(sidecar.url)
+        
+        with pytest.raises(SidecarError, match="input_type"):
+            provider.embed([["text"]], "passage")
+    
+    def test_unreachable_sidecar(self):
+        """Test that a missing sidecar raises SidecarError."""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        
+        with pytest.raises(SidecarError, match="unreachable"):
+            SidecarProvider(f"http://127.0.0.1:{port}")
+    
+    def test_metrics_endpoint(self, sidecar):
+        """Test that the sidecar exports its metrics registry."""
+        provider = SidecarProvider(sidecar.url)
+        provider.embed([["text"]], "query")
+        connection = provider._connection()
+        connection.request("GET", "/metrics")
+        
+        assert b"job_portal_embedding_requests_total" in connection.getresponse().read()
+    
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not supported")
+    def test_unix_socket(self, local_service):
+        """Test serving over a Unix socket."""
+        path = os.path.join(tempfile.mkdtemp(), "embeddings.sock")
+        server = EmbeddingSidecar(local_service, socket_path=path).start()
+        try:
+            provider = SidecarProvider(f"unix://{path}")
+            
+            assert provider.embed([["text"]], "query")[0].shape == (1, 64)
+        finally:
+            server.shutdown()
+        assert not os.path.exists(path)
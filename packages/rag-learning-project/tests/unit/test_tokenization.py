@@ -0,0 +1,74 @@
+"""Unit tests for token counting and token-budget chunking."""
+from unittest.mock import Mock
+
+from src.job_portal.infrastructure.voyage.tokenization import TokenCounter, make_text_splitter
+
+
+def _word_counter(**kwargs):
+    """Counter whose 'encoding' makes one token per word."""
+    counter = TokenCounter(**kwargs)
+    counter._encoding = Mock(encode_ordinary=lambda text: text.split())
+    counter._loaded = True
+    return counter
+
+
+class TestTokenCounter:
+    """Test suite for TokenCounter class."""
+    
+    def test_counts_with_encoding(self):
+        """Test that counts come from the encoding."""
+        counter = _word_counter()
+        
+        assert counter.count("one two three") == 3
+        assert counter.count("") == 1
+        assert counter.backend == "cl100k_base"
+    
+    def test_counts_are_cached(self):
+        """Test that repeated texts are counted once."""
+        counter = _word_counter()
+        counter.count("one two")
+        counter.count("one two")
+        
+        assert counter.stats()["hits"] == 1
+        assert counter.stats()["misses"] == 1
+        assert counter.stats()["entries"] == 1
+    
+    def test_cache_is_bounded(self):
+        """Test that the least recently used counts are dropped."""
+        counter = _word_counter(max_entries=2)
+        for text in ("a", "b", "a", "c"):
+            counter.count(text)
+        
+        assert counter.stats()["entries"] == 2
+        counter.count("a")
+        assert counter.stats()["hits"] == 2
+    
+    def test_estimate_fallback(self):
+        """Test the character estimate when no encoding is configured or loadable."""
+        assert TokenCounter(encoding_name=None).count("a" * 400) == 100
+        
+        broken = TokenCounter(encoding_name="no-such-encoding")
+        assert broken.count("a" * 40) == 10
+        assert broken.backend == "estimate"
+
+
+class TestTokenTextSplitter:
+    """Test token-budget chunking."""
+    
+    def test_chunks_fit_budget(self):
+        """Test that chunks are packed up to, never past, the token budget."""
+        counter = _word_counter()
+        splitter = make_text_splitter(counter, chunk_tokens=10)
+        text = "\n\n".join(" ".join(f"w{i}" for i in range(4)) for _ in range(6))
+        
+        chunks = splitter.split_text(text)
+        
+        assert all(counter.count(chunk) <= 10 for chunk in chunks)
+        # Two 4-word paragraphs fit per chunk
+        assert len(chunks) == 3
+    
+    def test_short_text_is_one_chunk(self):
+        """Test that text under the budget isn't split."""
+        splitter = make_text_splitter(_word_counter(), chunk_tokens=512)
+        
+        assert splitter.split_text("Senior Python developer.\n\nRemote.") == ["Senior Python developer.\n\nRemote."]
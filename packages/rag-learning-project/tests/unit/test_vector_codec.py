@@ -0,0 +1,86 @@
+"""Unit tests for MongoDB vector encoding."""
+import numpy as np
+import pytest
+from bson import BSON
+from bson.binary import Binary, BinaryVectorDtype
+
+from src.job_portal.infrastructure.mongodb.vector_codec import (
+    decode_vector,
+    detect_format,
+    encode_vector,
+    quantize_int8,
+    validate_format,
+)
+
+
+class TestVectorCodec:
+    """Test suite for vector codec functions."""
+    
+    def test_array_passthrough(self):
+        """Test that the array format keeps values unchanged."""
+        assert encode_vector([0.1, 0.2, 0.3], "array") == [0.1, 0.2, 0.3]
+    
+    def test_float32_round_trip(self):
+        """Test packing to a BinData float32 vector and back."""
+        vector = [0.1, -0.25, 0.5]
+        encoded = encode_vector(vector, "float32")
+        
+        assert isinstance(encoded, Binary)
+        assert encoded.as_vector().dtype == BinaryVectorDtype.FLOAT32
+        assert decode_vector(encoded) == pytest.approx(vector, abs=1e-7)
+    
+    def test_decode_returns_float32_vector(self):
+        """Test that every stored format decodes to a float32 NumPy vector."""
+        for fmt in ("array", "float32", "int8"):
+            decoded = decode_vector(encode_vector([0.5, -1.0], fmt))
+            assert isinstance(decoded, np.ndarray)
+            assert decoded.dtype == np.float32
+    
+    def test_array_format_converts_ndarrays(self):
+        """Test that NumPy vectors are stored as plain lists in the array format."""
+        encoded = encode_vector(np.array([0.5, -1.0], dtype=np.float32), "array")
+        assert encoded == [0.5, -1.0]
+        assert all(type(x) is float for x in encoded)
+    
+    def test_int8_preserves_direction(self):
+        """Test that int8 quantization keeps cosine similarity."""
+        rng = np.random.default_rng(0)
+        vector = rng.normal(size=1024)
+        decoded = np.array(decode_vector(encode_vector(vector, "int8")))
+        
+        cosine = vector @ decoded / (np.linalg.norm(vector) * np.linalg.norm(decoded))
+        assert cosine > 0.999
+        assert np.abs(decoded).max() == 127
+    
+    def test_quantize_zero_vector(self):
+        """Test quantizing an all-zero vector."""
+        assert not quantize_int8([0.0, 0.0]).any()
+    
+    def test_document_size(self):
+        """Test that packed vectors shrink the stored document."""
+        vector = [0.123456] * 1024
+        sizes = {
+            fmt: len(BSON.encode({"v": encode_vector(vector, fmt)}))
+            for fmt in ("array", "float32", "int8")
+        }
+        assert sizes["float32"] < sizes["array"] / 2
+        assert sizes["int8"] < sizes["float32"] / 3
+    
+    def test_reencode_between_formats(self):
+        """Test converting an encoded vector to another format."""
+        encoded = encode_vector([0.5, -1.0], "float32")
+        
+        assert encode_vector(encoded, "float32") is encoded
+        assert decode_vector(encode_vector(encoded, "int8")).tolist() == [64.0, -127.0]
+        assert encode_vector(encoded, "array") == [0.5, -1.0]
+    
+    def test_detect_format(self):
+        """Test detecting the format of stored values."""
+        assert detect_format([0.1]) == "array"
+        assert detect_format(encode_vector([0.1], "float32")) == "float32"
+        assert detect_format(encode_vector([0.1], "int8")) == "int8"
+    
+    def test_unknown_format(self):
+        """Test that unknown formats are rejected."""
+        with pytest.raises(ValueError, match="Unknown vector format"):
+            validate_format("float16")